@@ -1,6 +1,6 @@
 """GearGuard Backend Application Package"""
 from app.config import settings
-from app.database import get_database, init_database, close_database
+from app.database import get_database, get_pool, init_database, close_database
 
 __version__ = "1.0.0"
-__all__ = ["settings", "get_database", "init_database", "close_database"]
+__all__ = ["settings", "get_database", "get_pool", "init_database", "close_database"]
@@ -2,14 +2,18 @@
 GearGuard Backend - API Dependencies
 Dependency injection for FastAPI routes.
 """
-from typing import Optional, Annotated
-from fastapi import Depends, HTTPException, status, Request
+from typing import Optional, Annotated, AsyncGenerator, Any, Callable, List, Literal, Sequence, Tuple
+from fastapi import Depends, HTTPException, Query, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import base64
+import json
 import logging
 
-from app.database import get_database, Database
-from app.core.security import decode_access_token, TokenPayload
+from app.database import acquire_async, async_connection, AsyncDatabase, PoolTimeoutError
+from app.core.security import decode_access_token, hash_token, TokenPayload
 from app.core.permissions import has_permission, Permission
+from app.core.cache import TTLCache
+from app.config import settings
 from app.core.exceptions import (
     InvalidTokenError,
     TokenExpiredError,
@@ -22,19 +26,75 @@ logger = logging.getLogger(__name__)
 # HTTP Bearer security scheme
 security = HTTPBearer(auto_error=False)
 
+# (count query, params) -> row count, for include_total=estimate
+_count_estimate_cache = TTLCache(
+    maxsize=settings.COUNT_ESTIMATE_CACHE_SIZE,
+    ttl=settings.COUNT_ESTIMATE_TTL_SECONDS,
+)
+
+# user_id -> (is_active, is_verified); bounds how long a deactivation takes to apply
+_user_status_cache = TTLCache(
+    maxsize=settings.USER_STATUS_CACHE_SIZE,
+    ttl=settings.USER_STATUS_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_user_status(user_id: str) -> None:
+    """
+    Drop a user's cached status so the next request re-reads it.
+    
+    Call after any write that changes whether a user may authenticate.
+    Other worker processes pick the change up when their entry expires.
+    """
+    _user_status_cache.delete(user_id)
+
+
+def user_status_cache_stats() -> dict:
+    """User status cache metrics."""
+    return _user_status_cache.stats()
+
 
 # ===========================================
 # Database Dependency
 # ===========================================
 
-def get_db() -> Database:
+def _session_key(request: Request) -> Optional[str]:
+    """Identify the caller's session for read-your-writes tracking."""
+    authorization = request.headers.get("authorization")
+    return hash_token(authorization) if authorization else None
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncDatabase, None]:
     """
-    Get database instance.
+    Check out a pooled database connection for the duration of the request.
     
-    Returns:
-        Database connection instance
+    The connection is returned to the pool when the request finishes;
+    uncommitted work is rolled back if the request fails. If the caller's own
+    earlier writes have not been synced to the replica yet, a sync runs first.
+    
+    Yields:
+        AsyncDatabase wrapping the checked-out connection
+        
+    Raises:
+        HTTPException: 503 if no connection frees up within the pool timeout
     """
-    return get_database()
+    try:
+        db = await acquire_async(session_key=_session_key(request))
+    except PoolTimeoutError as e:
+        logger.warning(f"Database pool exhausted: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database is busy, please retry",
+        )
+    
+    try:
+        await db.ensure_fresh()
+        yield db
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        db.release()
 
 
 # ===========================================
@@ -43,7 +103,7 @@ def get_db() -> Database:
 
 async def get_current_user(
     credentials: Annotated[Optional[HTTPAuthorizationCredentials], Depends(security)],
-    db: Database = Depends(get_db)
+    db: AsyncDatabase = Depends(get_db)
 ) -> TokenPayload:
     """
     Get the current authenticated user from JWT token.
@@ -58,15 +118,24 @@ async def get_current_user(
     Raises:
         HTTPException: If authentication fails
     """
-    if credentials is None:
+    token = credentials.credentials if credentials is not None else None
+    return await _authenticate(token, db)
+
+
+async def _authenticate(token: Optional[str], db: Optional[AsyncDatabase] = None) -> TokenPayload:
+    """
+    Decode an access token and verify its user.
+    
+    Raises:
+        HTTPException: If authentication fails
+    """
+    if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    token = credentials.credentials
-    
     # Decode and validate the token
     payload = decode_access_token(token)
     
@@ -77,25 +146,74 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Optional: Verify user still exists and is active
-    # This adds a DB query but ensures immediate revocation
-    user = db.fetch_one(
-        "SELECT id, is_active, is_verified FROM users WHERE id = ?",
-        (payload.sub,)
-    )
+    await _verify_user_status(payload, db)
+    return payload
+
+
+async def _verify_user_status(payload: TokenPayload, db: Optional[AsyncDatabase] = None) -> None:
+    """
+    Verify the token's user still exists and is active.
     
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
+    The status is cached for USER_STATUS_CACHE_TTL_SECONDS and invalidated on
+    user writes. Without `db`, a pooled connection is borrowed only on a miss.
     
-    user_id, is_active, is_verified = user
+    Raises:
+        HTTPException: 401 if the user is gone, 403 if the account is disabled
+    """
+    user_status = _user_status_cache.get(payload.sub)
+    if user_status is None:
+        query = "SELECT id, is_active, is_verified FROM users WHERE id = ?"
+        if db is None:
+            async with async_connection() as conn:
+                user = await conn.fetch_one(query, (payload.sub,))
+        else:
+            user = await db.fetch_one(query, (payload.sub,))
+        
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        
+        user_status = (bool(user[1]), bool(user[2]))
+        _user_status_cache.set(payload.sub, user_status)
+    
+    is_active, is_verified = user_status
     
     if not is_active:
         raise to_http_exception(AccountDisabledError())
+
+
+async def get_stream_user(
+    credentials: Annotated[Optional[HTTPAuthorizationCredentials], Depends(security)],
+    access_token: Optional[str] = Query(None, description="Access token, for clients that cannot set headers (EventSource)")
+) -> TokenPayload:
+    """
+    Authenticate a long-lived streaming request.
     
-    return payload
+    Accepts the access token as a Bearer header or `access_token` query
+    parameter. Unlike `get_current_user` it holds no database connection for
+    the lifetime of the response.
+    
+    Raises:
+        HTTPException: If authentication fails
+    """
+    token = credentials.credentials if credentials is not None else access_token
+    return await _authenticate(token)
+
+
+async def get_unpooled_user(
+    credentials: Annotated[Optional[HTTPAuthorizationCredentials], Depends(security)],
+) -> TokenPayload:
+    """
+    Authenticate like `get_current_user` without checking out a database
+    connection for the request.
+    
+    For endpoints that wait on other work (e.g. the meter ingestion buffer)
+    or stream their response, and open short-lived connections themselves;
+    a request-scoped connection would stay checked out for the whole wait.
+    """
+    return await _authenticate(credentials.credentials if credentials is not None else None)
 
 
 async def get_current_user_optional(
@@ -157,14 +275,25 @@ class PermissionChecker:
         self, 
         current_user: Annotated[TokenPayload, Depends(get_current_user)]
     ) -> bool:
-        if not has_permission(current_user.permissions, self.permission):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Permission denied: {self.permission} required"
-            )
+        require_permission(current_user, self.permission)
         return True
 
 
+def require_permission(current_user: TokenPayload, permission: str) -> None:
+    """
+    Check a permission inside an endpoint (for endpoints that cannot use
+    `PermissionChecker`, which depends on a request-scoped connection).
+    
+    Raises:
+        HTTPException: 403 if the user lacks the permission
+    """
+    if not has_permission(current_user.permissions, permission):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Permission denied: {permission} required"
+        )
+
+
 class MultiPermissionChecker:
     """
     Dependency class for checking multiple permissions (OR logic).
@@ -231,22 +360,63 @@ async def get_org_id(
 # Pagination Dependencies
 # ===========================================
 
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor."""
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+    
+    Raises:
+        HTTPException: 400 if the cursor is malformed or has the wrong shape
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        values = None
+    
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+    return values
+
+
 class PaginationParams:
     """
     Pagination parameters.
     
+    Supports classic page numbers (LIMIT/OFFSET) and opaque keyset cursors.
+    When `cursor` is given, `offset` is 0 and the page continues strictly after
+    the row the cursor was taken from, so deep pages cost the same as the first.
+    
+    `include_total` controls the COUNT(*) behind `total`: "exact" runs it,
+    "estimate" serves a recently cached count for the same filter, and "none"
+    skips it. `has_more` is always known because one extra row is fetched.
+    
     Usage:
         @router.get("/items")
         async def get_items(pagination: PaginationParams = Depends()):
-            offset = pagination.offset
-            limit = pagination.limit
+            keyset_sql, keyset_params = pagination.keyset(("i.created_at", "i.id"))
+            ... WHERE ... AND {keyset_sql} ORDER BY i.created_at DESC, i.id DESC
+            ... LIMIT pagination.fetch_limit OFFSET pagination.offset
+            rows = pagination.page_rows(rows)
+            total = await pagination.resolve_total(db, count_sql, count_params, rows)
+            next_cursor = pagination.next_cursor(rows, lambda r: (r[5], r[0]))
     """
     
     def __init__(
         self,
         page: int = 1,
         page_size: int = 20,
-        max_page_size: int = 100
+        max_page_size: int = 100,
+        cursor: Optional[str] = None,
+        include_total: Literal["exact", "estimate", "none"] = "exact"
     ):
         if page < 1:
             page = 1
@@ -257,8 +427,88 @@ class PaginationParams:
         
         self.page = page
         self.page_size = page_size
-        self.offset = (page - 1) * page_size
+        self.cursor = cursor or None
+        self.offset = 0 if self.cursor else (page - 1) * page_size
         self.limit = page_size
+        self.fetch_limit = page_size + 1
+        self.include_total = include_total
+        self.has_more = False
+    
+    def keyset(
+        self,
+        columns: Sequence[str],
+        descending: bool = True
+    ) -> Tuple[str, List[Any]]:
+        """
+        Build the WHERE predicate that resumes after the cursor.
+        
+        Args:
+            columns: Sort columns, ending with a unique tiebreaker (e.g. id)
+            descending: Sort direction shared by all columns
+            
+        Returns:
+            (SQL predicate, params); ("1 = 1", []) when there is no cursor
+        """
+        if not self.cursor:
+            return "1 = 1", []
+        
+        values = decode_cursor(self.cursor, len(columns))
+        operator = "<" if descending else ">"
+        placeholders = ", ".join("?" for _ in columns)
+        return f"({', '.join(columns)}) {operator} ({placeholders})", values
+    
+    def page_rows(self, rows: Sequence[Sequence[Any]]) -> Sequence[Sequence[Any]]:
+        """Trim the look-ahead row fetched with `fetch_limit` and record `has_more`."""
+        self.has_more = len(rows) > self.limit
+        return rows[:self.limit]
+    
+    def next_cursor(
+        self,
+        rows: Sequence[Sequence[Any]],
+        key: Callable[[Sequence[Any]], Sequence[Any]]
+    ) -> Optional[str]:
+        """Cursor for the page after `rows`, or None if this is the last page."""
+        if not self.has_more or not rows:
+            return None
+        return encode_cursor(*key(rows[-1]))
+    
+    async def resolve_total(
+        self,
+        db: AsyncDatabase,
+        count_query: str,
+        params: Sequence[Any],
+        rows: Sequence[Sequence[Any]]
+    ) -> Optional[int]:
+        """
+        Total matching rows according to `include_total`.
+        
+        On the last page of an offset listing the total follows from the page
+        itself, so no COUNT(*) runs regardless of mode.
+        
+        Args:
+            db: Database connection
+            count_query: SELECT COUNT(*) over the same filters (without the cursor)
+            params: Parameters for count_query
+            rows: Rows on the current page (after `page_rows`)
+        """
+        if self.include_total == "none":
+            return None
+        
+        if not self.cursor and not self.has_more and (rows or self.offset == 0):
+            total = self.offset + len(rows)
+            _count_estimate_cache.set((count_query, tuple(params)), total)
+            return total
+        
+        cache_key = (count_query, tuple(params))
+        if self.include_total == "estimate":
+            cached = _count_estimate_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        row = await db.fetch_one(count_query, tuple(params))
+        total = row[0] if row else 0
+        _count_estimate_cache.set(cache_key, total)
+        return total
 
 
 # ===========================================
@@ -290,7 +540,9 @@ async def get_client_info(request: Request) -> dict:
 CurrentUser = Annotated[TokenPayload, Depends(get_current_user)]
 OptionalUser = Annotated[Optional[TokenPayload], Depends(get_current_user_optional)]
 ActiveUser = Annotated[TokenPayload, Depends(get_current_active_user)]
+StreamUser = Annotated[TokenPayload, Depends(get_stream_user)]
+UnpooledUser = Annotated[TokenPayload, Depends(get_unpooled_user)]
 OrgId = Annotated[str, Depends(get_org_id)]
 Pagination = Annotated[PaginationParams, Depends()]
 ClientInfo = Annotated[dict, Depends(get_client_info)]
-Db = Annotated[Database, Depends(get_db)]
+Db = Annotated[AsyncDatabase, Depends(get_db)]
@@ -2,11 +2,12 @@
 GearGuard Backend - Audit Logs Endpoints
 System audit trail access.
 """
-from typing import Optional, List
+from typing import Any, Optional, List, Tuple
 from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
 
 from ..deps import Db, CurrentUser, Pagination, PermissionChecker
+from ...database import optional_filter
 from ...core.permissions import Permission
 
 router = APIRouter()
@@ -25,9 +26,42 @@ class AuditLogResponse(BaseModel):
 
 class AuditLogListResponse(BaseModel):
     items: List[AuditLogResponse]
-    total: int
+    total: Optional[int]  # None when include_total=none
     page: int
     page_size: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None
+
+
+def audit_log_filters(
+    org_id: str,
+    resource_type: Optional[str] = None,
+    action: Optional[str] = None,
+    user_id: Optional[str] = None
+) -> Tuple[str, List[Any]]:
+    """WHERE clause (over alias a) shared by the audit log list and export."""
+    where_clauses = ["a.organization_id = ?"]
+    params: List[Any] = [org_id]
+    
+    if resource_type:
+        where_clauses.append("a.resource_type = ?")
+        params.append(resource_type)
+    # Residual filter: one statement shape whether or not it is set
+    action_sql, action_params = optional_filter("a.action", action or None)
+    where_clauses.append(action_sql)
+    params.extend(action_params)
+    if user_id:
+        where_clauses.append("a.user_id = ?")
+        params.append(user_id)
+    
+    return " AND ".join(where_clauses), params
+
+
+def audit_log_list_query(where_sql: str, keyset_sql: str) -> str:
+    """Audit log page (newest first) for an `audit_log_filters()` clause and keyset predicate."""
+    return f"""SELECT a.id, a.user_id, u.email, a.action, a.resource_type, a.resource_id, a.ip_address, a.created_at
+        FROM audit_logs a LEFT JOIN users u ON a.user_id = u.id
+        WHERE {where_sql} AND {keyset_sql} ORDER BY a.created_at DESC, a.id DESC LIMIT ? OFFSET ?"""
 
 
 @router.get("", response_model=AuditLogListResponse, dependencies=[Depends(PermissionChecker(Permission.AUDIT_READ))])
@@ -40,39 +74,27 @@ async def list_audit_logs(
     user_id: Optional[str] = Query(None)
 ):
     """List audit logs for the organization."""
-    where_clauses = ["a.organization_id = ?"]
-    params = [current_user.org_id]
-    
-    if resource_type:
-        where_clauses.append("a.resource_type = ?")
-        params.append(resource_type)
-    if action:
-        where_clauses.append("a.action = ?")
-        params.append(action)
-    if user_id:
-        where_clauses.append("a.user_id = ?")
-        params.append(user_id)
+    where_sql, params = audit_log_filters(current_user.org_id, resource_type, action, user_id)
     
-    where_sql = " AND ".join(where_clauses)
+    count_query = f"SELECT COUNT(*) FROM audit_logs a WHERE {where_sql}"
+    count_params = tuple(params)
     
-    count = db.fetch_one(f"SELECT COUNT(*) FROM audit_logs a WHERE {where_sql}", tuple(params))
-    
-    params.extend([pagination.limit, pagination.offset])
-    rows = db.fetch_all(
-        f"""SELECT a.id, a.user_id, u.email, a.action, a.resource_type, a.resource_id, a.ip_address, a.created_at
-        FROM audit_logs a LEFT JOIN users u ON a.user_id = u.id
-        WHERE {where_sql} ORDER BY a.created_at DESC LIMIT ? OFFSET ?""",
-        tuple(params)
-    )
+    keyset_sql, keyset_params = pagination.keyset(("a.created_at", "a.id"))
+    params.extend([*keyset_params, pagination.fetch_limit, pagination.offset])
+    rows = await db.fetch_all(audit_log_list_query(where_sql, keyset_sql), tuple(params))
+    rows = pagination.page_rows(rows)
+    total = await pagination.resolve_total(db, count_query, count_params, rows)
     
     return AuditLogListResponse(
         items=[AuditLogResponse(
             id=r[0], user_id=r[1], user_email=r[2], action=r[3],
             resource_type=r[4], resource_id=r[5], ip_address=r[6], created_at=str(r[7])
         ) for r in rows],
-        total=count[0] if count else 0,
+        total=total,
         page=pagination.page,
-        page_size=pagination.page_size
+        page_size=pagination.page_size,
+        has_more=pagination.has_more,
+        next_cursor=pagination.next_cursor(rows, lambda r: (r[7], r[0]))
     )
 
 
@@ -80,7 +102,7 @@ async def list_audit_logs(
             dependencies=[Depends(PermissionChecker(Permission.AUDIT_READ))])
 async def get_resource_audit_trail(resource_type: str, resource_id: str, current_user: CurrentUser, db: Db):
     """Get audit trail for a specific resource."""
-    rows = db.fetch_all(
+    rows = await db.fetch_all(
         """SELECT a.id, a.user_id, u.email, a.action, a.resource_type, a.resource_id, a.ip_address, a.created_at
         FROM audit_logs a LEFT JOIN users u ON a.user_id = u.id
         WHERE a.organization_id = ? AND a.resource_type = ? AND a.resource_id = ?
@@ -8,10 +8,11 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request, Backgrou
 from pydantic import BaseModel, EmailStr, Field
 import logging
 
-from app.api.deps import Db, CurrentUser, ClientInfo, get_current_user_optional
+from app.api.deps import Db, CurrentUser, ClientInfo, get_current_user_optional, invalidate_user_status
+from app.database import coalesce_assignments
 from app.core import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
     validate_password_strength,
     create_token_pair,
     decode_refresh_token,
@@ -30,6 +31,9 @@ from app.core.exceptions import (
 )
 from app.config import settings
 from app.core.email import send_email, get_welcome_email_content, get_reset_password_email_content
+from app.services.counters import track_counters
+from app.services.stats import invalidate_org_stats
+from app.services.search import USER, index_document
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -133,7 +137,7 @@ async def register(
     If organization_id is provided, joins the existing organization as a viewer.
     """
     # Check if email already exists
-    existing = db.fetch_one(
+    existing = await db.fetch_one(
         "SELECT id FROM users WHERE email = ?",
         (request.email.lower(),)
     )
@@ -156,7 +160,7 @@ async def register(
         org_id = generate_id()
         org_slug = f"{request.organization_name.lower().replace(' ', '-')}-{generate_id()[:8]}"
         
-        db.execute(
+        await db.execute(
             """
             INSERT INTO organizations (id, name, slug, created_at, updated_at)
             VALUES (?, ?, ?, ?, ?)
@@ -170,7 +174,7 @@ async def register(
         org_id = generate_id()
         org_slug = f"org-{generate_id()[:8]}"
         
-        db.execute(
+        await db.execute(
             """
             INSERT INTO organizations (id, name, slug, created_at, updated_at)
             VALUES (?, ?, ?, ?, ?)
@@ -184,7 +188,7 @@ async def register(
     if role not in [Role.SUPER_ADMIN, Role.ADMIN, Role.MANAGER, Role.TECHNICIAN]:
         role = Role.TECHNICIAN    
     # Get role ID
-    role_row = db.fetch_one("SELECT id FROM roles WHERE name = ?", (role,))
+    role_row = await db.fetch_one("SELECT id FROM roles WHERE name = ?", (role,))
     if not role_row:
         # Create role if not exists (shouldn't happen if migrations ran)
         role_id = f"role_{role}"
@@ -193,24 +197,25 @@ async def register(
     
     # Create user
     user_id = generate_id()
-    password_hash = get_password_hash(request.password)
+    password_hash = await get_password_hash_async(request.password)
     now = datetime.utcnow().isoformat()
     
-    db.execute(
-        """
-        INSERT INTO users (
-            id, email, password_hash, first_name, last_name, phone,
-            role_id, organization_id, is_active, is_verified,
-            created_at, updated_at
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            user_id, request.email.lower(), password_hash,
-            request.first_name, request.last_name, request.phone,
-            role_id, org_id, True, False, now, now
+    async with track_counters(db, "users", user_id, org_id):
+        await db.execute(
+            """
+            INSERT INTO users (
+                id, email, password_hash, first_name, last_name, phone,
+                role_id, organization_id, is_active, is_verified,
+                created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                user_id, request.email.lower(), password_hash,
+                request.first_name, request.last_name, request.phone,
+                role_id, org_id, True, False, now, now
+            )
         )
-    )
     
     # Create tokens
     permissions = get_role_permissions(role)
@@ -223,7 +228,7 @@ async def register(
     )
     
     # Store session
-    db.execute(
+    await db.execute(
         """
         INSERT INTO sessions (
             id, user_id, refresh_token_hash, device_info, 
@@ -239,8 +244,10 @@ async def register(
         )
     )
     
-    db.commit()
-    db.sync()
+    await index_document(db, USER, user_id)
+    await db.commit()
+    await db.sync()
+    invalidate_org_stats(org_id)
     
     logger.info(f"New user registered: {request.email}")
     
@@ -270,7 +277,7 @@ async def login(
     Authenticate user and return JWT tokens.
     """
     # Get user by email
-    user = db.fetch_one(
+    user = await db.fetch_one(
         """
         SELECT u.id, u.email, u.password_hash, u.first_name, u.last_name,
                u.organization_id, u.is_active, u.is_verified, r.name as role
@@ -290,7 +297,7 @@ async def login(
     ) = user
     
     # Verify password using bcrypt
-    if not verify_password(request.password, password_hash):
+    if not await verify_password_async(request.password, password_hash):
         raise to_http_exception(InvalidCredentialsError())
     
     # Check if user is active
@@ -311,7 +318,7 @@ async def login(
     )
     
     # Store session
-    db.execute(
+    await db.execute(
         """
         INSERT INTO sessions (
             id, user_id, refresh_token_hash, device_info,
@@ -328,13 +335,13 @@ async def login(
     )
     
     # Update last login
-    db.execute(
+    await db.execute(
         "UPDATE users SET last_login = ? WHERE id = ?",
         (datetime.utcnow().isoformat(), user_id)
     )
     
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
     
     logger.info(f"User logged in: {email}")
     
@@ -353,12 +360,13 @@ async def logout(
     """
     Logout user by invalidating all sessions.
     """
-    db.execute(
+    await db.execute(
         "UPDATE sessions SET is_active = FALSE WHERE user_id = ?",
         (current_user.sub,)
     )
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
+    invalidate_user_status(current_user.sub)
     
     logger.info(f"User logged out: {current_user.email}")
     
@@ -384,7 +392,7 @@ async def refresh_token(
         )
     
     # Verify session exists and is active
-    session = db.fetch_one(
+    session = await db.fetch_one(
         """
         SELECT s.id, s.is_active, s.expires_at, u.email, u.organization_id, r.name as role
         FROM sessions s
@@ -420,9 +428,9 @@ async def refresh_token(
     )
     
     # Invalidate old session and create new one
-    db.execute("UPDATE sessions SET is_active = FALSE WHERE id = ?", (session_id,))
+    await db.execute("UPDATE sessions SET is_active = FALSE WHERE id = ?", (session_id,))
     
-    db.execute(
+    await db.execute(
         """
         INSERT INTO sessions (
             id, user_id, refresh_token_hash, device_info,
@@ -438,8 +446,8 @@ async def refresh_token(
         )
     )
     
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
     
     return TokenResponse(
         access_token=token_pair.access_token,
@@ -458,7 +466,7 @@ async def forgot_password(
     Request a password reset email.
     """
     # Check if user exists
-    user = db.fetch_one(
+    user = await db.fetch_one(
         "SELECT id FROM users WHERE email = ?",
         (request.email.lower(),)
     )
@@ -475,15 +483,15 @@ async def forgot_password(
     expires_at = (datetime.utcnow() + timedelta(hours=1)).isoformat()
     
     # Store token
-    db.execute(
+    await db.execute(
         """
         INSERT INTO password_reset_tokens (id, user_id, token_hash, expires_at, is_used)
         VALUES (?, ?, ?, ?, FALSE)
         """,
         (generate_id(), user_id, plain_token, expires_at)
     )
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
     
     # TODO: Send email with plain_token
     logger.info(f"Password reset token generated for: {request.email}")
@@ -506,7 +514,7 @@ async def reset_password(
     
     # Find valid token
     token_val = request.token
-    token_row = db.fetch_one(
+    token_row = await db.fetch_one(
         """
         SELECT id, user_id, expires_at, is_used
         FROM password_reset_tokens
@@ -530,25 +538,25 @@ async def reset_password(
         )
     
     # Update password with proper hash
-    db.execute(
+    await db.execute(
         "UPDATE users SET password_hash = ?, updated_at = ? WHERE id = ?",
-        (get_password_hash(request.new_password), datetime.utcnow().isoformat(), user_id)
+        (await get_password_hash_async(request.new_password), datetime.utcnow().isoformat(), user_id)
     )
     
     # Mark token as used
-    db.execute(
+    await db.execute(
         "UPDATE password_reset_tokens SET is_used = TRUE WHERE id = ?",
         (token_id,)
     )
     
     # Invalidate all sessions
-    db.execute(
+    await db.execute(
         "UPDATE sessions SET is_active = FALSE WHERE user_id = ?",
         (user_id,)
     )
     
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
     
     logger.info(f"Password reset successful for user: {user_id}")
     
@@ -563,7 +571,7 @@ async def get_current_user_profile(
     """
     Get the current user's profile.
     """
-    user = db.fetch_one(
+    user = await db.fetch_one(
         """
         SELECT u.id, u.email, u.first_name, u.last_name, u.phone,
                u.profile_image_url, u.is_verified, u.created_at,
@@ -609,36 +617,24 @@ async def update_current_user_profile(
     """
     Update the current user's profile.
     """
-    updates = []
-    params = []
-    
-    if request.first_name is not None:
-        updates.append("first_name = ?")
-        params.append(request.first_name)
-    
-    if request.last_name is not None:
-        updates.append("last_name = ?")
-        params.append(request.last_name)
-    
-    if request.phone is not None:
-        updates.append("phone = ?")
-        params.append(request.phone)
-    
-    if request.profile_image_url is not None:
-        updates.append("profile_image_url = ?")
-        params.append(request.profile_image_url)
-    
-    if updates:
-        updates.append("updated_at = ?")
-        params.append(datetime.utcnow().isoformat())
-        params.append(current_user.sub)
+    values = {
+        "first_name": request.first_name,
+        "last_name": request.last_name,
+        "phone": request.phone,
+        "profile_image_url": request.profile_image_url,
+    }
+    
+    if any(value is not None for value in values.values()):
+        set_sql, params = coalesce_assignments(values)
+        params.extend([datetime.utcnow().isoformat(), current_user.sub])
         
-        db.execute(
-            f"UPDATE users SET {', '.join(updates)} WHERE id = ?",
+        await db.execute(
+            f"UPDATE users SET {set_sql}, updated_at = ? WHERE id = ?",
             tuple(params)
         )
-        db.commit()
-        db.sync()
+        await index_document(db, USER, current_user.sub)
+        await db.commit()
+        await db.sync()
     
     # Return updated profile
     return await get_current_user_profile(current_user, db)
@@ -654,7 +650,7 @@ async def change_password(
     Change the current user's password.
     """
     # Get current password hash
-    user = db.fetch_one(
+    user = await db.fetch_one(
         "SELECT password_hash FROM users WHERE id = ?",
         (current_user.sub,)
     )
@@ -663,7 +659,7 @@ async def change_password(
         raise to_http_exception(ResourceNotFoundError("User", current_user.sub))
     
     # Verify current password using bcrypt
-    if not verify_password(request.current_password, user[0]):
+    if not await verify_password_async(request.current_password, user[0]):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
@@ -675,13 +671,13 @@ async def change_password(
         raise to_http_exception(ValidationError(error_msg, field="new_password"))
     
     # Update password with proper hash
-    db.execute(
+    await db.execute(
         "UPDATE users SET password_hash = ?, updated_at = ? WHERE id = ?",
-        (get_password_hash(request.new_password), datetime.utcnow().isoformat(), current_user.sub)
+        (await get_password_hash_async(request.new_password), datetime.utcnow().isoformat(), current_user.sub)
     )
     
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
     
     logger.info(f"Password changed for user: {current_user.email}")
     
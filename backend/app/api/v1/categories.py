@@ -8,6 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 
 from ..deps import Db, CurrentUser, PermissionChecker
+from ...database import coalesce_assignments
 from ...core import generate_id
 from ...core.permissions import Permission
 
@@ -55,7 +56,7 @@ async def create_category(request: CategoryCreateRequest, current_user: CurrentU
     cat_id = generate_id()
     now = datetime.utcnow()
     
-    db.execute(
+    await db.execute(
         """
         INSERT INTO equipment_categories (id, organization_id, name, code, description, icon, color, parent_category_id, created_at)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -63,8 +64,8 @@ async def create_category(request: CategoryCreateRequest, current_user: CurrentU
         (cat_id, current_user.org_id, request.name, request.code, request.description,
          request.icon, request.color, request.parent_category_id, now)
     )
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
     
     return await get_category(cat_id, current_user, db)
 
@@ -72,7 +73,7 @@ async def create_category(request: CategoryCreateRequest, current_user: CurrentU
 @router.get("", response_model=List[CategoryResponse])
 async def list_categories(current_user: CurrentUser, db: Db):
     """List all equipment categories."""
-    rows = db.fetch_all(
+    rows = await db.fetch_all(
         """
         SELECT c.id, c.name, c.code, c.description, c.icon, c.color,
                c.parent_category_id, p.name, c.created_at,
@@ -98,7 +99,7 @@ async def list_categories(current_user: CurrentUser, db: Db):
 @router.get("/{category_id}", response_model=CategoryResponse)
 async def get_category(category_id: str, current_user: CurrentUser, db: Db):
     """Get category details."""
-    row = db.fetch_one(
+    row = await db.fetch_one(
         """
         SELECT c.id, c.name, c.code, c.description, c.icon, c.color,
                c.parent_category_id, p.name, c.created_at,
@@ -127,23 +128,20 @@ async def get_category(category_id: str, current_user: CurrentUser, db: Db):
 )
 async def update_category(category_id: str, request: CategoryUpdateRequest, current_user: CurrentUser, db: Db):
     """Update a category."""
-    updates = []
-    params = []
+    values = {
+        field: getattr(request, field, None)
+        for field in ["name", "code", "description", "icon", "color"]
+    }
     
-    for field in ["name", "code", "description", "icon", "color"]:
-        value = getattr(request, field, None)
-        if value is not None:
-            updates.append(f"{field} = ?")
-            params.append(value)
-    
-    if updates:
+    if any(value is not None for value in values.values()):
+        set_sql, params = coalesce_assignments(values)
         params.extend([category_id, current_user.org_id])
-        db.execute(
-            f"UPDATE equipment_categories SET {', '.join(updates)} WHERE id = ? AND organization_id = ?",
+        await db.execute(
+            f"UPDATE equipment_categories SET {set_sql} WHERE id = ? AND organization_id = ?",
             tuple(params)
         )
-        db.commit()
-        db.sync()
+        await db.commit()
+        await db.sync()
     
     return await get_category(category_id, current_user, db)
 
@@ -156,7 +154,7 @@ async def update_category(category_id: str, request: CategoryUpdateRequest, curr
 async def delete_category(category_id: str, current_user: CurrentUser, db: Db):
     """Delete a category."""
     # Check if category has equipment
-    count = db.fetch_one(
+    count = await db.fetch_one(
         "SELECT COUNT(*) FROM equipment WHERE category_id = ?",
         (category_id,)
     )
@@ -166,9 +164,9 @@ async def delete_category(category_id: str, current_user: CurrentUser, db: Db):
             detail="Cannot delete category with associated equipment"
         )
     
-    db.execute(
+    await db.execute(
         "DELETE FROM equipment_categories WHERE id = ? AND organization_id = ?",
         (category_id, current_user.org_id)
     )
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
@@ -9,6 +9,7 @@ from pydantic import BaseModel
 import json
 
 from ..deps import Db, CurrentUser, PermissionChecker
+from ...database import coalesce_assignments
 from ...core import generate_id
 from ...core.permissions import Permission
 
@@ -55,13 +56,13 @@ async def create_checklist(request: ChecklistCreateRequest, current_user: Curren
     now = datetime.utcnow()
     items_json = json.dumps([item.model_dump() for item in request.items])
     
-    db.execute(
+    await db.execute(
         """INSERT INTO checklist_templates (id, organization_id, name, description, category, items, is_active, created_by, created_at, updated_at)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
         (checklist_id, current_user.org_id, request.name, request.description, request.category, items_json, True, current_user.sub, now, now)
     )
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
     return await get_checklist(checklist_id, current_user, db)
 
 
@@ -69,12 +70,12 @@ async def create_checklist(request: ChecklistCreateRequest, current_user: Curren
 async def list_checklists(current_user: CurrentUser, db: Db, category: Optional[str] = None):
     """List checklist templates."""
     if category:
-        rows = db.fetch_all(
+        rows = await db.fetch_all(
             "SELECT id, name, description, category, items, is_active, created_at FROM checklist_templates WHERE organization_id = ? AND category = ? AND is_active = TRUE ORDER BY name",
             (current_user.org_id, category)
         )
     else:
-        rows = db.fetch_all(
+        rows = await db.fetch_all(
             "SELECT id, name, description, category, items, is_active, created_at FROM checklist_templates WHERE organization_id = ? AND is_active = TRUE ORDER BY name",
             (current_user.org_id,)
         )
@@ -90,7 +91,7 @@ async def list_checklists(current_user: CurrentUser, db: Db, category: Optional[
 @router.get("/{checklist_id}", response_model=ChecklistResponse)
 async def get_checklist(checklist_id: str, current_user: CurrentUser, db: Db):
     """Get checklist template details."""
-    row = db.fetch_one(
+    row = await db.fetch_one(
         "SELECT id, name, description, category, items, is_active, created_at FROM checklist_templates WHERE id = ? AND organization_id = ?",
         (checklist_id, current_user.org_id)
     )
@@ -107,27 +108,19 @@ async def get_checklist(checklist_id: str, current_user: CurrentUser, db: Db):
             dependencies=[Depends(PermissionChecker(Permission.SCHEDULE_UPDATE))])
 async def update_checklist(checklist_id: str, request: ChecklistUpdateRequest, current_user: CurrentUser, db: Db):
     """Update checklist template."""
-    updates = []
-    params = []
-    if request.name is not None:
-        updates.append("name = ?")
-        params.append(request.name)
-    if request.description is not None:
-        updates.append("description = ?")
-        params.append(request.description)
-    if request.items is not None:
-        updates.append("items = ?")
-        params.append(json.dumps([item.model_dump() for item in request.items]))
-    if request.is_active is not None:
-        updates.append("is_active = ?")
-        params.append(request.is_active)
+    values = {
+        "name": request.name,
+        "description": request.description,
+        "items": json.dumps([item.model_dump() for item in request.items]) if request.items is not None else None,
+        "is_active": request.is_active,
+    }
     
-    if updates:
-        updates.append("updated_at = ?")
+    if any(value is not None for value in values.values()):
+        set_sql, params = coalesce_assignments(values)
         params.extend([datetime.utcnow(), checklist_id, current_user.org_id])
-        db.execute(f"UPDATE checklist_templates SET {', '.join(updates)} WHERE id = ? AND organization_id = ?", tuple(params))
-        db.commit()
-        db.sync()
+        await db.execute(f"UPDATE checklist_templates SET {set_sql}, updated_at = ? WHERE id = ? AND organization_id = ?", tuple(params))
+        await db.commit()
+        await db.sync()
     return await get_checklist(checklist_id, current_user, db)
 
 
@@ -135,7 +128,7 @@ async def update_checklist(checklist_id: str, request: ChecklistUpdateRequest, c
                dependencies=[Depends(PermissionChecker(Permission.SCHEDULE_DELETE))])
 async def delete_checklist(checklist_id: str, current_user: CurrentUser, db: Db):
     """Deactivate checklist template."""
-    db.execute("UPDATE checklist_templates SET is_active = FALSE, updated_at = ? WHERE id = ? AND organization_id = ?",
+    await db.execute("UPDATE checklist_templates SET is_active = FALSE, updated_at = ? WHERE id = ? AND organization_id = ?",
                (datetime.utcnow(), checklist_id, current_user.org_id))
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
@@ -9,6 +9,7 @@ from pydantic import BaseModel
 import json
 
 from ..deps import Db, CurrentUser
+from ...database import coalesce_assignments
 from ...core import generate_id
 
 router = APIRouter()
@@ -39,7 +40,7 @@ class DashboardUpdateRequest(BaseModel):
 @router.get("", response_model=List[DashboardResponse])
 async def list_dashboards(current_user: CurrentUser, db: Db):
     """Get user's dashboards."""
-    rows = db.fetch_all(
+    rows = await db.fetch_all(
         """SELECT id, name, layout, is_default, is_public, created_at FROM dashboards
         WHERE organization_id = ? AND (user_id = ? OR is_public = TRUE) ORDER BY is_default DESC, name""",
         (current_user.org_id, current_user.sub)
@@ -57,23 +58,23 @@ async def create_dashboard(request: DashboardCreateRequest, current_user: Curren
     now = datetime.utcnow()
     
     if request.is_default:
-        db.execute("UPDATE dashboards SET is_default = FALSE WHERE user_id = ?", (current_user.sub,))
+        await db.execute("UPDATE dashboards SET is_default = FALSE WHERE user_id = ?", (current_user.sub,))
     
-    db.execute(
+    await db.execute(
         """INSERT INTO dashboards (id, organization_id, user_id, name, layout, is_default, is_public, created_by, created_at, updated_at)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
         (dash_id, current_user.org_id, current_user.sub, request.name, json.dumps(request.layout),
          request.is_default, request.is_public, current_user.sub, now, now)
     )
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
     return await get_dashboard(dash_id, current_user, db)
 
 
 @router.get("/{dashboard_id}", response_model=DashboardResponse)
 async def get_dashboard(dashboard_id: str, current_user: CurrentUser, db: Db):
     """Get dashboard by ID."""
-    row = db.fetch_one(
+    row = await db.fetch_one(
         "SELECT id, name, layout, is_default, is_public, created_at FROM dashboards WHERE id = ? AND (user_id = ? OR is_public = TRUE)",
         (dashboard_id, current_user.sub)
     )
@@ -88,32 +89,26 @@ async def get_dashboard(dashboard_id: str, current_user: CurrentUser, db: Db):
 @router.put("/{dashboard_id}", response_model=DashboardResponse)
 async def update_dashboard(dashboard_id: str, request: DashboardUpdateRequest, current_user: CurrentUser, db: Db):
     """Update a dashboard."""
-    updates = []
-    params = []
-    if request.name is not None:
-        updates.append("name = ?")
-        params.append(request.name)
-    if request.layout is not None:
-        updates.append("layout = ?")
-        params.append(json.dumps(request.layout))
-    if request.is_default is not None:
-        if request.is_default:
-            db.execute("UPDATE dashboards SET is_default = FALSE WHERE user_id = ?", (current_user.sub,))
-        updates.append("is_default = ?")
-        params.append(request.is_default)
+    values = {
+        "name": request.name,
+        "layout": json.dumps(request.layout) if request.layout is not None else None,
+        "is_default": request.is_default,
+    }
+    if request.is_default:
+        await db.execute("UPDATE dashboards SET is_default = FALSE WHERE user_id = ?", (current_user.sub,))
     
-    if updates:
-        updates.append("updated_at = ?")
+    if any(value is not None for value in values.values()):
+        set_sql, params = coalesce_assignments(values)
         params.extend([datetime.utcnow(), dashboard_id, current_user.sub])
-        db.execute(f"UPDATE dashboards SET {', '.join(updates)} WHERE id = ? AND user_id = ?", tuple(params))
-        db.commit()
-        db.sync()
+        await db.execute(f"UPDATE dashboards SET {set_sql}, updated_at = ? WHERE id = ? AND user_id = ?", tuple(params))
+        await db.commit()
+        await db.sync()
     return await get_dashboard(dashboard_id, current_user, db)
 
 
 @router.delete("/{dashboard_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_dashboard(dashboard_id: str, current_user: CurrentUser, db: Db):
     """Delete a dashboard."""
-    db.execute("DELETE FROM dashboards WHERE id = ? AND user_id = ?", (dashboard_id, current_user.sub))
-    db.commit()
-    db.sync()
+    await db.execute("DELETE FROM dashboards WHERE id = ? AND user_id = ?", (dashboard_id, current_user.sub))
+    await db.commit()
+    await db.sync()
@@ -2,14 +2,25 @@
 GearGuard Backend - Equipment Endpoints
 Equipment/asset management operations.
 """
-from typing import Optional, List
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from pydantic import BaseModel, Field
+from typing import Any, AsyncIterator, Dict, Optional, List, Tuple
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, UploadFile, File
+from pydantic import BaseModel, Field, ValidationError
 
-from ..deps import Db, CurrentUser, Pagination, PermissionChecker
-from ...core import generate_id
+from ..deps import Db, CurrentUser, Pagination, PermissionChecker, UnpooledUser, require_permission
+from ...config import settings
+from ...database import AsyncDatabase, async_connection, coalesce_assignments, optional_filter
+from ...core import generate_id, generate_work_order_number
 from ...core.permissions import Permission
+from ...services.bulk_import import (
+    ImportReport, RowError, insert_rows, iter_csv_records, iter_json_records, load_code_lookup
+)
+from ...services.counters import count_inserted_rows, track_counters
+from ...services.meter_ingest import get_meter_buffer
+from ...services.meter_rollups import as_utc_naive, fetch_series, update_rollups
+from ...services.meter_triggers import MeterReading, evaluate_meter_readings
+from ...services.stats import invalidate_org_stats
+from ...services.search import EQUIPMENT, WORK_ORDER, index_document, index_documents, search_filter
 
 router = APIRouter()
 
@@ -71,9 +82,11 @@ class EquipmentUpdateRequest(BaseModel):
 
 class EquipmentListResponse(BaseModel):
     items: List[EquipmentResponse]
-    total: int
+    total: Optional[int]  # None when include_total=none
     page: int
     page_size: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None
 
 
 class MeterReadingRequest(BaseModel):
@@ -82,6 +95,24 @@ class MeterReadingRequest(BaseModel):
     notes: Optional[str] = None
 
 
+class MeterPointResponse(BaseModel):
+    t: str
+    min: float
+    max: float
+    avg: float
+    last: float
+    count: int
+
+
+class MeterSeriesResponse(BaseModel):
+    equipment_id: str
+    meter_type: str
+    resolution: str  # raw, hour or day
+    start: str
+    end: str
+    points: List[MeterPointResponse]
+
+
 class MeterReadingResponse(BaseModel):
     id: str
     meter_type: str
@@ -97,6 +128,33 @@ class IssueReportRequest(BaseModel):
     priority: str = "medium"
 
 
+class BulkImportError(BaseModel):
+    row: int
+    field: Optional[str]
+    message: str
+
+
+class BulkImportResponse(BaseModel):
+    total_rows: int
+    created: int
+    failed: int
+    errors: List[BulkImportError]
+    errors_truncated: bool = False
+
+
+class MeterReadingBatchItem(MeterReadingRequest):
+    equipment_id: str
+    recorded_at: Optional[datetime] = None  # device timestamp; defaults to receipt time
+
+
+class MeterReadingBatchResponse(BaseModel):
+    total_rows: int
+    accepted: int
+    failed: int
+    errors: List[BulkImportError] = []
+    errors_truncated: bool = False
+
+
 @router.post(
     "",
     response_model=EquipmentResponse,
@@ -112,49 +170,304 @@ async def create_equipment(
     equipment_id = generate_id()
     now = datetime.utcnow()
     
-    db.execute(
-        """
-        INSERT INTO equipment (
-            id, organization_id, name, code, serial_number, model, manufacturer,
-            description, image_url, category_id, location_id, status, health_score,
-            criticality, purchase_date, purchase_cost, warranty_expiry,
-            created_by, created_at, updated_at
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            equipment_id, current_user.org_id, request.name, request.code,
-            request.serial_number, request.model, request.manufacturer,
-            request.description, request.image_url, request.category_id,
-            request.location_id, request.status, 100, request.criticality,
-            request.purchase_date, request.purchase_cost, request.warranty_expiry,
-            current_user.sub, now, now
+    async with track_counters(db, "equipment", equipment_id, current_user.org_id):
+        await db.execute(
+            """
+            INSERT INTO equipment (
+                id, organization_id, name, code, serial_number, model, manufacturer,
+                description, image_url, category_id, location_id, status, health_score,
+                criticality, purchase_date, purchase_cost, warranty_expiry,
+                created_by, created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                equipment_id, current_user.org_id, request.name, request.code,
+                request.serial_number, request.model, request.manufacturer,
+                request.description, request.image_url, request.category_id,
+                request.location_id, request.status, 100, request.criticality,
+                request.purchase_date, request.purchase_cost, request.warranty_expiry,
+                current_user.sub, now, now
+            )
         )
-    )
-    db.commit()
-    db.sync()
+    await index_document(db, EQUIPMENT, equipment_id)
+    await db.commit()
+    await db.sync()
+    invalidate_org_stats(current_user.org_id)
     
     return await get_equipment(equipment_id, current_user, db)
 
 
-@router.get("", response_model=EquipmentListResponse)
-async def list_equipment(
+# ===========================================
+# Bulk Import
+# ===========================================
+
+_EQUIPMENT_INSERT = """
+    INSERT INTO equipment (
+        id, organization_id, name, code, serial_number, model, manufacturer,
+        description, image_url, category_id, location_id, status, health_score,
+        criticality, purchase_date, purchase_cost, warranty_expiry,
+        created_by, created_at, updated_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _equipment_row(
+    record: Any,
+    categories: Dict[str, str],
+    locations: Dict[str, str],
+    org_id: str,
+    user_id: str
+) -> Tuple:
+    """Validate one import record and build its INSERT parameters."""
+    if not isinstance(record, dict):
+        raise RowError("Row must be an object")
+
+    record = dict(record)
+    # Category/location may be given by code (category_code) or in the *_id field
+    for field, code_field, lookup in (
+        ("category_id", "category_code", categories),
+        ("location_id", "location_code", locations),
+    ):
+        reference = record.pop(code_field, None) or record.get(field)
+        if reference is not None:
+            if str(reference) not in lookup:
+                raise RowError(f"Unknown {field[:-3]} '{reference}'", field)
+            record[field] = lookup[str(reference)]
+
+    try:
+        item = EquipmentCreateRequest(**record)
+    except ValidationError as e:
+        error = e.errors()[0]
+        raise RowError(error["msg"], ".".join(str(part) for part in error["loc"]))
+
+    now = datetime.utcnow()
+    return (
+        generate_id(), org_id, item.name, item.code,
+        item.serial_number, item.model, item.manufacturer,
+        item.description, item.image_url, item.category_id,
+        item.location_id, item.status, 100, item.criticality,
+        item.purchase_date, item.purchase_cost, item.warranty_expiry,
+        user_id, now, now
+    )
+
+
+async def _import_equipment(
+    db: AsyncDatabase,
+    org_id: str,
+    user_id: str,
+    records: AsyncIterator[Tuple[int, Any]]
+) -> BulkImportResponse:
+    """
+    Insert streamed records in committed batches of BULK_IMPORT_BATCH_SIZE.
+
+    Only the current batch is held in memory. Rows that fail validation or
+    are rejected by the database are reported and skipped; the replica is
+    synced once at the end rather than per batch.
+    """
+    categories = await load_code_lookup(db, "equipment_categories", org_id)
+    locations = await load_code_lookup(db, "locations", org_id)
+    report = ImportReport(settings.BULK_IMPORT_MAX_ERRORS)
+    batch: List[Tuple[int, Tuple]] = []
+
+    async def flush() -> None:
+        inserted = [batch[index][1] for index in await insert_rows(db, _EQUIPMENT_INSERT, batch, report)]
+        if inserted:
+            await count_inserted_rows(db, "equipment", org_id, [(row[11], row[12]) for row in inserted])
+            await index_documents(db, EQUIPMENT, [row[0] for row in inserted])
+        await db.commit()
+        report.created += len(inserted)
+        batch.clear()
+
+    try:
+        async for number, record in records:
+            report.total += 1
+            try:
+                batch.append((number, _equipment_row(record, categories, locations, org_id, user_id)))
+            except RowError as e:
+                report.add_error(number, e.message, e.field)
+                continue
+            if len(batch) >= settings.BULK_IMPORT_BATCH_SIZE:
+                await flush()
+    except RowError as e:
+        # Unreadable body: keep the rows already imported and stop here
+        report.add_error(report.total + 1, e.message)
+
+    if batch:
+        await flush()
+    if report.created:
+        await db.sync()
+        invalidate_org_stats(org_id)
+
+    return BulkImportResponse(**report.as_dict())
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkImportResponse,
+    dependencies=[Depends(PermissionChecker(Permission.EQUIPMENT_CREATE))]
+)
+async def bulk_import_equipment(
+    http_request: Request,
+    current_user: CurrentUser,
+    db: Db
+):
+    """
+    Import equipment from a JSON array or NDJSON request body.
+
+    Each record uses the create-equipment fields; categories and locations
+    may be referenced by `category_code` / `location_code`. The body is
+    parsed as it arrives, so large imports run in bounded memory. Returns a
+    per-row error report; valid rows are imported even if others fail.
+    """
+    return await _import_equipment(
+        db, current_user.org_id, current_user.sub, iter_json_records(http_request.stream())
+    )
+
+
+@router.post(
+    "/bulk/csv",
+    response_model=BulkImportResponse,
+    dependencies=[Depends(PermissionChecker(Permission.EQUIPMENT_CREATE))]
+)
+async def bulk_import_equipment_csv(
     current_user: CurrentUser,
     db: Db,
-    pagination: Pagination,
-    status: Optional[str] = Query(None),
-    category_id: Optional[str] = Query(None),
-    location_id: Optional[str] = Query(None),
-    criticality: Optional[str] = Query(None),
-    search: Optional[str] = Query(None)
+    file: UploadFile = File(..., description="CSV with a header row of equipment fields")
 ):
-    """List all equipment with filters."""
+    """Import equipment from an uploaded CSV file (same columns and report as /bulk)."""
+    try:
+        return await _import_equipment(
+            db, current_user.org_id, current_user.sub, iter_csv_records(file.file)
+        )
+    finally:
+        await file.close()
+
+
+# ===========================================
+# Meter Reading Ingestion
+# ===========================================
+
+async def _ingest_meter_readings(
+    org_id: str,
+    user_id: str,
+    records: AsyncIterator[Tuple[int, Any]]
+) -> MeterReadingBatchResponse:
+    """
+    Validate streamed readings and hand them to the ingestion buffer.
+
+    Readings are checked in chunks of METER_INGEST_MAX_BATCH_ROWS (one
+    equipment ownership query per chunk, on a connection returned to the pool
+    before the chunk is submitted); each chunk is acknowledged once the
+    buffer has committed it. A failed write stops the request so the client
+    can resend from the first unacknowledged row.
+    """
+    report = ImportReport(settings.BULK_IMPORT_MAX_ERRORS)
+    chunk: List[Tuple[int, MeterReadingBatchItem]] = []
+
+    async def submit() -> bool:
+        equipment_ids = list({item.equipment_id for _, item in chunk})
+        placeholders = ", ".join("?" for _ in equipment_ids)
+        async with async_connection() as db:
+            rows = await db.fetch_all(
+                f"SELECT id FROM equipment WHERE organization_id = ? AND id IN ({placeholders})",
+                (org_id, *equipment_ids)
+            )
+        known = {row[0] for row in rows}
+
+        now = datetime.utcnow()
+        numbers, rows = [], []
+        for number, item in chunk:
+            if item.equipment_id not in known:
+                report.add_error(number, "Equipment not found", "equipment_id")
+                continue
+            numbers.append(number)
+            rows.append((
+                generate_id(), item.equipment_id, item.meter_type, item.reading_value,
+                user_id, as_utc_naive(item.recorded_at) if item.recorded_at else now, item.notes
+            ))
+        chunk.clear()
+
+        try:
+            await get_meter_buffer().submit(rows)
+        except Exception as e:
+            for number in numbers:
+                report.add_error(number, f"Reading not stored: {e}")
+            return False
+        report.created += len(rows)
+        return True
+
+    try:
+        async for number, record in records:
+            report.total += 1
+            if not isinstance(record, dict):
+                report.add_error(number, "Row must be an object")
+                continue
+            try:
+                chunk.append((number, MeterReadingBatchItem(**record)))
+            except ValidationError as e:
+                error = e.errors()[0]
+                report.add_error(number, error["msg"], ".".join(str(part) for part in error["loc"]))
+                continue
+            if len(chunk) >= settings.METER_INGEST_MAX_BATCH_ROWS and not await submit():
+                break
+        else:
+            if chunk:
+                await submit()
+    except RowError as e:
+        # Unreadable body: keep the readings already acknowledged
+        report.add_error(report.total + 1, e.message)
+        if chunk:
+            await submit()
+
+    result = report.as_dict()
+    return MeterReadingBatchResponse(
+        total_rows=result["total_rows"], accepted=result["created"], failed=result["failed"],
+        errors=result["errors"], errors_truncated=result["errors_truncated"]
+    )
+
+
+@router.post("/meter-readings", response_model=MeterReadingBatchResponse)
+async def ingest_meter_readings(
+    http_request: Request,
+    current_user: UnpooledUser
+):
+    """
+    Ingest many meter readings in one request (JSON array or NDJSON body).
+
+    Each record is `{equipment_id, meter_type, reading_value, recorded_at?,
+    notes?}` for any equipment of the organization. Readings from concurrent
+    requests are written together every METER_INGEST_FLUSH_INTERVAL_MS and
+    evaluated against meter-based schedules. `accepted` counts readings
+    that are committed; rejected rows are listed in `errors`.
+    
+    Holds no pooled connection while it waits for the buffer, so the flush
+    can always get one.
+    """
+    require_permission(current_user, Permission.EQUIPMENT_UPDATE)
+    return await _ingest_meter_readings(
+        current_user.org_id, current_user.sub, iter_json_records(http_request.stream())
+    )
+
+
+def equipment_filters(
+    org_id: str,
+    status: Optional[str] = None,
+    category_id: Optional[str] = None,
+    location_id: Optional[str] = None,
+    criticality: Optional[str] = None,
+    search: Optional[str] = None
+) -> Tuple[str, List[Any]]:
+    """WHERE clause (over alias e) shared by the equipment list and export."""
     where_clauses = ["e.organization_id = ?"]
-    params = [current_user.org_id]
+    params: List[Any] = [org_id]
     
-    if status:
-        where_clauses.append("e.status = ?")
-        params.append(status)
+    # Residual filters keep one statement shape; indexed ones stay conditional
+    for column, value in (("e.status", status), ("e.criticality", criticality)):
+        filter_sql, filter_params = optional_filter(column, value or None)
+        where_clauses.append(filter_sql)
+        params.extend(filter_params)
     
     if category_id:
         where_clauses.append("e.category_id = ?")
@@ -164,27 +477,20 @@ async def list_equipment(
         where_clauses.append("e.location_id = ?")
         params.append(location_id)
     
-    if criticality:
-        where_clauses.append("e.criticality = ?")
-        params.append(criticality)
-    
     if search:
-        where_clauses.append("(e.name LIKE ? OR e.code LIKE ? OR e.serial_number LIKE ?)")
-        search_term = f"%{search}%"
-        params.extend([search_term, search_term, search_term])
-    
-    where_sql = " AND ".join(where_clauses)
-    
-    # Count
-    count = db.fetch_one(
-        f"SELECT COUNT(*) FROM equipment e WHERE {where_sql}",
-        tuple(params)
-    )
+        search_sql, search_params = search_filter(
+            EQUIPMENT, "e.id", org_id, search,
+            ["e.name", "e.code", "e.serial_number"]
+        )
+        where_clauses.append(search_sql)
+        params.extend(search_params)
     
-    # Fetch
-    params.extend([pagination.limit, pagination.offset])
-    rows = db.fetch_all(
-        f"""
+    return " AND ".join(where_clauses), params
+
+
+def equipment_list_query(where_sql: str, keyset_sql: str) -> str:
+    """Equipment page (newest first) for an `equipment_filters()` clause and keyset predicate."""
+    return f"""
         SELECT e.id, e.name, e.code, e.serial_number, e.model, e.manufacturer,
                e.description, e.image_url, e.category_id, c.name, e.location_id,
                l.name, e.status, e.health_score, e.criticality, e.purchase_date,
@@ -193,13 +499,39 @@ async def list_equipment(
         FROM equipment e
         LEFT JOIN equipment_categories c ON e.category_id = c.id
         LEFT JOIN locations l ON e.location_id = l.id
-        WHERE {where_sql}
-        ORDER BY e.created_at DESC
+        WHERE {where_sql} AND {keyset_sql}
+        ORDER BY e.created_at DESC, e.id DESC
         LIMIT ? OFFSET ?
-        """,
-        tuple(params)
+    """
+
+
+@router.get("", response_model=EquipmentListResponse)
+async def list_equipment(
+    current_user: CurrentUser,
+    db: Db,
+    pagination: Pagination,
+    status: Optional[str] = Query(None),
+    category_id: Optional[str] = Query(None),
+    location_id: Optional[str] = Query(None),
+    criticality: Optional[str] = Query(None),
+    search: Optional[str] = Query(None)
+):
+    """List all equipment with filters."""
+    where_sql, params = equipment_filters(
+        current_user.org_id, status, category_id, location_id, criticality, search
     )
     
+    # Count (run after the page, only if include_total needs it)
+    count_query = f"SELECT COUNT(*) FROM equipment e WHERE {where_sql}"
+    count_params = tuple(params)
+    
+    # Fetch
+    keyset_sql, keyset_params = pagination.keyset(("e.created_at", "e.id"))
+    params.extend([*keyset_params, pagination.fetch_limit, pagination.offset])
+    rows = await db.fetch_all(equipment_list_query(where_sql, keyset_sql), tuple(params))
+    rows = pagination.page_rows(rows)
+    total = await pagination.resolve_total(db, count_query, count_params, rows)
+    
     items = [
         EquipmentResponse(
             id=r[0], name=r[1], code=r[2], serial_number=r[3], model=r[4],
@@ -215,8 +547,10 @@ async def list_equipment(
     ]
     
     return EquipmentListResponse(
-        items=items, total=count[0] if count else 0,
-        page=pagination.page, page_size=pagination.page_size
+        items=items, total=total,
+        page=pagination.page, page_size=pagination.page_size,
+        has_more=pagination.has_more,
+        next_cursor=pagination.next_cursor(rows, lambda r: (r[19], r[0]))
     )
 
 
@@ -227,7 +561,7 @@ async def get_equipment(
     db: Db
 ):
     """Get equipment details."""
-    row = db.fetch_one(
+    row = await db.fetch_one(
         """
         SELECT e.id, e.name, e.code, e.serial_number, e.model, e.manufacturer,
                e.description, e.image_url, e.category_id, c.name, e.location_id,
@@ -269,27 +603,26 @@ async def update_equipment(
     db: Db
 ):
     """Update equipment."""
-    updates = []
-    params = []
-    
-    for field in ["name", "code", "serial_number", "model", "manufacturer",
-                  "description", "image_url", "category_id", "location_id",
-                  "status", "health_score", "criticality"]:
-        value = getattr(request, field, None)
-        if value is not None:
-            updates.append(f"{field} = ?")
-            params.append(value)
+    values = {
+        field: getattr(request, field, None)
+        for field in ["name", "code", "serial_number", "model", "manufacturer",
+                      "description", "image_url", "category_id", "location_id",
+                      "status", "health_score", "criticality"]
+    }
     
-    if updates:
-        updates.append("updated_at = ?")
+    if any(value is not None for value in values.values()):
+        set_sql, params = coalesce_assignments(values)
         params.extend([datetime.utcnow(), equipment_id, current_user.org_id])
         
-        db.execute(
-            f"UPDATE equipment SET {', '.join(updates)} WHERE id = ? AND organization_id = ?",
-            tuple(params)
-        )
-        db.commit()
-        db.sync()
+        async with track_counters(db, "equipment", equipment_id, current_user.org_id):
+            await db.execute(
+                f"UPDATE equipment SET {set_sql}, updated_at = ? WHERE id = ? AND organization_id = ?",
+                tuple(params)
+            )
+        await index_document(db, EQUIPMENT, equipment_id)
+        await db.commit()
+        await db.sync()
+        invalidate_org_stats(current_user.org_id)
     
     return await get_equipment(equipment_id, current_user, db)
 
@@ -305,12 +638,14 @@ async def delete_equipment(
     db: Db
 ):
     """Delete equipment (soft delete - set status to retired)."""
-    db.execute(
-        "UPDATE equipment SET status = 'retired', updated_at = ? WHERE id = ? AND organization_id = ?",
-        (datetime.utcnow(), equipment_id, current_user.org_id)
-    )
-    db.commit()
-    db.sync()
+    async with track_counters(db, "equipment", equipment_id, current_user.org_id):
+        await db.execute(
+            "UPDATE equipment SET status = 'retired', updated_at = ? WHERE id = ? AND organization_id = ?",
+            (datetime.utcnow(), equipment_id, current_user.org_id)
+        )
+    await db.commit()
+    await db.sync()
+    invalidate_org_stats(current_user.org_id)
 
 
 @router.post(
@@ -324,11 +659,18 @@ async def add_meter_reading(
     current_user: CurrentUser,
     db: Db
 ):
-    """Add a meter reading to equipment."""
+    """Add a meter reading to equipment (may trigger meter-based maintenance)."""
+    existing = await db.fetch_one(
+        "SELECT id FROM equipment WHERE id = ? AND organization_id = ?",
+        (equipment_id, current_user.org_id)
+    )
+    if not existing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Equipment not found")
+    
     reading_id = generate_id()
     now = datetime.utcnow()
     
-    db.execute(
+    await db.execute(
         """
         INSERT INTO meter_readings (id, equipment_id, meter_type, reading_value, recorded_by, recorded_at, notes)
         VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -336,8 +678,13 @@ async def add_meter_reading(
         (reading_id, equipment_id, request.meter_type, request.reading_value,
          current_user.sub, now, request.notes)
     )
-    db.commit()
-    db.sync()
+    readings = [MeterReading(equipment_id, request.meter_type, request.reading_value, now)]
+    await update_rollups(db, readings)
+    triggered = await evaluate_meter_readings(db, readings)
+    await db.commit()
+    await db.sync()
+    if triggered:
+        invalidate_org_stats(current_user.org_id)
     
     return MeterReadingResponse(
         id=reading_id, meter_type=request.meter_type, reading_value=request.reading_value,
@@ -345,6 +692,47 @@ async def add_meter_reading(
     )
 
 
+@router.get(
+    "/{equipment_id}/meters",
+    response_model=MeterSeriesResponse,
+    dependencies=[Depends(PermissionChecker(Permission.EQUIPMENT_READ))]
+)
+async def get_meter_series(
+    equipment_id: str,
+    current_user: CurrentUser,
+    db: Db,
+    meter_type: str = Query(..., description="Meter to chart, e.g. hours, km, cycles"),
+    start: Optional[datetime] = Query(None, description="Window start (default: 30 days before end)"),
+    end: Optional[datetime] = Query(None, description="Window end (default: now)"),
+    max_points: int = Query(500, ge=10, le=5000, description="Point budget for the window")
+):
+    """
+    Meter readings over a time window, downsampled to at most `max_points`.
+
+    Returns raw readings when they fit the budget, otherwise hourly or daily
+    rollups (min/max/avg/last/count per bucket).
+    """
+    existing = await db.fetch_one(
+        "SELECT id FROM equipment WHERE id = ? AND organization_id = ?",
+        (equipment_id, current_user.org_id)
+    )
+    if not existing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Equipment not found")
+    
+    end = as_utc_naive(end) if end else datetime.utcnow()
+    start = as_utc_naive(start) if start else end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be before end")
+    
+    resolution, points = await fetch_series(db, equipment_id, meter_type, start, end, max_points)
+    
+    return MeterSeriesResponse(
+        equipment_id=equipment_id, meter_type=meter_type, resolution=resolution,
+        start=str(start), end=str(end),
+        points=[MeterPointResponse(**point._asdict()) for point in points]
+    )
+
+
 @router.post(
     "/{equipment_id}/report-issue",
     status_code=status.HTTP_201_CREATED,
@@ -358,25 +746,28 @@ async def report_equipment_issue(
 ):
     """Report an issue with equipment (creates a work order)."""
     wo_id = generate_id()
-    wo_number = f"WO-{datetime.utcnow().strftime('%Y%m%d')}-{wo_id[:6].upper()}"
+    wo_number = generate_work_order_number(wo_id)
     now = datetime.utcnow()
     
-    db.execute(
-        """
-        INSERT INTO work_orders (
-            id, organization_id, equipment_id, work_order_number, title,
-            description, type, status, priority, requested_by, created_by,
-            created_at, updated_at
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            wo_id, current_user.org_id, equipment_id, wo_number, request.title,
-            request.description, "corrective", "pending", request.priority,
-            current_user.sub, current_user.sub, now, now
+    async with track_counters(db, "work_orders", wo_id, current_user.org_id):
+        await db.execute(
+            """
+            INSERT INTO work_orders (
+                id, organization_id, equipment_id, work_order_number, title,
+                description, type, status, priority, requested_by, created_by,
+                created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                wo_id, current_user.org_id, equipment_id, wo_number, request.title,
+                request.description, "corrective", "pending", request.priority,
+                current_user.sub, current_user.sub, now, now
+            )
         )
-    )
-    db.commit()
-    db.sync()
+    await index_document(db, WORK_ORDER, wo_id)
+    await db.commit()
+    await db.sync()
+    invalidate_org_stats(current_user.org_id)
     
     return {"message": "Issue reported successfully", "work_order_id": wo_id, "work_order_number": wo_number}
@@ -8,6 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel
 
 from ..deps import Db, CurrentUser, Pagination, PermissionChecker
+from ...database import coalesce_assignments, optional_filter
 from ...core import generate_id
 from ...core.permissions import Permission
 
@@ -69,7 +70,7 @@ async def create_location(
     location_id = generate_id()
     now = datetime.utcnow()
     
-    db.execute(
+    await db.execute(
         """
         INSERT INTO locations (
             id, organization_id, name, code, address, city, state, country,
@@ -85,8 +86,8 @@ async def create_location(
             request.type, request.parent_location_id, True, now, now
         )
     )
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
     
     return await get_location(location_id, current_user, db)
 
@@ -103,15 +104,16 @@ async def list_locations(
     where_clauses = ["l.organization_id = ?", "l.is_active = ?"]
     params = [current_user.org_id, is_active]
     
-    if type:
-        where_clauses.append("l.type = ?")
-        params.append(type)
+    # Residual filter: one statement shape whether or not it is set
+    type_sql, type_params = optional_filter("l.type", type or None)
+    where_clauses.append(type_sql)
+    params.extend(type_params)
     
     if parent_id:
         where_clauses.append("l.parent_location_id = ?")
         params.append(parent_id)
     
-    rows = db.fetch_all(
+    rows = await db.fetch_all(
         f"""
         SELECT l.id, l.name, l.code, l.address, l.city, l.state, l.country,
                l.type, l.parent_location_id, p.name as parent_name,
@@ -141,7 +143,7 @@ async def get_location(
     db: Db
 ):
     """Get a specific location."""
-    row = db.fetch_one(
+    row = await db.fetch_one(
         """
         SELECT l.id, l.name, l.code, l.address, l.city, l.state, l.country,
                l.type, l.parent_location_id, p.name as parent_name,
@@ -175,25 +177,21 @@ async def update_location(
     db: Db
 ):
     """Update a location."""
-    updates = []
-    params = []
+    values = {
+        field: getattr(request, field, None)
+        for field in ["name", "code", "address", "city", "state", "country", "type", "is_active"]
+    }
     
-    for field in ["name", "code", "address", "city", "state", "country", "type", "is_active"]:
-        value = getattr(request, field, None)
-        if value is not None:
-            updates.append(f"{field} = ?")
-            params.append(value)
-    
-    if updates:
-        updates.append("updated_at = ?")
+    if any(value is not None for value in values.values()):
+        set_sql, params = coalesce_assignments(values)
         params.extend([datetime.utcnow(), location_id, current_user.org_id])
         
-        db.execute(
-            f"UPDATE locations SET {', '.join(updates)} WHERE id = ? AND organization_id = ?",
+        await db.execute(
+            f"UPDATE locations SET {set_sql}, updated_at = ? WHERE id = ? AND organization_id = ?",
             tuple(params)
         )
-        db.commit()
-        db.sync()
+        await db.commit()
+        await db.sync()
     
     return await get_location(location_id, current_user, db)
 
@@ -209,9 +207,9 @@ async def delete_location(
     db: Db
 ):
     """Soft delete a location."""
-    db.execute(
+    await db.execute(
         "UPDATE locations SET is_active = FALSE, updated_at = ? WHERE id = ? AND organization_id = ?",
         (datetime.utcnow(), location_id, current_user.org_id)
     )
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
@@ -3,13 +3,17 @@ GearGuard Backend - Organizations Endpoints
 Organization management operations.
 """
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
+import json
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
 
 from ..deps import Db, CurrentUser, PermissionChecker
+from ...database import coalesce_assignments
 from ...core import generate_id
 from ...core.permissions import Permission, Role
+from ...services.recurrence import BusinessCalendar
+from ...services.stats import get_org_stats
 
 router = APIRouter()
 
@@ -43,6 +47,11 @@ class OrganizationUpdateRequest(BaseModel):
     website: Optional[str] = None
 
 
+class BusinessCalendarSettings(BaseModel):
+    working_days: List[int] = Field(default_factory=lambda: [0, 1, 2, 3, 4])  # Monday = 0
+    holidays: List[date] = Field(default_factory=list)
+
+
 class OrganizationStatsResponse(BaseModel):
     total_users: int
     total_equipment: int
@@ -60,7 +69,7 @@ async def list_organizations(
 ):
     """List organizations (super admin sees all, others see their own)."""
     if current_user.role == Role.SUPER_ADMIN:
-        rows = db.fetch_all(
+        rows = await db.fetch_all(
             """
             SELECT id, name, slug, logo_url, address, city, state, country,
                    phone, email, website, subscription_tier, is_active, created_at
@@ -69,7 +78,7 @@ async def list_organizations(
             """
         )
     else:
-        rows = db.fetch_all(
+        rows = await db.fetch_all(
             """
             SELECT id, name, slug, logo_url, address, city, state, country,
                    phone, email, website, subscription_tier, is_active, created_at
@@ -99,7 +108,7 @@ async def get_organization(
     if current_user.role != Role.SUPER_ADMIN and org_id != current_user.org_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     
-    row = db.fetch_one(
+    row = await db.fetch_one(
         """
         SELECT id, name, slug, logo_url, address, city, state, country,
                phone, email, website, subscription_tier, is_active, created_at
@@ -134,26 +143,21 @@ async def update_organization(
     if current_user.role != Role.SUPER_ADMIN and org_id != current_user.org_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     
-    updates = []
-    params = []
-    
-    for field in ["name", "logo_url", "address", "city", "state", "country", "phone", "email", "website"]:
-        value = getattr(request, field)
-        if value is not None:
-            updates.append(f"{field} = ?")
-            params.append(value)
+    values = {
+        field: getattr(request, field)
+        for field in ["name", "logo_url", "address", "city", "state", "country", "phone", "email", "website"]
+    }
     
-    if updates:
-        updates.append("updated_at = ?")
-        params.append(datetime.utcnow())
-        params.append(org_id)
+    if any(value is not None for value in values.values()):
+        set_sql, params = coalesce_assignments(values)
+        params.extend([datetime.utcnow(), org_id])
         
-        db.execute(
-            f"UPDATE organizations SET {', '.join(updates)} WHERE id = ?",
+        await db.execute(
+            f"UPDATE organizations SET {set_sql}, updated_at = ? WHERE id = ?",
             tuple(params)
         )
-        db.commit()
-        db.sync()
+        await db.commit()
+        await db.sync()
     
     return await get_organization(org_id, current_user, db)
 
@@ -168,36 +172,67 @@ async def get_organization_stats(
     if current_user.role != Role.SUPER_ADMIN and org_id != current_user.org_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     
-    # Users count
-    users = db.fetch_one("SELECT COUNT(*) FROM users WHERE organization_id = ?", (org_id,))
+    stats = await get_org_stats(db, org_id)
     
-    # Equipment count
-    equipment = db.fetch_one("SELECT COUNT(*) FROM equipment WHERE organization_id = ?", (org_id,))
-    
-    # Work orders
-    wo_total = db.fetch_one("SELECT COUNT(*) FROM work_orders WHERE organization_id = ?", (org_id,))
-    wo_pending = db.fetch_one(
-        "SELECT COUNT(*) FROM work_orders WHERE organization_id = ? AND status IN ('pending', 'in_progress')",
-        (org_id,)
-    )
-    wo_completed = db.fetch_one(
-        "SELECT COUNT(*) FROM work_orders WHERE organization_id = ? AND status = 'completed'",
-        (org_id,)
+    return OrganizationStatsResponse(
+        total_users=stats["users_total"],
+        total_equipment=stats["equipment_all"],
+        total_work_orders=stats["work_orders_total"],
+        pending_work_orders=stats["work_orders_pending"] + stats["work_orders_in_progress"],
+        completed_work_orders=stats["work_orders_completed"],
+        total_parts=stats["parts_total"],
+        low_stock_parts=stats["parts_low_stock"]
     )
+
+
+@router.get("/{org_id}/business-calendar", response_model=BusinessCalendarSettings)
+async def get_business_calendar(
+    org_id: str,
+    current_user: CurrentUser,
+    db: Db
+):
+    """Get the working days and holidays used to place maintenance due dates."""
+    if current_user.role != Role.SUPER_ADMIN and org_id != current_user.org_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
     
-    # Parts
-    parts_total = db.fetch_one("SELECT COUNT(*) FROM parts_inventory WHERE organization_id = ?", (org_id,))
-    parts_low = db.fetch_one(
-        "SELECT COUNT(*) FROM parts_inventory WHERE organization_id = ? AND quantity_in_stock <= minimum_stock_level",
-        (org_id,)
-    )
+    row = await db.fetch_one("SELECT settings FROM organizations WHERE id = ?", (org_id,))
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Organization not found")
     
-    return OrganizationStatsResponse(
-        total_users=users[0] if users else 0,
-        total_equipment=equipment[0] if equipment else 0,
-        total_work_orders=wo_total[0] if wo_total else 0,
-        pending_work_orders=wo_pending[0] if wo_pending else 0,
-        completed_work_orders=wo_completed[0] if wo_completed else 0,
-        total_parts=parts_total[0] if parts_total else 0,
-        low_stock_parts=parts_low[0] if parts_low else 0
+    return BusinessCalendarSettings(**BusinessCalendar.from_settings(row[0]).as_dict())
+
+
+@router.put(
+    "/{org_id}/business-calendar",
+    response_model=BusinessCalendarSettings,
+    dependencies=[Depends(PermissionChecker(Permission.ORG_UPDATE))]
+)
+async def update_business_calendar(
+    org_id: str,
+    request: BusinessCalendarSettings,
+    current_user: CurrentUser,
+    db: Db
+):
+    """Set the business calendar; PM due dates on non-working days move to the next working day."""
+    if current_user.role != Role.SUPER_ADMIN and org_id != current_user.org_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    
+    if not request.working_days or any(day < 0 or day > 6 for day in request.working_days):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="working_days must list weekdays from 0 (Monday) to 6 (Sunday)"
+        )
+    
+    business_calendar = BusinessCalendar(request.working_days, request.holidays)
+    await db.execute(
+        """
+        UPDATE organizations
+        SET settings = json_set(COALESCE(settings, '{}'), '$.business_calendar', json(?)), updated_at = ?
+        WHERE id = ?
+        """,
+        (json.dumps(business_calendar.as_dict()), datetime.utcnow(), org_id)
     )
+    await db.commit()
+    await db.sync()
+    
+    return await get_business_calendar(org_id, current_user, db)
@@ -2,14 +2,19 @@
 GearGuard Backend - Parts/Inventory Endpoints
 Spare parts inventory management.
 """
-from typing import Optional, List
+from typing import Any, Optional, List, Tuple
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel
 
 from ..deps import Db, CurrentUser, Pagination, PermissionChecker
+from ...database import coalesce_assignments, optional_filter
 from ...core import generate_id
 from ...core.permissions import Permission
+from ...services.counters import track_counters
+from ...services.outbox import low_stock_event_statement
+from ...services.stats import invalidate_org_stats
+from ...services.search import PART, index_document, search_filter
 
 router = APIRouter()
 
@@ -63,9 +68,11 @@ class StockAdjustRequest(BaseModel):
 
 class PartListResponse(BaseModel):
     items: List[PartResponse]
-    total: int
+    total: Optional[int]  # None when include_total=none
     page: int
     page_size: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None
 
 
 @router.post("", response_model=PartResponse, status_code=status.HTTP_201_CREATED,
@@ -75,49 +82,69 @@ async def create_part(request: PartCreateRequest, current_user: CurrentUser, db:
     part_id = generate_id()
     now = datetime.utcnow()
     
-    db.execute(
-        """INSERT INTO parts_inventory (id, organization_id, name, part_number, description, category,
-               manufacturer, unit, quantity_in_stock, minimum_stock_level, reorder_quantity,
-               unit_cost, storage_location, location_id, is_active, created_at, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (part_id, current_user.org_id, request.name, request.part_number, request.description,
-         request.category, request.manufacturer, request.unit, request.quantity_in_stock,
-         request.minimum_stock_level, request.reorder_quantity, request.unit_cost,
-         request.storage_location, request.location_id, True, now, now)
-    )
-    db.commit()
-    db.sync()
+    async with track_counters(db, "parts_inventory", part_id, current_user.org_id):
+        await db.execute(
+            """INSERT INTO parts_inventory (id, organization_id, name, part_number, description, category,
+                   manufacturer, unit, quantity_in_stock, minimum_stock_level, reorder_quantity,
+                   unit_cost, storage_location, location_id, is_active, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (part_id, current_user.org_id, request.name, request.part_number, request.description,
+             request.category, request.manufacturer, request.unit, request.quantity_in_stock,
+             request.minimum_stock_level, request.reorder_quantity, request.unit_cost,
+             request.storage_location, request.location_id, True, now, now)
+        )
+    await index_document(db, PART, part_id)
+    await db.commit()
+    await db.sync()
+    invalidate_org_stats(current_user.org_id)
     return await get_part(part_id, current_user, db)
 
 
-@router.get("", response_model=PartListResponse)
-async def list_parts(current_user: CurrentUser, db: Db, pagination: Pagination,
-                     category: Optional[str] = Query(None), search: Optional[str] = Query(None),
-                     low_stock_only: bool = Query(False)):
-    """List parts inventory."""
+def part_filters(org_id: str, category: Optional[str] = None, search: Optional[str] = None,
+                 low_stock_only: bool = False) -> Tuple[str, List[Any]]:
+    """WHERE clause (over alias p) for the parts list."""
     where_clauses = ["p.organization_id = ?", "p.is_active = TRUE"]
-    params = [current_user.org_id]
+    params: List[Any] = [org_id]
     
-    if category:
-        where_clauses.append("p.category = ?")
-        params.append(category)
+    # Residual filter: one statement shape whether or not it is set
+    category_sql, category_params = optional_filter("p.category", category or None)
+    where_clauses.append(category_sql)
+    params.extend(category_params)
     if search:
-        where_clauses.append("(p.name LIKE ? OR p.part_number LIKE ?)")
-        params.extend([f"%{search}%", f"%{search}%"])
+        search_sql, search_params = search_filter(
+            PART, "p.id", org_id, search, ["p.name", "p.part_number"]
+        )
+        where_clauses.append(search_sql)
+        params.extend(search_params)
     if low_stock_only:
         where_clauses.append("p.quantity_in_stock <= p.minimum_stock_level")
     
-    where_sql = " AND ".join(where_clauses)
-    count = db.fetch_one(f"SELECT COUNT(*) FROM parts_inventory p WHERE {where_sql}", tuple(params))
-    
-    params.extend([pagination.limit, pagination.offset])
-    rows = db.fetch_all(
-        f"""SELECT p.id, p.name, p.part_number, p.description, p.category, p.manufacturer,
+    return " AND ".join(where_clauses), params
+
+
+def part_list_query(where_sql: str, keyset_sql: str) -> str:
+    """Parts page (by name) for a `part_filters()` clause and keyset predicate."""
+    return f"""SELECT p.id, p.name, p.part_number, p.description, p.category, p.manufacturer,
                p.unit, p.quantity_in_stock, p.minimum_stock_level, p.reorder_quantity,
                p.unit_cost, p.storage_location, p.location_id, l.name, p.created_at
         FROM parts_inventory p LEFT JOIN locations l ON p.location_id = l.id
-        WHERE {where_sql} ORDER BY p.name LIMIT ? OFFSET ?""", tuple(params)
-    )
+        WHERE {where_sql} AND {keyset_sql} ORDER BY p.name, p.id LIMIT ? OFFSET ?"""
+
+
+@router.get("", response_model=PartListResponse)
+async def list_parts(current_user: CurrentUser, db: Db, pagination: Pagination,
+                     category: Optional[str] = Query(None), search: Optional[str] = Query(None),
+                     low_stock_only: bool = Query(False)):
+    """List parts inventory."""
+    where_sql, params = part_filters(current_user.org_id, category, search, low_stock_only)
+    count_query = f"SELECT COUNT(*) FROM parts_inventory p WHERE {where_sql}"
+    count_params = tuple(params)
+    
+    keyset_sql, keyset_params = pagination.keyset(("p.name", "p.id"), descending=False)
+    params.extend([*keyset_params, pagination.fetch_limit, pagination.offset])
+    rows = await db.fetch_all(part_list_query(where_sql, keyset_sql), tuple(params))
+    rows = pagination.page_rows(rows)
+    total = await pagination.resolve_total(db, count_query, count_params, rows)
     
     return PartListResponse(
         items=[PartResponse(
@@ -126,14 +153,16 @@ async def list_parts(current_user: CurrentUser, db: Db, pagination: Pagination,
             reorder_quantity=r[9], unit_cost=r[10], storage_location=r[11], location_id=r[12],
             location_name=r[13], is_low_stock=r[7] <= r[8], created_at=str(r[14])
         ) for r in rows],
-        total=count[0] if count else 0, page=pagination.page, page_size=pagination.page_size
+        total=total, page=pagination.page, page_size=pagination.page_size,
+        has_more=pagination.has_more,
+        next_cursor=pagination.next_cursor(rows, lambda r: (r[1], r[0]))
     )
 
 
 @router.get("/low-stock", response_model=List[PartResponse])
 async def get_low_stock_parts(current_user: CurrentUser, db: Db):
     """Get parts with low stock."""
-    rows = db.fetch_all(
+    rows = await db.fetch_all(
         """SELECT p.id, p.name, p.part_number, p.description, p.category, p.manufacturer,
                p.unit, p.quantity_in_stock, p.minimum_stock_level, p.reorder_quantity,
                p.unit_cost, p.storage_location, p.location_id, l.name, p.created_at
@@ -152,7 +181,7 @@ async def get_low_stock_parts(current_user: CurrentUser, db: Db):
 @router.get("/{part_id}", response_model=PartResponse)
 async def get_part(part_id: str, current_user: CurrentUser, db: Db):
     """Get part details."""
-    row = db.fetch_one(
+    row = await db.fetch_one(
         """SELECT p.id, p.name, p.part_number, p.description, p.category, p.manufacturer,
                p.unit, p.quantity_in_stock, p.minimum_stock_level, p.reorder_quantity,
                p.unit_cost, p.storage_location, p.location_id, l.name, p.created_at
@@ -173,31 +202,35 @@ async def get_part(part_id: str, current_user: CurrentUser, db: Db):
              dependencies=[Depends(PermissionChecker(Permission.PARTS_UPDATE))])
 async def adjust_stock(part_id: str, request: StockAdjustRequest, current_user: CurrentUser, db: Db):
     """Adjust stock level for a part."""
-    db.execute(
-        "UPDATE parts_inventory SET quantity_in_stock = quantity_in_stock + ?, updated_at = ? WHERE id = ? AND organization_id = ?",
-        (request.quantity_change, datetime.utcnow(), part_id, current_user.org_id)
-    )
-    db.commit()
-    db.sync()
+    now = datetime.utcnow()
+    async with track_counters(db, "parts_inventory", part_id, current_user.org_id):
+        await db.execute(
+            "UPDATE parts_inventory SET quantity_in_stock = quantity_in_stock + ?, updated_at = ? WHERE id = ? AND organization_id = ?",
+            (request.quantity_change, now, part_id, current_user.org_id)
+        )
+    await db.execute(*low_stock_event_statement(current_user.org_id, part_id, request.quantity_change, now))
+    await db.commit()
+    await db.sync()
+    invalidate_org_stats(current_user.org_id)
     return await get_part(part_id, current_user, db)
 
 
 @router.put("/{part_id}", response_model=PartResponse, dependencies=[Depends(PermissionChecker(Permission.PARTS_UPDATE))])
 async def update_part(part_id: str, request: PartUpdateRequest, current_user: CurrentUser, db: Db):
     """Update part information."""
-    updates = []
-    params = []
-    for field in ["name", "description", "unit_cost", "minimum_stock_level", "storage_location"]:
-        value = getattr(request, field, None)
-        if value is not None:
-            updates.append(f"{field} = ?")
-            params.append(value)
-    if updates:
-        updates.append("updated_at = ?")
+    values = {
+        field: getattr(request, field, None)
+        for field in ["name", "description", "unit_cost", "minimum_stock_level", "storage_location"]
+    }
+    if any(value is not None for value in values.values()):
+        set_sql, params = coalesce_assignments(values)
         params.extend([datetime.utcnow(), part_id, current_user.org_id])
-        db.execute(f"UPDATE parts_inventory SET {', '.join(updates)} WHERE id = ? AND organization_id = ?", tuple(params))
-        db.commit()
-        db.sync()
+        async with track_counters(db, "parts_inventory", part_id, current_user.org_id):
+            await db.execute(f"UPDATE parts_inventory SET {set_sql}, updated_at = ? WHERE id = ? AND organization_id = ?", tuple(params))
+        await index_document(db, PART, part_id)
+        await db.commit()
+        await db.sync()
+        invalidate_org_stats(current_user.org_id)
     return await get_part(part_id, current_user, db)
 
 
@@ -205,7 +238,9 @@ async def update_part(part_id: str, request: PartUpdateRequest, current_user: Cu
                dependencies=[Depends(PermissionChecker(Permission.PARTS_DELETE))])
 async def delete_part(part_id: str, current_user: CurrentUser, db: Db):
     """Deactivate a part."""
-    db.execute("UPDATE parts_inventory SET is_active = FALSE, updated_at = ? WHERE id = ? AND organization_id = ?",
-               (datetime.utcnow(), part_id, current_user.org_id))
-    db.commit()
-    db.sync()
+    async with track_counters(db, "parts_inventory", part_id, current_user.org_id):
+        await db.execute("UPDATE parts_inventory SET is_active = FALSE, updated_at = ? WHERE id = ? AND organization_id = ?",
+                   (datetime.utcnow(), part_id, current_user.org_id))
+    await db.commit()
+    await db.sync()
+    invalidate_org_stats(current_user.org_id)
@@ -2,16 +2,48 @@
 GearGuard Backend - Reports Endpoints
 Reporting and analytics.
 """
-from typing import Optional, List
+from typing import Any, Callable, Literal, Optional, List, Sequence, Tuple
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from ..deps import Db, CurrentUser, PermissionChecker
+from ..deps import Db, CurrentUser, PermissionChecker, UnpooledUser, require_permission
+from .audit import audit_log_filters
+from .equipment import equipment_filters
+from .workorders import work_order_filters
+from ...config import settings
 from ...core.permissions import Permission
+from ...services import export
+from ...services.stats import get_org_stats
 
 router = APIRouter()
 
+EQUIPMENT_HEALTH_SQL = """
+    SELECT id, name, status, health_score, last_maintenance_date FROM equipment
+    WHERE organization_id = ? AND status != 'retired' ORDER BY health_score LIMIT ?
+"""
+
+EQUIPMENT_HEALTH_BY_STATUS_SQL = """
+    SELECT id, name, status, health_score, last_maintenance_date FROM equipment
+    WHERE organization_id = ? AND status = ? ORDER BY health_score LIMIT ?
+"""
+
+WORK_ORDERS_CREATED_SQL = "SELECT COUNT(*) FROM work_orders WHERE organization_id = ? AND created_at >= ?"
+
+WORK_ORDERS_CREATED_BY_STATUS_SQL = WORK_ORDERS_CREATED_SQL + " AND status = ?"
+
+MAINTENANCE_COST_SQL = """
+    SELECT SUM(actual_cost) FROM work_orders
+    WHERE organization_id = ? AND created_at >= ? AND actual_cost IS NOT NULL
+"""
+
+PARTS_COST_SQL = """
+    SELECT SUM(pu.quantity_used * pu.unit_cost_at_time) FROM parts_usage pu
+    JOIN work_orders w ON pu.work_order_id = w.id
+    WHERE w.organization_id = ? AND pu.used_at >= ?
+"""
+
 
 class DashboardStats(BaseModel):
     total_equipment: int
@@ -48,42 +80,21 @@ class WorkOrderSummary(BaseModel):
 @router.get("/dashboard", response_model=DashboardStats, dependencies=[Depends(PermissionChecker(Permission.REPORT_READ))])
 async def get_dashboard_stats(current_user: CurrentUser, db: Db):
     """Get dashboard statistics."""
-    org_id = current_user.org_id
-    now = datetime.utcnow()
-    
-    # Equipment stats
-    eq_total = db.fetch_one("SELECT COUNT(*) FROM equipment WHERE organization_id = ? AND status != 'retired'", (org_id,))
-    eq_op = db.fetch_one("SELECT COUNT(*) FROM equipment WHERE organization_id = ? AND status = 'operational'", (org_id,))
-    eq_maint = db.fetch_one("SELECT COUNT(*) FROM equipment WHERE organization_id = ? AND status = 'maintenance'", (org_id,))
-    eq_break = db.fetch_one("SELECT COUNT(*) FROM equipment WHERE organization_id = ? AND status = 'breakdown'", (org_id,))
-    avg_health = db.fetch_one("SELECT AVG(health_score) FROM equipment WHERE organization_id = ? AND status != 'retired'", (org_id,))
-    
-    # Work order stats
-    wo_total = db.fetch_one("SELECT COUNT(*) FROM work_orders WHERE organization_id = ?", (org_id,))
-    wo_pend = db.fetch_one("SELECT COUNT(*) FROM work_orders WHERE organization_id = ? AND status = 'pending'", (org_id,))
-    wo_prog = db.fetch_one("SELECT COUNT(*) FROM work_orders WHERE organization_id = ? AND status = 'in_progress'", (org_id,))
-    wo_comp = db.fetch_one("SELECT COUNT(*) FROM work_orders WHERE organization_id = ? AND status = 'completed'", (org_id,))
-    wo_overdue = db.fetch_one("SELECT COUNT(*) FROM work_orders WHERE organization_id = ? AND status IN ('pending', 'in_progress') AND due_date < ?", (org_id, now))
-    
-    # Maintenance
-    upcoming = db.fetch_one("SELECT COUNT(*) FROM maintenance_schedules WHERE organization_id = ? AND is_active = TRUE AND next_due <= ?", (org_id, now + timedelta(days=7)))
-    
-    # Parts
-    low_stock = db.fetch_one("SELECT COUNT(*) FROM parts_inventory WHERE organization_id = ? AND is_active = TRUE AND quantity_in_stock <= minimum_stock_level", (org_id,))
+    stats = await get_org_stats(db, current_user.org_id)
     
     return DashboardStats(
-        total_equipment=eq_total[0] if eq_total else 0,
-        operational_equipment=eq_op[0] if eq_op else 0,
-        equipment_in_maintenance=eq_maint[0] if eq_maint else 0,
-        equipment_breakdown=eq_break[0] if eq_break else 0,
-        total_work_orders=wo_total[0] if wo_total else 0,
-        pending_work_orders=wo_pend[0] if wo_pend else 0,
-        in_progress_work_orders=wo_prog[0] if wo_prog else 0,
-        completed_work_orders=wo_comp[0] if wo_comp else 0,
-        overdue_work_orders=wo_overdue[0] if wo_overdue else 0,
-        upcoming_maintenance=upcoming[0] if upcoming else 0,
-        low_stock_parts=low_stock[0] if low_stock else 0,
-        avg_equipment_health=round(avg_health[0], 1) if avg_health and avg_health[0] else 0
+        total_equipment=stats["equipment_total"],
+        operational_equipment=stats["equipment_operational"],
+        equipment_in_maintenance=stats["equipment_maintenance"],
+        equipment_breakdown=stats["equipment_breakdown"],
+        total_work_orders=stats["work_orders_total"],
+        pending_work_orders=stats["work_orders_pending"],
+        in_progress_work_orders=stats["work_orders_in_progress"],
+        completed_work_orders=stats["work_orders_completed"],
+        overdue_work_orders=stats["work_orders_overdue"],
+        upcoming_maintenance=stats["maintenance_upcoming"],
+        low_stock_parts=stats["parts_low_stock_active"],
+        avg_equipment_health=stats["equipment_avg_health"]
     )
 
 
@@ -91,15 +102,9 @@ async def get_dashboard_stats(current_user: CurrentUser, db: Db):
 async def get_equipment_health_report(current_user: CurrentUser, db: Db, status: Optional[str] = Query(None), limit: int = Query(50)):
     """Get equipment health report."""
     if status:
-        rows = db.fetch_all(
-            "SELECT id, name, status, health_score, last_maintenance_date FROM equipment WHERE organization_id = ? AND status = ? ORDER BY health_score LIMIT ?",
-            (current_user.org_id, status, limit)
-        )
+        rows = await db.fetch_all(EQUIPMENT_HEALTH_BY_STATUS_SQL, (current_user.org_id, status, limit))
     else:
-        rows = db.fetch_all(
-            "SELECT id, name, status, health_score, last_maintenance_date FROM equipment WHERE organization_id = ? AND status != 'retired' ORDER BY health_score LIMIT ?",
-            (current_user.org_id, limit)
-        )
+        rows = await db.fetch_all(EQUIPMENT_HEALTH_SQL, (current_user.org_id, limit))
     return [EquipmentHealthItem(id=r[0], name=r[1], status=r[2], health_score=r[3], last_maintenance=str(r[4]) if r[4] else None) for r in rows]
 
 
@@ -116,10 +121,10 @@ async def get_workorder_summary(current_user: CurrentUser, db: Db, period: str =
     else:  # month
         start_date = datetime.utcnow() - timedelta(days=30)
     
-    total = db.fetch_one("SELECT COUNT(*) FROM work_orders WHERE organization_id = ? AND created_at >= ?", (org_id, start_date))
-    completed = db.fetch_one("SELECT COUNT(*) FROM work_orders WHERE organization_id = ? AND created_at >= ? AND status = 'completed'", (org_id, start_date))
-    pending = db.fetch_one("SELECT COUNT(*) FROM work_orders WHERE organization_id = ? AND created_at >= ? AND status = 'pending'", (org_id, start_date))
-    cancelled = db.fetch_one("SELECT COUNT(*) FROM work_orders WHERE organization_id = ? AND created_at >= ? AND status = 'cancelled'", (org_id, start_date))
+    total = await db.fetch_one(WORK_ORDERS_CREATED_SQL, (org_id, start_date))
+    completed = await db.fetch_one(WORK_ORDERS_CREATED_BY_STATUS_SQL, (org_id, start_date, "completed"))
+    pending = await db.fetch_one(WORK_ORDERS_CREATED_BY_STATUS_SQL, (org_id, start_date, "pending"))
+    cancelled = await db.fetch_one(WORK_ORDERS_CREATED_BY_STATUS_SQL, (org_id, start_date, "cancelled"))
     
     return [WorkOrderSummary(
         period=period,
@@ -136,18 +141,149 @@ async def get_maintenance_costs(current_user: CurrentUser, db: Db, days: int = Q
     """Get maintenance cost summary."""
     start_date = datetime.utcnow() - timedelta(days=days)
     
-    total_cost = db.fetch_one(
-        "SELECT SUM(actual_cost) FROM work_orders WHERE organization_id = ? AND created_at >= ? AND actual_cost IS NOT NULL",
-        (current_user.org_id, start_date)
-    )
-    parts_cost = db.fetch_one(
-        """SELECT SUM(pu.quantity_used * pu.unit_cost_at_time) FROM parts_usage pu 
-        JOIN work_orders w ON pu.work_order_id = w.id WHERE w.organization_id = ? AND pu.used_at >= ?""",
-        (current_user.org_id, start_date)
-    )
+    total_cost = await db.fetch_one(MAINTENANCE_COST_SQL, (current_user.org_id, start_date))
+    parts_cost = await db.fetch_one(PARTS_COST_SQL, (current_user.org_id, start_date))
     
     return {
         "period_days": days,
         "total_maintenance_cost": total_cost[0] if total_cost and total_cost[0] else 0,
         "parts_cost": parts_cost[0] if parts_cost and parts_cost[0] else 0
     }
+
+
+# ===========================================
+# Exports
+# ===========================================
+
+ExportFormat = Literal["csv", "ndjson"]
+
+# Export SELECTs (without WHERE/ORDER BY) and their keyset sort, newest first
+WORK_ORDER_EXPORT_SQL = """
+    SELECT w.id, w.work_order_number, w.title, w.description, w.equipment_id,
+           e.name, w.type, w.status, w.priority, w.assigned_to,
+           u.first_name || ' ' || u.last_name, w.due_date,
+           w.started_at, w.completed_at, w.estimated_hours, w.actual_hours,
+           w.actual_cost, w.created_by, w.created_at
+    FROM work_orders w
+    JOIN equipment e ON w.equipment_id = e.id
+    LEFT JOIN users u ON w.assigned_to = u.id
+"""
+WORK_ORDER_EXPORT_SORT = ("w.created_at", "w.id")
+
+EQUIPMENT_EXPORT_SQL = """
+    SELECT e.id, e.name, e.code, e.serial_number, e.model, e.manufacturer,
+           e.description, e.category_id, c.name, e.location_id, l.name,
+           e.status, e.health_score, e.criticality, e.purchase_date,
+           e.purchase_cost, e.warranty_expiry, e.last_maintenance_date,
+           e.next_maintenance_date, e.created_at
+    FROM equipment e
+    LEFT JOIN equipment_categories c ON e.category_id = c.id
+    LEFT JOIN locations l ON e.location_id = l.id
+"""
+EQUIPMENT_EXPORT_SORT = ("e.created_at", "e.id")
+
+AUDIT_LOG_EXPORT_SQL = """
+    SELECT a.id, a.user_id, u.email, a.action, a.resource_type, a.resource_id,
+           a.old_values, a.new_values, a.ip_address, a.created_at
+    FROM audit_logs a
+    LEFT JOIN users u ON a.user_id = u.id
+"""
+AUDIT_LOG_EXPORT_SORT = ("a.created_at", "a.id")
+
+
+def _export_response(
+    name: str,
+    export_format: str,
+    columns: Sequence[str],
+    select_sql: str,
+    where_sql: str,
+    params: Sequence[Any],
+    sort_columns: Sequence[str],
+    key: Callable[[Tuple], Sequence[Any]]
+) -> StreamingResponse:
+    """Stream every matching row as an attachment, EXPORT_CHUNK_SIZE rows per query."""
+    chunks = export.stream_rows(
+        select_sql, where_sql, params, sort_columns, key, settings.EXPORT_CHUNK_SIZE
+    )
+    filename = f"{name}-{datetime.utcnow():%Y%m%d-%H%M%S}.{export_format}"
+    return StreamingResponse(
+        export.encode(export_format, columns, chunks),
+        media_type=export.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/export/work-orders")
+async def export_work_orders(
+    current_user: UnpooledUser,
+    format: ExportFormat = Query("csv"),
+    status: Optional[str] = Query(None),
+    type: Optional[str] = Query(None),
+    priority: Optional[str] = Query(None),
+    equipment_id: Optional[str] = Query(None),
+    assigned_to: Optional[str] = Query(None),
+    search: Optional[str] = Query(None)
+):
+    """Export work orders (newest first) with the same filters as the list endpoint."""
+    require_permission(current_user, Permission.REPORT_EXPORT)
+    require_permission(current_user, Permission.WORKORDER_READ)
+    where_sql, params = work_order_filters(
+        current_user.org_id, status, type, priority, equipment_id, assigned_to, search
+    )
+    return _export_response(
+        "work-orders", format,
+        ["id", "work_order_number", "title", "description", "equipment_id", "equipment_name",
+         "type", "status", "priority", "assigned_to", "assigned_to_name", "due_date",
+         "started_at", "completed_at", "estimated_hours", "actual_hours", "actual_cost",
+         "created_by", "created_at"],
+        WORK_ORDER_EXPORT_SQL,
+        where_sql, params, WORK_ORDER_EXPORT_SORT, lambda r: (r[18], r[0])
+    )
+
+
+@router.get("/export/equipment")
+async def export_equipment(
+    current_user: UnpooledUser,
+    format: ExportFormat = Query("csv"),
+    status: Optional[str] = Query(None),
+    category_id: Optional[str] = Query(None),
+    location_id: Optional[str] = Query(None),
+    criticality: Optional[str] = Query(None),
+    search: Optional[str] = Query(None)
+):
+    """Export equipment (newest first) with the same filters as the list endpoint."""
+    require_permission(current_user, Permission.REPORT_EXPORT)
+    require_permission(current_user, Permission.EQUIPMENT_READ)
+    where_sql, params = equipment_filters(
+        current_user.org_id, status, category_id, location_id, criticality, search
+    )
+    return _export_response(
+        "equipment", format,
+        ["id", "name", "code", "serial_number", "model", "manufacturer", "description",
+         "category_id", "category_name", "location_id", "location_name", "status",
+         "health_score", "criticality", "purchase_date", "purchase_cost", "warranty_expiry",
+         "last_maintenance_date", "next_maintenance_date", "created_at"],
+        EQUIPMENT_EXPORT_SQL,
+        where_sql, params, EQUIPMENT_EXPORT_SORT, lambda r: (r[19], r[0])
+    )
+
+
+@router.get("/export/audit-logs")
+async def export_audit_logs(
+    current_user: UnpooledUser,
+    format: ExportFormat = Query("csv"),
+    resource_type: Optional[str] = Query(None),
+    action: Optional[str] = Query(None),
+    user_id: Optional[str] = Query(None)
+):
+    """Export audit logs (newest first) with the same filters as the list endpoint."""
+    require_permission(current_user, Permission.REPORT_EXPORT)
+    require_permission(current_user, Permission.AUDIT_READ)
+    where_sql, params = audit_log_filters(current_user.org_id, resource_type, action, user_id)
+    return _export_response(
+        "audit-logs", format,
+        ["id", "user_id", "user_email", "action", "resource_type", "resource_id",
+         "old_values", "new_values", "ip_address", "created_at"],
+        AUDIT_LOG_EXPORT_SQL,
+        where_sql, params, AUDIT_LOG_EXPORT_SORT, lambda r: (r[9], r[0])
+    )
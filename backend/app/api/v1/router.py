@@ -19,6 +19,8 @@ from . import notifications
 from . import reports
 from . import dashboards
 from . import audit
+from . import search
+from . import stream
 
 # Create the main API router
 api_router = APIRouter()
@@ -113,3 +115,15 @@ api_router.include_router(
     prefix="/audit-logs", 
     tags=["Audit Logs"]
 )
+
+api_router.include_router(
+    search.router, 
+    prefix="/search", 
+    tags=["Search"]
+)
+
+api_router.include_router(
+    stream.router, 
+    prefix="/stream", 
+    tags=["Live Updates"]
+)
@@ -2,14 +2,23 @@
 GearGuard Backend - Maintenance Schedules Endpoints
 Preventive maintenance schedule management.
 """
-from typing import Optional, List
+from typing import Any, Optional, List, Tuple
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel
 
 from ..deps import Db, CurrentUser, Pagination, PermissionChecker
+from ...config import settings
+from ...database import coalesce_assignments
 from ...core import generate_id
 from ...core.permissions import Permission
+from ...services.assignment import WorkOrderLoad, track_workload
+from ...services.meter_triggers import invalidate_meter_schedules
+from ...services.pm_scheduler import generation_key, generation_statements, record_generated
+from ...services.recurrence import (
+    INTERVAL_UNITS, Recurrence, calculate_next_due, expand_occurrences, load_business_calendars, normalize_unit,
+)
+from ...services.stats import invalidate_org_stats
 
 router = APIRouter()
 
@@ -39,9 +48,9 @@ class ScheduleCreateRequest(BaseModel):
     description: Optional[str] = None
     equipment_id: str
     type: str = "preventive"  # preventive, predictive, condition_based
-    frequency_type: str  # daily, weekly, monthly, yearly, meter_based
+    frequency_type: str  # daily, weekly, monthly, yearly, custom, meter_based
     frequency_value: Optional[int] = None
-    frequency_unit: Optional[str] = None
+    frequency_unit: Optional[str] = None  # custom: hours, days, weeks, months, years; meter_based: meter type
     meter_threshold: Optional[float] = None
     priority: str = "medium"
     assigned_to: Optional[str] = None
@@ -54,25 +63,49 @@ class ScheduleUpdateRequest(BaseModel):
     description: Optional[str] = None
     frequency_type: Optional[str] = None
     frequency_value: Optional[int] = None
+    frequency_unit: Optional[str] = None
     priority: Optional[str] = None
     assigned_to: Optional[str] = None
     is_active: Optional[bool] = None
 
 
-def calculate_next_due(frequency_type: str, frequency_value: int, last_performed: datetime = None) -> datetime:
-    """Calculate next due date based on frequency."""
-    base = last_performed or datetime.utcnow()
-    
-    if frequency_type == "daily":
-        return base + timedelta(days=frequency_value or 1)
-    elif frequency_type == "weekly":
-        return base + timedelta(weeks=frequency_value or 1)
-    elif frequency_type == "monthly":
-        return base + timedelta(days=30 * (frequency_value or 1))
-    elif frequency_type == "yearly":
-        return base + timedelta(days=365 * (frequency_value or 1))
-    else:
-        return base + timedelta(days=30)  # Default
+class ScheduleForecastOccurrence(BaseModel):
+    schedule_id: str
+    schedule_name: str
+    equipment_id: str
+    equipment_name: str
+    assigned_to: Optional[str]
+    due: str
+    estimated_duration_minutes: int
+
+
+class ScheduleForecastDay(BaseModel):
+    date: str
+    occurrences: int
+    estimated_minutes: int
+
+
+class ScheduleForecastResponse(BaseModel):
+    start: str
+    end: str
+    total_occurrences: int
+    total_estimated_minutes: int
+    days: List[ScheduleForecastDay]
+    occurrences: List[ScheduleForecastOccurrence]
+    occurrences_truncated: bool
+
+
+def _custom_frequency_unit(frequency_type: Optional[str], frequency_unit: Optional[str]) -> Optional[str]:
+    """Normalized unit of a custom frequency (400 if missing or unknown); other units pass through."""
+    if frequency_type != "custom":
+        return frequency_unit
+    unit = normalize_unit(frequency_unit)
+    if unit is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Custom frequencies need a frequency_unit of: {', '.join(INTERVAL_UNITS)}"
+        )
+    return unit
 
 
 @router.post(
@@ -85,9 +118,10 @@ async def create_schedule(request: ScheduleCreateRequest, current_user: CurrentU
     """Create a new maintenance schedule."""
     schedule_id = generate_id()
     now = datetime.utcnow()
-    next_due = calculate_next_due(request.frequency_type, request.frequency_value)
+    frequency_unit = _custom_frequency_unit(request.frequency_type, request.frequency_unit)
+    next_due = calculate_next_due(request.frequency_type, request.frequency_value, frequency_unit=frequency_unit)
     
-    db.execute(
+    await db.execute(
         """
         INSERT INTO maintenance_schedules (
             id, organization_id, equipment_id, name, description, type,
@@ -100,17 +134,69 @@ async def create_schedule(request: ScheduleCreateRequest, current_user: CurrentU
         (
             schedule_id, current_user.org_id, request.equipment_id, request.name,
             request.description, request.type, request.frequency_type, request.frequency_value,
-            request.frequency_unit, request.meter_threshold, next_due,
+            frequency_unit, request.meter_threshold, next_due,
             request.estimated_duration_minutes, request.priority, request.assigned_to,
             request.checklist_template_id, True, current_user.sub, now, now
         )
     )
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
+    invalidate_org_stats(current_user.org_id)
+    invalidate_meter_schedules(request.equipment_id)
     
     return await get_schedule(schedule_id, current_user, db)
 
 
+# ScheduleResponse columns, in field order
+SCHEDULE_SELECT_SQL = """
+    SELECT s.id, s.name, s.description, s.equipment_id, e.name, s.type,
+           s.frequency_type, s.frequency_value, s.frequency_unit, s.priority,
+           s.assigned_to, u.first_name || ' ' || u.last_name,
+           s.last_performed, s.next_due, s.estimated_duration_minutes,
+           s.is_active, s.created_at
+    FROM maintenance_schedules s
+    JOIN equipment e ON s.equipment_id = e.id
+    LEFT JOIN users u ON s.assigned_to = u.id
+"""
+
+UPCOMING_SCHEDULES_SQL = SCHEDULE_SELECT_SQL + """
+    WHERE s.organization_id = ? AND s.is_active = TRUE AND s.next_due <= ?
+    ORDER BY s.next_due
+"""
+
+OVERDUE_SCHEDULES_SQL = SCHEDULE_SELECT_SQL + """
+    WHERE s.organization_id = ? AND s.is_active = TRUE AND s.next_due < ?
+    ORDER BY s.next_due
+"""
+
+# Time-based schedules with an occurrence before the end of a forecast window
+FORECAST_SCHEDULES_SQL = """
+    SELECT s.id, s.name, s.equipment_id, e.name, s.assigned_to, s.next_due,
+           s.frequency_type, s.frequency_value, s.frequency_unit, s.estimated_duration_minutes
+    FROM maintenance_schedules s
+    JOIN equipment e ON s.equipment_id = e.id
+    WHERE s.organization_id = ? AND s.is_active = TRUE
+      AND s.frequency_type != 'meter_based' AND s.next_due < ?
+"""
+
+
+def schedule_filters(org_id: str, is_active: bool, equipment_id: Optional[str] = None) -> Tuple[str, List[Any]]:
+    """WHERE clause (over alias s) of the schedule list."""
+    where_clauses = ["s.organization_id = ?", "s.is_active = ?"]
+    params: List[Any] = [org_id, is_active]
+    
+    if equipment_id:
+        where_clauses.append("s.equipment_id = ?")
+        params.append(equipment_id)
+    
+    return " AND ".join(where_clauses), params
+
+
+def schedule_list_query(where_sql: str) -> str:
+    """Schedule list for a `schedule_filters()` clause, next due first."""
+    return f"{SCHEDULE_SELECT_SQL} WHERE {where_sql} ORDER BY s.next_due"
+
+
 @router.get("", response_model=List[ScheduleResponse])
 async def list_schedules(
     current_user: CurrentUser,
@@ -119,28 +205,8 @@ async def list_schedules(
     is_active: bool = Query(True)
 ):
     """List all maintenance schedules."""
-    where_clauses = ["s.organization_id = ?", "s.is_active = ?"]
-    params = [current_user.org_id, is_active]
-    
-    if equipment_id:
-        where_clauses.append("s.equipment_id = ?")
-        params.append(equipment_id)
-    
-    rows = db.fetch_all(
-        f"""
-        SELECT s.id, s.name, s.description, s.equipment_id, e.name, s.type,
-               s.frequency_type, s.frequency_value, s.frequency_unit, s.priority,
-               s.assigned_to, u.first_name || ' ' || u.last_name,
-               s.last_performed, s.next_due, s.estimated_duration_minutes,
-               s.is_active, s.created_at
-        FROM maintenance_schedules s
-        JOIN equipment e ON s.equipment_id = e.id
-        LEFT JOIN users u ON s.assigned_to = u.id
-        WHERE {' AND '.join(where_clauses)}
-        ORDER BY s.next_due
-        """,
-        tuple(params)
-    )
+    where_sql, params = schedule_filters(current_user.org_id, is_active, equipment_id)
+    rows = await db.fetch_all(schedule_list_query(where_sql), tuple(params))
     
     return [
         ScheduleResponse(
@@ -163,21 +229,7 @@ async def get_upcoming_maintenance(
     """Get maintenance schedules due in the next N days."""
     future_date = datetime.utcnow() + timedelta(days=days)
     
-    rows = db.fetch_all(
-        """
-        SELECT s.id, s.name, s.description, s.equipment_id, e.name, s.type,
-               s.frequency_type, s.frequency_value, s.frequency_unit, s.priority,
-               s.assigned_to, u.first_name || ' ' || u.last_name,
-               s.last_performed, s.next_due, s.estimated_duration_minutes,
-               s.is_active, s.created_at
-        FROM maintenance_schedules s
-        JOIN equipment e ON s.equipment_id = e.id
-        LEFT JOIN users u ON s.assigned_to = u.id
-        WHERE s.organization_id = ? AND s.is_active = TRUE AND s.next_due <= ?
-        ORDER BY s.next_due
-        """,
-        (current_user.org_id, future_date)
-    )
+    rows = await db.fetch_all(UPCOMING_SCHEDULES_SQL, (current_user.org_id, future_date))
     
     return [
         ScheduleResponse(
@@ -196,21 +248,7 @@ async def get_overdue_maintenance(current_user: CurrentUser, db: Db):
     """Get overdue maintenance schedules."""
     now = datetime.utcnow()
     
-    rows = db.fetch_all(
-        """
-        SELECT s.id, s.name, s.description, s.equipment_id, e.name, s.type,
-               s.frequency_type, s.frequency_value, s.frequency_unit, s.priority,
-               s.assigned_to, u.first_name || ' ' || u.last_name,
-               s.last_performed, s.next_due, s.estimated_duration_minutes,
-               s.is_active, s.created_at
-        FROM maintenance_schedules s
-        JOIN equipment e ON s.equipment_id = e.id
-        LEFT JOIN users u ON s.assigned_to = u.id
-        WHERE s.organization_id = ? AND s.is_active = TRUE AND s.next_due < ?
-        ORDER BY s.next_due
-        """,
-        (current_user.org_id, now)
-    )
+    rows = await db.fetch_all(OVERDUE_SCHEDULES_SQL, (current_user.org_id, now))
     
     return [
         ScheduleResponse(
@@ -224,21 +262,69 @@ async def get_overdue_maintenance(current_user: CurrentUser, db: Db):
     ]
 
 
+@router.get("/forecast", response_model=ScheduleForecastResponse)
+async def forecast_maintenance(
+    current_user: CurrentUser,
+    db: Db,
+    days: int = Query(30, ge=1, le=366)
+):
+    """
+    Forecast preventive maintenance occurrences over the next N days.
+
+    Every active time-based schedule is expanded from its next due date in
+    one pass (occurrences already in /overdue are not repeated), with due
+    dates moved to working days by the organization's business calendar.
+    Daily totals cover the whole window; the occurrence list is capped at
+    SCHEDULE_FORECAST_MAX_OCCURRENCES.
+    """
+    start = datetime.utcnow()
+    end = start + timedelta(days=days)
+
+    rows = await db.fetch_all(FORECAST_SCHEDULES_SQL, (current_user.org_id, end))
+    calendars = await load_business_calendars(db, [current_user.org_id])
+    business_calendar = calendars[current_user.org_id]
+
+    occurrences = []
+    for r in rows:
+        rule = Recurrence.for_schedule(r[6], r[7], r[8])
+        anchor = r[5] if isinstance(r[5], datetime) else datetime.fromisoformat(str(r[5]))
+        minutes = r[9] or 60
+        for due in expand_occurrences(rule, anchor, start, end, business_calendar):
+            occurrences.append((due, r, minutes))
+    occurrences.sort(key=lambda occurrence: occurrence[0])
+
+    per_day = {}
+    for due, _, minutes in occurrences:
+        totals = per_day.setdefault(due.date(), [0, 0])
+        totals[0] += 1
+        totals[1] += minutes
+
+    listed = occurrences[:settings.SCHEDULE_FORECAST_MAX_OCCURRENCES]
+    return ScheduleForecastResponse(
+        start=str(start),
+        end=str(end),
+        total_occurrences=len(occurrences),
+        total_estimated_minutes=sum(totals[1] for totals in per_day.values()),
+        days=[
+            ScheduleForecastDay(date=day.isoformat(), occurrences=totals[0], estimated_minutes=totals[1])
+            for day, totals in sorted(per_day.items())
+        ],
+        occurrences=[
+            ScheduleForecastOccurrence(
+                schedule_id=r[0], schedule_name=r[1], equipment_id=r[2], equipment_name=r[3],
+                assigned_to=r[4], due=str(due), estimated_duration_minutes=minutes
+            )
+            for due, r, minutes in listed
+        ],
+        occurrences_truncated=len(occurrences) > len(listed),
+    )
+
+
 @router.get("/{schedule_id}", response_model=ScheduleResponse)
 async def get_schedule(schedule_id: str, current_user: CurrentUser, db: Db):
     """Get schedule details."""
-    row = db.fetch_one(
-        """
-        SELECT s.id, s.name, s.description, s.equipment_id, e.name, s.type,
-               s.frequency_type, s.frequency_value, s.frequency_unit, s.priority,
-               s.assigned_to, u.first_name || ' ' || u.last_name,
-               s.last_performed, s.next_due, s.estimated_duration_minutes,
-               s.is_active, s.created_at
-        FROM maintenance_schedules s
-        JOIN equipment e ON s.equipment_id = e.id
-        LEFT JOIN users u ON s.assigned_to = u.id
-        WHERE s.id = ? AND s.organization_id = ?
-        """,
+    row = await db.fetch_one(
+        f"{SCHEDULE_SELECT_SQL} WHERE s.id = ? AND s.organization_id = ?",
         (schedule_id, current_user.org_id)
     )
     
@@ -260,12 +346,17 @@ async def get_schedule(schedule_id: str, current_user: CurrentUser, db: Db):
     dependencies=[Depends(PermissionChecker(Permission.WORKORDER_CREATE))]
 )
 async def generate_work_order_from_schedule(schedule_id: str, current_user: CurrentUser, db: Db):
-    """Generate a work order from a maintenance schedule."""
-    # Get schedule
-    schedule = db.fetch_one(
+    """
+    Generate the work order for a schedule's next due instance now.
+
+    Goes through the same claim and compare-and-set as the background
+    generator, so repeated clicks, concurrent requests and the job itself
+    produce at most one work order per due instance.
+    """
+    schedule = await db.fetch_one(
         """
-        SELECT s.name, s.description, s.equipment_id, s.priority, s.assigned_to,
-               s.estimated_duration_minutes, s.checklist_template_id, s.frequency_type, s.frequency_value
+        SELECT s.next_due, s.frequency_type, s.frequency_value, s.frequency_unit, s.is_active,
+               s.assigned_to, s.estimated_duration_minutes
         FROM maintenance_schedules s
         WHERE s.id = ? AND s.organization_id = ?
         """,
@@ -274,42 +365,50 @@ async def generate_work_order_from_schedule(schedule_id: str, current_user: Curr
     
     if not schedule:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Schedule not found")
+    if not schedule[4]:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Schedule is not active")
+    if schedule[0] is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Schedule has no due date")
     
-    wo_id = generate_id()
-    wo_number = f"WO-{datetime.utcnow().strftime('%Y%m%d')}-{wo_id[:6].upper()}"
     now = datetime.utcnow()
-    
-    db.execute(
+    calendars = await load_business_calendars(db, [current_user.org_id])
+    wo_id, statements = generation_statements(
+        (schedule_id, schedule[0], schedule[1], schedule[2], schedule[3]),
+        now, calendars[current_user.org_id], created_by=current_user.sub
+    )
+    statements.append((
         """
-        INSERT INTO work_orders (
-            id, organization_id, equipment_id, schedule_id, work_order_number,
-            title, description, type, status, priority, assigned_to,
-            estimated_hours, checklist_template_id, created_by, created_at, updated_at
+        UPDATE maintenance_schedules SET last_performed = ?
+        WHERE id = ? AND EXISTS (
+            SELECT 1 FROM pm_generations WHERE idempotency_key = ? AND work_order_id = ?
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
-        (
-            wo_id, current_user.org_id, schedule[2], schedule_id, wo_number,
-            f"PM: {schedule[0]}", schedule[1], "preventive", "pending", schedule[3],
-            schedule[4], (schedule[5] or 60) / 60, schedule[6], current_user.sub, now, now
-        )
-    )
+        (now, schedule_id, generation_key(schedule_id, schedule[0]), wo_id)
+    ))
     
-    # Update schedule - set last performed and calculate next due
-    next_due = calculate_next_due(schedule[7], schedule[8], now)
-    db.execute(
-        """
-        UPDATE maintenance_schedules 
-        SET last_performed = ?, next_due = ?, updated_at = ?
-        WHERE id = ?
-        """,
-        (now, next_due, now, schedule_id)
-    )
+    async with db.transaction():
+        results = await db.batch(statements)
+        if not results[1].rows_affected:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A work order was already generated for this due date"
+            )
+        await record_generated(db, {current_user.org_id: [wo_id]})
+        wo_number = await db.fetch_one("SELECT work_order_number FROM work_orders WHERE id = ?", (wo_id,))
     
-    db.commit()
-    db.sync()
+    await db.sync()
+    if schedule[5]:
+        track_workload(
+            current_user.org_id, None,
+            WorkOrderLoad(schedule[5], (schedule[6] or 60) / 60, "pending")
+        )
+    invalidate_org_stats(current_user.org_id)
     
-    return {"message": "Work order generated", "work_order_id": wo_id, "work_order_number": wo_number}
+    return {
+        "message": "Work order generated",
+        "work_order_id": wo_id,
+        "work_order_number": wo_number[0]
+    }
 
 
 @router.put(
@@ -319,24 +418,35 @@ async def generate_work_order_from_schedule(schedule_id: str, current_user: Curr
 )
 async def update_schedule(schedule_id: str, request: ScheduleUpdateRequest, current_user: CurrentUser, db: Db):
     """Update a schedule."""
-    updates = []
-    params = []
-    
-    for field in ["name", "description", "frequency_type", "frequency_value", "priority", "assigned_to", "is_active"]:
-        value = getattr(request, field, None)
-        if value is not None:
-            updates.append(f"{field} = ?")
-            params.append(value)
-    
-    if updates:
-        updates.append("updated_at = ?")
+    values = {
+        field: getattr(request, field, None)
+        for field in [
+            "name", "description", "frequency_type", "frequency_value", "frequency_unit",
+            "priority", "assigned_to", "is_active"
+        ]
+    }
+    if request.frequency_type == "custom" or request.frequency_unit is not None:
+        # The stored type and unit apply to whatever this request leaves out
+        stored = await db.fetch_one(
+            "SELECT frequency_type, frequency_unit FROM maintenance_schedules WHERE id = ? AND organization_id = ?",
+            (schedule_id, current_user.org_id)
+        )
+        if not stored:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Schedule not found")
+        if (request.frequency_type or stored[0]) == "custom":
+            values["frequency_unit"] = _custom_frequency_unit("custom", request.frequency_unit or stored[1])
+
+    if any(value is not None for value in values.values()):
+        set_sql, params = coalesce_assignments(values)
         params.extend([datetime.utcnow(), schedule_id, current_user.org_id])
-        db.execute(
-            f"UPDATE maintenance_schedules SET {', '.join(updates)} WHERE id = ? AND organization_id = ?",
+        await db.execute(
+            f"UPDATE maintenance_schedules SET {set_sql}, updated_at = ? WHERE id = ? AND organization_id = ?",
             tuple(params)
         )
-        db.commit()
-        db.sync()
+        await db.commit()
+        await db.sync()
+        invalidate_org_stats(current_user.org_id)
+        invalidate_meter_schedules()
     
     return await get_schedule(schedule_id, current_user, db)
 
@@ -348,9 +458,11 @@ async def update_schedule(schedule_id: str, request: ScheduleUpdateRequest, curr
 )
 async def delete_schedule(schedule_id: str, current_user: CurrentUser, db: Db):
     """Deactivate a schedule."""
-    db.execute(
+    await db.execute(
         "UPDATE maintenance_schedules SET is_active = FALSE, updated_at = ? WHERE id = ? AND organization_id = ?",
         (datetime.utcnow(), schedule_id, current_user.org_id)
     )
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
+    invalidate_org_stats(current_user.org_id)
+    invalidate_meter_schedules()
@@ -0,0 +1,96 @@
+"""
+GearGuard Backend - Search Endpoints
+Unified full-text search across work orders, equipment, parts and users.
+"""
+import asyncio
+from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException, status, Query
+from pydantic import BaseModel
+
+from ..deps import UnpooledUser
+from ...config import settings
+from ...core.permissions import Permission, has_permission
+from ...database import acquire_async
+from ...services.search import EQUIPMENT, PART, USER, WORK_ORDER, is_available, search
+
+router = APIRouter()
+
+# Searchable entity type -> permission required to see it
+SEARCH_TYPES: Dict[str, str] = {
+    WORK_ORDER: Permission.WORKORDER_READ,
+    EQUIPMENT: Permission.EQUIPMENT_READ,
+    PART: Permission.PARTS_READ,
+    USER: Permission.USER_READ,
+}
+
+
+class SearchHit(BaseModel):
+    id: str
+    type: str
+    title: str
+    snippet: Optional[str]
+    score: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    results: Dict[str, List[SearchHit]]
+    timed_out: bool = False
+
+
+@router.get("", response_model=SearchResponse)
+async def search_all(
+    current_user: UnpooledUser,
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[str] = Query(None, description="Comma-separated: work_order,equipment,part,user"),
+    limit: int = Query(5, ge=1, le=20, description="Maximum results per type")
+):
+    """
+    Ranked prefix search across everything the user may read.
+
+    Results are grouped by type, best match first. If the query takes longer
+    than SEARCH_TIMEOUT_SECONDS the response is empty with `timed_out` set.
+    """
+    if not is_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Search index is not available"
+        )
+
+    requested = [t.strip() for t in types.split(",") if t.strip()] if types else list(SEARCH_TYPES)
+    unknown = [t for t in requested if t not in SEARCH_TYPES]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown search type: {', '.join(unknown)}"
+        )
+    entity_types = [
+        t for t in requested
+        if has_permission(current_user.permissions, SEARCH_TYPES[t])
+    ]
+    results: Dict[str, List[SearchHit]] = {t: [] for t in entity_types}
+
+    # The request holds no connection of its own (UnpooledUser); the query
+    # runs on one pooled connection, so a query that outlives the timeout
+    # finishes in the background and returns it when done
+    conn = await acquire_async()
+    task = asyncio.ensure_future(search(conn, current_user.org_id, q, entity_types, limit))
+
+    def finished(done: asyncio.Future) -> None:
+        conn.release()
+        if not done.cancelled():
+            done.exception()  # mark retrieved when nobody is waiting any more
+
+    task.add_done_callback(finished)
+
+    try:
+        rows = await asyncio.wait_for(asyncio.shield(task), settings.SEARCH_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        return SearchResponse(query=q, results=results, timed_out=True)
+
+    for row in rows:
+        results[row[0]].append(SearchHit(
+            id=row[1], type=row[0], title=row[2], snippet=row[3], score=round(-row[4], 4)
+        ))
+
+    return SearchResponse(query=q, results=results)
@@ -0,0 +1,102 @@
+"""
+GearGuard Backend - Live Update Stream
+Server-sent events for notifications, unread counts and work order status.
+"""
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from ..deps import StreamUser
+from ...config import settings
+from ...core.permissions import Permission, has_permission
+from ...database import async_connection
+from ...services.counters import get_unread_counts
+from ...services.pubsub import StreamLimitError, Subscription, get_broker
+
+router = APIRouter()
+
+
+def _format_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
+
+
+async def _event_stream(subscription: Subscription, expires_at: Optional[float]) -> AsyncIterator[str]:
+    """
+    Write queued events as they arrive and a comment line every
+    STREAM_HEARTBEAT_SECONDS while idle. Ends when the access token expires
+    (the client reconnects with a fresh one) or the server shuts down.
+    """
+    try:
+        yield f"retry: {settings.STREAM_RETRY_MILLISECONDS}\n\n"
+        while not subscription.closed:
+            timeout = settings.STREAM_HEARTBEAT_SECONDS
+            if expires_at is not None:
+                remaining = expires_at - time.time()
+                if remaining <= 0:
+                    break
+                timeout = min(timeout, remaining)
+
+            events = await subscription.next_events(timeout)
+            if events:
+                # One write per wakeup; a slow client holds this up and its
+                # queue collapses into `resync` rather than growing
+                yield "".join(_format_event(event, data) for event, data in events)
+            else:
+                yield ": ping\n\n"
+    finally:
+        get_broker().unsubscribe(subscription)
+
+
+@router.get("")
+async def stream_updates(current_user: StreamUser):
+    """
+    Open a server-sent events stream of live updates for the current user.
+
+    Events:
+    - `notification`: a new notification for the user
+    - `unread_count`: the user's unread notification count (sent on connect
+      and after changes; only the latest value is delivered)
+    - `work_order`: a work order in the organization changed status
+      (requires work order read permission)
+    - `resync`: updates were dropped because the client fell behind; refetch
+
+    EventSource clients, which cannot send headers, may pass the access token
+    as the `access_token` query parameter.
+    """
+    broker = get_broker()
+    try:
+        subscription = broker.subscribe(
+            current_user.org_id,
+            current_user.sub,
+            work_orders=has_permission(current_user.permissions, Permission.WORKORDER_READ),
+        )
+    except StreamLimitError:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many open streams",
+            headers={"Retry-After": str(settings.STREAM_RETRY_MILLISECONDS // 1000 or 1)},
+        )
+
+    try:
+        async with async_connection() as db:
+            counts = await get_unread_counts(db, [current_user.sub])
+    except Exception:
+        broker.unsubscribe(subscription)
+        raise
+    subscription.set_unread(counts[current_user.sub])
+
+    expires_at = current_user.exp.timestamp() if current_user.exp else None
+    return StreamingResponse(
+        _event_stream(subscription, expires_at),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+        # Also covers clients that disconnect before the first write
+        background=BackgroundTask(broker.unsubscribe, subscription),
+    )
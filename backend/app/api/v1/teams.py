@@ -10,6 +10,7 @@ from pydantic import BaseModel
 from ..deps import Db, CurrentUser, PermissionChecker
 from ...core import generate_id
 from ...core.permissions import Permission
+from ...services.assignment import invalidate_workload
 
 router = APIRouter()
 
@@ -55,27 +56,28 @@ async def create_team(request: TeamCreateRequest, current_user: CurrentUser, db:
     team_id = generate_id()
     now = datetime.utcnow()
     
-    db.execute(
+    await db.execute(
         """INSERT INTO teams (id, organization_id, name, description, leader_id, location_id, is_active, created_at, updated_at)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
         (team_id, current_user.org_id, request.name, request.description, request.leader_id, request.location_id, True, now, now)
     )
     
     if request.leader_id:
-        db.execute(
+        await db.execute(
             "INSERT INTO team_members (id, team_id, user_id, role, joined_at) VALUES (?, ?, ?, ?, ?)",
             (generate_id(), team_id, request.leader_id, "leader", now)
         )
     
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
+    invalidate_workload(current_user.org_id)
     return await get_team(team_id, current_user, db)
 
 
 @router.get("", response_model=List[TeamResponse])
 async def list_teams(current_user: CurrentUser, db: Db):
     """List all teams."""
-    rows = db.fetch_all(
+    rows = await db.fetch_all(
         """SELECT t.id, t.name, t.description, t.leader_id, u.first_name || ' ' || u.last_name,
                t.location_id, l.name, (SELECT COUNT(*) FROM team_members WHERE team_id = t.id),
                t.is_active, t.created_at
@@ -89,7 +91,7 @@ async def list_teams(current_user: CurrentUser, db: Db):
 @router.get("/{team_id}", response_model=TeamResponse)
 async def get_team(team_id: str, current_user: CurrentUser, db: Db):
     """Get team details."""
-    row = db.fetch_one(
+    row = await db.fetch_one(
         """SELECT t.id, t.name, t.description, t.leader_id, u.first_name || ' ' || u.last_name,
                t.location_id, l.name, (SELECT COUNT(*) FROM team_members WHERE team_id = t.id),
                t.is_active, t.created_at
@@ -105,7 +107,7 @@ async def get_team(team_id: str, current_user: CurrentUser, db: Db):
 @router.get("/{team_id}/members", response_model=List[TeamMemberResponse])
 async def get_team_members(team_id: str, current_user: CurrentUser, db: Db):
     """Get team members."""
-    rows = db.fetch_all(
+    rows = await db.fetch_all(
         """SELECT tm.id, tm.user_id, u.first_name || ' ' || u.last_name, u.email, tm.role, tm.joined_at
         FROM team_members tm JOIN users u ON tm.user_id = u.id WHERE tm.team_id = ?""", (team_id,)
     )
@@ -118,19 +120,21 @@ async def add_team_member(team_id: str, request: AddMemberRequest, current_user:
     """Add member to team."""
     member_id = generate_id()
     now = datetime.utcnow()
-    db.execute("INSERT INTO team_members (id, team_id, user_id, role, joined_at) VALUES (?, ?, ?, ?, ?)",
+    await db.execute("INSERT INTO team_members (id, team_id, user_id, role, joined_at) VALUES (?, ?, ?, ?, ?)",
                (member_id, team_id, request.user_id, request.role, now))
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
+    invalidate_workload(current_user.org_id)
     
-    row = db.fetch_one("SELECT first_name || ' ' || last_name, email FROM users WHERE id = ?", (request.user_id,))
+    row = await db.fetch_one("SELECT first_name || ' ' || last_name, email FROM users WHERE id = ?", (request.user_id,))
     return TeamMemberResponse(id=member_id, user_id=request.user_id, user_name=row[0], user_email=row[1], role=request.role, joined_at=str(now))
 
 
 @router.delete("/{team_id}/members/{user_id}", status_code=status.HTTP_204_NO_CONTENT,
                dependencies=[Depends(PermissionChecker(Permission.USER_MANAGE_ROLES))])
-async def remove_team_member(team_id: str, user_id: str, db: Db):
+async def remove_team_member(team_id: str, user_id: str, current_user: CurrentUser, db: Db):
     """Remove member from team."""
-    db.execute("DELETE FROM team_members WHERE team_id = ? AND user_id = ?", (team_id, user_id))
-    db.commit()
-    db.sync()
+    await db.execute("DELETE FROM team_members WHERE team_id = ? AND user_id = ?", (team_id, user_id))
+    await db.commit()
+    await db.sync()
+    invalidate_workload(current_user.org_id)
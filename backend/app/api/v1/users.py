@@ -2,14 +2,19 @@
 GearGuard Backend - Users Endpoints
 User management operations.
 """
-from typing import Optional, List
+from typing import Any, Optional, List, Tuple
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel, EmailStr, Field
 
-from ..deps import Db, CurrentUser, Pagination, PermissionChecker
-from ...core import generate_id, get_password_hash
+from ..deps import Db, CurrentUser, Pagination, PermissionChecker, invalidate_user_status
+from ...database import coalesce_assignments, optional_filter
+from ...core import generate_id, get_password_hash_async
 from ...core.permissions import Permission, Role, can_manage_role
+from ...services.assignment import invalidate_workload
+from ...services.counters import track_counters
+from ...services.stats import invalidate_org_stats
+from ...services.search import USER, index_document, search_filter
 
 router = APIRouter()
 
@@ -51,9 +56,11 @@ class UserUpdateRequest(BaseModel):
 
 class UserListResponse(BaseModel):
     items: List[UserResponse]
-    total: int
+    total: Optional[int]  # None when include_total=none
     page: int
     page_size: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None
 
 
 class RoleUpdateRequest(BaseModel):
@@ -77,7 +84,7 @@ async def create_user(
 ):
     """Create a new user in the organization."""
     # Check if email exists
-    existing = db.fetch_one(
+    existing = await db.fetch_one(
         "SELECT id FROM users WHERE email = ?",
         (request.email.lower(),)
     )
@@ -95,7 +102,7 @@ async def create_user(
         )
     
     # Get role ID
-    role_row = db.fetch_one("SELECT id FROM roles WHERE name = ?", (request.role,))
+    role_row = await db.fetch_one("SELECT id FROM roles WHERE name = ?", (request.role,))
     if not role_row:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -104,24 +111,29 @@ async def create_user(
     
     user_id = generate_id()
     now = datetime.utcnow()
+    password_hash = await get_password_hash_async(request.password)
     
-    db.execute(
-        """
-        INSERT INTO users (
-            id, email, password_hash, first_name, last_name, phone,
-            role_id, organization_id, is_active, is_verified,
-            created_at, updated_at
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            user_id, request.email.lower(), get_password_hash(request.password),
-            request.first_name, request.last_name, request.phone,
-            role_row[0], current_user.org_id, True, False, now, now
+    async with track_counters(db, "users", user_id, current_user.org_id):
+        await db.execute(
+            """
+            INSERT INTO users (
+                id, email, password_hash, first_name, last_name, phone,
+                role_id, organization_id, is_active, is_verified,
+                created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                user_id, request.email.lower(), password_hash,
+                request.first_name, request.last_name, request.phone,
+                role_row[0], current_user.org_id, True, False, now, now
+            )
         )
-    )
-    db.commit()
-    db.sync()
+    await index_document(db, USER, user_id)
+    await db.commit()
+    await db.sync()
+    invalidate_org_stats(current_user.org_id)
+    invalidate_workload(current_user.org_id)
     
     return UserResponse(
         id=user_id,
@@ -139,6 +151,43 @@ async def create_user(
     )
 
 
+def user_filters(org_id: str, role: Optional[str] = None, is_active: Optional[bool] = None,
+                 search: Optional[str] = None) -> Tuple[str, List[Any]]:
+    """WHERE clause (over aliases u and r) for the user list."""
+    where_clauses = ["u.organization_id = ?"]
+    params: List[Any] = [org_id]
+    
+    # Residual filters keep one statement shape whether or not they are set
+    for column, value in (("r.name", role or None), ("u.is_active", is_active)):
+        filter_sql, filter_params = optional_filter(column, value)
+        where_clauses.append(filter_sql)
+        params.extend(filter_params)
+    
+    if search:
+        search_sql, search_params = search_filter(
+            USER, "u.id", org_id, search,
+            ["u.first_name", "u.last_name", "u.email"]
+        )
+        where_clauses.append(search_sql)
+        params.extend(search_params)
+    
+    return " AND ".join(where_clauses), params
+
+
+def user_list_query(where_sql: str, keyset_sql: str) -> str:
+    """User page (newest first) for a `user_filters()` clause and keyset predicate."""
+    return f"""
+        SELECT u.id, u.email, u.first_name, u.last_name, u.phone,
+               u.profile_image_url, r.name as role, u.organization_id,
+               u.is_active, u.is_verified, u.last_login, u.created_at
+        FROM users u
+        JOIN roles r ON u.role_id = r.id
+        WHERE {where_sql} AND {keyset_sql}
+        ORDER BY u.created_at DESC, u.id DESC
+        LIMIT ? OFFSET ?
+    """
+
+
 @router.get(
     "",
     response_model=UserListResponse,
@@ -153,51 +202,23 @@ async def list_users(
     search: Optional[str] = Query(None)
 ):
     """List users in the organization."""
-    where_clauses = ["u.organization_id = ?"]
-    params = [current_user.org_id]
+    where_sql, params = user_filters(current_user.org_id, role, is_active, search)
     
-    if role:
-        where_clauses.append("r.name = ?")
-        params.append(role)
-    
-    if is_active is not None:
-        where_clauses.append("u.is_active = ?")
-        params.append(is_active)
-    
-    if search:
-        where_clauses.append("(u.first_name LIKE ? OR u.last_name LIKE ? OR u.email LIKE ?)")
-        search_term = f"%{search}%"
-        params.extend([search_term, search_term, search_term])
-    
-    where_sql = " AND ".join(where_clauses)
-    
-    # Get total count
-    count_row = db.fetch_one(
-        f"""
+    # Total count (run after the page, only if include_total needs it)
+    count_query = f"""
         SELECT COUNT(*)
         FROM users u
         JOIN roles r ON u.role_id = r.id
         WHERE {where_sql}
-        """,
-        tuple(params)
-    )
-    total = count_row[0] if count_row else 0
+        """
+    count_params = tuple(params)
     
     # Get users
-    params.extend([pagination.limit, pagination.offset])
-    rows = db.fetch_all(
-        f"""
-        SELECT u.id, u.email, u.first_name, u.last_name, u.phone,
-               u.profile_image_url, r.name as role, u.organization_id,
-               u.is_active, u.is_verified, u.last_login, u.created_at
-        FROM users u
-        JOIN roles r ON u.role_id = r.id
-        WHERE {where_sql}
-        ORDER BY u.created_at DESC
-        LIMIT ? OFFSET ?
-        """,
-        tuple(params)
-    )
+    keyset_sql, keyset_params = pagination.keyset(("u.created_at", "u.id"))
+    params.extend([*keyset_params, pagination.fetch_limit, pagination.offset])
+    rows = await db.fetch_all(user_list_query(where_sql, keyset_sql), tuple(params))
+    rows = pagination.page_rows(rows)
+    total = await pagination.resolve_total(db, count_query, count_params, rows)
     
     users = [
         UserResponse(
@@ -213,7 +234,9 @@ async def list_users(
         items=users,
         total=total,
         page=pagination.page,
-        page_size=pagination.page_size
+        page_size=pagination.page_size,
+        has_more=pagination.has_more,
+        next_cursor=pagination.next_cursor(rows, lambda r: (r[11], r[0]))
     )
 
 
@@ -228,7 +251,7 @@ async def get_user(
     db: Db
 ):
     """Get a specific user by ID."""
-    row = db.fetch_one(
+    row = await db.fetch_one(
         """
         SELECT u.id, u.email, u.first_name, u.last_name, u.phone,
                u.profile_image_url, r.name as role, u.organization_id,
@@ -267,43 +290,33 @@ async def update_user(
 ):
     """Update a user's information."""
     # Verify user exists in same org
-    existing = db.fetch_one(
+    existing = await db.fetch_one(
         "SELECT id FROM users WHERE id = ? AND organization_id = ?",
         (user_id, current_user.org_id)
     )
     if not existing:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
-    updates = []
-    params = []
-    
-    if request.first_name is not None:
-        updates.append("first_name = ?")
-        params.append(request.first_name)
-    
-    if request.last_name is not None:
-        updates.append("last_name = ?")
-        params.append(request.last_name)
-    
-    if request.phone is not None:
-        updates.append("phone = ?")
-        params.append(request.phone)
-    
-    if request.is_active is not None:
-        updates.append("is_active = ?")
-        params.append(request.is_active)
+    values = {
+        "first_name": request.first_name,
+        "last_name": request.last_name,
+        "phone": request.phone,
+        "is_active": request.is_active,
+    }
     
-    if updates:
-        updates.append("updated_at = ?")
-        params.append(datetime.utcnow())
-        params.append(user_id)
+    if any(value is not None for value in values.values()):
+        set_sql, params = coalesce_assignments(values)
+        params.extend([datetime.utcnow(), user_id])
         
-        db.execute(
-            f"UPDATE users SET {', '.join(updates)} WHERE id = ?",
+        await db.execute(
+            f"UPDATE users SET {set_sql}, updated_at = ? WHERE id = ?",
             tuple(params)
         )
-        db.commit()
-        db.sync()
+        await index_document(db, USER, user_id)
+        await db.commit()
+        await db.sync()
+        invalidate_user_status(user_id)
+        invalidate_workload(current_user.org_id)
     
     return await get_user(user_id, current_user, db)
 
@@ -325,7 +338,7 @@ async def delete_user(
             detail="Cannot delete yourself"
         )
     
-    db.execute(
+    await db.execute(
         """
         UPDATE users 
         SET is_active = FALSE, updated_at = ?
@@ -333,8 +346,10 @@ async def delete_user(
         """,
         (datetime.utcnow(), user_id, current_user.org_id)
     )
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
+    invalidate_user_status(user_id)
+    invalidate_workload(current_user.org_id)
 
 
 @router.put(
@@ -361,11 +376,11 @@ async def update_user_role(
             detail="Cannot assign a role equal to or higher than your own"
         )
     
-    role_row = db.fetch_one("SELECT id FROM roles WHERE name = ?", (request.role,))
+    role_row = await db.fetch_one("SELECT id FROM roles WHERE name = ?", (request.role,))
     if not role_row:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid role")
     
-    db.execute(
+    await db.execute(
         """
         UPDATE users 
         SET role_id = ?, updated_at = ?
@@ -373,7 +388,9 @@ async def update_user_role(
         """,
         (role_row[0], datetime.utcnow(), user_id, current_user.org_id)
     )
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
+    invalidate_user_status(user_id)
+    invalidate_workload(current_user.org_id)
     
     return await get_user(user_id, current_user, db)
@@ -2,14 +2,24 @@
 GearGuard Backend - Work Orders Endpoints
 Work order management operations.
 """
-from typing import Optional, List
+from typing import Any, Optional, List, Tuple
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel, Field
 
 from ..deps import Db, CurrentUser, Pagination, PermissionChecker
-from ...core import generate_id
+from ...database import coalesce_assignments, optional_filter
+from ...core import generate_id, generate_work_order_number
 from ...core.permissions import Permission
+from ...services.assignment import (
+    OPEN_STATUSES, POLICIES, SAME_LOCATION, WorkOrderLoad, fetch_work_order_load, pick_assignee,
+    release_assignee, track_workload,
+)
+from ...services.counters import track_counters
+from ...services.outbox import emit_work_order_assigned, emit_work_order_status_changed, low_stock_event_statement
+from ...services.pubsub import publish_work_order_status
+from ...services.stats import invalidate_org_stats
+from ...services.search import WORK_ORDER, index_document, search_filter
 
 router = APIRouter()
 
@@ -44,6 +54,7 @@ class WorkOrderCreateRequest(BaseModel):
     priority: str = "medium"  # low, medium, high, critical
     assigned_to: Optional[str] = None
     assigned_team_id: Optional[str] = None
+    auto_assign: Optional[str] = None  # least_loaded, same_location, team_round_robin (when assigned_to is empty)
     due_date: Optional[str] = None
     estimated_hours: Optional[float] = None
     checklist_template_id: Optional[str] = None
@@ -59,9 +70,11 @@ class WorkOrderUpdateRequest(BaseModel):
 
 class WorkOrderListResponse(BaseModel):
     items: List[WorkOrderResponse]
-    total: int
+    total: Optional[int]  # None when include_total=none
     page: int
     page_size: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None
 
 
 class StatusUpdateRequest(BaseModel):
@@ -71,6 +84,7 @@ class StatusUpdateRequest(BaseModel):
 class AssignRequest(BaseModel):
     assigned_to: Optional[str] = None
     assigned_team_id: Optional[str] = None
+    auto_assign: Optional[str] = None  # least_loaded, same_location, team_round_robin (when assigned_to is empty)
 
 
 class CommentRequest(BaseModel):
@@ -110,6 +124,34 @@ class PartUsageRequest(BaseModel):
     notes: Optional[str] = None
 
 
+async def _auto_assignee(
+    db: Db,
+    org_id: str,
+    policy: str,
+    equipment_id: str,
+    estimated_hours: Optional[float],
+    team_id: Optional[str]
+) -> Optional[str]:
+    """Pick (and reserve) a technician for an open work order under an assignment policy."""
+    if policy not in POLICIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"auto_assign must be one of: {', '.join(POLICIES)}"
+        )
+    
+    location_id = None
+    if policy == SAME_LOCATION:
+        row = await db.fetch_one(
+            "SELECT location_id FROM equipment WHERE id = ? AND organization_id = ?",
+            (equipment_id, org_id)
+        )
+        location_id = row[0] if row else None
+    
+    return await pick_assignee(
+        db, org_id, policy, estimated_hours=estimated_hours, team_id=team_id, location_id=location_id
+    )
+
+
 @router.post(
     "",
     response_model=WorkOrderResponse,
@@ -117,58 +159,74 @@ class PartUsageRequest(BaseModel):
     dependencies=[Depends(PermissionChecker(Permission.WORKORDER_CREATE))]
 )
 async def create_work_order(request: WorkOrderCreateRequest, current_user: CurrentUser, db: Db):
-    """Create a new work order."""
+    """Create a new work order, optionally auto-assigning it by technician workload."""
     wo_id = generate_id()
-    wo_number = f"WO-{datetime.utcnow().strftime('%Y%m%d')}-{wo_id[:6].upper()}"
+    wo_number = generate_work_order_number(wo_id)
     now = datetime.utcnow()
     
-    db.execute(
-        """
-        INSERT INTO work_orders (
-            id, organization_id, equipment_id, work_order_number, title, description,
-            type, status, priority, assigned_to, assigned_team_id, due_date,
-            estimated_hours, checklist_template_id, created_by, created_at, updated_at
+    assigned_to = request.assigned_to
+    auto_assigned = assigned_to is None and request.auto_assign is not None
+    if auto_assigned:
+        assigned_to = await _auto_assignee(
+            db, current_user.org_id, request.auto_assign, request.equipment_id,
+            request.estimated_hours, request.assigned_team_id
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            wo_id, current_user.org_id, request.equipment_id, wo_number, request.title,
-            request.description, request.type, "pending", request.priority,
-            request.assigned_to, request.assigned_team_id, request.due_date,
-            request.estimated_hours, request.checklist_template_id, current_user.sub, now, now
-        )
-    )
-    db.commit()
-    db.sync()
+    
+    try:
+        async with track_counters(db, "work_orders", wo_id, current_user.org_id):
+            await db.execute(
+                """
+                INSERT INTO work_orders (
+                    id, organization_id, equipment_id, work_order_number, title, description,
+                    type, status, priority, assigned_to, assigned_team_id, due_date,
+                    estimated_hours, checklist_template_id, created_by, created_at, updated_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    wo_id, current_user.org_id, request.equipment_id, wo_number, request.title,
+                    request.description, request.type, "pending", request.priority,
+                    assigned_to, request.assigned_team_id, request.due_date,
+                    request.estimated_hours, request.checklist_template_id, current_user.sub, now, now
+                )
+            )
+        await index_document(db, WORK_ORDER, wo_id)
+        await emit_work_order_assigned(db, current_user.org_id, wo_id, current_user.sub)
+        await db.commit()
+        await db.sync()
+    except Exception:
+        if auto_assigned:
+            release_assignee(current_user.org_id, assigned_to, request.estimated_hours)
+        raise
+    
+    if not auto_assigned:
+        track_workload(current_user.org_id, None, WorkOrderLoad(assigned_to, request.estimated_hours, "pending"))
+    invalidate_org_stats(current_user.org_id)
     
     return await get_work_order(wo_id, current_user, db)
 
 
-@router.get("", response_model=WorkOrderListResponse)
-async def list_work_orders(
-    current_user: CurrentUser,
-    db: Db,
-    pagination: Pagination,
-    status: Optional[str] = Query(None),
-    type: Optional[str] = Query(None),
-    priority: Optional[str] = Query(None),
-    equipment_id: Optional[str] = Query(None),
-    assigned_to: Optional[str] = Query(None),
-    search: Optional[str] = Query(None)
-):
-    """List work orders with filters."""
+def work_order_filters(
+    org_id: str,
+    status: Optional[str] = None,
+    type: Optional[str] = None,
+    priority: Optional[str] = None,
+    equipment_id: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    search: Optional[str] = None
+) -> Tuple[str, List[Any]]:
+    """WHERE clause (over alias w) shared by the work order list and export."""
     where_clauses = ["w.organization_id = ?"]
-    params = [current_user.org_id]
+    params: List[Any] = [org_id]
     
     if status:
         where_clauses.append("w.status = ?")
         params.append(status)
-    if type:
-        where_clauses.append("w.type = ?")
-        params.append(type)
-    if priority:
-        where_clauses.append("w.priority = ?")
-        params.append(priority)
+    # Residual filters keep one statement shape; indexed ones stay conditional
+    for column, value in (("w.type", type), ("w.priority", priority)):
+        filter_sql, filter_params = optional_filter(column, value or None)
+        where_clauses.append(filter_sql)
+        params.extend(filter_params)
     if equipment_id:
         where_clauses.append("w.equipment_id = ?")
         params.append(equipment_id)
@@ -176,16 +234,18 @@ async def list_work_orders(
         where_clauses.append("w.assigned_to = ?")
         params.append(assigned_to)
     if search:
-        where_clauses.append("(w.title LIKE ? OR w.work_order_number LIKE ?)")
-        params.extend([f"%{search}%", f"%{search}%"])
-    
-    where_sql = " AND ".join(where_clauses)
-    
-    count = db.fetch_one(f"SELECT COUNT(*) FROM work_orders w WHERE {where_sql}", tuple(params))
+        search_sql, search_params = search_filter(
+            WORK_ORDER, "w.id", org_id, search, ["w.title", "w.work_order_number"]
+        )
+        where_clauses.append(search_sql)
+        params.extend(search_params)
     
-    params.extend([pagination.limit, pagination.offset])
-    rows = db.fetch_all(
-        f"""
+    return " AND ".join(where_clauses), params
+
+
+def work_order_list_query(where_sql: str, keyset_sql: str) -> str:
+    """Work order page (newest first) for a `work_order_filters()` clause and keyset predicate."""
+    return f"""
         SELECT w.id, w.work_order_number, w.title, w.description, w.equipment_id,
                e.name, w.type, w.status, w.priority, w.assigned_to,
                u.first_name || ' ' || u.last_name, w.assigned_team_id, w.due_date,
@@ -194,13 +254,43 @@ async def list_work_orders(
         FROM work_orders w
         JOIN equipment e ON w.equipment_id = e.id
         LEFT JOIN users u ON w.assigned_to = u.id
-        WHERE {where_sql}
-        ORDER BY w.created_at DESC
+        WHERE {where_sql} AND {keyset_sql}
+        ORDER BY w.created_at DESC, w.id DESC
         LIMIT ? OFFSET ?
-        """,
-        tuple(params)
+    """
+
+
+def work_order_count_query(where_sql: str) -> str:
+    """Total behind a work order list (same clause, no cursor)."""
+    return f"SELECT COUNT(*) FROM work_orders w WHERE {where_sql}"
+
+
+@router.get("", response_model=WorkOrderListResponse)
+async def list_work_orders(
+    current_user: CurrentUser,
+    db: Db,
+    pagination: Pagination,
+    status: Optional[str] = Query(None),
+    type: Optional[str] = Query(None),
+    priority: Optional[str] = Query(None),
+    equipment_id: Optional[str] = Query(None),
+    assigned_to: Optional[str] = Query(None),
+    search: Optional[str] = Query(None)
+):
+    """List work orders with filters."""
+    where_sql, params = work_order_filters(
+        current_user.org_id, status, type, priority, equipment_id, assigned_to, search
     )
     
+    count_query = work_order_count_query(where_sql)
+    count_params = tuple(params)
+    
+    keyset_sql, keyset_params = pagination.keyset(("w.created_at", "w.id"))
+    params.extend([*keyset_params, pagination.fetch_limit, pagination.offset])
+    rows = await db.fetch_all(work_order_list_query(where_sql, keyset_sql), tuple(params))
+    rows = pagination.page_rows(rows)
+    total = await pagination.resolve_total(db, count_query, count_params, rows)
+    
     return WorkOrderListResponse(
         items=[
             WorkOrderResponse(
@@ -213,16 +303,18 @@ async def list_work_orders(
             )
             for r in rows
         ],
-        total=count[0] if count else 0,
+        total=total,
         page=pagination.page,
-        page_size=pagination.page_size
+        page_size=pagination.page_size,
+        has_more=pagination.has_more,
+        next_cursor=pagination.next_cursor(rows, lambda r: (r[18], r[0]))
     )
 
 
 @router.get("/{wo_id}", response_model=WorkOrderResponse)
 async def get_work_order(wo_id: str, current_user: CurrentUser, db: Db):
     """Get work order details."""
-    row = db.fetch_one(
+    row = await db.fetch_one(
         """
         SELECT w.id, w.work_order_number, w.title, w.description, w.equipment_id,
                e.name, w.type, w.status, w.priority, w.assigned_to,
@@ -258,6 +350,7 @@ async def get_work_order(wo_id: str, current_user: CurrentUser, db: Db):
 async def update_work_order_status(wo_id: str, request: StatusUpdateRequest, current_user: CurrentUser, db: Db):
     """Update work order status."""
     now = datetime.utcnow()
+    before = await fetch_work_order_load(db, wo_id, current_user.org_id)
     updates = ["status = ?", "updated_at = ?"]
     params = [request.status, now]
     
@@ -269,12 +362,19 @@ async def update_work_order_status(wo_id: str, request: StatusUpdateRequest, cur
         params.append(now)
     
     params.extend([wo_id, current_user.org_id])
-    db.execute(
-        f"UPDATE work_orders SET {', '.join(updates)} WHERE id = ? AND organization_id = ?",
-        tuple(params)
-    )
-    db.commit()
-    db.sync()
+    async with track_counters(db, "work_orders", wo_id, current_user.org_id):
+        await db.execute(
+            f"UPDATE work_orders SET {', '.join(updates)} WHERE id = ? AND organization_id = ?",
+            tuple(params)
+        )
+    if before is not None:
+        await emit_work_order_status_changed(db, current_user.org_id, wo_id, before.status, current_user.sub)
+    await db.commit()
+    await db.sync()
+    if before is not None:
+        track_workload(current_user.org_id, before, before._replace(status=request.status))
+        publish_work_order_status(current_user.org_id, wo_id, request.status, before.status, current_user.sub, now)
+    invalidate_org_stats(current_user.org_id)
     
     return await get_work_order(wo_id, current_user, db)
 
@@ -285,17 +385,48 @@ async def update_work_order_status(wo_id: str, request: StatusUpdateRequest, cur
     dependencies=[Depends(PermissionChecker(Permission.WORKORDER_ASSIGN))]
 )
 async def assign_work_order(wo_id: str, request: AssignRequest, current_user: CurrentUser, db: Db):
-    """Assign work order to user or team."""
-    db.execute(
-        """
-        UPDATE work_orders 
-        SET assigned_to = ?, assigned_team_id = ?, updated_at = ?
-        WHERE id = ? AND organization_id = ?
-        """,
-        (request.assigned_to, request.assigned_team_id, datetime.utcnow(), wo_id, current_user.org_id)
-    )
-    db.commit()
-    db.sync()
+    """Assign work order to a user or team, or pick the user by technician workload."""
+    before = await fetch_work_order_load(db, wo_id, current_user.org_id)
+    if before is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Work order not found")
+    
+    assigned_to = request.assigned_to
+    auto_assigned = assigned_to is None and request.auto_assign is not None
+    if auto_assigned:
+        if before.status not in OPEN_STATUSES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only open work orders can be auto-assigned"
+            )
+        equipment = await db.fetch_one("SELECT equipment_id FROM work_orders WHERE id = ?", (wo_id,))
+        assigned_to = await _auto_assignee(
+            db, current_user.org_id, request.auto_assign, equipment[0],
+            before.estimated_hours, request.assigned_team_id
+        )
+    
+    try:
+        await db.execute(
+            """
+            UPDATE work_orders 
+            SET assigned_to = ?, assigned_team_id = ?, updated_at = ?
+            WHERE id = ? AND organization_id = ?
+            """,
+            (assigned_to, request.assigned_team_id, datetime.utcnow(), wo_id, current_user.org_id)
+        )
+        if assigned_to != before.assigned_to or (assigned_to is None and request.assigned_team_id):
+            await emit_work_order_assigned(db, current_user.org_id, wo_id, current_user.sub)
+        await db.commit()
+        await db.sync()
+    except Exception:
+        if auto_assigned:
+            release_assignee(current_user.org_id, assigned_to, before.estimated_hours)
+        raise
+    
+    if auto_assigned:
+        # The pick already reserved the new assignee's load
+        track_workload(current_user.org_id, before, None)
+    else:
+        track_workload(current_user.org_id, before, before._replace(assigned_to=assigned_to))
     
     return await get_work_order(wo_id, current_user, db)
 
@@ -319,7 +450,7 @@ async def complete_work_order(wo_id: str, current_user: CurrentUser, db: Db):
 @router.get("/{wo_id}/comments", response_model=List[CommentResponse])
 async def get_work_order_comments(wo_id: str, current_user: CurrentUser, db: Db):
     """Get work order comments."""
-    rows = db.fetch_all(
+    rows = await db.fetch_all(
         """
         SELECT c.id, c.user_id, u.first_name || ' ' || u.last_name, c.comment,
                c.is_internal, c.created_at
@@ -346,15 +477,15 @@ async def add_work_order_comment(wo_id: str, request: CommentRequest, current_us
     comment_id = generate_id()
     now = datetime.utcnow()
     
-    db.execute(
+    await db.execute(
         """
         INSERT INTO work_order_comments (id, work_order_id, user_id, comment, is_internal, created_at, updated_at)
         VALUES (?, ?, ?, ?, ?, ?, ?)
         """,
         (comment_id, wo_id, current_user.sub, request.comment, request.is_internal, now, now)
     )
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
     
     return CommentResponse(
         id=comment_id, user_id=current_user.sub, user_name=current_user.email,
@@ -365,7 +496,7 @@ async def add_work_order_comment(wo_id: str, request: CommentRequest, current_us
 @router.get("/{wo_id}/tasks", response_model=List[TaskResponse])
 async def get_work_order_tasks(wo_id: str, current_user: CurrentUser, db: Db):
     """Get work order tasks."""
-    rows = db.fetch_all(
+    rows = await db.fetch_all(
         """
         SELECT id, task_order, title, description, status, is_required, completed_by, completed_at
         FROM work_order_tasks
@@ -392,7 +523,7 @@ async def update_work_order_task(wo_id: str, task_id: str, request: TaskUpdateRe
     completed_by = current_user.sub if request.status == "completed" else None
     completed_at = now if request.status == "completed" else None
     
-    db.execute(
+    await db.execute(
         """
         UPDATE work_order_tasks
         SET status = ?, notes = ?, time_spent_minutes = ?, completed_by = ?, completed_at = ?
@@ -400,10 +531,10 @@ async def update_work_order_task(wo_id: str, task_id: str, request: TaskUpdateRe
         """,
         (request.status, request.notes, request.time_spent_minutes, completed_by, completed_at, task_id, wo_id)
     )
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
     
-    row = db.fetch_one(
+    row = await db.fetch_one(
         "SELECT id, task_order, title, description, status, is_required, completed_by, completed_at FROM work_order_tasks WHERE id = ?",
         (task_id,)
     )
@@ -422,7 +553,7 @@ async def update_work_order_task(wo_id: str, task_id: str, request: TaskUpdateRe
 async def add_parts_to_work_order(wo_id: str, request: PartUsageRequest, current_user: CurrentUser, db: Db):
     """Record parts usage for a work order."""
     # Get part info
-    part = db.fetch_one(
+    part = await db.fetch_one(
         "SELECT unit_cost, quantity_in_stock FROM parts_inventory WHERE id = ?",
         (request.part_id,)
     )
@@ -436,7 +567,7 @@ async def add_parts_to_work_order(wo_id: str, request: PartUsageRequest, current
     now = datetime.utcnow()
     
     # Record usage
-    db.execute(
+    await db.execute(
         """
         INSERT INTO parts_usage (id, work_order_id, part_id, quantity_used, unit_cost_at_time, used_by, used_at, notes)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -445,13 +576,16 @@ async def add_parts_to_work_order(wo_id: str, request: PartUsageRequest, current
     )
     
     # Update stock
-    db.execute(
-        "UPDATE parts_inventory SET quantity_in_stock = quantity_in_stock - ?, updated_at = ? WHERE id = ?",
-        (request.quantity_used, now, request.part_id)
-    )
+    async with track_counters(db, "parts_inventory", request.part_id, current_user.org_id):
+        await db.execute(
+            "UPDATE parts_inventory SET quantity_in_stock = quantity_in_stock - ?, updated_at = ? WHERE id = ?",
+            (request.quantity_used, now, request.part_id)
+        )
+    await db.execute(*low_stock_event_statement(current_user.org_id, request.part_id, -request.quantity_used, now))
     
-    db.commit()
-    db.sync()
+    await db.commit()
+    await db.sync()
+    invalidate_org_stats(current_user.org_id)
     
     return {"message": "Parts usage recorded", "usage_id": usage_id}
 
@@ -463,24 +597,27 @@ async def add_parts_to_work_order(wo_id: str, request: PartUsageRequest, current
 )
 async def update_work_order(wo_id: str, request: WorkOrderUpdateRequest, current_user: CurrentUser, db: Db):
     """Update work order."""
-    updates = []
-    params = []
-    
-    for field in ["title", "description", "priority", "due_date", "estimated_hours"]:
-        value = getattr(request, field, None)
-        if value is not None:
-            updates.append(f"{field} = ?")
-            params.append(value)
+    values = {
+        field: getattr(request, field, None)
+        for field in ["title", "description", "priority", "due_date", "estimated_hours"]
+    }
     
-    if updates:
-        updates.append("updated_at = ?")
+    if any(value is not None for value in values.values()):
+        before = None
+        if request.estimated_hours is not None:
+            before = await fetch_work_order_load(db, wo_id, current_user.org_id)
+        set_sql, params = coalesce_assignments(values)
         params.extend([datetime.utcnow(), wo_id, current_user.org_id])
-        db.execute(
-            f"UPDATE work_orders SET {', '.join(updates)} WHERE id = ? AND organization_id = ?",
+        await db.execute(
+            f"UPDATE work_orders SET {set_sql}, updated_at = ? WHERE id = ? AND organization_id = ?",
             tuple(params)
         )
-        db.commit()
-        db.sync()
+        await index_document(db, WORK_ORDER, wo_id)
+        await db.commit()
+        await db.sync()
+        if before is not None:
+            track_workload(current_user.org_id, before, before._replace(estimated_hours=request.estimated_hours))
+        invalidate_org_stats(current_user.org_id)
     
     return await get_work_order(wo_id, current_user, db)
 
@@ -492,9 +629,18 @@ async def update_work_order(wo_id: str, request: WorkOrderUpdateRequest, current
 )
 async def delete_work_order(wo_id: str, current_user: CurrentUser, db: Db):
     """Cancel/delete a work order."""
-    db.execute(
-        "UPDATE work_orders SET status = 'cancelled', updated_at = ? WHERE id = ? AND organization_id = ?",
-        (datetime.utcnow(), wo_id, current_user.org_id)
-    )
-    db.commit()
-    db.sync()
+    now = datetime.utcnow()
+    before = await fetch_work_order_load(db, wo_id, current_user.org_id)
+    async with track_counters(db, "work_orders", wo_id, current_user.org_id):
+        await db.execute(
+            "UPDATE work_orders SET status = 'cancelled', updated_at = ? WHERE id = ? AND organization_id = ?",
+            (now, wo_id, current_user.org_id)
+        )
+    if before is not None:
+        await emit_work_order_status_changed(db, current_user.org_id, wo_id, before.status, current_user.sub)
+    await db.commit()
+    await db.sync()
+    if before is not None:
+        track_workload(current_user.org_id, before, before._replace(status="cancelled"))
+        publish_work_order_status(current_user.org_id, wo_id, "cancelled", before.status, current_user.sub, now)
+    invalidate_org_stats(current_user.org_id)
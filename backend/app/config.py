@@ -26,12 +26,100 @@ class Settings:
     TURSO_AUTH_TOKEN: str = os.getenv("TURSO_AUTH_TOKEN", "")
     LOCAL_DB_PATH: str = os.getenv("LOCAL_DB_PATH", "./local.db")
     
+    # Database - Connection Pool
+    DB_POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+    DB_POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+    DB_HEALTH_CHECK_INTERVAL_SECONDS: float = float(os.getenv("DB_HEALTH_CHECK_INTERVAL_SECONDS", "30"))
+    # Threads running blocking driver calls for async handlers (defaults to pool max size)
+    DB_EXECUTOR_MAX_WORKERS: int = int(os.getenv("DB_EXECUTOR_MAX_WORKERS", os.getenv("DB_POOL_MAX_SIZE", "10")))
+    # Prepared statements kept per connection, keyed by normalized SQL text
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+    
+    # Database - Embedded replica sync after writes: immediate, debounced or periodic
+    DB_SYNC_POLICY: str = os.getenv("DB_SYNC_POLICY", "debounced").lower()
+    DB_SYNC_DEBOUNCE_MS: int = int(os.getenv("DB_SYNC_DEBOUNCE_MS", "500"))
+    DB_SYNC_INTERVAL_SECONDS: float = float(os.getenv("DB_SYNC_INTERVAL_SECONDS", "5"))
+    
     # JWT Authentication
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
     REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
     
+    # Auth - How long a user's active status is trusted without re-reading it (0 disables)
+    USER_STATUS_CACHE_TTL_SECONDS: float = float(os.getenv("USER_STATUS_CACHE_TTL_SECONDS", "30"))
+    USER_STATUS_CACHE_SIZE: int = int(os.getenv("USER_STATUS_CACHE_SIZE", "10000"))
+    
+    # Auth - bcrypt runs on its own pool; requests beyond workers + queue get 429
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))
+    
+    # Auth - Verified access token cache (entries also expire with the token; 0 disables)
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+    TOKEN_CACHE_MAX_TTL_SECONDS: float = float(os.getenv("TOKEN_CACHE_MAX_TTL_SECONDS", "900"))
+    
+    # Reports - Per-organization dashboard/stats cache (0 disables)
+    STATS_CACHE_TTL_SECONDS: float = float(os.getenv("STATS_CACHE_TTL_SECONDS", "15"))
+    STATS_CACHE_SIZE: int = int(os.getenv("STATS_CACHE_SIZE", "1000"))
+    
+    # Lists - How long include_total=estimate may reuse a count for the same filter
+    COUNT_ESTIMATE_TTL_SECONDS: float = float(os.getenv("COUNT_ESTIMATE_TTL_SECONDS", "60"))
+    COUNT_ESTIMATE_CACHE_SIZE: int = int(os.getenv("COUNT_ESTIMATE_CACHE_SIZE", "5000"))
+    
+    # Search - Unified /search requests return partial results after this many seconds
+    SEARCH_TIMEOUT_SECONDS: float = float(os.getenv("SEARCH_TIMEOUT_SECONDS", "2"))
+    
+    # Bulk Import - Rows inserted (and committed) per transaction; errors listed in the report
+    BULK_IMPORT_BATCH_SIZE: int = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "500"))
+    BULK_IMPORT_MAX_ERRORS: int = int(os.getenv("BULK_IMPORT_MAX_ERRORS", "1000"))
+    
+    # Reports - Rows fetched per query while streaming /reports/export downloads
+    EXPORT_CHUNK_SIZE: int = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+    # Work orders - Per-organization technician workload index used for auto-assignment (0 disables)
+    ASSIGNMENT_INDEX_TTL_SECONDS: float = float(os.getenv("ASSIGNMENT_INDEX_TTL_SECONDS", "60"))
+    ASSIGNMENT_INDEX_CACHE_SIZE: int = int(os.getenv("ASSIGNMENT_INDEX_CACHE_SIZE", "1000"))
+    # Schedules - Occurrences listed by /schedules/forecast (daily totals always cover the full window)
+    SCHEDULE_FORECAST_MAX_OCCURRENCES: int = int(os.getenv("SCHEDULE_FORECAST_MAX_OCCURRENCES", "5000"))
+    
+    # Background jobs (run inside each API process)
+    ENABLE_BACKGROUND_JOBS: bool = os.getenv("ENABLE_BACKGROUND_JOBS", "true").lower() == "true"
+    COUNTER_RECONCILE_INTERVAL_SECONDS: float = float(os.getenv("COUNTER_RECONCILE_INTERVAL_SECONDS", "3600"))
+    UNREAD_COUNTER_RECONCILE_INTERVAL_SECONDS: float = float(os.getenv("UNREAD_COUNTER_RECONCILE_INTERVAL_SECONDS", "3600"))
+    # PM generation - How often due schedules are turned into work orders, and batch limits per run
+    PM_GENERATION_INTERVAL_SECONDS: float = float(os.getenv("PM_GENERATION_INTERVAL_SECONDS", "60"))
+    PM_GENERATION_BATCH_SIZE: int = int(os.getenv("PM_GENERATION_BATCH_SIZE", "200"))
+    PM_GENERATION_MAX_BATCHES: int = int(os.getenv("PM_GENERATION_MAX_BATCHES", "50"))
+    # PM generation - Assignment policy for work orders of schedules without an assignee (empty = leave unassigned)
+    PM_AUTO_ASSIGN_POLICY: str = os.getenv("PM_AUTO_ASSIGN_POLICY", "")
+    
+    # Meters - Per-equipment cache of meter-based schedules checked on each reading (0 disables)
+    METER_SCHEDULE_CACHE_TTL_SECONDS: float = float(os.getenv("METER_SCHEDULE_CACHE_TTL_SECONDS", "60"))
+    METER_SCHEDULE_CACHE_SIZE: int = int(os.getenv("METER_SCHEDULE_CACHE_SIZE", "10000"))
+    # Meters - Batched ingestion flushes buffered readings at this interval or row count
+    METER_INGEST_FLUSH_INTERVAL_MS: float = float(os.getenv("METER_INGEST_FLUSH_INTERVAL_MS", "100"))
+    METER_INGEST_MAX_BATCH_ROWS: int = int(os.getenv("METER_INGEST_MAX_BATCH_ROWS", "2000"))
+    # Meters - Raw readings and hourly rollups are deleted after these many days (daily rollups are kept)
+    METER_RAW_RETENTION_DAYS: int = int(os.getenv("METER_RAW_RETENTION_DAYS", "90"))
+    METER_HOURLY_RETENTION_DAYS: int = int(os.getenv("METER_HOURLY_RETENTION_DAYS", "400"))
+    METER_COMPACTION_INTERVAL_SECONDS: float = float(os.getenv("METER_COMPACTION_INTERVAL_SECONDS", "3600"))
+    METER_COMPACTION_BATCH_SIZE: int = int(os.getenv("METER_COMPACTION_BATCH_SIZE", "5000"))
+    # Notifications - How often outbox events are fanned out into notifications, and batch limits per run
+    NOTIFICATION_DISPATCH_INTERVAL_SECONDS: float = float(os.getenv("NOTIFICATION_DISPATCH_INTERVAL_SECONDS", "5"))
+    NOTIFICATION_DISPATCH_BATCH_SIZE: int = int(os.getenv("NOTIFICATION_DISPATCH_BATCH_SIZE", "500"))
+    NOTIFICATION_DISPATCH_MAX_BATCHES: int = int(os.getenv("NOTIFICATION_DISPATCH_MAX_BATCHES", "20"))
+    # Notifications - Seconds a claimed batch is reserved, attempts per event, days processed events are kept
+    NOTIFICATION_DISPATCH_LEASE_SECONDS: float = float(os.getenv("NOTIFICATION_DISPATCH_LEASE_SECONDS", "60"))
+    NOTIFICATION_MAX_ATTEMPTS: int = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "10"))
+    NOTIFICATION_OUTBOX_RETENTION_DAYS: int = int(os.getenv("NOTIFICATION_OUTBOX_RETENTION_DAYS", "7"))
+    # Live updates - SSE heartbeat, client reconnect delay, events buffered per connection before a resync
+    STREAM_HEARTBEAT_SECONDS: float = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "20"))
+    STREAM_RETRY_MILLISECONDS: int = int(os.getenv("STREAM_RETRY_MILLISECONDS", "5000"))
+    STREAM_QUEUE_SIZE: int = int(os.getenv("STREAM_QUEUE_SIZE", "100"))
+    # Live updates - Open streams per user and per process
+    STREAM_MAX_CONNECTIONS_PER_USER: int = int(os.getenv("STREAM_MAX_CONNECTIONS_PER_USER", "5"))
+    STREAM_MAX_CONNECTIONS: int = int(os.getenv("STREAM_MAX_CONNECTIONS", "2000"))
+    
     # CORS
     CORS_ORIGINS: str = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:8000")
     
@@ -5,13 +5,19 @@ Security, permissions, and exception handling.
 from .security import (
     verify_password,
     get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
+    password_hasher_stats,
     validate_password_strength,
     create_access_token,
     create_refresh_token,
     create_token_pair,
     decode_access_token,
     decode_refresh_token,
+    access_token_cache_stats,
+    clear_access_token_cache,
     generate_id,
+    generate_work_order_number,
     hash_token,
     generate_reset_token,
     generate_verification_token,
@@ -58,6 +64,7 @@ from .exceptions import (
     WorkOrderError,
     InventoryError,
     InsufficientStockError,
+    TooManyRequestsError,
     to_http_exception,
 )
 
@@ -65,13 +72,19 @@ __all__ = [
     # Security
     "verify_password",
     "get_password_hash",
+    "verify_password_async",
+    "get_password_hash_async",
+    "password_hasher_stats",
     "validate_password_strength",
     "create_access_token",
     "create_refresh_token",
     "create_token_pair",
     "decode_access_token",
     "decode_refresh_token",
+    "access_token_cache_stats",
+    "clear_access_token_cache",
     "generate_id",
+    "generate_work_order_number",
     "hash_token",
     "generate_reset_token",
     "generate_verification_token",
@@ -116,5 +129,6 @@ __all__ = [
     "WorkOrderError",
     "InventoryError",
     "InsufficientStockError",
+    "TooManyRequestsError",
     "to_http_exception",
 ]
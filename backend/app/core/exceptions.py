@@ -259,6 +259,26 @@ class InsufficientStockError(InventoryError):
         }
 
 
+# ===========================================
+# Capacity Exceptions
+# ===========================================
+
+class TooManyRequestsError(GearGuardException):
+    """Server is saturated for this kind of work; client should retry later."""
+    
+    def __init__(
+        self,
+        message: str = "Server is busy, please retry shortly",
+        retry_after: Optional[int] = None
+    ):
+        super().__init__(
+            message,
+            code="TOO_MANY_REQUESTS",
+            details={"retry_after": retry_after}
+        )
+        self.retry_after = retry_after
+
+
 # ===========================================
 # HTTP Exception Converters
 # ===========================================
@@ -274,6 +294,7 @@ def to_http_exception(error: GearGuardException) -> HTTPException:
         FastAPI HTTPException
     """
     status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+    headers = None
     
     if isinstance(error, InvalidCredentialsError):
         status_code = status.HTTP_401_UNAUTHORIZED
@@ -291,6 +312,10 @@ def to_http_exception(error: GearGuardException) -> HTTPException:
         status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
     elif isinstance(error, BusinessLogicError):
         status_code = status.HTTP_400_BAD_REQUEST
+    elif isinstance(error, TooManyRequestsError):
+        status_code = status.HTTP_429_TOO_MANY_REQUESTS
+        if error.retry_after is not None:
+            headers = {"Retry-After": str(error.retry_after)}
     
     return HTTPException(
         status_code=status_code,
@@ -298,5 +323,6 @@ def to_http_exception(error: GearGuardException) -> HTTPException:
             "message": error.message,
             "code": error.code,
             "details": error.details
-        }
+        },
+        headers=headers
     )
@@ -3,14 +3,20 @@ GearGuard Backend - Security Module
 Handles JWT token generation, password hashing, and authentication utilities.
 """
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+import asyncio
+import threading
 from jose import JWTError, jwt
 import bcrypt
 from pydantic import BaseModel
 import ulid
 import logging
+import time
 
 from app.config import settings
+from app.core.cache import TTLCache
+from app.core.exceptions import TooManyRequestsError
 
 logger = logging.getLogger(__name__)
 
@@ -91,6 +97,147 @@ def get_password_hash(password: str) -> str:
     ).decode('utf-8')
 
 
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated thread pool so it never blocks the event loop.
+    
+    Admission is bounded: at most `workers` hashes run at once and at most
+    `queue_size` more wait for a worker. Anything beyond that is rejected with
+    TooManyRequestsError so a login burst sheds load instead of queueing
+    unboundedly behind the CPU.
+    """
+    
+    def __init__(self, workers: int = 4, queue_size: int = 32):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        
+        # Metrics
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._queue_time_total = 0.0
+        self._run_time_total = 0.0
+        self._run_time_max = 0.0
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix="bcrypt"
+                    )
+        return self._executor
+    
+    async def run(self, func: Callable, *args) -> Any:
+        """
+        Run a hashing function on the pool.
+        
+        Raises:
+            TooManyRequestsError: If workers and queue are all occupied
+        """
+        with self._lock:
+            if self._in_flight >= self.workers + self.queue_size:
+                self._rejected += 1
+                raise TooManyRequestsError(
+                    "Too many authentication requests in progress, please retry shortly",
+                    retry_after=1
+                )
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        
+        submitted = time.perf_counter()
+        
+        def timed() -> Any:
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._queue_time_total += started - submitted
+                    self._run_time_total += finished - started
+                    self._run_time_max = max(self._run_time_max, finished - started)
+        
+        try:
+            future = self._get_executor().submit(timed)
+        except Exception:
+            self._release(None)
+            raise
+        # The slot is freed when the worker is done, not when the caller stops
+        # waiting: a cancelled request's hash keeps its thread busy until it ends
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+    
+    def _release(self, future: Optional[Future]) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if future is not None and not future.cancelled():
+                self._completed += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hashing pool metrics."""
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "completed": completed,
+                "rejected": self._rejected,
+                "queue_time_avg_ms": round(self._queue_time_total / completed * 1000, 2) if completed else 0.0,
+                "run_time_avg_ms": round(self._run_time_total / completed * 1000, 2) if completed else 0.0,
+                "run_time_max_ms": round(self._run_time_max * 1000, 2),
+            }
+    
+    def shutdown(self) -> None:
+        """Stop the worker threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+_password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against its hash without blocking the event loop.
+    
+    Raises:
+        TooManyRequestsError: If the hashing pool is saturated
+    """
+    return await _password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password without blocking the event loop.
+    
+    Raises:
+        TooManyRequestsError: If the hashing pool is saturated
+    """
+    return await _password_hasher.run(get_password_hash, password)
+
+
+def password_hasher_stats() -> Dict[str, Any]:
+    """Password hashing pool metrics."""
+    return _password_hasher.stats()
+
+
+def shutdown_password_hasher() -> None:
+    """Stop the password hashing pool (application shutdown)."""
+    _password_hasher.shutdown()
+
+
 def validate_password_strength(password: str) -> tuple[bool, str]:
     """
     Validate password meets minimum security requirements.
@@ -252,16 +399,33 @@ def create_token_pair(
     return token_pair, session_id
 
 
+# hash_token(token) -> TokenPayload for tokens that already passed verification.
+# Entries never outlive the token's own exp claim.
+_access_token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.TOKEN_CACHE_MAX_TTL_SECONDS,
+)
+
+
 def decode_access_token(token: str) -> Optional[TokenPayload]:
     """
     Decode and validate an access token.
     
+    Verified tokens are cached until they expire, so repeat requests with the
+    same bearer token skip signature verification and payload parsing.
+    
     Args:
         token: JWT access token string
         
     Returns:
         TokenPayload if valid, None otherwise
     """
+    cache_key = hash_token(token) if _access_token_cache.enabled else None
+    if cache_key is not None:
+        cached = _access_token_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
     try:
         payload = jwt.decode(
             token,
@@ -274,7 +438,13 @@ def decode_access_token(token: str) -> Optional[TokenPayload]:
             logger.warning("Token is not an access token")
             return None
         
-        return TokenPayload(**payload)
+        token_payload = TokenPayload(**payload)
+        
+        exp = payload.get("exp")
+        if cache_key is not None and exp is not None:
+            _access_token_cache.set(cache_key, token_payload, ttl=exp - time.time())
+        
+        return token_payload
     
     except JWTError as e:
         logger.warning(f"JWT decode error: {e}")
@@ -284,6 +454,16 @@ def decode_access_token(token: str) -> Optional[TokenPayload]:
         return None
 
 
+def access_token_cache_stats() -> Dict[str, Any]:
+    """Verified access token cache metrics."""
+    return _access_token_cache.stats()
+
+
+def clear_access_token_cache() -> None:
+    """Forget all verified access tokens (e.g. after rotating JWT_SECRET_KEY)."""
+    _access_token_cache.clear()
+
+
 def decode_refresh_token(token: str) -> Optional[RefreshTokenPayload]:
     """
     Decode and validate a refresh token.
@@ -331,6 +511,20 @@ def generate_id() -> str:
     return str(ulid.new())
 
 
+def generate_work_order_number(wo_id: str, when: Optional[datetime] = None) -> str:
+    """
+    Human-readable work order number, e.g. WO-20240601-7QF3K2XA.
+    
+    Uses the random tail of the ULID: its leading characters encode the
+    timestamp and repeat for every ID generated within ~17 minutes.
+    
+    Args:
+        wo_id: Work order ID (from `generate_id`)
+        when: Creation time (defaults to now)
+    """
+    return f"WO-{(when or datetime.utcnow()).strftime('%Y%m%d')}-{wo_id[-8:].upper()}"
+
+
 def hash_token(token: str) -> str:
     """
     Hash a token for secure storage.
@@ -2,9 +2,17 @@
 GearGuard Backend - Database Connection Module
 Handles Turso/LibSQL database connections.
 """
+import asyncio
+import functools
+import random
+import re
 import sqlite3
-from typing import Optional, Any, List, Tuple
-from contextlib import contextmanager
+import threading
+import time
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Any, Callable, Iterable, List, NamedTuple, Sequence, Tuple, Deque, Dict, Union
+from contextlib import contextmanager, asynccontextmanager
 import logging
 
 from app.config import settings
@@ -12,6 +20,176 @@ from app.config import settings
 logger = logging.getLogger(__name__)
 
 
+# ===========================================
+# Statement Cache
+# ===========================================
+
+# String literals are kept verbatim; whitespace runs outside them collapse to one space
+_SQL_TOKEN_RE = re.compile(r"('(?:[^']|'')*')|\s+")
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize_sql(query: str) -> str:
+    """
+    Canonical text for a statement, used as the statement cache key.
+    
+    Endpoints build SQL with f-strings and triple-quoted blocks, so the same
+    statement shape arrives with different indentation and line breaks.
+    Collapsing whitespace (outside string literals) maps them to one key.
+    """
+    return _SQL_TOKEN_RE.sub(lambda m: m.group(1) or " ", query).strip()
+
+
+class StatementCache:
+    """
+    Per-connection LRU of prepared statements keyed by normalized SQL.
+    
+    sqlite3 keeps compiled statements per connection keyed by exact SQL text
+    (`cached_statements`); executing normalized text lets every spelling of a
+    shape reuse one compiled statement. This class mirrors that LRU to count
+    hits and misses. Drivers without client-side prepared statements (libsql
+    embedded replica, HTTP client) still receive normalized text but are not
+    counted as prepared.
+    
+    Counters are process-wide so /health reports the whole pool.
+    """
+    
+    _lock = threading.Lock()
+    _hits = 0
+    _misses = 0
+    _evictions = 0
+    _unprepared = 0
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = max(0, maxsize)
+        self._statements: "OrderedDict[str, None]" = OrderedDict()
+        self.enabled = False  # Set when the connection's driver caches statements
+    
+    def prepare(self, query: str) -> str:
+        """Return the normalized statement text and record a hit or miss."""
+        sql = normalize_sql(query)
+        
+        if not self.enabled or not self.maxsize:
+            with StatementCache._lock:
+                StatementCache._unprepared += 1
+            return sql
+        
+        evicted = False
+        if sql in self._statements:
+            self._statements.move_to_end(sql)
+            hit = True
+        else:
+            hit = False
+            self._statements[sql] = None
+            if len(self._statements) > self.maxsize:
+                self._statements.popitem(last=False)
+                evicted = True
+        
+        with StatementCache._lock:
+            if hit:
+                StatementCache._hits += 1
+            else:
+                StatementCache._misses += 1
+            if evicted:
+                StatementCache._evictions += 1
+        return sql
+    
+    def reset(self, enabled: bool) -> None:
+        """Forget cached statements (the connection was replaced)."""
+        self._statements.clear()
+        self.enabled = enabled
+    
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Process-wide statement cache metrics."""
+        with cls._lock:
+            lookups = cls._hits + cls._misses
+            normalized = normalize_sql.cache_info()
+            return {
+                "maxsize_per_connection": settings.DB_STATEMENT_CACHE_SIZE,
+                "hits": cls._hits,
+                "misses": cls._misses,
+                "hit_rate": round(cls._hits / lookups, 4) if lookups else 0.0,
+                "evictions": cls._evictions,
+                "unprepared": cls._unprepared,
+                "distinct_sql_texts": normalized.currsize,
+            }
+
+
+def statement_cache_stats() -> Dict[str, Any]:
+    """Statement cache metrics across all pooled connections."""
+    return StatementCache.stats()
+
+
+# ===========================================
+# Statement Shapes
+# ===========================================
+# Helpers that keep dynamically built SQL to a bounded set of statement
+# shapes, so the statement cache is not defeated by one shape per
+# combination of optional fields.
+
+def coalesce_assignments(values: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """
+    SET clause writing every column, keeping the current value where None.
+    
+    Usage:
+        set_sql, params = coalesce_assignments({"name": request.name, ...})
+        await db.execute(f"UPDATE t SET {set_sql}, updated_at = ? WHERE id = ?", ...)
+    
+    The SQL depends only on the (fixed) column list, never on which fields a
+    request happens to set. Columns cannot be cleared to NULL this way, which
+    matches the "None means unchanged" convention of the update endpoints.
+    
+    Returns:
+        (SET clause, parameters in column order)
+    """
+    sql = ", ".join(f"{column} = COALESCE(?, {column})" for column in values)
+    return sql, list(values.values())
+
+
+def optional_filter(column: str, value: Any) -> Tuple[str, List[Any]]:
+    """
+    Equality predicate that matches everything when `value` is None.
+    
+    Use for residual filters with no supporting index; filters an index can
+    seek on should stay conditional so the planner still sees `column = ?`.
+    
+    Returns:
+        (predicate, parameters)
+    """
+    return f"(? IS NULL OR {column} = ?)", [value, value]
+
+
+# ===========================================
+# Bulk Writes
+# ===========================================
+
+# A batch entry: bare SQL or (SQL, params)
+Statement = Union[str, Tuple[str, Sequence[Any]]]
+
+
+class StatementResult(NamedTuple):
+    """Outcome of one statement in a `batch()`."""
+    rows: List[Tuple]
+    rows_affected: int
+    last_insert_rowid: Optional[int]
+
+
+def _as_statement(statement: Statement) -> Tuple[str, Tuple]:
+    if isinstance(statement, str):
+        return statement, ()
+    query, params = statement
+    return query, tuple(params)
+
+
+def _describe_batch(statements: List[Tuple[str, Tuple]]) -> str:
+    """Short description of a batch for retry/failure logs."""
+    if not statements:
+        return "<empty batch>"
+    first = statements[0][0]
+    return first if len(statements) == 1 else f"{first} (+{len(statements) - 1} more)"
+
+
 class Database:
     """
     Database connection manager for Turso/LibSQL.
@@ -43,9 +221,10 @@ class Database:
         self._connection: Optional[Any] = None
         self._is_http_client = False
         self._last_health_check: float = 0
-        self._health_check_interval: float = 30.0  # seconds
+        self._health_check_interval: float = settings.DB_HEALTH_CHECK_INTERVAL_SECONDS
         self._connection_attempts: int = 0
         self._max_connection_attempts: int = 5
+        self._statements = StatementCache(settings.DB_STATEMENT_CACHE_SIZE)
     
     def _is_connection_error(self, error: Exception) -> bool:
         """Check if the error is a connection-related error that warrants reconnection."""
@@ -127,6 +306,7 @@ class Database:
                     self._is_http_client = True
                     self._connection_attempts = 0
                     self._last_health_check = time.time()
+                    self._statements.reset(enabled=False)
                     logger.info("Connected to Turso database via HTTP client")
                     return self._connection
             except ImportError:
@@ -150,69 +330,189 @@ class Database:
             except ImportError:
                 # Fallback to local SQLite
                 logger.warning("libsql not found, using local SQLite")
-                self._connection = sqlite3.connect(settings.LOCAL_DB_PATH)
+                self._connection = self._connect_sqlite()
                 self._connection_attempts = 0
             except Exception as e:
                 logger.error(f"Failed to connect to Turso: {e}")
                 # Fallback to local SQLite
-                self._connection = sqlite3.connect(settings.LOCAL_DB_PATH)
+                self._connection = self._connect_sqlite()
                 self._connection_attempts = 0
                 logger.warning("Connected to local SQLite database")
+            
+            self._statements.reset(enabled=isinstance(self._connection, sqlite3.Connection))
         
         return self._connection
     
+    @staticmethod
+    def _connect_sqlite() -> sqlite3.Connection:
+        """Open the local SQLite fallback with a statement cache sized from settings."""
+        # Pooled connections are opened in a worker thread and used on the event loop
+        return sqlite3.connect(
+            settings.LOCAL_DB_PATH,
+            check_same_thread=False,
+            cached_statements=settings.DB_STATEMENT_CACHE_SIZE,
+        )
+    
     def _reconnect(self) -> Any:
         """Force reconnection to the database."""
         logger.info("Reconnecting to database...")
         return self.connect(force_reconnect=True)
     
+    @staticmethod
+    def _backoff_delay(attempt: int) -> float:
+        """Exponential backoff with jitter for a (zero-based) retry attempt."""
+        base_delay = 0.5 * (2 ** attempt)
+        jitter = random.uniform(0, 0.5)
+        return base_delay + jitter
+    
+    def _should_retry(self, error: Exception, attempt: int, retries: int, query: str) -> bool:
+        """
+        Decide whether a failed query attempt should be retried.
+        Connection errors drop the connection so the next attempt reconnects.
+        """
+        if not self._is_connection_error(error):
+            # Non-connection error, don't retry
+            logger.error(f"Query execution failed: {error}\nQuery: {query}")
+            return False
+        
+        logger.warning(
+            f"Connection error on attempt {attempt + 1}/{retries}: {error}"
+        )
+        # Force reconnection on next attempt
+        self._connection = None
+        return True
+    
+    def _execute_once(self, query: str, params: Tuple = (), fetch: Optional[str] = None) -> Any:
+        """
+        Single query attempt without retries (AsyncDatabase drives the retry loop).
+        
+        Args:
+            fetch: "one" or "all" to fetch rows in the same call
+        """
+        conn = self.connect()
+        result = conn.execute(self._statements.prepare(query), params)
+        if fetch == "one":
+            return result.fetchone()
+        if fetch == "all":
+            return result.fetchall()
+        return result
+    
     def execute(self, query: str, params: Tuple = (), retries: int = 3) -> Any:
         """
         Execute a single query with robust retry logic for connection drops.
         Automatically reconnects when connection errors are detected.
         """
-        import time
-        
+        return self._call_with_retry(self._execute_once, (query, params), retries, query)
+    
+    def _call_with_retry(self, func: Callable[..., Any], args: Tuple, retries: int, query: str) -> Any:
+        """Run `func(*args)`, reconnecting and backing off on connection errors."""
         last_error = None
         for attempt in range(retries):
             try:
-                # Get connection (will reconnect if needed)
-                conn = self.connect()
-                
-                # Execute query
-                result = conn.execute(query, params)
-                return result
-                
+                return func(*args)
             except Exception as e:
                 last_error = e
                 
-                # Check if this is a connection error
-                if self._is_connection_error(e):
-                    logger.warning(
-                        f"Connection error on attempt {attempt + 1}/{retries}: {e}"
-                    )
-                    
-                    # Force reconnection on next attempt
-                    self._connection = None
-                    
-                    if attempt < retries - 1:
-                        # Exponential backoff with jitter
-                        import random
-                        base_delay = 0.5 * (2 ** attempt)
-                        jitter = random.uniform(0, 0.5)
-                        delay = base_delay + jitter
-                        logger.info(f"Retrying in {delay:.2f}s...")
-                        time.sleep(delay)
-                    continue
-                else:
-                    # Non-connection error, don't retry
-                    logger.error(f"Query execution failed: {e}\nQuery: {query}")
+                if not self._should_retry(e, attempt, retries, query):
                     raise
+                
+                if attempt < retries - 1:
+                    delay = self._backoff_delay(attempt)
+                    logger.info(f"Retrying in {delay:.2f}s...")
+                    time.sleep(delay)
         
-        # All retries exhausted
         logger.warning(f"All {retries} retry attempts failed for query: {query[:100]}...")
         raise last_error or Exception("Database connection failed after retries")
     
+    @contextmanager
+    def _savepoint(self, conn: Any):
+        """
+        Make a group of statements atomic without ending the caller's transaction.
+        
+        Inside an open transaction the savepoint nests and its work commits with
+        the caller; outside one, releasing it commits immediately.
+        """
+        conn.execute("SAVEPOINT gg_batch")
+        try:
+            yield
+        except Exception:
+            try:
+                conn.execute("ROLLBACK TO gg_batch")
+                conn.execute("RELEASE gg_batch")
+            except Exception as rollback_error:
+                logger.warning(f"Batch rollback failed: {rollback_error}")
+            raise
+        conn.execute("RELEASE gg_batch")
+    
+    def _execute_many_once(self, query: str, seq_of_params: List[Tuple]) -> int:
+        """Single execute_many attempt. Returns total rows affected."""
+        conn = self.connect()
+        sql = self._statements.prepare(query)
+        
+        if self._is_http_client:
+            # One pipelined request, executed by the server in a transaction
+            results = conn.batch([(sql, params) for params in seq_of_params])
+            return sum(result.rows_affected for result in results)
+        
+        with self._savepoint(conn):
+            if hasattr(conn, "executemany"):
+                return max(conn.executemany(sql, seq_of_params).rowcount, 0)
+            return sum(max(conn.execute(sql, params).rowcount, 0) for params in seq_of_params)
+    
+    def _batch_once(self, statements: List[Tuple[str, Tuple]]) -> List[StatementResult]:
+        """Single batch attempt."""
+        conn = self.connect()
+        prepared = [(self._statements.prepare(query), params) for query, params in statements]
+        
+        if self._is_http_client:
+            return [
+                StatementResult([tuple(row) for row in result.rows], result.rows_affected, result.last_insert_rowid)
+                for result in conn.batch(prepared)
+            ]
+        
+        results = []
+        with self._savepoint(conn):
+            for query, params in prepared:
+                cursor = conn.execute(query, params)
+                if cursor.description:
+                    results.append(StatementResult(cursor.fetchall(), 0, None))
+                else:
+                    results.append(StatementResult([], max(cursor.rowcount, 0), cursor.lastrowid))
+        return results
+    
+    def execute_many(self, query: str, seq_of_params: Iterable[Sequence[Any]], retries: int = 3) -> int:
+        """
+        Run one statement for every parameter set, atomically.
+        
+        Uses a single pipelined batch on the HTTP client and `executemany` on
+        local connections, so N rows cost one round trip instead of N.
+        
+        Returns:
+            Total rows affected
+        """
+        seq = [tuple(params) for params in seq_of_params]
+        if not seq:
+            return 0
+        return self._call_with_retry(self._execute_many_once, (query, seq), retries, query)
+    
+    def batch(self, statements: Iterable[Statement], retries: int = 3) -> List[StatementResult]:
+        """
+        Run several statements atomically in one round trip where supported.
+        
+        Either every statement applies or none do. On local connections the
+        batch nests inside the caller's open transaction (commit as usual).
+        
+        Args:
+            statements: SQL strings or (SQL, params) tuples
+        
+        Returns:
+            One StatementResult per statement, in order
+        """
+        prepared = [_as_statement(statement) for statement in statements]
+        if not prepared:
+            return []
+        return self._call_with_retry(self._batch_once, (prepared,), retries, _describe_batch(prepared))
+    
     def execute_with_reconnect(self, query: str, params: Tuple = ()) -> Any:
         """
         Execute a query with aggressive reconnection.
@@ -224,7 +524,7 @@ class Database:
             # Last resort: force full reconnect and try once more
             logger.warning(f"All retries failed, attempting full reconnect...")
             self._reconnect()
-            return self.connect().execute(query, params)
+            return self.connect().execute(self._statements.prepare(query), params)
     
     def fetch_one(self, query: str, params: Tuple = ()) -> Optional[Tuple]:
         """Execute query and fetch one result."""
@@ -259,6 +559,26 @@ class Database:
                 self._connection = None
             raise
     
+    def begin_write(self) -> None:
+        """
+        Open the write transaction now (BEGIN IMMEDIATE), so rows read before
+        the first write cannot be changed by other connections until commit.
+        
+        No-op inside an already open transaction and on the HTTP client,
+        where every request is its own transaction.
+        """
+        conn = self.connect()
+        if self._is_http_client or getattr(conn, "in_transaction", True):
+            return
+        conn.execute("BEGIN IMMEDIATE")
+    
+    @property
+    def in_transaction(self) -> bool:
+        """True while a transaction is open on the local connection."""
+        if self._connection is None or self._is_http_client:
+            return False
+        return bool(getattr(self._connection, "in_transaction", False))
+    
     def rollback(self) -> None:
         """Rollback current transaction."""
         if self._connection and hasattr(self._connection, 'rollback'):
@@ -269,23 +589,45 @@ class Database:
                 if self._is_connection_error(e):
                     self._connection = None
     
-    def sync(self) -> None:
-        """Sync local replica with remote Turso database."""
-        if self._connection and hasattr(self._connection, 'sync'):
-            try:
-                self._connection.sync()
-                logger.debug("Database synced with remote")
-            except Exception as e:
-                logger.warning(f"Sync warning: {e}")
-                if self._is_connection_error(e):
-                    # Try to reconnect and sync again
-                    try:
-                        self._reconnect()
-                        if hasattr(self._connection, 'sync'):
-                            self._connection.sync()
-                            logger.info("Sync succeeded after reconnection")
-                    except Exception as retry_error:
-                        logger.error(f"Sync failed after reconnection: {retry_error}")
+    @property
+    def supports_sync(self) -> bool:
+        """True when the connection is an embedded replica that can sync."""
+        return self._connection is not None and hasattr(self._connection, 'sync')
+    
+    def sync(self, session_key: Optional[str] = None) -> None:
+        """
+        Request a sync of the local replica with remote Turso database.
+        
+        When the sync actually runs is decided by the SyncCoordinator policy.
+        
+        Args:
+            session_key: Identifies the writing session for read-your-writes
+        """
+        if self.supports_sync:
+            get_sync_coordinator().request_sync(self, session_key)
+    
+    def _sync_now(self) -> bool:
+        """Sync local replica with remote Turso database. Returns True on success."""
+        if not self.supports_sync:
+            return False
+        
+        try:
+            self._connection.sync()
+            logger.debug("Database synced with remote")
+            return True
+        except Exception as e:
+            logger.warning(f"Sync warning: {e}")
+            if self._is_connection_error(e):
+                # Try to reconnect and sync again
+                try:
+                    self._reconnect()
+                    if hasattr(self._connection, 'sync'):
+                        self._connection.sync()
+                        logger.info("Sync succeeded after reconnection")
+                        return True
+                except Exception as retry_error:
+                    logger.error(f"Sync failed after reconnection: {retry_error}")
+            return False
     
     def close(self) -> None:
         """Close database connection."""
@@ -319,6 +661,20 @@ class Database:
             self.rollback()
             raise
     
+    @staticmethod
+    def _split_sql_statements(sql_content: str) -> List[str]:
+        """
+        Split a migration file into statements.
+        
+        Full-line `--` comments are dropped first, so a statement preceded by a
+        comment header is not mistaken for a comment and skipped.
+        """
+        lines = [
+            line for line in sql_content.splitlines()
+            if not line.strip().startswith("--")
+        ]
+        return [statement.strip() for statement in "\n".join(lines).split(";")]
+    
     def run_migrations(self, migrations_dir: str = "migrations") -> None:
         """Run SQL migration files from the migrations directory."""
         from pathlib import Path
@@ -338,10 +694,8 @@ class Database:
                     sql_content = f.read()
                 
                 # Execute each statement separately
-                statements = sql_content.split(";")
-                for statement in statements:
-                    statement = statement.strip()
-                    if statement and not statement.startswith("--"):
+                for statement in self._split_sql_statements(sql_content):
+                    if statement:
                         # Determine if this is a non-critical statement
                         is_index_stmt = "CREATE INDEX" in statement.upper()
                         
@@ -367,9 +721,530 @@ class Database:
         logger.info("All migrations completed successfully")
 
 
-# Singleton database instance
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available within the checkout timeout."""
+    pass
+
+
+class ConnectionPool:
+    """
+    Bounded pool of Database connections.
+    
+    Each request checks out its own Database (and therefore its own underlying
+    libsql/sqlite handle), so concurrent requests no longer serialize on a single
+    connection and a reconnect in one request cannot drop another request's handle.
+    
+    - Keeps at least `min_size` connections open, never more than `max_size`.
+    - Health checks a connection on checkout (rate limited by its health check interval).
+    - Tracks checkout/wait metrics, exposed through `stats()`.
+    """
+    
+    def __init__(
+        self,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 10.0
+    ):
+        self._min_size = max(0, min_size)
+        self._max_size = max(1, max_size, self._min_size)
+        self._timeout = timeout
+        
+        self._idle: Deque[Database] = deque()
+        self._size = 0  # Connections owned by the pool (idle + in use)
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        
+        # Metrics
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._health_check_failures = 0
+        self._peak_in_use = 0
+    
+    def open(self) -> None:
+        """Open the minimum number of connections up front."""
+        with self._cond:
+            missing = self._min_size - self._size
+            self._size += max(0, missing)
+        
+        for _ in range(max(0, missing)):
+            db = Database()
+            try:
+                db.connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                raise
+            with self._cond:
+                self._idle.append(db)
+                self._cond.notify()
+        
+        logger.info(f"Database pool opened (min={self._min_size}, max={self._max_size})")
+    
+    def acquire(self, timeout: Optional[float] = None) -> Database:
+        """
+        Check out a connection, waiting up to `timeout` seconds for one to free up.
+        
+        Raises:
+            PoolTimeoutError: If no connection is available in time
+        """
+        timeout = self._timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        db: Optional[Database] = None
+        create = False
+        waited = False
+        
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeoutError("Database pool is closed")
+                if self._idle:
+                    # LIFO keeps the most recently used (warm) connections in rotation
+                    db = self._idle.pop()
+                    break
+                if self._size < self._max_size:
+                    self._size += 1
+                    create = True
+                    break
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Timed out after {timeout:.1f}s waiting for a database connection"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+            
+            waited_for = time.monotonic() - start
+            self._checkouts += 1
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            if waited:
+                self._waits += 1
+                self._wait_time_total += waited_for
+                self._wait_time_max = max(self._wait_time_max, waited_for)
+        
+        try:
+            if create:
+                db = Database()
+                db.connect()
+            elif not db._check_connection_health():
+                with self._cond:
+                    self._health_check_failures += 1
+                db._reconnect()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                if create:
+                    self._size -= 1
+                elif db is not None:
+                    self._idle.append(db)
+                self._cond.notify()
+            raise
+        
+        return db
+    
+    def release(self, db: Database) -> None:
+        """
+        Return a connection to the pool.
+        
+        A transaction left open (and its write lock) is rolled back first;
+        if that fails the connection is closed instead of reused.
+        """
+        if db.in_transaction:
+            logger.debug("Rolling back transaction left open on a released connection")
+            db.rollback()
+        discard = db.in_transaction
+        
+        with self._cond:
+            self._in_use -= 1
+            if self._closed or discard:
+                self._size -= 1
+                db.close()
+            else:
+                self._idle.append(db)
+            self._cond.notify()
+    
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """
+        Context manager that checks out a connection and always returns it.
+        Uncommitted work is rolled back if the block raises.
+        """
+        db = self.acquire(timeout)
+        try:
+            yield db
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            self.release(db)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Pool usage and wait metrics."""
+        with self._cond:
+            return {
+                "min_size": self._min_size,
+                "max_size": self._max_size,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "peak_in_use": self._peak_in_use,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_time_avg_ms": round(
+                    (self._wait_time_total / self._waits) * 1000, 2
+                ) if self._waits else 0.0,
+                "wait_time_max_ms": round(self._wait_time_max * 1000, 2),
+                "health_check_failures": self._health_check_failures,
+            }
+    
+    def close(self) -> None:
+        """Close idle connections; in-use connections are closed when released."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        
+        for db in idle:
+            db.close()
+        logger.info("Database pool closed")
+
+
+class SyncPolicy:
+    """When replica syncs requested by writes are performed."""
+    IMMEDIATE = "immediate"  # Sync inline after every write (original behavior)
+    DEBOUNCED = "debounced"  # At most one sync per debounce window, off the request path
+    PERIODIC = "periodic"    # Background sync every interval
+
+
+class SyncCoordinator:
+    """
+    Coalesces embedded-replica syncs requested after writes.
+    
+    On the embedded-replica path writes are already forwarded to the primary;
+    `sync()` only pulls frames back into the local replica. Deferring it keeps the
+    replica round trip out of write latency. Deferred syncs run on a dedicated
+    connection so they never touch a connection that a request has checked out.
+    
+    Read-your-writes: every sync request records a write sequence number against
+    the requesting session. When that session checks out a connection again before
+    a sync has covered its writes, `ensure_fresh()` syncs first - other sessions
+    are not delayed.
+    """
+    
+    MAX_TRACKED_SESSIONS = 10000
+    
+    def __init__(
+        self,
+        policy: str = SyncPolicy.DEBOUNCED,
+        debounce_ms: int = 500,
+        interval_seconds: float = 5.0
+    ):
+        if policy not in (SyncPolicy.IMMEDIATE, SyncPolicy.DEBOUNCED, SyncPolicy.PERIODIC):
+            logger.warning(f"Unknown sync policy '{policy}', using '{SyncPolicy.IMMEDIATE}'")
+            policy = SyncPolicy.IMMEDIATE
+        
+        self.policy = policy
+        self._debounce = max(0, debounce_ms) / 1000
+        self._interval = max(0.1, interval_seconds)
+        
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()  # Serializes syncs on the dedicated connection
+        self._db: Optional[Database] = None
+        self._timer: Optional[threading.Timer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        
+        self._write_seq = 0
+        self._synced_seq = 0
+        self._session_seq: "OrderedDict[str, int]" = OrderedDict()
+        self._last_sync = 0.0
+        
+        # Metrics
+        self._requested = 0
+        self._performed = 0
+        self._forced = 0
+        self._failures = 0
+    
+    def request_sync(self, db: Database, session_key: Optional[str] = None) -> None:
+        """Record a write that needs a sync and schedule it per policy."""
+        with self._lock:
+            self._requested += 1
+            self._write_seq += 1
+            if session_key:
+                self._session_seq[session_key] = self._write_seq
+                self._session_seq.move_to_end(session_key)
+                while len(self._session_seq) > self.MAX_TRACKED_SESSIONS:
+                    self._session_seq.popitem(last=False)
+        
+        if self.policy == SyncPolicy.IMMEDIATE:
+            # Same connection, same thread - exactly the pre-coordinator behavior
+            with self._lock:
+                target = self._write_seq
+            if db._sync_now():
+                self._mark_synced(target)
+            else:
+                with self._lock:
+                    self._failures += 1
+        elif self.policy == SyncPolicy.DEBOUNCED:
+            self._schedule_debounced()
+        else:
+            self._ensure_periodic_thread()
+    
+    def needs_sync(self, session_key: Optional[str]) -> bool:
+        """True if the session has writes not yet covered by a completed sync."""
+        if not session_key:
+            return False
+        with self._lock:
+            return self._session_seq.get(session_key, 0) > self._synced_seq
+    
+    def ensure_fresh(self, session_key: Optional[str]) -> None:
+        """Sync now if the session's own writes have not been synced yet."""
+        if self.needs_sync(session_key):
+            with self._lock:
+                self._forced += 1
+            self.flush()
+    
+    def flush(self) -> bool:
+        """Run a sync on the dedicated connection now."""
+        with self._sync_lock:
+            with self._lock:
+                target = self._write_seq
+                if target <= self._synced_seq and self.policy != SyncPolicy.PERIODIC:
+                    return True
+            
+            try:
+                if self._db is None:
+                    self._db = Database()
+                    self._db.connect()
+                ok = self._db._sync_now()
+            except Exception as e:
+                logger.warning(f"Deferred sync failed: {e}")
+                ok = False
+            
+            if ok:
+                self._mark_synced(target)
+            else:
+                with self._lock:
+                    self._failures += 1
+            return ok
+    
+    def _mark_synced(self, seq: int) -> None:
+        with self._lock:
+            self._synced_seq = max(self._synced_seq, seq)
+            self._last_sync = time.monotonic()
+            self._performed += 1
+    
+    def _schedule_debounced(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                return  # A pending sync will cover this write
+            delay = max(0.0, self._last_sync + self._debounce - time.monotonic())
+            self._timer = threading.Timer(delay, self._run_debounced)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def _run_debounced(self) -> None:
+        with self._lock:
+            self._timer = None
+        self.flush()
+    
+    def _ensure_periodic_thread(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run_periodic, name="db-sync", daemon=True
+            )
+            self._thread.start()
+    
+    def _run_periodic(self) -> None:
+        while not self._stop.wait(self._interval):
+            # Always pull on each tick so the replica also picks up other writers
+            self.flush()
+    
+    def start(self) -> None:
+        """Start background syncing for the periodic policy."""
+        if self.policy == SyncPolicy.PERIODIC:
+            self._ensure_periodic_thread()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Sync coordination metrics."""
+        with self._lock:
+            return {
+                "policy": self.policy,
+                "requested": self._requested,
+                "performed": self._performed,
+                "coalesced": max(0, self._requested - self._performed),
+                "forced_for_read_your_writes": self._forced,
+                "failures": self._failures,
+                "pending": self._write_seq > self._synced_seq,
+            }
+    
+    def close(self) -> None:
+        """Stop background syncing and flush any pending writes."""
+        self._stop.set()
+        with self._lock:
+            timer, self._timer = self._timer, None
+            pending = self._write_seq > self._synced_seq
+        if timer is not None:
+            timer.cancel()
+        if pending and self.policy != SyncPolicy.IMMEDIATE:
+            self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class AsyncDatabase:
+    """
+    Awaitable facade over a pooled Database.
+    
+    Blocking driver calls run on a bounded thread pool executor, so a slow Turso
+    round trip only occupies a worker thread instead of the event loop.
+    Connection-error retries back off with asyncio.sleep rather than time.sleep.
+    """
+    
+    def __init__(
+        self,
+        db: Database,
+        executor: ThreadPoolExecutor,
+        pool: Optional[ConnectionPool] = None,
+        session_key: Optional[str] = None
+    ):
+        self._db = db
+        self._executor = executor
+        self._pool = pool
+        self.session_key = session_key
+    
+    @property
+    def database(self) -> Database:
+        """The underlying blocking Database (only use it from executor threads)."""
+        return self._db
+    
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking callable on the database executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+    
+    async def _execute_with_retry(
+        self,
+        query: str,
+        params: Tuple,
+        retries: int,
+        fetch: Optional[str] = None
+    ) -> Any:
+        return await self._run_with_retry(self._db._execute_once, (query, params, fetch), retries, query)
+    
+    async def _run_with_retry(self, func: Callable[..., Any], args: Tuple, retries: int, query: str) -> Any:
+        """Run a blocking Database call on the executor, retrying connection errors."""
+        last_error = None
+        for attempt in range(retries):
+            try:
+                return await self.run(func, *args)
+            except Exception as e:
+                last_error = e
+                
+                if not self._db._should_retry(e, attempt, retries, query):
+                    raise
+                
+                if attempt < retries - 1:
+                    delay = Database._backoff_delay(attempt)
+                    logger.info(f"Retrying in {delay:.2f}s...")
+                    await asyncio.sleep(delay)
+        
+        logger.warning(f"All {retries} retry attempts failed for query: {query[:100]}...")
+        raise last_error or Exception("Database connection failed after retries")
+    
+    async def execute(self, query: str, params: Tuple = (), retries: int = 3) -> Any:
+        """Execute a single query with non-blocking retry/backoff."""
+        return await self._execute_with_retry(query, params, retries)
+    
+    async def fetch_one(self, query: str, params: Tuple = ()) -> Optional[Tuple]:
+        """Execute query and fetch one result."""
+        return await self._execute_with_retry(query, params, 3, fetch="one")
+    
+    async def fetch_all(self, query: str, params: Tuple = ()) -> List[Tuple]:
+        """Execute query and fetch all results."""
+        return await self._execute_with_retry(query, params, 3, fetch="all")
+    
+    async def execute_many(self, query: str, seq_of_params: Iterable[Sequence[Any]], retries: int = 3) -> int:
+        """Run one statement per parameter set atomically (see Database.execute_many)."""
+        seq = [tuple(params) for params in seq_of_params]
+        if not seq:
+            return 0
+        return await self._run_with_retry(self._db._execute_many_once, (query, seq), retries, query)
+    
+    async def batch(self, statements: Iterable[Statement], retries: int = 3) -> List[StatementResult]:
+        """Run several statements atomically in one round trip (see Database.batch)."""
+        prepared = [_as_statement(statement) for statement in statements]
+        if not prepared:
+            return []
+        return await self._run_with_retry(
+            self._db._batch_once, (prepared,), retries, _describe_batch(prepared)
+        )
+    
+    async def commit(self) -> None:
+        """Commit current transaction."""
+        await self.run(self._db.commit)
+    
+    async def begin_write(self) -> None:
+        """Open the write transaction now (see Database.begin_write)."""
+        await self.run(self._db.begin_write)
+    
+    async def rollback(self) -> None:
+        """Rollback current transaction."""
+        await self.run(self._db.rollback)
+    
+    async def sync(self) -> None:
+        """Request a replica sync; timing follows the configured SyncPolicy."""
+        if self._db.supports_sync:
+            await self.run(self._db.sync, self.session_key)
+    
+    async def ensure_fresh(self) -> None:
+        """Make this session's earlier writes visible before it reads (read-your-writes)."""
+        if get_sync_coordinator().needs_sync(self.session_key):
+            await self.run(get_sync_coordinator().ensure_fresh, self.session_key)
+    
+    @asynccontextmanager
+    async def transaction(self):
+        """Async context manager for database transactions."""
+        try:
+            yield self
+            await self.commit()
+        except Exception:
+            await self.rollback()
+            raise
+    
+    def release(self) -> None:
+        """Return the underlying connection to its pool."""
+        if self._pool is not None:
+            self._pool.release(self._db)
+            self._pool = None
+
+
+# Singleton database instance (startup tasks: migrations, seeding)
 _db_instance: Optional[Database] = None
 
+# Connection pool used for request handling
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+# Executor running blocking driver calls for AsyncDatabase
+_executor: Optional[ThreadPoolExecutor] = None
+
+# Replica sync coordination
+_sync_coordinator: Optional[SyncCoordinator] = None
+
 
 def get_database() -> Database:
     """Get the singleton database instance."""
@@ -379,16 +1254,106 @@ def get_database() -> Database:
     return _db_instance
 
 
+def get_pool() -> ConnectionPool:
+    """Get the connection pool, creating and warming it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = ConnectionPool(
+                    min_size=settings.DB_POOL_MIN_SIZE,
+                    max_size=settings.DB_POOL_MAX_SIZE,
+                    timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+                )
+                pool.open()
+                _pool = pool
+    return _pool
+
+
+def get_sync_coordinator() -> SyncCoordinator:
+    """Get the replica sync coordinator configured from settings."""
+    global _sync_coordinator
+    if _sync_coordinator is None:
+        with _pool_lock:
+            if _sync_coordinator is None:
+                _sync_coordinator = SyncCoordinator(
+                    policy=settings.DB_SYNC_POLICY,
+                    debounce_ms=settings.DB_SYNC_DEBOUNCE_MS,
+                    interval_seconds=settings.DB_SYNC_INTERVAL_SECONDS,
+                )
+    return _sync_coordinator
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the bounded thread pool that runs blocking database calls."""
+    global _executor
+    if _executor is None:
+        with _pool_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.DB_EXECUTOR_MAX_WORKERS,
+                    thread_name_prefix="db",
+                )
+    return _executor
+
+
+async def acquire_async(
+    timeout: Optional[float] = None,
+    session_key: Optional[str] = None
+) -> AsyncDatabase:
+    """
+    Check out a pooled connection wrapped in an AsyncDatabase.
+    Call `release()` on the result when done (or use `async_connection()`).
+    
+    Waiting for a free connection happens off the event loop and off the
+    database executor, so waiters never starve the connections already in use.
+    
+    Args:
+        timeout: Seconds to wait for a free connection (pool default if None)
+        session_key: Requesting session, used for read-your-writes after deferred syncs
+    
+    Raises:
+        PoolTimeoutError: If no connection is available in time
+    """
+    pool = await asyncio.to_thread(get_pool)
+    db = await asyncio.to_thread(pool.acquire, timeout)
+    return AsyncDatabase(db, get_executor(), pool, session_key)
+
+
+@asynccontextmanager
+async def async_connection(timeout: Optional[float] = None):
+    """Async context manager yielding a pooled AsyncDatabase."""
+    db = await acquire_async(timeout)
+    try:
+        yield db
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        db.release()
+
+
 def init_database() -> Database:
-    """Initialize database connection."""
+    """Initialize database connection and the request connection pool."""
     db = get_database()
     db.connect()
+    get_pool()
+    get_sync_coordinator().start()
     return db
 
 
 def close_database() -> None:
-    """Close database connection."""
-    global _db_instance
+    """Close database connection and the connection pool."""
+    global _db_instance, _pool, _executor, _sync_coordinator
+    if _sync_coordinator:
+        _sync_coordinator.close()
+        _sync_coordinator = None
+    if _pool:
+        _pool.close()
+        _pool = None
+    if _executor:
+        _executor.shutdown(wait=False)
+        _executor = None
     if _db_instance:
         _db_instance.close()
         _db_instance = None
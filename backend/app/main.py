@@ -12,9 +12,22 @@ import sys
 import uuid
 import os
 from app.config import settings
-from app.database import init_database, close_database, get_database, Database
+from app.database import init_database, close_database, get_pool, get_sync_coordinator, statement_cache_stats, async_connection, Database
 from app.api.v1.router import api_router
+from app.api.deps import user_status_cache_stats
+from app.services.stats import stats_cache_stats
+from app.services.assignment import assignment_index_stats
+from app.services.counters import reconcile_all_counters, reconcile_all_unread_counters
+from app.services.pm_scheduler import generate_due_work_orders
+from app.services.meter_triggers import meter_schedule_cache_stats
+from app.services.meter_ingest import get_meter_buffer, meter_ingest_stats
+from app.services.meter_rollups import compact_meter_data
+from app.services.outbox import dispatch_notifications
+from app.services.pubsub import get_broker, stream_stats
+from app.services.search import ensure_search_index
+from app.services.jobs import PeriodicJob, get_job_runner
 from app.core.exceptions import GearGuardException, to_http_exception
+from app.core.security import access_token_cache_stats, password_hasher_stats, shutdown_password_hasher
 
 # ===========================================
 # Logging Configuration
@@ -137,6 +150,38 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"Super admin creation skipped or failed: {e}")
         
+        # Full-text search index (falls back to LIKE search if FTS5 is unavailable)
+        await ensure_search_index()
+        
+        if settings.ENABLE_BACKGROUND_JOBS:
+            runner = get_job_runner()
+            runner.add(PeriodicJob(
+                "reconcile_org_counters",
+                settings.COUNTER_RECONCILE_INTERVAL_SECONDS,
+                reconcile_all_counters,
+            ))
+            runner.add(PeriodicJob(
+                "reconcile_unread_counters",
+                settings.UNREAD_COUNTER_RECONCILE_INTERVAL_SECONDS,
+                reconcile_all_unread_counters,
+            ))
+            runner.add(PeriodicJob(
+                "generate_pm_work_orders",
+                settings.PM_GENERATION_INTERVAL_SECONDS,
+                generate_due_work_orders,
+            ))
+            runner.add(PeriodicJob(
+                "compact_meter_data",
+                settings.METER_COMPACTION_INTERVAL_SECONDS,
+                compact_meter_data,
+            ))
+            runner.add(PeriodicJob(
+                "dispatch_notifications",
+                settings.NOTIFICATION_DISPATCH_INTERVAL_SECONDS,
+                dispatch_notifications,
+            ))
+            runner.start()
+        
         logger.info(f"GearGuard Backend started successfully in {settings.APP_ENV} mode")
         
         yield
@@ -144,7 +189,11 @@ async def lifespan(app: FastAPI):
     finally:
         # Shutdown
         logger.info("Shutting down GearGuard Backend...")
+        get_broker().close_all()
+        await get_job_runner().stop()
+        await get_meter_buffer().close()
         close_database()
+        shutdown_password_hasher()
         logger.info("Database connection closed")
         logger.info("GearGuard Backend shutdown complete")
 
@@ -207,6 +256,7 @@ async def gearguard_exception_handler(request: Request, exc: GearGuardException)
     return JSONResponse(
         status_code=http_exc.status_code,
         content=http_exc.detail,
+        headers=http_exc.headers,
     )
 
 
@@ -291,10 +341,12 @@ async def health_check():
     """
     # Check database connection
     db_healthy = False
+    pool_stats = {}
     try:
-        db = get_database()
-        db.execute("SELECT 1")
+        async with async_connection() as db:
+            await db.execute("SELECT 1")
         db_healthy = True
+        pool_stats = get_pool().stats()
     except Exception as e:
         logger.error(f"Health check - Database unhealthy: {e}")
     
@@ -308,6 +360,20 @@ async def health_check():
             "environment": settings.APP_ENV,
             "checks": {
                 "database": "ok" if db_healthy else "error",
+            },
+            "metrics": {
+                "database_pool": pool_stats,
+                "statement_cache": statement_cache_stats(),
+                "replica_sync": get_sync_coordinator().stats(),
+                "user_status_cache": user_status_cache_stats(),
+                "access_token_cache": access_token_cache_stats(),
+                "password_hashing": password_hasher_stats(),
+                "stats_cache": stats_cache_stats(),
+                "assignment_index": assignment_index_stats(),
+                "meter_schedule_index": meter_schedule_cache_stats(),
+                "meter_ingest": meter_ingest_stats(),
+                "live_updates": stream_stats(),
+                "background_jobs": get_job_runner().stats(),
             }
         }
     )
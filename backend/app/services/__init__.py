@@ -0,0 +1,4 @@
+"""
+GearGuard Backend - Services
+Business logic shared across API endpoints.
+"""
@@ -0,0 +1,264 @@
+"""
+GearGuard Backend - Work Order Assignment
+Workload-aware choice of assignee for new and generated work orders.
+
+Each organization gets an in-process index of technician workload: open
+work orders (pending or in progress) and their estimated hours per
+assignee, plus team membership and team locations. Technicians are kept in
+min-heaps by load - one for the organization, one per location and one per
+team - so picking the least-loaded candidate costs O(log n). Load changes
+push a fresh heap entry and older entries are discarded lazily when they
+reach the top.
+
+Policies:
+- least_loaded: fewest open estimated hours in the organization
+- same_location: least loaded among technicians in teams at the equipment's
+  location (falls back to least_loaded)
+- team_round_robin: next technician of the work order's team in turn
+  (falls back to least_loaded without a team)
+
+Picks reserve their load immediately, so a burst of auto-assigned work
+orders is spread out. Changes made by other processes are picked up when
+the index expires (ASSIGNMENT_INDEX_TTL_SECONDS).
+"""
+import heapq
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Set, Tuple
+import logging
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.database import AsyncDatabase
+
+logger = logging.getLogger(__name__)
+
+LEAST_LOADED = "least_loaded"
+SAME_LOCATION = "same_location"
+TEAM_ROUND_ROBIN = "team_round_robin"
+
+POLICIES = (LEAST_LOADED, SAME_LOCATION, TEAM_ROUND_ROBIN)
+
+OPEN_STATUSES = ("pending", "in_progress")
+
+# Work orders without an estimate count as one hour of load
+DEFAULT_HOURS = 1.0
+
+_ORG = "org"
+
+
+class WorkOrderLoad(NamedTuple):
+    """The part of a work order that counts towards its assignee's load."""
+    assigned_to: Optional[str]
+    estimated_hours: Optional[float]
+    status: str
+
+
+# ===========================================
+# Workload Index
+# ===========================================
+
+class OrgWorkload:
+    """Load of one organization's technicians, indexed for least-loaded picks."""
+
+    def __init__(
+        self,
+        technicians: Set[str],
+        memberships: List[Tuple[str, str, Optional[str]]],
+        open_work: Dict[str, Tuple[int, float]]
+    ):
+        """
+        Args:
+            technicians: Active technician IDs
+            memberships: (team_id, user_id, team location_id) rows in rotation order
+            open_work: user_id -> (open work orders, open estimated hours)
+        """
+        self.technicians = technicians
+        self.open_count: Dict[str, int] = {user_id: open_work.get(user_id, (0, 0.0))[0] for user_id in technicians}
+        self.hours: Dict[str, float] = {user_id: open_work.get(user_id, (0, 0.0))[1] for user_id in technicians}
+
+        # Heap scopes each technician belongs to: the organization, their teams and team locations
+        self._scopes: Dict[str, List[Hashable]] = {user_id: [_ORG] for user_id in technicians}
+        self._team_members: Dict[str, List[str]] = {}
+        self._rotation: Dict[str, int] = {}
+        for team_id, user_id, location_id in memberships:
+            if user_id not in technicians:
+                continue
+            self._team_members.setdefault(team_id, []).append(user_id)
+            for scope in (("team", team_id), ("location", location_id)):
+                if scope[1] and scope not in self._scopes[user_id]:
+                    self._scopes[user_id].append(scope)
+
+        self._version: Dict[str, int] = {user_id: 0 for user_id in technicians}
+        self._heaps: Dict[Hashable, List[Tuple[float, int, str, int]]] = {}
+        self._sizes: Dict[Hashable, int] = {}
+        for user_id, scopes in self._scopes.items():
+            for scope in scopes:
+                self._heaps.setdefault(scope, []).append(self._entry(user_id))
+                self._sizes[scope] = self._sizes.get(scope, 0) + 1
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
+
+    def _entry(self, user_id: str) -> Tuple[float, int, str, int]:
+        return (self.hours[user_id], self.open_count[user_id], user_id, self._version[user_id])
+
+    def adjust(self, user_id: Optional[str], hours: Optional[float], count: int) -> None:
+        """Add (count=1) or remove (count=-1) one open work order of `user_id`."""
+        if user_id not in self.technicians:
+            return
+        load = (hours if hours is not None else DEFAULT_HOURS) * count
+        self.hours[user_id] = max(0.0, self.hours[user_id] + load)
+        self.open_count[user_id] = max(0, self.open_count[user_id] + count)
+        self._version[user_id] += 1
+
+        entry = self._entry(user_id)
+        for scope in self._scopes[user_id]:
+            heap = self._heaps[scope]
+            heapq.heappush(heap, entry)
+            if len(heap) > 2 * self._sizes[scope] + 16:
+                # Too many superseded entries: rebuild from current loads
+                members = {item[2] for item in heap}
+                self._heaps[scope] = [self._entry(member) for member in members]
+                heapq.heapify(self._heaps[scope])
+
+    def least_loaded(self, scope: Hashable = _ORG) -> Optional[str]:
+        """Technician with the lowest load in `scope` (None if it has none)."""
+        heap = self._heaps.get(scope)
+        while heap:
+            _, _, user_id, version = heap[0]
+            if version == self._version[user_id]:
+                return user_id
+            heapq.heappop(heap)  # superseded by a newer entry for the same user
+        return None
+
+    def next_in_team(self, team_id: str) -> Optional[str]:
+        """Next technician of a team in rotation."""
+        members = self._team_members.get(team_id)
+        if not members:
+            return None
+        turn = self._rotation.get(team_id, 0)
+        self._rotation[team_id] = turn + 1
+        return members[turn % len(members)]
+
+    def pick(self, policy: str, team_id: Optional[str] = None, location_id: Optional[str] = None) -> Optional[str]:
+        """Choose a technician under `policy` (None if the organization has none)."""
+        user_id = None
+        if policy == TEAM_ROUND_ROBIN and team_id:
+            user_id = self.next_in_team(team_id)
+        elif policy == SAME_LOCATION and location_id:
+            user_id = self.least_loaded(("location", location_id))
+        return user_id or self.least_loaded()
+
+
+_workloads = TTLCache(
+    maxsize=settings.ASSIGNMENT_INDEX_CACHE_SIZE,
+    ttl=settings.ASSIGNMENT_INDEX_TTL_SECONDS,
+)
+
+
+# Open work orders and estimated hours per assignee (hours default to the first parameter)
+OPEN_WORK_BY_ASSIGNEE_SQL = """
+    SELECT assigned_to, COUNT(*), SUM(COALESCE(estimated_hours, ?))
+    FROM work_orders
+    WHERE organization_id = ? AND status IN ('pending', 'in_progress') AND assigned_to IS NOT NULL
+    GROUP BY assigned_to
+"""
+
+
+async def _load_workload(db: AsyncDatabase, org_id: str) -> OrgWorkload:
+    technicians = await db.fetch_all(
+        """
+        SELECT u.id FROM users u
+        JOIN roles r ON u.role_id = r.id
+        WHERE u.organization_id = ? AND u.is_active = TRUE AND r.name = 'technician'
+        """,
+        (org_id,)
+    )
+    memberships = await db.fetch_all(
+        """
+        SELECT tm.team_id, tm.user_id, t.location_id
+        FROM teams t
+        JOIN team_members tm ON tm.team_id = t.id
+        WHERE t.organization_id = ? AND t.is_active = TRUE
+        ORDER BY tm.team_id, tm.joined_at, tm.user_id
+        """,
+        (org_id,)
+    )
+    open_work = await db.fetch_all(OPEN_WORK_BY_ASSIGNEE_SQL, (DEFAULT_HOURS, org_id))
+    return OrgWorkload(
+        {row[0] for row in technicians},
+        [tuple(row) for row in memberships],
+        {row[0]: (row[1], float(row[2] or 0)) for row in open_work},
+    )
+
+
+async def get_workload(db: AsyncDatabase, org_id: str) -> OrgWorkload:
+    """Workload index of an organization (cached for ASSIGNMENT_INDEX_TTL_SECONDS)."""
+    workload = _workloads.get(org_id)
+    if workload is None:
+        workload = await _load_workload(db, org_id)
+        _workloads.set(org_id, workload)
+    return workload
+
+
+def invalidate_workload(org_id: str) -> None:
+    """Drop an organization's index after technician, role or team membership changes."""
+    _workloads.delete(org_id)
+
+
+def assignment_index_stats() -> Dict[str, Any]:
+    """Workload index cache metrics."""
+    return _workloads.stats()
+
+
+# ===========================================
+# Assignment
+# ===========================================
+
+async def pick_assignee(
+    db: AsyncDatabase,
+    org_id: str,
+    policy: str,
+    estimated_hours: Optional[float] = None,
+    team_id: Optional[str] = None,
+    location_id: Optional[str] = None
+) -> Optional[str]:
+    """
+    Choose an assignee for a new open work order and reserve its load.
+
+    Returns:
+        User ID, or None if the organization has no active technicians
+    """
+    workload = await get_workload(db, org_id)
+    user_id = workload.pick(policy, team_id=team_id, location_id=location_id)
+    if user_id:
+        workload.adjust(user_id, estimated_hours, 1)
+    return user_id
+
+
+def release_assignee(org_id: str, user_id: Optional[str], estimated_hours: Optional[float] = None) -> None:
+    """Return load reserved by `pick_assignee()` for a work order that was not created."""
+    workload = _workloads.get(org_id)
+    if workload is not None:
+        workload.adjust(user_id, estimated_hours, -1)
+
+
+def track_workload(org_id: str, before: Optional[WorkOrderLoad], after: Optional[WorkOrderLoad]) -> None:
+    """
+    Apply a work order change (creation, reassignment, status or estimate
+    change) to a cached index; `before` is None for new work orders.
+    """
+    workload = _workloads.get(org_id)
+    if workload is None:
+        return
+    if before is not None and before.status in OPEN_STATUSES:
+        workload.adjust(before.assigned_to, before.estimated_hours, -1)
+    if after is not None and after.status in OPEN_STATUSES:
+        workload.adjust(after.assigned_to, after.estimated_hours, 1)
+
+
+async def fetch_work_order_load(db: AsyncDatabase, wo_id: str, org_id: str) -> Optional[WorkOrderLoad]:
+    """Current assignee, estimate and status of a work order."""
+    row = await db.fetch_one(
+        "SELECT assigned_to, estimated_hours, status FROM work_orders WHERE id = ? AND organization_id = ?",
+        (wo_id, org_id)
+    )
+    return WorkOrderLoad(row[0], row[1], row[2]) if row else None
@@ -0,0 +1,203 @@
+"""
+GearGuard Backend - Bulk Import
+Streaming record parsers and batched inserts for bulk import endpoints.
+
+Records are parsed incrementally from the request body (JSON array, NDJSON
+or CSV) and handed to the endpoint one at a time, so memory stays bounded by
+the insert batch size rather than the size of the upload.
+"""
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+import logging
+
+from app.database import AsyncDatabase
+
+logger = logging.getLogger(__name__)
+
+_JSON_DECODER = json.JSONDecoder()
+# Characters separating records: whitespace, commas and the closing bracket
+# of a JSON array body (its opening bracket is skipped once, at the start)
+_RECORD_SEPARATORS = " \t\r\n,]"
+# An unfinished record larger than this is treated as malformed input
+MAX_RECORD_CHARS = 1 << 20
+
+
+class RowError(Exception):
+    """A single input row that cannot be imported."""
+
+    def __init__(self, message: str, field: Optional[str] = None):
+        super().__init__(message)
+        self.message = message
+        self.field = field
+
+
+# ===========================================
+# Record Parsers
+# ===========================================
+
+async def iter_json_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Parse records from a streamed JSON array or NDJSON body.
+
+    Each top-level value (array element or line) is decoded as soon as it is
+    complete, so only the current, unfinished record is buffered.
+
+    Yields:
+        (1-based record number, decoded value)
+
+    Raises:
+        RowError: If the body is not valid JSON (parsing cannot continue)
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    number = 0
+    started = False
+
+    async def records(final: bool):
+        nonlocal buffer, number, started
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in _RECORD_SEPARATORS:
+                position += 1
+            if position >= len(buffer):
+                break
+            if not started:
+                started = True
+                if buffer[position] == "[":
+                    # A JSON array body; its elements are the records
+                    position += 1
+                    continue
+            try:
+                value, end = _JSON_DECODER.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                if final or len(buffer) - position > MAX_RECORD_CHARS:
+                    raise RowError(f"Invalid JSON after record {number}: {e.msg}")
+                break  # Record continues in the next chunk
+            number += 1
+            yield number, value
+            position = end
+        buffer = buffer[position:]
+
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        async for record in records(final=False):
+            yield record
+
+    buffer += decoder.decode(b"", final=True)
+    async for record in records(final=True):
+        yield record
+
+
+async def iter_csv_records(file: BinaryIO) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Parse records from an uploaded CSV file with a header row.
+
+    Blank cells become None so optional fields fall back to their defaults.
+
+    Yields:
+        (1-based data row number, row dict keyed by header)
+
+    Raises:
+        RowError: If the file is not UTF-8 text or not valid CSV
+    """
+    reader = csv.DictReader(codecs.getreader("utf-8-sig")(file))
+    number = 0
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise RowError(f"Unreadable CSV after row {number}: {e}")
+        number += 1
+        yield number, {
+            key.strip(): (value.strip() or None) if isinstance(value, str) else value
+            for key, value in row.items()
+            if key
+        }
+
+
+# ===========================================
+# Reporting
+# ===========================================
+
+class ImportReport:
+    """Running totals and a capped list of per-row errors."""
+
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.total = 0
+        self.created = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def add_error(self, row: int, message: str, field: Optional[str] = None) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "field": field, "message": message})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total_rows": self.total,
+            "created": self.created,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+# ===========================================
+# Lookups and Inserts
+# ===========================================
+
+async def load_code_lookup(db: AsyncDatabase, table: str, org_id: str) -> Dict[str, str]:
+    """
+    Map both ids and codes of an organization's rows to ids.
+
+    Used to resolve references such as category/location by code in one
+    query per import instead of one per row.
+    """
+    rows = await db.fetch_all(f"SELECT id, code FROM {table} WHERE organization_id = ?", (org_id,))
+    lookup: Dict[str, str] = {}
+    for row_id, code in rows:
+        if code:
+            lookup[code] = row_id
+    for row_id, _ in rows:
+        lookup[row_id] = row_id
+    return lookup
+
+
+async def insert_rows(
+    db: AsyncDatabase,
+    query: str,
+    rows: List[Tuple[int, Tuple]],
+    report: ImportReport
+) -> List[int]:
+    """
+    Insert a batch of rows in one round trip (uncommitted; caller commits).
+
+    If the batch is rejected (e.g. a duplicate code), rows are retried one at
+    a time so only the offending rows are reported.
+
+    Args:
+        rows: (row number, parameters) pairs
+
+    Returns:
+        Indexes into `rows` that were inserted
+    """
+    try:
+        await db.execute_many(query, [params for _, params in rows])
+        return list(range(len(rows)))
+    except Exception as e:
+        logger.debug(f"Bulk insert batch rejected, retrying rows individually: {e}")
+
+    inserted = []
+    for index, (number, params) in enumerate(rows):
+        try:
+            await db.execute(query, params, retries=1)
+            inserted.append(index)
+        except Exception as e:
+            report.add_error(number, str(e))
+    return inserted
@@ -0,0 +1,382 @@
+"""
+GearGuard Backend - Organization Counters
+Incrementally maintained per-organization rollups (org_counters table) and
+per-user unread notification counts (notification_counters table).
+
+Write paths wrap their statements in `track_counters()`, which opens the
+write transaction, diffs the row's counter contributions before and after
+the write and applies the delta in that same transaction. `reconcile_counters()` recomputes everything
+from the source tables to repair drift.
+
+Notification writes batch their statement with the matching unread counter
+statement, so the unread badge never has to count notifications.
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+import time
+
+from app.database import AsyncDatabase, async_connection
+
+logger = logging.getLogger(__name__)
+
+# Marker counter written by reconciliation; its absence means "never reconciled"
+RECONCILED_MARKER = "_reconciled_at"
+
+
+# ===========================================
+# Per-row Contributions
+# ===========================================
+
+def _equipment_contribution(row: Tuple) -> Dict[str, float]:
+    status, health_score = row
+    counters = {"equipment_all": 1, f"equipment_status:{status}": 1}
+    if status != "retired":
+        counters["equipment_active"] = 1
+        # Scored rows only, so the average skips NULL scores like AVG() does
+        counters["equipment_health_sum"] = health_score or 0
+        counters["equipment_health_count"] = 0 if health_score is None else 1
+    return counters
+
+
+def _work_order_contribution(row: Tuple) -> Dict[str, float]:
+    (status,) = row
+    return {"work_orders_total": 1, f"work_orders_status:{status}": 1}
+
+
+def _part_contribution(row: Tuple) -> Dict[str, float]:
+    quantity_in_stock, minimum_stock_level, is_active = row
+    # Same rule as `quantity_in_stock <= minimum_stock_level` in SQL: NULL is never low
+    low = (
+        quantity_in_stock is not None and minimum_stock_level is not None
+        and quantity_in_stock <= minimum_stock_level
+    )
+    return {
+        "parts_total": 1,
+        "parts_low_stock": 1 if low else 0,
+        "parts_low_stock_active": 1 if low and is_active else 0,
+    }
+
+
+def _user_contribution(row: Tuple) -> Dict[str, float]:
+    return {"users_total": 1}
+
+
+# entity -> (snapshot query, contribution function)
+_TRACKED: Dict[str, Tuple[str, Callable[[Tuple], Dict[str, float]]]] = {
+    "equipment": (
+        "SELECT status, health_score FROM equipment WHERE id = ? AND organization_id = ?",
+        _equipment_contribution,
+    ),
+    "work_orders": (
+        "SELECT status FROM work_orders WHERE id = ? AND organization_id = ?",
+        _work_order_contribution,
+    ),
+    "parts_inventory": (
+        "SELECT quantity_in_stock, minimum_stock_level, is_active FROM parts_inventory WHERE id = ? AND organization_id = ?",
+        _part_contribution,
+    ),
+    "users": (
+        "SELECT id FROM users WHERE id = ? AND organization_id = ?",
+        _user_contribution,
+    ),
+}
+
+
+def _diff(before: Dict[str, float], after: Dict[str, float]) -> Dict[str, float]:
+    deltas = {}
+    for counter in set(before) | set(after):
+        delta = after.get(counter, 0) - before.get(counter, 0)
+        if delta:
+            deltas[counter] = delta
+    return deltas
+
+
+# ===========================================
+# Incremental Updates
+# ===========================================
+
+async def apply_counter_deltas(db: AsyncDatabase, org_id: str, deltas: Dict[str, float]) -> None:
+    """Add deltas to an organization's counters (uncommitted; caller commits)."""
+    now = datetime.utcnow()
+    await db.execute_many(
+        """
+        INSERT INTO org_counters (organization_id, counter, value, updated_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (organization_id, counter)
+        DO UPDATE SET value = value + excluded.value, updated_at = excluded.updated_at
+        """,
+        [(org_id, counter, delta, now) for counter, delta in deltas.items()]
+    )
+
+
+async def count_inserted_rows(
+    db: AsyncDatabase,
+    entity: str,
+    org_id: str,
+    rows: Iterable[Tuple]
+) -> None:
+    """
+    Add the contributions of freshly inserted rows (uncommitted; caller commits).
+
+    For bulk inserts, where snapshotting each row as `track_counters()` does
+    would cost two reads per row.
+
+    Args:
+        entity: Table name, as for `track_counters()`
+        rows: One snapshot per inserted row, shaped like the entity's snapshot query
+    """
+    _, contribution = _TRACKED[entity]
+    deltas: Dict[str, float] = {}
+    for row in rows:
+        for counter, value in contribution(row).items():
+            deltas[counter] = deltas.get(counter, 0) + value
+    deltas = {counter: value for counter, value in deltas.items() if value}
+    if deltas:
+        await apply_counter_deltas(db, org_id, deltas)
+
+
+@asynccontextmanager
+async def track_counters(db: AsyncDatabase, entity: str, entity_id: str, org_id: str):
+    """
+    Keep org_counters in step with a write to a single row.
+
+    The write transaction is opened before the "before" snapshot, so a
+    concurrent write to the same row waits for this one to commit instead
+    of applying a delta from the same starting point. (The HTTP client
+    commits every statement on its own; drift there is left to
+    `reconcile_counters()`.)
+
+    Usage:
+        async with track_counters(db, "work_orders", wo_id, org_id):
+            await db.execute("UPDATE work_orders SET status = ? ...")
+        await db.commit()
+
+    Args:
+        db: Connection the write runs on (the delta joins its transaction)
+        entity: Table name ("equipment", "work_orders", "parts_inventory", "users")
+        entity_id: Primary key of the row being written
+        org_id: Owning organization
+    """
+    query, contribution = _TRACKED[entity]
+
+    await db.begin_write()
+    row = await db.fetch_one(query, (entity_id, org_id))
+    before = contribution(tuple(row)) if row else {}
+
+    yield
+
+    row = await db.fetch_one(query, (entity_id, org_id))
+    after = contribution(tuple(row)) if row else {}
+
+    deltas = _diff(before, after)
+    if deltas:
+        await apply_counter_deltas(db, org_id, deltas)
+
+
+# ===========================================
+# Reads and Reconciliation
+# ===========================================
+
+async def get_counters(db: AsyncDatabase, org_id: str) -> Dict[str, float]:
+    """
+    Read an organization's counters, reconciling first if it never has been.
+
+    Returns:
+        Mapping of counter name to value (missing counters are zero)
+    """
+    rows = await db.fetch_all(
+        "SELECT counter, value FROM org_counters WHERE organization_id = ?",
+        (org_id,)
+    )
+    counters = {row[0]: row[1] for row in rows}
+
+    if RECONCILED_MARKER not in counters:
+        await reconcile_counters(db, org_id)
+        rows = await db.fetch_all(
+            "SELECT counter, value FROM org_counters WHERE organization_id = ?",
+            (org_id,)
+        )
+        counters = {row[0]: row[1] for row in rows}
+
+    return counters
+
+
+# (counter name expression, value expression, source table, extra filter, extra group by)
+_RECONCILE_SOURCES = [
+    ("'equipment_all'", "COUNT(*)", "equipment", "", ""),
+    ("'equipment_status:' || status", "COUNT(*)", "equipment", "", ", status"),
+    ("'equipment_active'", "COUNT(*)", "equipment", "AND status != 'retired'", ""),
+    ("'equipment_health_sum'", "COALESCE(SUM(health_score), 0)", "equipment", "AND status != 'retired'", ""),
+    ("'equipment_health_count'", "COUNT(health_score)", "equipment", "AND status != 'retired'", ""),
+    ("'work_orders_total'", "COUNT(*)", "work_orders", "", ""),
+    ("'work_orders_status:' || status", "COUNT(*)", "work_orders", "", ", status"),
+    ("'parts_total'", "COUNT(*)", "parts_inventory", "", ""),
+    ("'parts_low_stock'", "COUNT(*)", "parts_inventory",
+     "AND quantity_in_stock <= minimum_stock_level", ""),
+    ("'parts_low_stock_active'", "COUNT(*)", "parts_inventory",
+     "AND is_active = TRUE AND quantity_in_stock <= minimum_stock_level", ""),
+    ("'users_total'", "COUNT(*)", "users", "", ""),
+]
+
+
+async def reconcile_counters(db: AsyncDatabase, org_id: Optional[str] = None) -> None:
+    """
+    Recompute counters from source tables, replacing whatever drifted.
+
+    Args:
+        db: Database connection
+        org_id: Organization to reconcile (all organizations if None)
+    """
+    started = time.monotonic()
+    now = datetime.utcnow()
+    org_filter = "organization_id = ?" if org_id else "1 = 1"
+    org_params: Tuple[Any, ...] = (org_id,) if org_id else ()
+
+    statements = [(f"DELETE FROM org_counters WHERE {org_filter}", org_params)]
+    for counter, value, table, extra_filter, group_extra in _RECONCILE_SOURCES:
+        statements.append((
+            f"""
+            INSERT INTO org_counters (organization_id, counter, value, updated_at)
+            SELECT organization_id, {counter}, {value}, ?
+            FROM {table}
+            WHERE {org_filter} {extra_filter}
+            GROUP BY organization_id{group_extra}
+            """,
+            (now, *org_params)
+        ))
+    # Mark reconciled (also for organizations with no rows at all)
+    statements.append((
+        f"""
+        INSERT INTO org_counters (organization_id, counter, value, updated_at)
+        SELECT id, ?, ?, ? FROM organizations WHERE {org_filter.replace('organization_id', 'id')}
+        """,
+        (RECONCILED_MARKER, time.time(), now, *org_params)
+    ))
+
+    # One atomic round trip: readers never see a half-rebuilt counter set
+    async with db.transaction():
+        await db.batch(statements)
+
+    logger.info(
+        f"Reconciled org counters for {org_id or 'all organizations'} "
+        f"in {(time.monotonic() - started) * 1000:.0f}ms"
+    )
+
+
+async def reconcile_all_counters() -> None:
+    """Background job: repair counter drift for every organization."""
+    async with async_connection() as db:
+        await reconcile_counters(db)
+
+
+# ===========================================
+# Unread Notification Counters
+# ===========================================
+
+# Rows per multi-row counter upsert (3 parameters each)
+_UNREAD_ROWS_PER_UPSERT = 300
+
+
+def unread_increment_statements(counts: Dict[str, int], now: datetime) -> List[Tuple[str, Tuple]]:
+    """
+    Statements adding `counts` (user_id -> new unread notifications) to the
+    users' counters; batch them with the notification inserts.
+    """
+    items = [(user_id, count) for user_id, count in counts.items() if count]
+    statements = []
+    for start in range(0, len(items), _UNREAD_ROWS_PER_UPSERT):
+        chunk = items[start:start + _UNREAD_ROWS_PER_UPSERT]
+        statements.append((
+            f"""
+            INSERT INTO notification_counters (user_id, unread, updated_at)
+            VALUES {", ".join("(?, ?, ?)" for _ in chunk)}
+            ON CONFLICT (user_id)
+            DO UPDATE SET unread = unread + excluded.unread, updated_at = excluded.updated_at
+            """,
+            tuple(value for user_id, count in chunk for value in (user_id, count, now))
+        ))
+    return statements
+
+
+def mark_read_statements(user_id: str, now: datetime, notification_id: Optional[str] = None) -> List[Tuple[str, Tuple]]:
+    """
+    Mark one notification (or all of a user's) read and update the counter;
+    run the statements together in one batch.
+    """
+    if notification_id is None:
+        return [
+            ("UPDATE notification_counters SET unread = 0, updated_at = ? WHERE user_id = ?", (now, user_id)),
+            (
+                "UPDATE notifications SET is_read = TRUE, read_at = ? WHERE user_id = ? AND is_read = FALSE",
+                (now, user_id)
+            ),
+        ]
+    # The decrement runs first, while the notification still reads as unread
+    return [
+        _unread_decrement_statement(user_id, notification_id, now),
+        (
+            "UPDATE notifications SET is_read = TRUE, read_at = ? WHERE id = ? AND user_id = ? AND is_read = FALSE",
+            (now, notification_id, user_id)
+        ),
+    ]
+
+
+def delete_notification_statements(user_id: str, notification_id: str, now: datetime) -> List[Tuple[str, Tuple]]:
+    """Delete a notification and update the counter; run the statements together in one batch."""
+    return [
+        _unread_decrement_statement(user_id, notification_id, now),
+        ("DELETE FROM notifications WHERE id = ? AND user_id = ?", (notification_id, user_id)),
+    ]
+
+
+def _unread_decrement_statement(user_id: str, notification_id: str, now: datetime) -> Tuple[str, Tuple]:
+    return (
+        """
+        UPDATE notification_counters SET unread = MAX(unread - 1, 0), updated_at = ?
+        WHERE user_id = ? AND EXISTS (
+            SELECT 1 FROM notifications WHERE id = ? AND user_id = ? AND is_read = FALSE
+        )
+        """,
+        (now, user_id, notification_id, user_id)
+    )
+
+
+async def get_unread_counts(db: AsyncDatabase, user_ids: List[str]) -> Dict[str, int]:
+    """Unread notification count per user (from counters; missing means zero)."""
+    if not user_ids:
+        return {}
+    rows = await db.fetch_all(
+        f"SELECT user_id, unread FROM notification_counters WHERE user_id IN ({', '.join('?' for _ in user_ids)})",
+        tuple(user_ids)
+    )
+    counts = {user_id: 0 for user_id in user_ids}
+    counts.update({row[0]: row[1] for row in rows})
+    return counts
+
+
+async def reconcile_unread_counters(db: AsyncDatabase) -> None:
+    """Recompute every user's unread count from notifications, replacing whatever drifted."""
+    started = time.monotonic()
+    async with db.transaction():
+        await db.batch([
+            ("DELETE FROM notification_counters", ()),
+            (
+                """
+                INSERT INTO notification_counters (user_id, unread, updated_at)
+                SELECT user_id, COUNT(*), ? FROM notifications
+                WHERE is_read = FALSE
+                GROUP BY user_id
+                """,
+                (datetime.utcnow(),)
+            ),
+        ])
+
+    logger.info(f"Reconciled unread notification counters in {(time.monotonic() - started) * 1000:.0f}ms")
+
+
+async def reconcile_all_unread_counters() -> None:
+    """Background job: repair unread notification counter drift."""
+    async with async_connection() as db:
+        await reconcile_unread_counters(db)
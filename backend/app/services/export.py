@@ -0,0 +1,131 @@
+"""
+GearGuard Backend - Streaming Export
+Row streaming and CSV/NDJSON encoding for report exports.
+
+Rows are read in keyset-ordered chunks (the same (created_at, id) indexes
+the list endpoints page with) and encoded chunk by chunk, so an export of
+any size holds at most one chunk in memory and never pays for OFFSET.
+"""
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Callable, List, Sequence, Tuple
+import logging
+
+from app.database import async_connection
+
+logger = logging.getLogger(__name__)
+
+CSV = "csv"
+NDJSON = "ndjson"
+
+MEDIA_TYPES = {
+    CSV: "text/csv; charset=utf-8",
+    NDJSON: "application/x-ndjson",
+}
+
+# Leading characters spreadsheets treat as a formula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+# ===========================================
+# Row Streaming
+# ===========================================
+
+def chunk_query(select_sql: str, where_sql: str, sort_columns: Sequence[str], resume: bool) -> str:
+    """Query for the next chunk, resuming after a key when `resume` is set."""
+    order_sql = ", ".join(f"{column} DESC" for column in sort_columns)
+    keyset_sql = f"({', '.join(sort_columns)}) < ({', '.join('?' for _ in sort_columns)})"
+    return f"""
+        {select_sql}
+        WHERE {where_sql} AND {keyset_sql if resume else '1 = 1'}
+        ORDER BY {order_sql}
+        LIMIT ?
+    """
+
+
+async def stream_rows(
+    select_sql: str,
+    where_sql: str,
+    params: Sequence[Any],
+    sort_columns: Sequence[str],
+    key: Callable[[Tuple], Sequence[Any]],
+    chunk_size: int
+) -> AsyncIterator[List[Tuple]]:
+    """
+    Yield every matching row, newest first, in chunks of `chunk_size`.
+
+    Each chunk resumes strictly after the previous chunk's last row, so rows
+    are never repeated even if new rows are written during the export.
+
+    The response body is produced after the endpoint returns, so the stream
+    must not depend on the request-scoped connection. Each chunk is read on
+    a pooled connection that is released before the chunk is yielded, so a
+    slow client never holds a connection while it reads.
+
+    Args:
+        select_sql: "SELECT ... FROM ... [JOIN ...]" without WHERE/ORDER BY
+        where_sql: Filter predicate (its parameters in `params`)
+        sort_columns: Descending sort, ending with a unique tiebreaker (e.g. id)
+        key: Extracts the sort column values from a row
+    """
+    after: Sequence[Any] = ()
+
+    while True:
+        async with async_connection() as db:
+            rows = await db.fetch_all(
+                chunk_query(select_sql, where_sql, sort_columns, bool(after)),
+                (*params, *after, chunk_size)
+            )
+        if not rows:
+            return
+        yield rows
+        if len(rows) < chunk_size:
+            return
+        after = tuple(key(rows[-1]))
+
+
+# ===========================================
+# Encoding
+# ===========================================
+
+def _csv_cell(value: Any) -> Any:
+    """Neutralize cells a spreadsheet would evaluate as formulas."""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+async def encode_csv(columns: Sequence[str], chunks: AsyncIterator[List[Tuple]]) -> AsyncIterator[str]:
+    """Encode row chunks as CSV text, header first, one string per chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columns)
+    yield buffer.getvalue()
+
+    async for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_cell(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+
+
+async def encode_ndjson(columns: Sequence[str], chunks: AsyncIterator[List[Tuple]]) -> AsyncIterator[str]:
+    """Encode row chunks as NDJSON (one object per row), one string per chunk."""
+    async for rows in chunks:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=str, separators=(",", ":")) + "\n"
+            for row in rows
+        )
+
+
+def encode(
+    export_format: str,
+    columns: Sequence[str],
+    chunks: AsyncIterator[List[Tuple]]
+) -> AsyncIterator[str]:
+    """Encoder for `export_format` (CSV or NDJSON)."""
+    if export_format == CSV:
+        return encode_csv(columns, chunks)
+    return encode_ndjson(columns, chunks)
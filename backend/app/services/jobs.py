@@ -0,0 +1,122 @@
+"""
+GearGuard Backend - Background Jobs
+Periodic maintenance tasks run inside the API process.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """
+    Runs an async function every `interval_seconds`.
+
+    Failures are logged and counted; the job keeps its schedule.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval_seconds: float,
+        func: Callable[[], Awaitable[Any]],
+        initial_delay: Optional[float] = None
+    ):
+        self.name = name
+        self.interval = max(0.1, interval_seconds)
+        self.initial_delay = self.interval if initial_delay is None else initial_delay
+        self._func = func
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self._runs = 0
+        self._failures = 0
+        self._last_run_at: Optional[float] = None
+        self._last_duration = 0.0
+        self._last_error: Optional[str] = None
+
+    async def run_once(self) -> None:
+        """Run the job now, recording metrics."""
+        started = time.monotonic()
+        try:
+            await self._func()
+            self._last_error = None
+        except Exception as e:
+            self._failures += 1
+            self._last_error = str(e)
+            logger.exception(f"Background job '{self.name}' failed: {e}")
+        finally:
+            self._runs += 1
+            self._last_run_at = time.time()
+            self._last_duration = time.monotonic() - started
+
+    async def _loop(self) -> None:
+        await asyncio.sleep(self.initial_delay)
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name=f"job:{self.name}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self.interval,
+            "runs": self._runs,
+            "failures": self._failures,
+            "last_run_at": self._last_run_at,
+            "last_duration_ms": round(self._last_duration * 1000, 2),
+            "last_error": self._last_error,
+        }
+
+
+class JobRunner:
+    """Owns the application's periodic jobs for the lifespan of the process."""
+
+    def __init__(self):
+        self._jobs: List[PeriodicJob] = []
+        self._started = False
+
+    def add(self, job: PeriodicJob) -> PeriodicJob:
+        """Register a job; it starts immediately if the runner is running."""
+        self._jobs.append(job)
+        if self._started:
+            job.start()
+        return job
+
+    def start(self) -> None:
+        self._started = True
+        for job in self._jobs:
+            job.start()
+        if self._jobs:
+            logger.info(f"Started background jobs: {', '.join(job.name for job in self._jobs)}")
+
+    async def stop(self) -> None:
+        self._started = False
+        await asyncio.gather(*(job.stop() for job in self._jobs))
+
+    def stats(self) -> Dict[str, Any]:
+        return {job.name: job.stats() for job in self._jobs}
+
+
+_job_runner: Optional[JobRunner] = None
+
+
+def get_job_runner() -> JobRunner:
+    """Get the process-wide job runner."""
+    global _job_runner
+    if _job_runner is None:
+        _job_runner = JobRunner()
+    return _job_runner
@@ -0,0 +1,183 @@
+"""
+GearGuard Backend - Meter Reading Ingestion
+Group commit of meter readings from concurrent ingestion requests.
+
+Requests hand validated readings to the process-wide buffer and wait for
+their acknowledgement. The buffer flushes every
+METER_INGEST_FLUSH_INTERVAL_MS (sooner once METER_INGEST_MAX_BATCH_ROWS are
+pending) with one bulk insert and rollup update in a single commit, then
+one meter trigger evaluation and one replica sync, however many requests
+contributed rows. Readings are acknowledged once committed; a failing
+trigger evaluation is logged and never rejects them.
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from app.config import settings
+from app.database import async_connection
+from app.services.meter_rollups import update_rollups
+from app.services.meter_triggers import MeterReading, evaluate_meter_readings
+from app.services.stats import invalidate_org_stats
+
+logger = logging.getLogger(__name__)
+
+# (id, equipment_id, meter_type, reading_value, recorded_by, recorded_at, notes)
+ReadingRow = Tuple[str, str, str, float, str, Any, Optional[str]]
+
+INSERT_READING_SQL = """
+    INSERT INTO meter_readings (id, equipment_id, meter_type, reading_value, recorded_by, recorded_at, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+async def write_readings(rows: Sequence[ReadingRow]) -> Dict[str, int]:
+    """
+    Insert readings and update rollups in one committed transaction, then
+    evaluate meter triggers in a second one.
+
+    Raises only if the readings were not committed. A trigger evaluation
+    failure is logged and its work orders are left for the next reading of
+    the same meter.
+
+    Returns:
+        Work orders triggered per organization
+    """
+    readings = [MeterReading(row[1], row[2], row[3], row[5]) for row in rows]
+    triggered: Dict[str, int] = {}
+
+    async with async_connection() as db:
+        async with db.transaction():
+            await db.execute_many(INSERT_READING_SQL, rows)
+            await update_rollups(db, readings)
+
+        try:
+            async with db.transaction():
+                triggered = await evaluate_meter_readings(db, readings)
+        except Exception as e:
+            logger.exception(f"Meter trigger evaluation for {len(readings)} readings failed: {e}")
+
+        await db.sync()
+
+    for org_id in triggered:
+        invalidate_org_stats(org_id)
+    return triggered
+
+
+class MeterReadingBuffer:
+    """
+    Collects readings from many requests and writes them in one flush.
+
+    `submit()` returns once the submitted rows are committed, or raises the
+    flush error, so callers only acknowledge durable readings. Flushes run
+    one at a time in submission order.
+    """
+
+    def __init__(self, flush_interval: float, max_rows: int):
+        self.flush_interval = max(0.0, flush_interval)
+        self.max_rows = max(1, max_rows)
+        self._rows: List[ReadingRow] = []
+        self._waiters: List[asyncio.Future] = []
+        self._full = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+
+        # Metrics
+        self._flushes = 0
+        self._failures = 0
+        self._rows_written = 0
+        self._last_flush_rows = 0
+        self._last_flush_duration = 0.0
+
+    async def submit(self, rows: List[ReadingRow]) -> None:
+        """Queue rows and wait until they are committed."""
+        if not rows:
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._rows.extend(rows)
+        self._waiters.append(waiter)
+        if len(self._rows) >= self.max_rows:
+            self._full.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run(), name="meter-ingest-flush")
+
+        await waiter
+
+    async def _run(self) -> None:
+        while self._rows:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write everything pending now and resolve its waiters."""
+        rows, waiters = self._rows, self._waiters
+        self._rows, self._waiters = [], []
+        if not rows:
+            return
+
+        started = time.monotonic()
+        try:
+            await write_readings(rows)
+        except Exception as e:
+            self._failures += 1
+            logger.error(f"Meter reading flush of {len(rows)} rows failed: {e}")
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+        finally:
+            self._flushes += 1
+            self._last_flush_rows = len(rows)
+            self._last_flush_duration = time.monotonic() - started
+
+        self._rows_written += len(rows)
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def close(self) -> None:
+        """Flush what is pending (called on shutdown)."""
+        self._full.set()
+        if self._flusher is not None:
+            await self._flusher
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "flush_interval_ms": round(self.flush_interval * 1000, 2),
+            "max_batch_rows": self.max_rows,
+            "pending_rows": len(self._rows),
+            "flushes": self._flushes,
+            "failures": self._failures,
+            "rows_written": self._rows_written,
+            "avg_rows_per_flush": (
+                round(self._rows_written / (self._flushes - self._failures), 1)
+                if self._flushes > self._failures else 0.0
+            ),
+            "last_flush_rows": self._last_flush_rows,
+            "last_flush_ms": round(self._last_flush_duration * 1000, 2),
+        }
+
+
+_buffer: Optional[MeterReadingBuffer] = None
+
+
+def get_meter_buffer() -> MeterReadingBuffer:
+    """Get the process-wide meter reading buffer."""
+    global _buffer
+    if _buffer is None:
+        _buffer = MeterReadingBuffer(
+            settings.METER_INGEST_FLUSH_INTERVAL_MS / 1000,
+            settings.METER_INGEST_MAX_BATCH_ROWS,
+        )
+    return _buffer
+
+
+def meter_ingest_stats() -> Dict[str, Any]:
+    """Meter reading buffer metrics."""
+    return get_meter_buffer().stats()
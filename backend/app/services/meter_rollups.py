@@ -0,0 +1,227 @@
+"""
+GearGuard Backend - Meter Rollups
+Hourly/daily rollups of meter readings, downsampled series and retention.
+
+Every write path that inserts meter readings calls `update_rollups()` in the
+same transaction, which folds the readings into `meter_rollups` (min, max,
+sum, count and last value per bucket). Series queries read raw readings,
+hourly or daily rollups - whichever is the finest that fits the requested
+point budget - so a year of data costs at most a few hundred rows.
+`compact_meter_data()` drops raw readings and hourly rollups past their
+retention; daily rollups are kept.
+"""
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+import logging
+
+from app.config import settings
+from app.database import AsyncDatabase, async_connection
+from app.services.meter_triggers import MeterReading
+
+logger = logging.getLogger(__name__)
+
+RAW = "raw"
+HOUR = "hour"
+DAY = "day"
+
+
+class MeterPoint(NamedTuple):
+    t: str  # bucket start (or reading time for raw points)
+    min: float
+    max: float
+    avg: float
+    last: float
+    count: int
+
+
+def as_utc_naive(value: datetime) -> datetime:
+    """Timestamps are stored as naive UTC; convert aware datetimes accordingly."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _parse(value: Any) -> datetime:
+    """Timestamp column value (datetime or ISO string) as a datetime."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def bucket_start(value: Any, resolution: str) -> datetime:
+    """Start of the hour or day containing `value`."""
+    moment = _parse(value).replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if resolution == DAY else moment
+
+
+# ===========================================
+# Incremental Maintenance
+# ===========================================
+
+_UPSERT_ROLLUP_SQL = """
+    INSERT INTO meter_rollups (
+        equipment_id, meter_type, resolution, bucket, min_value, max_value,
+        sum_value, sample_count, last_value, last_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (equipment_id, meter_type, resolution, bucket) DO UPDATE SET
+        min_value = MIN(min_value, excluded.min_value),
+        max_value = MAX(max_value, excluded.max_value),
+        sum_value = sum_value + excluded.sum_value,
+        sample_count = sample_count + excluded.sample_count,
+        last_value = CASE WHEN excluded.last_at >= last_at THEN excluded.last_value ELSE last_value END,
+        last_at = MAX(last_at, excluded.last_at)
+"""
+
+
+async def update_rollups(db: AsyncDatabase, readings: Iterable[MeterReading]) -> None:
+    """
+    Fold readings into their hourly and daily buckets (uncommitted; caller commits).
+
+    Readings are pre-aggregated per bucket, so a batch costs one upsert per
+    touched bucket rather than one per reading.
+    """
+    # (equipment, meter, resolution, bucket) -> [min, max, sum, count, last, last_at]
+    buckets: Dict[Tuple[str, str, str, datetime], List[Any]] = {}
+    for reading in readings:
+        recorded_at = _parse(reading.recorded_at)
+        for resolution in (HOUR, DAY):
+            key = (reading.equipment_id, reading.meter_type, resolution, bucket_start(recorded_at, resolution))
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [reading.value, reading.value, reading.value, 1, reading.value, recorded_at]
+                continue
+            bucket[0] = min(bucket[0], reading.value)
+            bucket[1] = max(bucket[1], reading.value)
+            bucket[2] += reading.value
+            bucket[3] += 1
+            if recorded_at >= bucket[5]:
+                bucket[4], bucket[5] = reading.value, recorded_at
+
+    await db.execute_many(_UPSERT_ROLLUP_SQL, [(*key, *values) for key, values in buckets.items()])
+
+
+# ===========================================
+# Series Queries
+# ===========================================
+
+def _merge(points: List[MeterPoint], step: int) -> List[MeterPoint]:
+    """Combine every `step` consecutive points into one."""
+    merged = []
+    for index in range(0, len(points), step):
+        group = points[index:index + step]
+        count = sum(point.count for point in group)
+        merged.append(MeterPoint(
+            t=group[0].t,
+            min=min(point.min for point in group),
+            max=max(point.max for point in group),
+            avg=sum(point.avg * point.count for point in group) / count if count else 0.0,
+            last=group[-1].last,
+            count=count,
+        ))
+    return merged
+
+
+# Raw readings in a window, counted up to a limit (stops reading the index past it)
+RAW_SERIES_COUNT_SQL = """
+    SELECT COUNT(*) FROM (
+        SELECT 1 FROM meter_readings
+        WHERE equipment_id = ? AND meter_type = ? AND recorded_at >= ? AND recorded_at < ?
+        LIMIT ?
+    )
+"""
+
+RAW_SERIES_SQL = """
+    SELECT recorded_at, reading_value FROM meter_readings
+    WHERE equipment_id = ? AND meter_type = ? AND recorded_at >= ? AND recorded_at < ?
+    ORDER BY recorded_at
+"""
+
+ROLLUP_SERIES_SQL = """
+    SELECT bucket, min_value, max_value, sum_value, sample_count, last_value
+    FROM meter_rollups
+    WHERE equipment_id = ? AND meter_type = ? AND resolution = ? AND bucket >= ? AND bucket < ?
+    ORDER BY bucket
+"""
+
+
+async def fetch_series(
+    db: AsyncDatabase,
+    equipment_id: str,
+    meter_type: str,
+    start: datetime,
+    end: datetime,
+    max_points: int
+) -> Tuple[str, List[MeterPoint]]:
+    """
+    Readings of one meter between `start` and `end`, oldest first.
+
+    Uses the finest resolution that fits `max_points` and still has data for
+    the whole window (raw readings and hourly rollups are subject to
+    retention). Daily points are merged further for very long windows.
+
+    Returns:
+        (resolution, points) where resolution is "raw", "hour" or "day"
+    """
+    now = datetime.utcnow()
+    hours = (end - start).total_seconds() / 3600
+
+    raw_covered = start >= now - timedelta(days=settings.METER_RAW_RETENTION_DAYS)
+    if raw_covered:
+        # Bounded count: stops reading the index once the budget is exceeded
+        row = await db.fetch_one(RAW_SERIES_COUNT_SQL, (equipment_id, meter_type, start, end, max_points + 1))
+        if row and row[0] <= max_points:
+            rows = await db.fetch_all(RAW_SERIES_SQL, (equipment_id, meter_type, start, end))
+            return RAW, [MeterPoint(str(r[0]), r[1], r[1], r[1], r[1], 1) for r in rows]
+
+    hourly_covered = start >= now - timedelta(days=settings.METER_HOURLY_RETENTION_DAYS)
+    resolution = HOUR if hours <= max_points and hourly_covered else DAY
+
+    rows = await db.fetch_all(
+        ROLLUP_SERIES_SQL, (equipment_id, meter_type, resolution, bucket_start(start, resolution), end)
+    )
+    points = [
+        MeterPoint(str(r[0]), r[1], r[2], r[3] / r[4] if r[4] else 0.0, r[5], r[4])
+        for r in rows
+    ]
+    if len(points) > max_points:
+        points = _merge(points, math.ceil(len(points) / max_points))
+    return resolution, points
+
+
+# ===========================================
+# Retention
+# ===========================================
+
+async def _delete_before(db: AsyncDatabase, table: str, where_sql: str, params: Tuple) -> int:
+    """Delete matching rows in bounded chunks (each chunk its own transaction)."""
+    deleted = 0
+    while True:
+        async with db.transaction():
+            (result,) = await db.batch([(
+                f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {where_sql} LIMIT ?)",
+                (*params, settings.METER_COMPACTION_BATCH_SIZE)
+            )])
+        affected = result.rows_affected
+        deleted += affected
+        if affected < settings.METER_COMPACTION_BATCH_SIZE:
+            return deleted
+
+
+async def compact_meter_data() -> None:
+    """Background job: drop raw readings and hourly rollups past retention."""
+    now = datetime.utcnow()
+    raw_cutoff = now - timedelta(days=settings.METER_RAW_RETENTION_DAYS)
+    hourly_cutoff = now - timedelta(days=settings.METER_HOURLY_RETENTION_DAYS)
+
+    async with async_connection() as db:
+        readings = await _delete_before(db, "meter_readings", "recorded_at < ?", (raw_cutoff,))
+        hourly = await _delete_before(
+            db, "meter_rollups", "resolution = ? AND bucket < ?", (HOUR, bucket_start(hourly_cutoff, HOUR))
+        )
+        if readings or hourly:
+            await db.sync()
+
+    if readings or hourly:
+        logger.info(f"Meter retention removed {readings} raw readings and {hourly} hourly rollups")
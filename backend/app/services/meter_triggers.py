@@ -0,0 +1,201 @@
+"""
+GearGuard Backend - Meter-based Maintenance Triggers
+Turns meter readings into work orders for meter-based schedules.
+
+A meter-based schedule fires every `meter_threshold` units of a meter
+(`frequency_unit`, e.g. "hours" or "km"; NULL matches any meter of the
+equipment). The meter value at which it last fired is kept in
+`meter_trigger_state`; the first reading after a schedule is created sets
+that baseline.
+
+Readings are evaluated against an in-process index of equipment -> active
+meter-based schedules, so readings for equipment without such schedules
+cost no query at all. Firing reuses the PM generator's claim/insert/CAS
+statements, so concurrent ingestion never creates duplicate work orders.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import logging
+
+from app.config import settings
+from app.core import generate_id
+from app.core.cache import TTLCache
+from app.database import AsyncDatabase
+from app.services.outbox import generated_work_order_event_statement
+from app.services.pm_scheduler import claimed_work_order_statement, record_generated
+
+logger = logging.getLogger(__name__)
+
+
+class MeterReading(NamedTuple):
+    equipment_id: str
+    meter_type: str
+    value: float
+    recorded_at: datetime
+
+
+class MeterSchedule(NamedTuple):
+    id: str
+    organization_id: str
+    meter_type: Optional[str]  # None matches every meter type
+    threshold: float
+
+
+# ===========================================
+# Equipment -> Schedule Index
+# ===========================================
+
+_schedule_index = TTLCache(
+    maxsize=settings.METER_SCHEDULE_CACHE_SIZE,
+    ttl=settings.METER_SCHEDULE_CACHE_TTL_SECONDS,
+)
+
+
+async def meter_schedules_for(db: AsyncDatabase, equipment_id: str) -> List[MeterSchedule]:
+    """Active meter-based schedules of one equipment (cached per equipment)."""
+    cached = _schedule_index.get(equipment_id)
+    if cached is not None:
+        return cached
+
+    rows = await db.fetch_all(
+        """
+        SELECT id, organization_id, frequency_unit, meter_threshold
+        FROM maintenance_schedules
+        WHERE equipment_id = ? AND frequency_type = 'meter_based' AND is_active = TRUE
+          AND meter_threshold > 0
+        """,
+        (equipment_id,)
+    )
+    schedules = [MeterSchedule(row[0], row[1], row[2] or None, float(row[3])) for row in rows]
+    _schedule_index.set(equipment_id, schedules)
+    return schedules
+
+
+def invalidate_meter_schedules(equipment_id: Optional[str] = None) -> None:
+    """Drop cached schedules for one equipment (or all) after a schedule write."""
+    if equipment_id is None:
+        _schedule_index.clear()
+    else:
+        _schedule_index.delete(equipment_id)
+
+
+def meter_schedule_cache_stats() -> Dict[str, Any]:
+    """Equipment -> meter schedule index metrics."""
+    return _schedule_index.stats()
+
+
+# ===========================================
+# Evaluation
+# ===========================================
+
+def _trigger_statements(
+    schedule: MeterSchedule,
+    baseline: float,
+    reading: MeterReading,
+    now: datetime
+) -> Tuple[str, List[Tuple[str, Tuple]]]:
+    """Claim, insert, event and baseline-advance statements for a crossed threshold."""
+    key = f"meter:{schedule.id}:{baseline}"
+    wo_id = generate_id()
+
+    return wo_id, [
+        (
+            """
+            INSERT OR IGNORE INTO pm_generations
+                (idempotency_key, schedule_id, organization_id, due_at, work_order_id, created_at)
+            SELECT ?, s.id, s.organization_id, ?, ?, ?
+            FROM maintenance_schedules s
+            JOIN meter_trigger_state t ON t.schedule_id = s.id
+            WHERE s.id = ? AND s.is_active = TRUE AND t.last_trigger_value = ?
+            """,
+            (key, reading.recorded_at, wo_id, now, schedule.id, baseline)
+        ),
+        claimed_work_order_statement(key, wo_id, now),
+        generated_work_order_event_statement(key, wo_id, now),
+        (
+            """
+            UPDATE meter_trigger_state SET last_trigger_value = ?, updated_at = ?
+            WHERE schedule_id = ? AND last_trigger_value = ?
+            """,
+            (reading.value, now, schedule.id, baseline)
+        ),
+    ]
+
+
+async def evaluate_meter_readings(db: AsyncDatabase, readings: Iterable[MeterReading]) -> Dict[str, int]:
+    """
+    Check readings against meter-based schedule thresholds and generate work orders.
+
+    Runs in the caller's transaction (uncommitted; caller commits). A batch
+    of readings is reduced to the highest value per schedule, so a schedule
+    fires at most once per batch.
+
+    Returns:
+        Work orders created per organization
+    """
+    # Highest matching reading per schedule
+    latest: Dict[str, Tuple[MeterSchedule, MeterReading]] = {}
+    schedules_by_equipment: Dict[str, List[MeterSchedule]] = {}
+    for reading in readings:
+        if reading.equipment_id not in schedules_by_equipment:
+            schedules_by_equipment[reading.equipment_id] = await meter_schedules_for(db, reading.equipment_id)
+        for schedule in schedules_by_equipment[reading.equipment_id]:
+            if schedule.meter_type not in (None, reading.meter_type):
+                continue
+            current = latest.get(schedule.id)
+            if current is None or reading.value > current[1].value:
+                latest[schedule.id] = (schedule, reading)
+
+    if not latest:
+        return {}
+
+    placeholders = ", ".join("?" for _ in latest)
+    baselines = {
+        row[0]: row[1]
+        for row in await db.fetch_all(
+            f"SELECT schedule_id, last_trigger_value FROM meter_trigger_state WHERE schedule_id IN ({placeholders})",
+            tuple(latest)
+        )
+    }
+
+    now = datetime.utcnow()
+    statements: List[Tuple[str, Tuple]] = []
+    candidates: List[Tuple[int, str, str]] = []  # (insert statement index, work order id, organization id)
+    for schedule_id, (schedule, reading) in latest.items():
+        baseline = baselines.get(schedule_id)
+        if baseline is None:
+            # First reading since the schedule was created sets the baseline
+            statements.append((
+                """
+                INSERT OR IGNORE INTO meter_trigger_state (schedule_id, last_trigger_value, updated_at)
+                VALUES (?, ?, ?)
+                """,
+                (schedule_id, reading.value, now)
+            ))
+        elif reading.value < baseline:
+            # Meter was reset or replaced: start counting again from here
+            statements.append((
+                """
+                UPDATE meter_trigger_state SET last_trigger_value = ?, updated_at = ?
+                WHERE schedule_id = ? AND last_trigger_value = ?
+                """,
+                (reading.value, now, schedule_id, baseline)
+            ))
+        elif reading.value - baseline >= schedule.threshold:
+            wo_id, trigger_statements = _trigger_statements(schedule, baseline, reading, now)
+            candidates.append((len(statements) + 1, wo_id, schedule.organization_id))
+            statements.extend(trigger_statements)
+
+    if not statements:
+        return {}
+
+    results = await db.batch(statements)
+    created: Dict[str, List[str]] = {}
+    for index, wo_id, org_id in candidates:
+        if results[index].rows_affected:
+            created.setdefault(org_id, []).append(wo_id)
+    await record_generated(db, created)
+
+    if created:
+        logger.info(f"Meter readings triggered {sum(map(len, created.values()))} preventive work orders")
+    return {org_id: len(wo_ids) for org_id, wo_ids in created.items()}
@@ -0,0 +1,485 @@
+"""
+GearGuard Backend - Event Outbox
+Notification fan-out through an outbox of domain events.
+
+Write paths add an `event_outbox` row in the same transaction as the change
+itself (work order assignment and status changes, generated preventive work
+orders, parts dropping below their minimum stock), so an event exists if
+and only if its change was committed. The `dispatch_notifications` job
+claims pending events under a lease, expands their recipients (users,
+members of teams, holders of roles) with a few batched queries and writes
+all notifications with multi-row inserts, marking the events processed in
+the same transaction.
+
+Delivery is at least once: a worker that dies mid-batch leaves its claim to
+expire and the events are dispatched again, and a worker that outlives its
+lease skips the events claimed by another one in the meantime.
+Notification IDs are derived from (event, recipient), so a repeated
+dispatch inserts nothing twice and does not count them as unread again.
+Events with a `dedup_key` are recorded once however often they are emitted.
+New notifications are also pushed to recipients with an open live update
+stream.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import json
+import logging
+import uuid
+
+from app.config import settings
+from app.core import generate_id
+from app.database import AsyncDatabase, async_connection
+from app.services.counters import unread_increment_statements
+from app.services.pubsub import get_broker, publish_notifications, publish_unread_counts
+
+logger = logging.getLogger(__name__)
+
+WORK_ORDER_ASSIGNED = "work_order_assigned"
+WORK_ORDER_STATUS_CHANGED = "work_order_status_changed"
+PM_DUE = "pm_due"
+PART_LOW_STOCK = "part_low_stock"
+
+# Roles notified about organization-wide events
+MANAGER_ROLES = ("admin", "manager")
+
+# Rows per multi-row notification INSERT (11 parameters each)
+_ROWS_PER_INSERT = 80
+
+# Notification IDs per existence check
+_IDS_PER_LOOKUP = 500
+
+_NOTIFICATION_NAMESPACE = uuid.UUID("5f1d3a52-8a51-4f0e-9a57-2b0c8f3e7d11")
+
+_INSERT_EVENT_SQL = """
+    INSERT OR IGNORE INTO event_outbox
+        (organization_id, event_type, reference_type, reference_id, dedup_key, payload, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+# ===========================================
+# Emitting
+# ===========================================
+
+def event_statement(
+    org_id: str,
+    event_type: str,
+    reference_type: Optional[str],
+    reference_id: Optional[str],
+    title: str,
+    message: str,
+    users: Iterable[Optional[str]] = (),
+    teams: Iterable[Optional[str]] = (),
+    roles: Iterable[str] = (),
+    exclude: Iterable[Optional[str]] = (),
+    priority: str = "normal",
+    action_url: Optional[str] = None,
+    dedup_key: Optional[str] = None,
+    now: Optional[datetime] = None
+) -> Tuple[str, Tuple]:
+    """INSERT of one outbox event (for callers that batch their statements)."""
+    payload = {
+        "title": title,
+        "message": message,
+        "priority": priority,
+        "action_url": action_url,
+        "users": [user_id for user_id in users if user_id],
+        "teams": [team_id for team_id in teams if team_id],
+        "roles": list(roles),
+        "exclude": [user_id for user_id in exclude if user_id],
+    }
+    return _INSERT_EVENT_SQL, (
+        org_id, event_type, reference_type, reference_id, dedup_key,
+        json.dumps(payload), now or datetime.utcnow()
+    )
+
+
+async def emit_event(db: AsyncDatabase, org_id: str, event_type: str, **event: Any) -> None:
+    """Add an event in the caller's transaction (uncommitted; caller commits)."""
+    await db.execute(*event_statement(org_id, event_type, **event))
+
+
+async def emit_work_order_assigned(db: AsyncDatabase, org_id: str, wo_id: str, actor_id: str) -> None:
+    """Tell the assignee (or the assigned team) about a work order; call after the write."""
+    row = await db.fetch_one(
+        """
+        SELECT work_order_number, title, assigned_to, assigned_team_id, priority, updated_at
+        FROM work_orders WHERE id = ? AND organization_id = ?
+        """,
+        (wo_id, org_id)
+    )
+    if not row or not (row[2] or row[3]):
+        return
+
+    await emit_event(
+        db, org_id, WORK_ORDER_ASSIGNED,
+        reference_type="work_order",
+        reference_id=wo_id,
+        title="Work order assigned",
+        message=f"{row[0]}: {row[1]} has been assigned to you",
+        users=[row[2]],
+        teams=[] if row[2] else [row[3]],
+        exclude=[actor_id],
+        priority="high" if row[4] in ("high", "critical") else "normal",
+        action_url="/dashboard/work-orders",
+        dedup_key=f"{WORK_ORDER_ASSIGNED}:{wo_id}:{row[2] or row[3]}:{row[5]}",
+    )
+
+
+async def emit_work_order_status_changed(
+    db: AsyncDatabase,
+    org_id: str,
+    wo_id: str,
+    previous_status: str,
+    actor_id: str
+) -> None:
+    """Tell the requester, creator and assignee about a status change; call after the write."""
+    row = await db.fetch_one(
+        """
+        SELECT work_order_number, title, status, assigned_to, created_by, requested_by, updated_at
+        FROM work_orders WHERE id = ? AND organization_id = ?
+        """,
+        (wo_id, org_id)
+    )
+    if not row or row[2] == previous_status:
+        return
+
+    status_name = str(row[2]).replace("_", " ")
+    await emit_event(
+        db, org_id, WORK_ORDER_STATUS_CHANGED,
+        reference_type="work_order",
+        reference_id=wo_id,
+        title=f"Work order {status_name}",
+        message=f"{row[0]}: {row[1]} is now {status_name}",
+        users=[row[3], row[4], row[5]],
+        exclude=[actor_id],
+        action_url="/dashboard/work-orders",
+        dedup_key=f"{WORK_ORDER_STATUS_CHANGED}:{wo_id}:{row[2]}:{row[6]}",
+    )
+
+
+def generated_work_order_event_statement(key: str, wo_id: str, now: datetime) -> Tuple[str, Tuple]:
+    """
+    Event for a preventive work order generated under a `pm_generations` key.
+
+    Conditional on the claim like the work order insert itself, so only the
+    worker that created the work order records the event. Notifies the
+    assignee, or the organization's managers when there is none.
+    """
+    return (
+        """
+        INSERT OR IGNORE INTO event_outbox
+            (organization_id, event_type, reference_type, reference_id, dedup_key, payload, created_at)
+        SELECT w.organization_id, ?, 'work_order', w.id, g.idempotency_key,
+               json_object(
+                   'title', 'Preventive maintenance due',
+                   'message', w.work_order_number || ': ' || w.title || ' is due',
+                   'priority', CASE WHEN w.priority IN ('high', 'critical') THEN 'high' ELSE 'normal' END,
+                   'action_url', '/dashboard/work-orders',
+                   'users', json(CASE WHEN w.assigned_to IS NULL THEN '[]' ELSE json_array(w.assigned_to) END),
+                   'teams', json_array(),
+                   'roles', json(CASE WHEN w.assigned_to IS NULL THEN json_array(?, ?) ELSE '[]' END),
+                   'exclude', json_array()
+               ),
+               ?
+        FROM pm_generations g
+        JOIN work_orders w ON w.id = g.work_order_id
+        WHERE g.idempotency_key = ? AND g.work_order_id = ?
+        """,
+        (PM_DUE, *MANAGER_ROLES, now, key, wo_id)
+    )
+
+
+def low_stock_event_statement(org_id: str, part_id: str, quantity_change: int, now: datetime) -> Tuple[str, Tuple]:
+    """
+    Event for a part whose stock change of `quantity_change` took it to or
+    below its minimum level; run after the stock update. At most one per
+    part per day.
+    """
+    return (
+        """
+        INSERT OR IGNORE INTO event_outbox
+            (organization_id, event_type, reference_type, reference_id, dedup_key, payload, created_at)
+        SELECT organization_id, ?, 'part', id, ?,
+               json_object(
+                   'title', 'Part low on stock',
+                   'message', name || ' is down to ' || quantity_in_stock || ' (minimum ' || minimum_stock_level || ')',
+                   'priority', 'high',
+                   'action_url', '/dashboard/parts/' || id,
+                   'users', json_array(),
+                   'teams', json_array(),
+                   'roles', json_array(?, ?),
+                   'exclude', json_array()
+               ),
+               ?
+        FROM parts_inventory
+        WHERE id = ? AND organization_id = ? AND is_active = TRUE
+          AND quantity_in_stock <= minimum_stock_level
+          AND quantity_in_stock - ? > minimum_stock_level
+        """,
+        (
+            PART_LOW_STOCK, f"{PART_LOW_STOCK}:{part_id}:{now.date().isoformat()}",
+            *MANAGER_ROLES, now, part_id, org_id, quantity_change
+        )
+    )
+
+
+# ===========================================
+# Dispatching
+# ===========================================
+
+def notification_id(event_id: int, user_id: str) -> str:
+    """Stable notification ID per (event, recipient), so redelivery is a no-op."""
+    return uuid.uuid5(_NOTIFICATION_NAMESPACE, f"{event_id}:{user_id}").hex
+
+
+def _placeholders(values: Sequence) -> str:
+    return ", ".join("?" for _ in values)
+
+
+async def _resolve_recipients(db: AsyncDatabase, events: List[Tuple[Any, ...]]) -> Dict[int, List[str]]:
+    """
+    Recipients of each event: active users of the event's organization named
+    directly, through a team, or through a role (minus `exclude`).
+    """
+    users: Set[str] = set()
+    teams: Set[str] = set()
+    role_orgs: Set[str] = set()
+    roles: Set[str] = set()
+    for _, org_id, _, _, _, payload in events:
+        users.update(payload.get("users", []))
+        teams.update(payload.get("teams", []))
+        if payload.get("roles"):
+            role_orgs.add(org_id)
+            roles.update(payload["roles"])
+
+    active_users: Dict[str, str] = {}  # user_id -> organization_id
+    if users:
+        user_list = list(users)
+        rows = await db.fetch_all(
+            f"SELECT id, organization_id FROM users WHERE id IN ({_placeholders(user_list)}) AND is_active = TRUE",
+            tuple(user_list)
+        )
+        active_users = {row[0]: row[1] for row in rows}
+
+    team_members: Dict[str, List[Tuple[str, str]]] = {}
+    if teams:
+        team_list = list(teams)
+        rows = await db.fetch_all(
+            f"""
+            SELECT tm.team_id, u.id, u.organization_id
+            FROM team_members tm
+            JOIN users u ON u.id = tm.user_id
+            WHERE tm.team_id IN ({_placeholders(team_list)}) AND u.is_active = TRUE
+            """,
+            tuple(team_list)
+        )
+        for team_id, user_id, org_id in rows:
+            team_members.setdefault(team_id, []).append((user_id, org_id))
+
+    role_holders: Dict[Tuple[str, str], List[str]] = {}
+    if roles:
+        org_list, role_list = list(role_orgs), list(roles)
+        rows = await db.fetch_all(
+            f"""
+            SELECT u.organization_id, r.name, u.id
+            FROM users u
+            JOIN roles r ON r.id = u.role_id
+            WHERE u.organization_id IN ({_placeholders(org_list)})
+              AND r.name IN ({_placeholders(role_list)}) AND u.is_active = TRUE
+            """,
+            (*org_list, *role_list)
+        )
+        for org_id, role, user_id in rows:
+            role_holders.setdefault((org_id, role), []).append(user_id)
+
+    recipients: Dict[int, List[str]] = {}
+    for event_id, org_id, _, _, _, payload in events:
+        chosen: Dict[str, None] = {}  # ordered set
+        for user_id in payload.get("users", []):
+            if active_users.get(user_id) == org_id:
+                chosen[user_id] = None
+        for team_id in payload.get("teams", []):
+            for user_id, member_org in team_members.get(team_id, []):
+                if member_org == org_id:
+                    chosen[user_id] = None
+        for role in payload.get("roles", []):
+            for user_id in role_holders.get((org_id, role), []):
+                chosen[user_id] = None
+        for user_id in payload.get("exclude", []):
+            chosen.pop(user_id, None)
+        recipients[event_id] = list(chosen)
+    return recipients
+
+
+def _notification_statements(rows: List[Tuple]) -> List[Tuple[str, Tuple]]:
+    """Multi-row INSERT OR IGNORE statements for notification rows."""
+    statements = []
+    for start in range(0, len(rows), _ROWS_PER_INSERT):
+        chunk = rows[start:start + _ROWS_PER_INSERT]
+        values = ", ".join("(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)" for _ in chunk)
+        statements.append((
+            f"""
+            INSERT OR IGNORE INTO notifications (
+                id, user_id, organization_id, type, title, message,
+                reference_type, reference_id, priority, action_url, created_at
+            )
+            VALUES {values}
+            """,
+            tuple(value for row in chunk for value in row)
+        ))
+    return statements
+
+
+async def _existing_notification_ids(db: AsyncDatabase, ids: Sequence[str]) -> Set[str]:
+    """IDs among `ids` already written, i.e. notifications of redelivered events."""
+    existing: Set[str] = set()
+    for start in range(0, len(ids), _IDS_PER_LOOKUP):
+        chunk = ids[start:start + _IDS_PER_LOOKUP]
+        rows = await db.fetch_all(
+            f"SELECT id FROM notifications WHERE id IN ({_placeholders(chunk)})", tuple(chunk)
+        )
+        existing.update(row[0] for row in rows)
+    return existing
+
+
+# Events claimed by one dispatcher run, in insertion order
+CLAIMED_EVENTS_SQL = """
+    SELECT id, organization_id, event_type, reference_type, reference_id, payload
+    FROM event_outbox WHERE claim_token = ?
+    ORDER BY id
+"""
+
+
+async def dispatch_batch(db: AsyncDatabase, now: datetime, limit: int) -> Tuple[int, int]:
+    """
+    Claim up to `limit` pending events and write their notifications.
+
+    Returns:
+        (events claimed, notifications written)
+    """
+    token = generate_id()
+    lease_until = now + timedelta(seconds=settings.NOTIFICATION_DISPATCH_LEASE_SECONDS)
+    async with db.transaction():
+        await db.batch([(
+            """
+            UPDATE event_outbox SET claim_token = ?, claimed_until = ?, attempts = attempts + 1
+            WHERE id IN (
+                SELECT id FROM event_outbox
+                WHERE processed_at IS NULL AND attempts < ?
+                  AND (claimed_until IS NULL OR claimed_until < ?)
+                ORDER BY id
+                LIMIT ?
+            )
+            """,
+            (token, lease_until, settings.NOTIFICATION_MAX_ATTEMPTS, now, limit)
+        )])
+
+    rows = await db.fetch_all(CLAIMED_EVENTS_SQL, (token,))
+    if not rows:
+        return 0, 0
+
+    events = [(row[0], row[1], row[2], row[3], row[4], json.loads(row[5])) for row in rows]
+    recipients = await _resolve_recipients(db, events)
+
+    async with db.transaction():
+        # A run that outlived its lease may have lost events to another
+        # dispatcher, which delivers them; write only the events still held.
+        # (The HTTP client commits every statement on its own, so there the
+        # check narrows the window rather than closing it.)
+        await db.begin_write()
+        held = {row[0] for row in await db.fetch_all("SELECT id FROM event_outbox WHERE claim_token = ?", (token,))}
+
+        notifications = []
+        for event_id, org_id, event_type, reference_type, reference_id, payload in events:
+            if event_id not in held:
+                continue
+            for user_id in recipients[event_id]:
+                notifications.append((
+                    notification_id(event_id, user_id), user_id, org_id, event_type,
+                    payload.get("title", event_type), payload.get("message", ""),
+                    reference_type, reference_id, payload.get("priority") or "normal",
+                    payload.get("action_url"), now
+                ))
+
+        # Only count (and push) what this run inserts: a redelivered event's
+        # notifications are already written and counted
+        existing = await _existing_notification_ids(db, [row[0] for row in notifications])
+        notifications = [row for row in notifications if row[0] not in existing]
+
+        unread: Dict[str, int] = {}
+        for row in notifications:
+            unread[row[1]] = unread.get(row[1], 0) + 1
+
+        statements = _notification_statements(notifications)
+        statements.extend(unread_increment_statements(unread, now))
+        statements.append((
+            "UPDATE event_outbox SET processed_at = ?, claim_token = NULL WHERE claim_token = ?",
+            (now, token)
+        ))
+        await db.batch(statements)
+
+    await _publish(db, notifications)
+    return len(events), len(notifications)
+
+
+async def _publish(db: AsyncDatabase, notifications: List[Tuple]) -> None:
+    """Push notifications written by `dispatch_batch` to recipients with an open stream."""
+    subscribed = set(get_broker().subscribed_users(row[1] for row in notifications))
+    if not subscribed:
+        return
+    publish_notifications(
+        {
+            "id": row[0], "type": row[3], "title": row[4], "message": row[5],
+            "reference_type": row[6], "reference_id": row[7], "priority": row[8],
+            "is_read": False, "action_url": row[9], "created_at": str(row[10]),
+            "user_id": row[1],
+        }
+        for row in notifications if row[1] in subscribed
+    )
+    await publish_unread_counts(db, subscribed)
+
+
+async def _purge_processed(db: AsyncDatabase, now: datetime) -> int:
+    cutoff = now - timedelta(days=settings.NOTIFICATION_OUTBOX_RETENTION_DAYS)
+    async with db.transaction():
+        (result,) = await db.batch([(
+            """
+            DELETE FROM event_outbox WHERE id IN (
+                SELECT id FROM event_outbox WHERE processed_at < ? LIMIT ?
+            )
+            """,
+            (cutoff, settings.NOTIFICATION_DISPATCH_BATCH_SIZE)
+        )])
+    return result.rows_affected
+
+
+async def dispatch_notifications(now: Optional[datetime] = None) -> int:
+    """
+    Background job: turn pending outbox events into notifications.
+
+    Works in batches of NOTIFICATION_DISPATCH_BATCH_SIZE events, at most
+    NOTIFICATION_DISPATCH_MAX_BATCHES per run, then drops one batch of
+    processed events past NOTIFICATION_OUTBOX_RETENTION_DAYS.
+
+    Returns:
+        Number of notifications written by this worker
+    """
+    now = now or datetime.utcnow()
+    events = written = 0
+
+    async with async_connection() as db:
+        for _ in range(settings.NOTIFICATION_DISPATCH_MAX_BATCHES):
+            claimed, delivered = await dispatch_batch(db, now, settings.NOTIFICATION_DISPATCH_BATCH_SIZE)
+            events += claimed
+            written += delivered
+            if claimed < settings.NOTIFICATION_DISPATCH_BATCH_SIZE:
+                break
+
+        purged = await _purge_processed(db, now)
+        if events or purged:
+            await db.sync()
+
+    if events:
+        logger.info(f"Dispatched {events} events as {written} notifications")
+    return written
@@ -0,0 +1,265 @@
+"""
+GearGuard Backend - Preventive Maintenance Generator
+Background generation of work orders for due maintenance schedules.
+
+Each run scans active, time-based schedules by `next_due` and generates one
+work order per due instance. Every instance is claimed through an
+idempotency key in `pm_generations` and the schedule's `next_due` is
+advanced with a compare-and-set in the same atomic batch, so any number of
+API workers can run the job concurrently without duplicating work orders.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from app.config import settings
+from app.core import generate_id, generate_work_order_number
+from app.database import AsyncDatabase, async_connection
+from app.services.assignment import SAME_LOCATION, WorkOrderLoad, pick_assignee, release_assignee, track_workload
+from app.services.counters import count_inserted_rows
+from app.services.outbox import generated_work_order_event_statement
+from app.services.recurrence import (
+    ALWAYS_OPEN, BusinessCalendar, Recurrence, load_business_calendars, next_due_after,
+)
+from app.services.search import WORK_ORDER, index_documents
+from app.services.stats import invalidate_org_stats
+
+logger = logging.getLogger(__name__)
+
+# Statements per schedule in a generation batch (claim, insert, event, advance)
+_STATEMENTS_PER_SCHEDULE = 4
+
+# Due time-based schedules across every organization, oldest first
+DUE_SCHEDULES_SQL = """
+    SELECT id, organization_id, next_due, frequency_type, frequency_value, frequency_unit,
+           equipment_id, assigned_to, estimated_duration_minutes
+    FROM maintenance_schedules
+    WHERE is_active = TRUE AND frequency_type != 'meter_based' AND next_due <= ?
+    ORDER BY next_due
+    LIMIT ?
+"""
+
+
+def _as_datetime(value: Any) -> datetime:
+    """Timestamp column value (datetime or ISO string) as a datetime."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+# ===========================================
+# Generation
+# ===========================================
+
+def claimed_work_order_statement(
+    key: str,
+    wo_id: str,
+    now: datetime,
+    assigned_to: Optional[str] = None,
+    created_by: Optional[str] = None
+) -> Tuple[str, Tuple]:
+    """
+    INSERT of the preventive work order for a claimed `pm_generations` key.
+
+    Inserts nothing unless the key was claimed for this `wo_id`, so a losing
+    concurrent claim (or a replay) never produces a second work order. The
+    schedule's assignee takes precedence over `assigned_to`; `created_by`
+    (default: the schedule's creator) records who asked for it.
+    """
+    wo_number = generate_work_order_number(wo_id, now)
+    return (
+        """
+        INSERT INTO work_orders (
+            id, organization_id, equipment_id, schedule_id, work_order_number,
+            title, description, type, status, priority, assigned_to,
+            estimated_hours, checklist_template_id, due_date, created_by,
+            created_at, updated_at
+        )
+        SELECT ?, s.organization_id, s.equipment_id, s.id, ?,
+               'PM: ' || s.name, s.description, 'preventive', 'pending', s.priority,
+               COALESCE(s.assigned_to, ?), COALESCE(s.estimated_duration_minutes, 60) / 60.0,
+               s.checklist_template_id, g.due_at, COALESCE(?, s.created_by), ?, ?
+        FROM pm_generations g
+        JOIN maintenance_schedules s ON s.id = g.schedule_id
+        WHERE g.idempotency_key = ? AND g.work_order_id = ?
+        """,
+        (wo_id, wo_number, assigned_to, created_by, now, now, key, wo_id)
+    )
+
+
+async def record_generated(db: AsyncDatabase, created: Dict[str, List[str]]) -> None:
+    """Counters and search documents for generated work orders (organization -> ids)."""
+    for org_id, wo_ids in created.items():
+        await count_inserted_rows(db, "work_orders", org_id, [("pending",)] * len(wo_ids))
+        await index_documents(db, WORK_ORDER, wo_ids)
+
+
+def generation_key(schedule_id: str, next_due: Any) -> str:
+    """Idempotency key of one due instance of a schedule."""
+    return f"pm:{schedule_id}:{next_due}"
+
+
+def generation_statements(
+    schedule: Tuple,
+    now: datetime,
+    business_calendar: BusinessCalendar = ALWAYS_OPEN,
+    assigned_to: Optional[str] = None,
+    created_by: Optional[str] = None
+) -> Tuple[str, List[Tuple[str, Tuple]]]:
+    """
+    Claim, insert, event and advance statements for one due schedule.
+
+    Every statement is conditional on the claim, so a schedule another worker
+    already handled (or that changed since it was read) is a no-op. The work
+    order is due on the first working day at or after `next_due`. Used by
+    the background job and by manual generation alike.
+
+    Args:
+        schedule: (id, next_due as stored, frequency_type, frequency_value, frequency_unit)
+
+    Returns:
+        (work order id, statements); the insert is statement 1
+    """
+    schedule_id, next_due, frequency_type, frequency_value, frequency_unit = schedule
+    due = _as_datetime(next_due)
+    rule = Recurrence.for_schedule(frequency_type, frequency_value, frequency_unit)
+    key = generation_key(schedule_id, next_due)
+    wo_id = generate_id()
+
+    return wo_id, [
+        (
+            """
+            INSERT OR IGNORE INTO pm_generations
+                (idempotency_key, schedule_id, organization_id, due_at, work_order_id, created_at)
+            SELECT ?, id, organization_id, ?, ?, ?
+            FROM maintenance_schedules
+            WHERE id = ? AND next_due = ? AND is_active = TRUE
+            """,
+            (key, business_calendar.roll_forward(due), wo_id, now, schedule_id, next_due)
+        ),
+        claimed_work_order_statement(key, wo_id, now, assigned_to, created_by),
+        generated_work_order_event_statement(key, wo_id, now),
+        (
+            "UPDATE maintenance_schedules SET next_due = ?, updated_at = ? WHERE id = ? AND next_due = ?",
+            (next_due_after(rule, due, now, business_calendar), now, schedule_id, next_due)
+        ),
+    ]
+
+
+def _estimated_hours(duration_minutes: Optional[int]) -> float:
+    return (duration_minutes or 60) / 60
+
+
+async def _auto_assignees(db: AsyncDatabase, due: List[Tuple]) -> List[Optional[str]]:
+    """
+    Assignees picked by PM_AUTO_ASSIGN_POLICY for due schedules without one
+    (None where the schedule has an assignee or auto-assignment is off).
+    """
+    policy = settings.PM_AUTO_ASSIGN_POLICY
+    if not policy:
+        return [None] * len(due)
+
+    locations: Dict[str, Optional[str]] = {}
+    unassigned_equipment = list({row[6] for row in due if not row[7]})
+    if policy == SAME_LOCATION and unassigned_equipment:
+        placeholders = ", ".join("?" for _ in unassigned_equipment)
+        rows = await db.fetch_all(
+            f"SELECT id, location_id FROM equipment WHERE id IN ({placeholders})",
+            tuple(unassigned_equipment)
+        )
+        locations = {row[0]: row[1] for row in rows}
+
+    assignees: List[Optional[str]] = []
+    for row in due:
+        if row[7]:
+            assignees.append(None)
+            continue
+        assignees.append(await pick_assignee(
+            db, row[1], policy, estimated_hours=_estimated_hours(row[8]), location_id=locations.get(row[6])
+        ))
+    return assignees
+
+
+async def generate_due_batch(db: AsyncDatabase, now: datetime, limit: int) -> Tuple[int, Dict[str, int]]:
+    """
+    Generate work orders for up to `limit` schedules due at `now`.
+
+    Returns:
+        (schedules scanned, work orders created per organization)
+    """
+    due = await db.fetch_all(DUE_SCHEDULES_SQL, (now, limit))
+    if not due:
+        return 0, {}
+
+    calendars = await load_business_calendars(db, (row[1] for row in due))
+    assignees = await _auto_assignees(db, due)
+
+    statements: List[Tuple[str, Tuple]] = []
+    candidates: List[Tuple[str, str]] = []  # (work order id, organization id)
+    for row, assigned_to in zip(due, assignees):
+        schedule_id, org_id, next_due, frequency_type, frequency_value, frequency_unit = row[:6]
+        wo_id, schedule_statements = generation_statements(
+            (schedule_id, next_due, frequency_type, frequency_value, frequency_unit),
+            now, calendars[org_id], assigned_to
+        )
+        statements.extend(schedule_statements)
+        candidates.append((wo_id, org_id))
+
+    created: Dict[str, List[str]] = {}
+    try:
+        async with db.transaction():
+            results = await db.batch(statements)
+            for index, (wo_id, org_id) in enumerate(candidates):
+                if results[index * _STATEMENTS_PER_SCHEDULE + 1].rows_affected:
+                    created.setdefault(org_id, []).append(wo_id)
+
+            await record_generated(db, created)
+    except Exception:
+        created = {}
+        raise
+    finally:
+        # Give back load reserved for work orders this worker did not create, and
+        # count the ones assigned by their schedule
+        created_ids = {wo_id for wo_ids in created.values() for wo_id in wo_ids}
+        for row, assigned_to, (wo_id, org_id) in zip(due, assignees, candidates):
+            if assigned_to and wo_id not in created_ids:
+                release_assignee(org_id, assigned_to, _estimated_hours(row[8]))
+            elif row[7] and wo_id in created_ids:
+                track_workload(org_id, None, WorkOrderLoad(row[7], _estimated_hours(row[8]), "pending"))
+
+    return len(due), {org_id: len(wo_ids) for org_id, wo_ids in created.items()}
+
+
+async def generate_due_work_orders(now: Optional[datetime] = None) -> int:
+    """
+    Background job: generate work orders for every due PM schedule.
+
+    Works through due schedules in batches of PM_GENERATION_BATCH_SIZE, at
+    most PM_GENERATION_MAX_BATCHES per run; anything left is picked up by
+    the next run.
+
+    Returns:
+        Number of work orders created by this worker
+    """
+    now = now or datetime.utcnow()
+    per_org: Counter = Counter()
+
+    async with async_connection() as db:
+        for _ in range(settings.PM_GENERATION_MAX_BATCHES):
+            scanned, created = await generate_due_batch(db, now, settings.PM_GENERATION_BATCH_SIZE)
+            per_org.update(created)
+            # Stop when the backlog is drained or every due row was claimed elsewhere
+            if scanned < settings.PM_GENERATION_BATCH_SIZE or not created:
+                break
+
+        if per_org:
+            await db.sync()
+
+    for org_id in per_org:
+        invalidate_org_stats(org_id)
+
+    total = sum(per_org.values())
+    if total:
+        logger.info(f"Generated {total} preventive work orders for {len(per_org)} organizations")
+    return total
@@ -0,0 +1,234 @@
+"""
+GearGuard Backend - Live Updates
+In-process publish/subscribe behind the server-sent events stream.
+
+Each open stream holds one `Subscription`, registered under its user and
+organization. Publishers (the notification dispatcher, notification and
+work order endpoints) hand events to the subscriptions of a user or an
+organization; nothing is stored or queried when nobody is listening.
+
+Memory per connection is bounded: at most STREAM_QUEUE_SIZE events wait
+for a slow client, unread counts are coalesced to the latest value, and a
+queue that overflows is replaced by a single `resync` event telling the
+client to refetch. Idle connections hold no buffered events and wake up
+only for heartbeats.
+
+Events reach connections of the process that published them. With several
+workers, a client connected elsewhere catches up on its next reconnect or
+`resync`.
+"""
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+from app.config import settings
+from app.database import AsyncDatabase
+from app.services.counters import get_unread_counts
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION = "notification"
+UNREAD_COUNT = "unread_count"
+WORK_ORDER = "work_order"
+RESYNC = "resync"
+
+
+class StreamLimitError(Exception):
+    """Raised when a user or the process has no stream connections left."""
+    pass
+
+
+# ===========================================
+# Subscriptions
+# ===========================================
+
+class Subscription:
+    """Pending events of one stream connection."""
+
+    __slots__ = ("org_id", "user_id", "work_orders", "closed", "_events", "_unread", "_overflowed", "_wakeup")
+
+    def __init__(self, org_id: str, user_id: str, work_orders: bool = True):
+        self.org_id = org_id
+        self.user_id = user_id
+        self.work_orders = work_orders  # receives organization-wide work order events
+        self.closed = False
+        self._events: Deque[Tuple[str, Dict[str, Any]]] = deque()
+        self._unread: Optional[int] = None
+        self._overflowed = False
+        self._wakeup = asyncio.Event()
+
+    def put(self, event: str, data: Dict[str, Any]) -> None:
+        """Queue an event; on overflow drop the backlog in favour of `resync`."""
+        if self._overflowed:
+            return
+        if len(self._events) >= settings.STREAM_QUEUE_SIZE:
+            self._events.clear()
+            self._overflowed = True
+        else:
+            self._events.append((event, data))
+        self._wakeup.set()
+
+    def set_unread(self, count: int) -> None:
+        """Replace any undelivered unread count with `count`."""
+        self._unread = count
+        self._wakeup.set()
+
+    def close(self) -> None:
+        """End the stream after the events already queued."""
+        self.closed = True
+        self._wakeup.set()
+
+    async def next_events(self, timeout: float) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Wait up to `timeout` seconds for events and take all that are pending.
+
+        Returns:
+            (event, data) pairs; empty if the wait timed out
+        """
+        if not self._wakeup.is_set():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._wakeup.clear()
+
+        if self._overflowed:
+            events = [(RESYNC, {})]
+            self._overflowed = False
+        else:
+            events = list(self._events)
+        self._events.clear()
+        if self._unread is not None:
+            events.append((UNREAD_COUNT, {"unread_count": self._unread}))
+            self._unread = None
+        return events
+
+
+# ===========================================
+# Broker
+# ===========================================
+
+class Broker:
+    """Subscriptions of this process by user and organization."""
+
+    def __init__(self):
+        self._by_user: Dict[str, Set[Subscription]] = {}
+        self._by_org: Dict[str, Set[Subscription]] = {}
+        self._connections = 0
+        self._published = 0
+        self._rejected = 0
+
+    def subscribe(self, org_id: str, user_id: str, work_orders: bool = True) -> Subscription:
+        """
+        Register a stream connection.
+
+        Raises:
+            StreamLimitError: If the user or the process is at its connection limit
+        """
+        if (
+            self._connections >= settings.STREAM_MAX_CONNECTIONS
+            or len(self._by_user.get(user_id, ())) >= settings.STREAM_MAX_CONNECTIONS_PER_USER
+        ):
+            self._rejected += 1
+            raise StreamLimitError("Too many open streams")
+
+        subscription = Subscription(org_id, user_id, work_orders)
+        self._by_user.setdefault(user_id, set()).add(subscription)
+        self._by_org.setdefault(org_id, set()).add(subscription)
+        self._connections += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Forget a connection (safe to call more than once)."""
+        for index, key in ((self._by_user, subscription.user_id), (self._by_org, subscription.org_id)):
+            subscriptions = index.get(key)
+            if subscriptions is None or subscription not in subscriptions:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del index[key]
+        self._connections -= 1
+
+    def subscribed_users(self, user_ids: Iterable[str]) -> List[str]:
+        """The given users that have at least one open stream."""
+        return [user_id for user_id in dict.fromkeys(user_ids) if user_id in self._by_user]
+
+    def publish_to_user(self, user_id: str, event: str, data: Dict[str, Any]) -> None:
+        for subscription in self._by_user.get(user_id, ()):
+            subscription.put(event, data)
+            self._published += 1
+
+    def publish_work_order(self, org_id: str, data: Dict[str, Any]) -> None:
+        for subscription in self._by_org.get(org_id, ()):
+            if subscription.work_orders:
+                subscription.put(WORK_ORDER, data)
+                self._published += 1
+
+    def set_unread(self, user_id: str, count: int) -> None:
+        for subscription in self._by_user.get(user_id, ()):
+            subscription.set_unread(count)
+
+    def close_all(self) -> None:
+        for subscriptions in list(self._by_user.values()):
+            for subscription in subscriptions:
+                subscription.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections": self._connections,
+            "users": len(self._by_user),
+            "organizations": len(self._by_org),
+            "events_published": self._published,
+            "rejected_connections": self._rejected,
+        }
+
+
+_broker = Broker()
+
+
+def get_broker() -> Broker:
+    """Process-wide stream broker."""
+    return _broker
+
+
+def stream_stats() -> Dict[str, Any]:
+    """Live update stream metrics."""
+    return _broker.stats()
+
+
+# ===========================================
+# Publishing
+# ===========================================
+
+async def publish_unread_counts(db: AsyncDatabase, user_ids: Iterable[str]) -> None:
+    """Push fresh unread counts to those of `user_ids` with an open stream."""
+    subscribed = _broker.subscribed_users(user_ids)
+    if not subscribed:
+        return
+    for user_id, count in (await get_unread_counts(db, subscribed)).items():
+        _broker.set_unread(user_id, count)
+
+
+def publish_notifications(notifications: Iterable[Dict[str, Any]]) -> None:
+    """Push newly written notifications (dicts with `user_id`) to their recipients."""
+    for notification in notifications:
+        _broker.publish_to_user(notification["user_id"], NOTIFICATION, notification)
+
+
+def publish_work_order_status(
+    org_id: str,
+    wo_id: str,
+    status: str,
+    previous_status: Optional[str],
+    updated_by: Optional[str],
+    updated_at: Any
+) -> None:
+    """Push a work order status change to the organization's streams."""
+    _broker.publish_work_order(org_id, {
+        "id": wo_id,
+        "status": status,
+        "previous_status": previous_status,
+        "updated_by": updated_by,
+        "updated_at": str(updated_at),
+    })
@@ -0,0 +1,251 @@
+"""
+GearGuard Backend - Schedule Recurrence
+Calendar-correct due dates for time-based maintenance schedules.
+
+A schedule recurs every `frequency_value` units: the unit follows from
+`frequency_type` (daily, weekly, monthly, yearly), or from `frequency_unit`
+(hours, days, weeks, months, years) for `custom` schedules. Month and year
+steps are true calendar steps; a day that does not exist in the target month
+is clamped to its last day (Jan 31 + 1 month = Feb 28).
+
+Occurrences are always computed from an anchor (`anchor + n * interval`),
+and the first one at or after a given moment is found arithmetically, so
+expanding a schedule over a window never walks through its history one
+step at a time.
+
+An organization's business calendar (working weekdays and holidays, kept
+under `business_calendar` in `organizations.settings`) moves occurrences
+that fall on a non-working day to the next working day.
+"""
+import calendar
+import json
+import math
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, NamedTuple, Optional
+import logging
+
+from app.database import AsyncDatabase
+
+logger = logging.getLogger(__name__)
+
+HOURS = "hours"
+DAYS = "days"
+WEEKS = "weeks"
+MONTHS = "months"
+YEARS = "years"
+
+INTERVAL_UNITS = (HOURS, DAYS, WEEKS, MONTHS, YEARS)
+
+_FREQUENCY_UNITS = {
+    "daily": DAYS,
+    "weekly": WEEKS,
+    "monthly": MONTHS,
+    "yearly": YEARS,
+}
+
+_FIXED_STEPS = {
+    HOURS: timedelta(hours=1),
+    DAYS: timedelta(days=1),
+    WEEKS: timedelta(weeks=1),
+}
+
+# Longest run of non-working days a calendar may produce
+_MAX_ROLL_DAYS = 366
+
+
+def normalize_unit(unit: Optional[str]) -> Optional[str]:
+    """Interval unit name ("Month", "months" -> "months"), or None if unknown."""
+    if not unit:
+        return None
+    name = unit.strip().lower()
+    if not name.endswith("s"):
+        name += "s"
+    return name if name in INTERVAL_UNITS else None
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """Add calendar months, clamping the day to the end of the target month."""
+    year, month = divmod(value.month - 1 + months, 12)
+    year += value.year
+    day = min(value.day, calendar.monthrange(year, month + 1)[1])
+    return value.replace(year=year, month=month + 1, day=day)
+
+
+# ===========================================
+# Recurrence Rules
+# ===========================================
+
+class Recurrence(NamedTuple):
+    unit: str
+    interval: int
+
+    @classmethod
+    def for_schedule(
+        cls,
+        frequency_type: str,
+        frequency_value: Optional[int],
+        frequency_unit: Optional[str] = None
+    ) -> "Recurrence":
+        """Rule of a time-based schedule (unknown frequency types recur every 30 days)."""
+        interval = max(frequency_value or 1, 1)  # never step backwards
+        if frequency_type == "custom":
+            unit = normalize_unit(frequency_unit)
+            if unit:
+                return cls(unit, interval)
+        elif frequency_type in _FREQUENCY_UNITS:
+            return cls(_FREQUENCY_UNITS[frequency_type], interval)
+        return cls(DAYS, 30)  # Default
+
+    def nth(self, anchor: datetime, n: int) -> datetime:
+        """The `n`-th occurrence after `anchor` (n = 0 is the anchor itself)."""
+        if self.unit in _FIXED_STEPS:
+            return anchor + _FIXED_STEPS[self.unit] * (self.interval * n)
+        months = self.interval * (12 if self.unit == YEARS else 1)
+        return add_months(anchor, months * n)
+
+    def index_at_or_after(self, anchor: datetime, moment: datetime) -> int:
+        """Smallest n >= 0 whose occurrence is at or after `moment`."""
+        if moment <= anchor:
+            return 0
+        if self.unit in _FIXED_STEPS:
+            return math.ceil((moment - anchor) / (_FIXED_STEPS[self.unit] * self.interval))
+
+        months = self.interval * (12 if self.unit == YEARS else 1)
+        elapsed = (moment.year - anchor.year) * 12 + moment.month - anchor.month
+        n = elapsed // months
+        # The n-th step lands in or before moment's month; at most one more is needed
+        while self.nth(anchor, n) < moment:
+            n += 1
+        return n
+
+
+# ===========================================
+# Business Calendars
+# ===========================================
+
+class BusinessCalendar:
+    """Working weekdays (Monday = 0) and holidays of an organization."""
+
+    def __init__(self, working_days: Iterable[int] = range(7), holidays: Iterable[date] = ()):
+        self.working_days: FrozenSet[int] = frozenset(working_days) or frozenset(range(7))
+        self.holidays: FrozenSet[date] = frozenset(holidays)
+
+    @property
+    def is_always_open(self) -> bool:
+        return len(self.working_days) == 7 and not self.holidays
+
+    def is_working_day(self, day: date) -> bool:
+        return day.weekday() in self.working_days and day not in self.holidays
+
+    def roll_forward(self, value: datetime) -> datetime:
+        """`value`, or the same time on the next working day."""
+        if self.is_always_open:
+            return value
+        for offset in range(_MAX_ROLL_DAYS):
+            candidate = value + timedelta(days=offset)
+            if self.is_working_day(candidate.date()):
+                return candidate
+        return value
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "working_days": sorted(self.working_days),
+            "holidays": [day.isoformat() for day in sorted(self.holidays)],
+        }
+
+    @classmethod
+    def from_settings(cls, settings_json: Optional[str]) -> "BusinessCalendar":
+        """Calendar stored in an organization's settings (always open if unset or invalid)."""
+        if not settings_json:
+            return ALWAYS_OPEN
+        try:
+            config = json.loads(settings_json).get("business_calendar") or {}
+            return cls(
+                working_days=[int(day) for day in config.get("working_days", range(7)) if 0 <= int(day) <= 6],
+                holidays=[date.fromisoformat(str(day)) for day in config.get("holidays", [])],
+            )
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring invalid business calendar settings: {e}")
+            return ALWAYS_OPEN
+
+
+ALWAYS_OPEN = BusinessCalendar()
+
+
+async def load_business_calendars(db: AsyncDatabase, org_ids: Iterable[str]) -> Dict[str, BusinessCalendar]:
+    """Business calendars of several organizations in one query."""
+    org_ids = list(set(org_ids))
+    if not org_ids:
+        return {}
+
+    placeholders = ", ".join("?" for _ in org_ids)
+    rows = await db.fetch_all(
+        f"SELECT id, settings FROM organizations WHERE id IN ({placeholders})",
+        tuple(org_ids)
+    )
+    calendars = {row[0]: BusinessCalendar.from_settings(row[1]) for row in rows}
+    return {org_id: calendars.get(org_id, ALWAYS_OPEN) for org_id in org_ids}
+
+
+# ===========================================
+# Due Dates
+# ===========================================
+
+def calculate_next_due(
+    frequency_type: str,
+    frequency_value: int,
+    last_performed: datetime = None,
+    frequency_unit: Optional[str] = None
+) -> datetime:
+    """Calculate next due date based on frequency."""
+    base = last_performed or datetime.utcnow()
+    return Recurrence.for_schedule(frequency_type, frequency_value, frequency_unit).nth(base, 1)
+
+
+def next_due_after(
+    rule: Recurrence,
+    due: datetime,
+    now: datetime,
+    business_calendar: BusinessCalendar = ALWAYS_OPEN
+) -> datetime:
+    """
+    First due date after `now`, stepping from `due` by the schedule's rule.
+
+    Instances missed while no generator was running are skipped rather than
+    produced as a burst of catch-up work orders. Instances that a business
+    calendar moves onto the same working day as `due` are skipped as well,
+    so a daily schedule yields one work order per working day.
+    """
+    n = max(rule.index_at_or_after(due, now + timedelta(microseconds=1)), 1)
+    generated_for = business_calendar.roll_forward(due)
+    while business_calendar.roll_forward(rule.nth(due, n)) <= generated_for:
+        n += 1
+    return rule.nth(due, n)
+
+
+def expand_occurrences(
+    rule: Recurrence,
+    anchor: datetime,
+    start: datetime,
+    end: datetime,
+    business_calendar: BusinessCalendar = ALWAYS_OPEN
+) -> Iterator[datetime]:
+    """
+    Due dates of a schedule in [start, end), after business-calendar moves.
+
+    `anchor` is the schedule's next_due; occurrences before `start` are
+    skipped without being computed.
+    """
+    n = rule.index_at_or_after(anchor, start)
+    previous = None
+    while True:
+        nominal = rule.nth(anchor, n)
+        if nominal >= end:
+            return
+        due = business_calendar.roll_forward(nominal)
+        if due >= end:
+            return
+        if previous is None or due > previous:
+            yield due
+            previous = due
+        n += 1
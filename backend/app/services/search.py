@@ -0,0 +1,247 @@
+"""
+GearGuard Backend - Full-Text Search
+SQLite FTS5 index over work orders, equipment, parts and users.
+
+Documents live in a single `search_index` FTS5 table tagged with entity type
+and organization. Write paths call `index_document()` in the same transaction
+as the source write; the index is rebuilt at startup when empty. Soft-deleted
+rows keep their documents for list filters; unified search skips them.
+"""
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from app.database import AsyncDatabase, async_connection
+
+logger = logging.getLogger(__name__)
+
+# Entity types stored in the index
+WORK_ORDER = "work_order"
+EQUIPMENT = "equipment"
+PART = "part"
+USER = "user"
+
+# entity type -> SQL selecting (id, organization_id, title, body) from the source table
+_SOURCES: Dict[str, str] = {
+    WORK_ORDER: """
+        SELECT id, organization_id, title,
+               COALESCE(work_order_number, '') || ' ' || COALESCE(description, '')
+        FROM work_orders
+    """,
+    EQUIPMENT: """
+        SELECT id, organization_id, name,
+               COALESCE(code, '') || ' ' || COALESCE(serial_number, '') || ' ' ||
+               COALESCE(model, '') || ' ' || COALESCE(manufacturer, '') || ' ' ||
+               COALESCE(description, '')
+        FROM equipment
+    """,
+    PART: """
+        SELECT id, organization_id, name,
+               COALESCE(part_number, '') || ' ' || COALESCE(manufacturer, '') || ' ' ||
+               COALESCE(category, '') || ' ' || COALESCE(description, '')
+        FROM parts_inventory
+    """,
+    USER: """
+        SELECT id, organization_id, first_name || ' ' || last_name, email
+        FROM users
+    """,
+}
+
+# entity type -> predicate a document's source row must meet to appear in
+# unified search. Soft-deleted rows stay indexed so list endpoints can still
+# filter them (e.g. inactive users), but /search only returns live ones.
+_LIVE: Dict[str, str] = {
+    EQUIPMENT: "EXISTS (SELECT 1 FROM equipment WHERE id = entity_id AND status != 'retired')",
+    PART: "EXISTS (SELECT 1 FROM parts_inventory WHERE id = entity_id AND is_active = TRUE)",
+    USER: "EXISTS (SELECT 1 FROM users WHERE id = entity_id AND is_active = TRUE)",
+}
+
+# Set at startup; list endpoints fall back to LIKE when FTS5 is unavailable
+_fts_available = False
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def is_available() -> bool:
+    """True once the FTS5 index exists and has been populated."""
+    return _fts_available
+
+
+def build_match_query(text: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, so user input can never inject
+    FTS5 syntax and "pum mot" matches "Pump Motor".
+
+    Returns:
+        MATCH expression, or None if the text contains no searchable words
+    """
+    tokens = _TOKEN_RE.findall(text)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens[:16])
+
+
+def search_filter(
+    entity_type: str,
+    id_column: str,
+    org_id: str,
+    text: str,
+    like_columns: Sequence[str]
+) -> Tuple[str, List[Any]]:
+    """
+    WHERE predicate restricting a list query to rows matching `text`.
+
+    Uses the FTS5 index when available, otherwise the original LIKE scan.
+
+    Args:
+        entity_type: Index entity type (WORK_ORDER, EQUIPMENT, ...)
+        id_column: Qualified id column of the listed table, e.g. "w.id"
+        org_id: Organization being listed
+        text: User search text
+        like_columns: Columns for the LIKE fallback
+    """
+    match = build_match_query(text) if _fts_available else None
+    if match:
+        return (
+            f"{id_column} IN (SELECT entity_id FROM search_index "
+            f"WHERE search_index MATCH ? AND entity_type = ? AND organization_id = ?)",
+            [match, entity_type, org_id],
+        )
+
+    term = f"%{text}%"
+    return (
+        "(" + " OR ".join(f"{column} LIKE ?" for column in like_columns) + ")",
+        [term] * len(like_columns),
+    )
+
+
+async def index_document(db: AsyncDatabase, entity_type: str, entity_id: str) -> None:
+    """
+    (Re)index one row from its source table (uncommitted; caller commits).
+
+    Removes the document if the source row no longer exists.
+    """
+    if not _fts_available:
+        return
+
+    await db.batch([
+        (
+            "DELETE FROM search_index WHERE entity_type = ? AND entity_id = ?",
+            (entity_type, entity_id)
+        ),
+        (
+            f"""
+            INSERT INTO search_index (entity_type, entity_id, organization_id, title, body)
+            SELECT ?, src.* FROM ({_SOURCES[entity_type]} WHERE id = ?) AS src
+            """,
+            (entity_type, entity_id)
+        ),
+    ])
+
+
+async def index_documents(db: AsyncDatabase, entity_type: str, entity_ids: Sequence[str]) -> None:
+    """
+    Index many rows of one type in a single round trip (uncommitted; caller commits).
+
+    Used by bulk imports instead of one `index_document()` call per row.
+    """
+    if not _fts_available or not entity_ids:
+        return
+
+    placeholders = ", ".join("?" for _ in entity_ids)
+    await db.batch([
+        (
+            f"DELETE FROM search_index WHERE entity_type = ? AND entity_id IN ({placeholders})",
+            (entity_type, *entity_ids)
+        ),
+        (
+            f"""
+            INSERT INTO search_index (entity_type, entity_id, organization_id, title, body)
+            SELECT ?, src.* FROM ({_SOURCES[entity_type]} WHERE id IN ({placeholders})) AS src
+            """,
+            (entity_type, *entity_ids)
+        ),
+    ])
+
+
+async def rebuild_search_index(db: AsyncDatabase) -> int:
+    """Rebuild the whole index from source tables. Returns documents indexed."""
+    statements = ["DELETE FROM search_index"]
+    for entity_type, source in _SOURCES.items():
+        statements.append((
+            f"""
+            INSERT INTO search_index (entity_type, entity_id, organization_id, title, body)
+            SELECT ?, src.* FROM ({source}) AS src
+            """,
+            (entity_type,)
+        ))
+
+    async with db.transaction():
+        await db.batch(statements)
+
+    row = await db.fetch_one("SELECT COUNT(*) FROM search_index")
+    return row[0] if row else 0
+
+
+async def ensure_search_index() -> bool:
+    """
+    Check that the FTS5 index exists and populate it if it is empty.
+
+    Called at startup. Leaves search on the LIKE fallback if FTS5 is missing
+    (e.g. migration 004 not applied).
+    """
+    global _fts_available
+    try:
+        async with async_connection() as db:
+            row = await db.fetch_one("SELECT COUNT(*) FROM search_index")
+            _fts_available = True
+            if row and row[0] == 0:
+                indexed = await rebuild_search_index(db)
+                logger.info(f"Search index built with {indexed} documents")
+    except Exception as e:
+        _fts_available = False
+        logger.warning(f"Full-text search unavailable, using LIKE fallback: {e}")
+    return _fts_available
+
+
+async def search(
+    db: AsyncDatabase,
+    org_id: str,
+    text: str,
+    entity_types: Sequence[str],
+    limit_per_type: int
+) -> List[Tuple]:
+    """
+    Ranked search across entity types in one query.
+
+    Returns:
+        Rows of (entity_type, entity_id, title, snippet, rank), best first,
+        at most `limit_per_type` per entity type
+    """
+    match = build_match_query(text)
+    if not match or not entity_types:
+        return []
+
+    # One ranked sub-select per type, so a type with many strong matches
+    # cannot crowd the others out of the result
+    per_type_sql = """
+        SELECT * FROM (
+            SELECT entity_type, entity_id, title,
+                   snippet(search_index, 4, '[', ']', '...', 12),
+                   bm25(search_index, 0.0, 0.0, 0.0, 10.0, 1.0) AS rank
+            FROM search_index
+            WHERE search_index MATCH ? AND organization_id = ? AND entity_type = ?{live}
+            ORDER BY rank
+            LIMIT ?
+        )
+    """
+    selects: List[str] = []
+    params: List[Any] = []
+    for entity_type in entity_types:
+        live = f" AND {_LIVE[entity_type]}" if entity_type in _LIVE else ""
+        selects.append(per_type_sql.format(live=live))
+        params.extend([match, org_id, entity_type, limit_per_type])
+
+    return await db.fetch_all(" UNION ALL ".join(selects) + " ORDER BY rank", tuple(params))
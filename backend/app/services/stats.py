@@ -0,0 +1,145 @@
+"""
+GearGuard Backend - Organization Statistics
+Dashboard and organization stats served from org_counters plus the few
+time-dependent counts that cannot be maintained incrementally.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List
+import logging
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.database import AsyncDatabase, PoolTimeoutError, acquire_async
+from app.services.counters import get_counters
+
+logger = logging.getLogger(__name__)
+
+# Days ahead counted as "upcoming" maintenance on the dashboard
+UPCOMING_MAINTENANCE_DAYS = 7
+
+_stats_cache = TTLCache(
+    maxsize=settings.STATS_CACHE_SIZE,
+    ttl=settings.STATS_CACHE_TTL_SECONDS,
+)
+
+
+# ===========================================
+# Time-dependent Queries
+# ===========================================
+# Everything else comes from org_counters; these depend on "now" so they
+# cannot be maintained incrementally.
+
+OVERDUE_WORK_ORDERS_SQL = """
+    SELECT COUNT(*)
+    FROM work_orders
+    WHERE organization_id = ? AND status IN ('pending', 'in_progress') AND due_date < ?
+"""
+
+UPCOMING_MAINTENANCE_SQL = """
+    SELECT COUNT(*)
+    FROM maintenance_schedules
+    WHERE organization_id = ? AND is_active = TRUE AND next_due <= ?
+"""
+
+
+def _int(value: Any) -> int:
+    """Missing counters and NULL aggregates count as zero."""
+    return int(value) if value else 0
+
+
+async def _run_concurrently(
+    db: AsyncDatabase,
+    *tasks: Callable[[AsyncDatabase], Awaitable[Any]]
+) -> List[Any]:
+    """
+    Run independent read tasks in parallel.
+
+    Each task borrows its own pooled connection when one is free right now;
+    otherwise it falls back to the request's connection, one task at a time.
+    """
+    fallback_lock = asyncio.Lock()
+
+    async def run(task: Callable[[AsyncDatabase], Awaitable[Any]]) -> Any:
+        try:
+            conn = await acquire_async(timeout=0)
+        except PoolTimeoutError:
+            async with fallback_lock:
+                return await task(db)
+        try:
+            return await task(conn)
+        finally:
+            conn.release()
+
+    return await asyncio.gather(*(run(task) for task in tasks))
+
+
+async def get_org_stats(db: AsyncDatabase, org_id: str) -> Dict[str, Any]:
+    """
+    Get aggregate statistics for an organization.
+
+    Totals are O(1) reads from org_counters; overdue work orders and upcoming
+    maintenance are counted live. Results are cached per organization for
+    STATS_CACHE_TTL_SECONDS and dropped by `invalidate_org_stats()` when
+    equipment, work orders, parts, schedules or users change.
+
+    Args:
+        db: Request database connection
+        org_id: Organization ID
+
+    Returns:
+        Dict of counters used by the dashboard and organization stats
+    """
+    cached = _stats_cache.get(org_id)
+    if cached is not None:
+        return cached
+
+    now = datetime.utcnow()
+    counters, overdue, upcoming = await _run_concurrently(
+        db,
+        lambda conn: get_counters(conn, org_id),
+        lambda conn: conn.fetch_one(OVERDUE_WORK_ORDERS_SQL, (org_id, now)),
+        lambda conn: conn.fetch_one(
+            UPCOMING_MAINTENANCE_SQL,
+            (org_id, now + timedelta(days=UPCOMING_MAINTENANCE_DAYS))
+        ),
+    )
+
+    def counter(name: str) -> int:
+        return _int(counters.get(name))
+
+    equipment_active = counter("equipment_active")
+    health_sum = counters.get("equipment_health_sum") or 0
+    health_count = counter("equipment_health_count")
+
+    stats = {
+        "equipment_all": counter("equipment_all"),
+        "equipment_total": equipment_active,
+        "equipment_operational": counter("equipment_status:operational"),
+        "equipment_maintenance": counter("equipment_status:maintenance"),
+        "equipment_breakdown": counter("equipment_status:breakdown"),
+        "equipment_avg_health": round(health_sum / health_count, 1) if health_count else 0,
+        "work_orders_total": counter("work_orders_total"),
+        "work_orders_pending": counter("work_orders_status:pending"),
+        "work_orders_in_progress": counter("work_orders_status:in_progress"),
+        "work_orders_completed": counter("work_orders_status:completed"),
+        "work_orders_overdue": _int(overdue[0]) if overdue else 0,
+        "maintenance_upcoming": _int(upcoming[0]) if upcoming else 0,
+        "parts_total": counter("parts_total"),
+        "parts_low_stock": counter("parts_low_stock"),
+        "parts_low_stock_active": counter("parts_low_stock_active"),
+        "users_total": counter("users_total"),
+    }
+
+    _stats_cache.set(org_id, stats)
+    return stats
+
+
+def invalidate_org_stats(org_id: str) -> None:
+    """Drop cached statistics for an organization after a write."""
+    _stats_cache.delete(org_id)
+
+
+def stats_cache_stats() -> Dict[str, Any]:
+    """Organization stats cache metrics."""
+    return _stats_cache.stats()
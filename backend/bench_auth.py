@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+GearGuard Backend - Auth Overhead Microbenchmark
+Measures per-request cost of access token decoding with and without the
+verified token cache.
+
+Usage:
+    python bench_auth.py [iterations]
+"""
+import os
+import sys
+import time
+
+# A secret is required to sign tokens; use a throwaway one if none is configured
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret-key-not-for-production-use-0000")
+
+from app.core.permissions import Role, get_role_permissions
+from app.core.security import (
+    create_access_token,
+    decode_access_token,
+    clear_access_token_cache,
+    access_token_cache_stats,
+)
+
+
+def run(label: str, token: str, iterations: int, cached: bool) -> float:
+    """Decode the same token repeatedly and return microseconds per call."""
+    clear_access_token_cache()
+    decode_access_token(token)  # Warm up (and fill the cache when cached)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if not cached:
+            clear_access_token_cache()
+        payload = decode_access_token(token)
+        assert payload is not None
+    elapsed = time.perf_counter() - start
+
+    per_call_us = elapsed / iterations * 1_000_000
+    print(f"  {label:<28} {per_call_us:>10.2f} us/request")
+    return per_call_us
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    token = create_access_token(
+        user_id="01BENCHUSER0000000000000000",
+        email="bench@example.com",
+        org_id="01BENCHORG00000000000000000",
+        role=Role.TECHNICIAN,
+        permissions=get_role_permissions(Role.TECHNICIAN),
+    )
+
+    print("=" * 60)
+    print("  Access token decode overhead")
+    print("=" * 60)
+    print(f"  Iterations: {iterations}\n")
+
+    before = run("Before (verify every call)", token, iterations, cached=False)
+    after = run("After (verified token cache)", token, iterations, cached=True)
+
+    print(f"\n  Speedup: {before / after:.1f}x")
+    print(f"  Cache: {access_token_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
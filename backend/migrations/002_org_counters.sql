@@ -0,0 +1,15 @@
+-- ============================================
+-- GearGuard Database Schema
+-- Migration: 002_org_counters
+-- Per-organization rollup counters maintained by write paths
+-- ============================================
+
+-- Counter values keyed by name, e.g. 'work_orders_status:pending',
+-- 'equipment_health_sum', 'parts_low_stock'. Rebuilt by reconciliation.
+CREATE TABLE IF NOT EXISTS org_counters (
+    organization_id TEXT NOT NULL,
+    counter TEXT NOT NULL,
+    value REAL NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (organization_id, counter)
+);
@@ -0,0 +1,14 @@
+-- ============================================
+-- GearGuard Database Schema
+-- Migration: 003_keyset_pagination_indexes
+-- Composite indexes backing cursor pagination on list endpoints
+-- ============================================
+
+-- Lists ordered by (created_at, id) within an organization
+CREATE INDEX IF NOT EXISTS idx_workorders_org_created ON work_orders(organization_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_equipment_org_created ON equipment(organization_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_users_org_created ON users(organization_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_audit_org_created ON audit_logs(organization_id, created_at, id);
+
+-- Parts are listed alphabetically
+CREATE INDEX IF NOT EXISTS idx_parts_org_name ON parts_inventory(organization_id, name, id);
@@ -0,0 +1,16 @@
+-- ============================================
+-- GearGuard Database Schema
+-- Migration: 004_search_index
+-- FTS5 full-text index over work orders, equipment, parts and users
+-- ============================================
+
+-- One document per entity; populated by the API at startup and kept in step by write paths
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+    entity_type UNINDEXED,
+    entity_id UNINDEXED,
+    organization_id UNINDEXED,
+    title,
+    body,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
@@ -0,0 +1,27 @@
+-- ============================================
+-- GearGuard Database Schema
+-- Migration: 005_tenant_composite_indexes
+-- Tenant-first composite and partial indexes matching hot query shapes
+-- (checked by tests/test_query_plans.py)
+-- ============================================
+
+-- Work order lists filtered by status or assignee, newest first
+CREATE INDEX IF NOT EXISTS idx_workorders_org_status_created ON work_orders(organization_id, status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_workorders_org_assignee_created ON work_orders(organization_id, assigned_to, created_at, id);
+
+-- Overdue work orders (dashboard): only open work orders are indexed
+CREATE INDEX IF NOT EXISTS idx_workorders_org_open_due ON work_orders(organization_id, due_date) WHERE status IN ('pending', 'in_progress');
+
+-- Schedule lists and upcoming/overdue maintenance, ordered by next_due
+CREATE INDEX IF NOT EXISTS idx_schedules_org_active_due ON maintenance_schedules(organization_id, is_active, next_due);
+
+-- Equipment health reports, worst first
+CREATE INDEX IF NOT EXISTS idx_equipment_org_status_health ON equipment(organization_id, status, health_score);
+CREATE INDEX IF NOT EXISTS idx_equipment_org_health_in_service ON equipment(organization_id, health_score) WHERE status != 'retired';
+
+-- Parts cost reports join usage to work orders
+CREATE INDEX IF NOT EXISTS idx_parts_usage_work_order ON parts_usage(work_order_id, used_at);
+
+-- Notification inbox, newest first (all and unread only)
+CREATE INDEX IF NOT EXISTS idx_notifications_user_created ON notifications(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_notifications_user_unread_created ON notifications(user_id, created_at) WHERE is_read = FALSE;
@@ -0,0 +1,23 @@
+-- ============================================
+-- GearGuard Database Schema
+-- Migration: 006_pm_generations
+-- Idempotency records for work orders generated from due PM schedules
+-- ============================================
+
+-- One row per generated due instance; the key ('pm:<schedule_id>:<next_due>')
+-- is claimed before the work order is written, so each instance yields one WO
+CREATE TABLE IF NOT EXISTS pm_generations (
+    idempotency_key TEXT PRIMARY KEY,
+    schedule_id TEXT NOT NULL,
+    organization_id TEXT NOT NULL,
+    due_at TIMESTAMP NOT NULL,
+    work_order_id TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (schedule_id) REFERENCES maintenance_schedules(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_pm_generations_schedule ON pm_generations(schedule_id, due_at);
+
+-- Due scan of the PM generator: only active, time-based schedules are indexed
+CREATE INDEX IF NOT EXISTS idx_schedules_time_based_due ON maintenance_schedules(next_due)
+    WHERE is_active = TRUE AND frequency_type != 'meter_based';
@@ -0,0 +1,20 @@
+-- ============================================
+-- GearGuard Database Schema
+-- Migration: 007_meter_triggers
+-- Trigger state for meter-based maintenance schedules
+-- ============================================
+
+-- Meter value at which each meter-based schedule last fired (its baseline)
+CREATE TABLE IF NOT EXISTS meter_trigger_state (
+    schedule_id TEXT PRIMARY KEY,
+    last_trigger_value REAL NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (schedule_id) REFERENCES maintenance_schedules(id) ON DELETE CASCADE
+);
+
+-- Active meter-based schedules of an equipment (loaded on each reading cache miss)
+CREATE INDEX IF NOT EXISTS idx_schedules_meter_equipment ON maintenance_schedules(equipment_id)
+    WHERE frequency_type = 'meter_based' AND is_active = TRUE;
+
+-- Latest readings of an equipment's meter
+CREATE INDEX IF NOT EXISTS idx_meter_readings_equipment_type_time ON meter_readings(equipment_id, meter_type, recorded_at);
@@ -0,0 +1,50 @@
+-- ============================================
+-- GearGuard Database Schema
+-- Migration: 008_meter_rollups
+-- Hourly and daily meter reading rollups, plus indexes for retention
+-- ============================================
+
+-- One row per (equipment, meter, resolution, bucket start); maintained on ingest.
+-- resolution is 'hour' or 'day'; bucket is 'YYYY-MM-DD HH:00:00' (UTC)
+CREATE TABLE IF NOT EXISTS meter_rollups (
+    equipment_id TEXT NOT NULL,
+    meter_type TEXT NOT NULL,
+    resolution TEXT NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    min_value REAL NOT NULL,
+    max_value REAL NOT NULL,
+    sum_value REAL NOT NULL,
+    sample_count INTEGER NOT NULL,
+    last_value REAL NOT NULL,
+    last_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (equipment_id, meter_type, resolution, bucket),
+    FOREIGN KEY (equipment_id) REFERENCES equipment(id) ON DELETE CASCADE
+);
+
+-- Retention deletes old raw readings and hourly rollups oldest first
+CREATE INDEX IF NOT EXISTS idx_meter_readings_recorded ON meter_readings(recorded_at);
+CREATE INDEX IF NOT EXISTS idx_meter_rollups_resolution_bucket ON meter_rollups(resolution, bucket);
+
+-- Backfill from readings recorded before rollups existed (only while the table is empty).
+-- With MAX(recorded_at), SQLite takes reading_value from the latest row of each group.
+INSERT OR IGNORE INTO meter_rollups (
+    equipment_id, meter_type, resolution, bucket, min_value, max_value,
+    sum_value, sample_count, last_value, last_at
+)
+SELECT equipment_id, meter_type, 'hour', strftime('%Y-%m-%d %H:00:00', recorded_at),
+       MIN(reading_value), MAX(reading_value), SUM(reading_value), COUNT(*),
+       reading_value, MAX(recorded_at)
+FROM meter_readings
+WHERE NOT EXISTS (SELECT 1 FROM meter_rollups)
+GROUP BY equipment_id, meter_type, strftime('%Y-%m-%d %H:00:00', recorded_at);
+
+INSERT OR IGNORE INTO meter_rollups (
+    equipment_id, meter_type, resolution, bucket, min_value, max_value,
+    sum_value, sample_count, last_value, last_at
+)
+SELECT equipment_id, meter_type, 'day', strftime('%Y-%m-%d 00:00:00', recorded_at),
+       MIN(reading_value), MAX(reading_value), SUM(reading_value), COUNT(*),
+       reading_value, MAX(recorded_at)
+FROM meter_readings
+WHERE NOT EXISTS (SELECT 1 FROM meter_rollups WHERE resolution = 'day')
+GROUP BY equipment_id, meter_type, strftime('%Y-%m-%d 00:00:00', recorded_at);
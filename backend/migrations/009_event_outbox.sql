@@ -0,0 +1,32 @@
+-- ============================================
+-- GearGuard Database Schema
+-- Migration: 009_event_outbox
+-- Domain events written with their change, fanned out into notifications
+-- ============================================
+
+-- One row per domain event; written in the transaction of the change it describes.
+-- payload is JSON: title, message, priority, action_url and the recipients
+-- (users, teams, roles, exclude). The dispatcher claims rows with a lease
+-- (claim_token, claimed_until) and sets processed_at once notifications are written.
+CREATE TABLE IF NOT EXISTS event_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    organization_id TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    reference_type TEXT,
+    reference_id TEXT,
+    dedup_key TEXT UNIQUE,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claim_token TEXT,
+    claimed_until TIMESTAMP,
+    processed_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (organization_id) REFERENCES organizations(id) ON DELETE CASCADE
+);
+
+-- Dispatcher: pending events in order, and the rows of one claim
+CREATE INDEX IF NOT EXISTS idx_event_outbox_pending ON event_outbox(id) WHERE processed_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_event_outbox_claim ON event_outbox(claim_token) WHERE claim_token IS NOT NULL;
+
+-- Retention: processed events oldest first
+CREATE INDEX IF NOT EXISTS idx_event_outbox_processed ON event_outbox(processed_at) WHERE processed_at IS NOT NULL;
@@ -0,0 +1,19 @@
+-- ============================================
+-- GearGuard Database Schema
+-- Migration: 010_notification_counters
+-- Per-user unread notification counts maintained by write paths
+-- ============================================
+
+-- Unread notifications per user, updated in the same transaction as every
+-- notification insert, read, or delete. A missing row means zero.
+-- Rebuilt by reconciliation.
+CREATE TABLE IF NOT EXISTS notification_counters (
+    user_id TEXT PRIMARY KEY,
+    unread INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Seed from existing notifications (rows already maintained are left alone)
+INSERT OR IGNORE INTO notification_counters (user_id, unread)
+SELECT user_id, COUNT(*) FROM notifications WHERE is_read = FALSE GROUP BY user_id;
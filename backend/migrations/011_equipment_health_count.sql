@@ -0,0 +1,14 @@
+-- ============================================
+-- GearGuard Database Schema
+-- Migration: 011_equipment_health_count
+-- Count of scored equipment behind the average health counter
+-- ============================================
+
+-- 'equipment_health_count' counts non-retired equipment with a health score,
+-- so the dashboard average skips NULL scores. Seed it for organizations
+-- counted before it existed (values already maintained are left alone).
+INSERT OR IGNORE INTO org_counters (organization_id, counter, value)
+SELECT organization_id, 'equipment_health_count', COUNT(health_score)
+FROM equipment
+WHERE status != 'retired'
+GROUP BY organization_id;
@@ -0,0 +1,242 @@
+"""
+=============================================================================
+GearGuard Backend - Service Test Support
+=============================================================================
+
+Shared setup for the service-level test modules (test_*_module.py that
+exercise app/ directly instead of a running server):
+- points the app at a throwaway local SQLite file with every migration applied
+- fixture helpers that insert organizations, users, equipment, schedules,
+  work orders and parts
+- a runner that prints each test like the endpoint test modules do
+
+Import this module before anything from `app`, so settings pick up the
+test database:
+
+    import service_support as support
+    from app.services import pm_scheduler
+
+Test functions take no arguments and raise AssertionError on failure, so
+the modules run both as scripts and under pytest.
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import traceback
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+MIGRATIONS_DIR = BACKEND_DIR / "migrations"
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="gearguard-tests-"), "test.db")
+
+# Local SQLite only, no background jobs; must be set before `app.config` is imported
+os.environ["TURSO_DATABASE_URL"] = ""
+os.environ["TURSO_AUTH_TOKEN"] = ""
+os.environ["LOCAL_DB_PATH"] = DB_PATH
+os.environ["ENABLE_BACKGROUND_JOBS"] = "false"
+os.environ.setdefault("JWT_SECRET_KEY", "service-tests-secret-key-0123456789")
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def _create_database() -> None:
+    conn = sqlite3.connect(DB_PATH)
+    for migration in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        conn.executescript(migration.read_text())
+    conn.commit()
+    conn.close()
+
+
+_create_database()
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+def new_id(prefix: str = "") -> str:
+    """Unique fixture ID, so tests sharing the database never collide."""
+    return f"{prefix}{uuid.uuid4().hex[:12]}"
+
+
+def connect() -> sqlite3.Connection:
+    """Direct connection to the test database (for fixtures and assertions)."""
+    return sqlite3.connect(DB_PATH)
+
+
+def execute(sql: str, params: Tuple = ()) -> None:
+    conn = connect()
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def fetch_all(sql: str, params: Tuple = ()) -> List[Tuple]:
+    conn = connect()
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def fetch_value(sql: str, params: Tuple = ()) -> Any:
+    rows = fetch_all(sql, params)
+    return rows[0][0] if rows else None
+
+
+def role_id(name: str) -> str:
+    return fetch_value("SELECT id FROM roles WHERE name = ?", (name,))
+
+
+def create_org(settings_json: Optional[str] = None) -> str:
+    org_id = new_id("org_")
+    execute(
+        "INSERT INTO organizations (id, name, slug, settings) VALUES (?, ?, ?, ?)",
+        (org_id, f"Org {org_id}", org_id, settings_json)
+    )
+    return org_id
+
+
+def create_user(org_id: str, role: str = "technician", is_active: bool = True) -> str:
+    user_id = new_id("user_")
+    execute(
+        """
+        INSERT INTO users (id, email, password_hash, first_name, last_name, role_id, organization_id, is_active)
+        VALUES (?, ?, 'x', 'Test', 'User', ?, ?, ?)
+        """,
+        (user_id, f"{user_id}@example.com", role_id(role), org_id, is_active)
+    )
+    return user_id
+
+
+def create_team(org_id: str, members: Iterable[str] = (), location_id: Optional[str] = None) -> str:
+    team_id = new_id("team_")
+    execute(
+        "INSERT INTO teams (id, organization_id, name, location_id) VALUES (?, ?, ?, ?)",
+        (team_id, org_id, f"Team {team_id}", location_id)
+    )
+    for user_id in members:
+        execute(
+            "INSERT INTO team_members (id, team_id, user_id) VALUES (?, ?, ?)",
+            (new_id("tm_"), team_id, user_id)
+        )
+    return team_id
+
+
+def create_equipment(org_id: str, status: str = "active", location_id: Optional[str] = None) -> str:
+    equipment_id = new_id("eq_")
+    execute(
+        "INSERT INTO equipment (id, organization_id, name, status, location_id) VALUES (?, ?, ?, ?, ?)",
+        (equipment_id, org_id, f"Equipment {equipment_id}", status, location_id)
+    )
+    return equipment_id
+
+
+def create_schedule(
+    org_id: str,
+    equipment_id: str,
+    next_due: Optional[datetime] = None,
+    frequency_type: str = "daily",
+    frequency_value: int = 1,
+    **columns: Any
+) -> str:
+    """Maintenance schedule; extra keyword arguments are written as columns."""
+    schedule_id = new_id("sched_")
+    values = {
+        "id": schedule_id,
+        "organization_id": org_id,
+        "equipment_id": equipment_id,
+        "name": f"Schedule {schedule_id}",
+        "type": "preventive",
+        "frequency_type": frequency_type,
+        "frequency_value": frequency_value,
+        "next_due": next_due,
+        "is_active": True,
+        **columns,
+    }
+    execute(
+        f"INSERT INTO maintenance_schedules ({', '.join(values)}) VALUES ({', '.join('?' for _ in values)})",
+        tuple(values.values())
+    )
+    return schedule_id
+
+
+def create_work_order(org_id: str, equipment_id: str, status: str = "pending", **columns: Any) -> str:
+    """Work order; extra keyword arguments are written as columns."""
+    wo_id = new_id("wo_")
+    values = {
+        "id": wo_id,
+        "organization_id": org_id,
+        "equipment_id": equipment_id,
+        "work_order_number": f"WO-{wo_id}",
+        "title": f"Work order {wo_id}",
+        "type": "corrective",
+        "status": status,
+        **columns,
+    }
+    execute(
+        f"INSERT INTO work_orders ({', '.join(values)}) VALUES ({', '.join('?' for _ in values)})",
+        tuple(values.values())
+    )
+    return wo_id
+
+
+def create_part(org_id: str, **columns: Any) -> str:
+    """Inventory part; extra keyword arguments are written as columns."""
+    part_id = new_id("part_")
+    values = {"id": part_id, "organization_id": org_id, "name": f"Part {part_id}", **columns}
+    execute(
+        f"INSERT INTO parts_inventory ({', '.join(values)}) VALUES ({', '.join('?' for _ in values)})",
+        tuple(values.values())
+    )
+    return part_id
+
+
+# =============================================================================
+# Runner
+# =============================================================================
+
+def run(coro: Any) -> Any:
+    """Run a coroutine to completion from a synchronous test."""
+    return asyncio.run(coro)
+
+
+def run_module(title: str, tests: List[Callable[[], Any]]) -> None:
+    """Run test functions in order, print a summary and exit non-zero on failure."""
+    print("\n" + "=" * 60)
+    print(f"  {title}")
+    print("=" * 60)
+
+    passed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+        except Exception as e:
+            print(f"  ❌ {name}: {e.__class__.__name__}: {e}")
+            traceback.print_exc()
+        else:
+            passed += 1
+            print(f"  ✅ {name}")
+
+    total = len(tests)
+    if passed == total:
+        print(f"\n  🎉 ALL TESTS PASSED! ({passed}/{total})\n")
+        sys.exit(0)
+    print(f"\n  ❌ TESTS FAILED: {passed}/{total}\n")
+    sys.exit(1)
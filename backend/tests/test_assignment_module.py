@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Work Order Auto-Assignment Test Suite
+=============================================================================
+
+Tests workload-aware assignment (app/services/assignment.py) through the
+work order endpoints (app/api/v1/workorders.py):
+- least_loaded spreads a burst of work orders over idle technicians and
+  never picks inactive users or other roles
+- same_location prefers technicians of teams at the equipment's location
+- team_round_robin takes team members in turn
+- completions and manual assignments update the cached index
+- unknown policies and closed work orders are rejected
+- load reserved for a work order that was not created is released
+
+Usage:
+    python tests/test_assignment_module.py
+    python -m pytest tests/test_assignment_module.py
+"""
+
+from collections import Counter
+from typing import List, Optional
+
+import service_support as support
+from fastapi import HTTPException
+
+from app.api.v1.workorders import (
+    AssignRequest, StatusUpdateRequest, WorkOrderCreateRequest, assign_work_order, create_work_order,
+    update_work_order_status,
+)
+from app.core.security import TokenPayload
+from app.database import async_connection
+from app.services.assignment import get_workload, pick_assignee, release_assignee
+
+
+def _admin(org_id: str) -> TokenPayload:
+    user_id = support.create_user(org_id, "admin")
+    return TokenPayload(sub=user_id, email=f"{user_id}@example.com", org_id=org_id, role="admin", permissions=[])
+
+
+def _create_location(org_id: str) -> str:
+    location_id = support.new_id("loc_")
+    support.execute(
+        "INSERT INTO locations (id, organization_id, name) VALUES (?, ?, 'Plant')", (location_id, org_id)
+    )
+    return location_id
+
+
+def _create(admin: TokenPayload, equipment_id: str, policy: Optional[str] = "least_loaded", **fields) -> str:
+    async def run():
+        async with async_connection() as db:
+            request = WorkOrderCreateRequest(equipment_id=equipment_id, title="Auto", auto_assign=policy, **fields)
+            return await create_work_order(request, admin, db)
+
+    return support.run(run()).assigned_to
+
+
+def _assign(admin: TokenPayload, wo_id: str, **fields) -> Optional[str]:
+    async def run():
+        async with async_connection() as db:
+            return await assign_work_order(wo_id, AssignRequest(**fields), admin, db)
+
+    return support.run(run()).assigned_to
+
+
+def _complete(admin: TokenPayload, wo_id: str) -> None:
+    async def run():
+        async with async_connection() as db:
+            await update_work_order_status(wo_id, StatusUpdateRequest(status="completed"), admin, db)
+
+    support.run(run())
+
+
+def _status_code(call) -> Optional[int]:
+    try:
+        call()
+    except HTTPException as e:
+        return e.status_code
+    return None
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_least_loaded_spreads_a_burst():
+    org_id = support.create_org()
+    admin = _admin(org_id)
+    busy, idle_a, idle_b = (support.create_user(org_id) for _ in range(3))
+    support.create_user(org_id, is_active=False)
+    equipment_id = support.create_equipment(org_id)
+    support.create_work_order(org_id, equipment_id, assigned_to=busy, estimated_hours=4.0)
+
+    picks: List[str] = [_create(admin, equipment_id, estimated_hours=2.0) for _ in range(4)]
+
+    assert Counter(picks) == {idle_a: 2, idle_b: 2}
+    # The next one ties all three at four hours; the one with fewest work orders wins
+    assert _create(admin, equipment_id, estimated_hours=2.0) == busy
+
+
+def test_same_location_prefers_local_team():
+    org_id = support.create_org()
+    admin = _admin(org_id)
+    local, remote = support.create_user(org_id), support.create_user(org_id)
+    location_id = _create_location(org_id)
+    support.create_team(org_id, [local], location_id=location_id)
+    local_equipment = support.create_equipment(org_id, location_id=location_id)
+    other_equipment = support.create_equipment(org_id)
+    support.create_work_order(org_id, other_equipment, assigned_to=local, estimated_hours=8.0)
+
+    assert _create(admin, local_equipment, "same_location") == local
+    # No location: falls back to least loaded across the organization
+    assert _create(admin, other_equipment, "same_location") == remote
+
+
+def test_team_round_robin_takes_turns():
+    org_id = support.create_org()
+    admin = _admin(org_id)
+    members = [support.create_user(org_id) for _ in range(3)]
+    team_id = support.create_team(org_id, members)
+    equipment_id = support.create_equipment(org_id)
+    support.create_work_order(org_id, equipment_id, assigned_to=members[0], estimated_hours=20.0)
+
+    picks = [_create(admin, equipment_id, "team_round_robin", assigned_team_id=team_id) for _ in range(4)]
+
+    # Turns ignore load: the busy member still gets theirs
+    assert sorted(picks[:3]) == sorted(members)
+    assert picks[3] == picks[0]
+
+
+def test_index_follows_completion_and_manual_assignment():
+    org_id = support.create_org()
+    admin = _admin(org_id)
+    first, second = support.create_user(org_id), support.create_user(org_id)
+    equipment_id = support.create_equipment(org_id)
+    first_wo = support.create_work_order(
+        org_id, equipment_id, assigned_to=first, estimated_hours=3.0, created_by=admin.sub
+    )
+    second_wo = support.create_work_order(
+        org_id, equipment_id, assigned_to=second, estimated_hours=5.0, created_by=admin.sub
+    )
+    assert _create(admin, equipment_id, estimated_hours=1.0) == first  # first: 4h, second: 5h
+
+    _complete(admin, first_wo)  # first: 1h
+    _assign(admin, second_wo, assigned_to=first)  # first: 6h, second: 0h
+    assert _create(admin, equipment_id, estimated_hours=1.0) == second
+
+    # Auto-assigning existing work moves its load to the new pick
+    assert _assign(admin, second_wo, auto_assign="least_loaded") == second  # first: 1h, second: 6h
+    assert _create(admin, equipment_id, estimated_hours=1.0) == first
+
+
+def test_invalid_requests_are_rejected():
+    org_id = support.create_org()
+    admin = _admin(org_id)
+    support.create_user(org_id)
+    equipment_id = support.create_equipment(org_id)
+    done_wo = support.create_work_order(org_id, equipment_id, status="completed", created_by=admin.sub)
+
+    assert _status_code(lambda: _create(admin, equipment_id, "busiest_first")) == 400
+    assert _status_code(lambda: _assign(admin, done_wo, auto_assign="least_loaded")) == 400
+
+
+def test_unused_reservation_is_released():
+    org_id = support.create_org()
+    technician = support.create_user(org_id)
+    empty_org = support.create_org()
+
+    async def run():
+        async with async_connection() as db:
+            picked = await pick_assignee(db, org_id, "least_loaded", estimated_hours=3.0)
+            reserved = (await get_workload(db, org_id)).hours[technician]
+            release_assignee(org_id, picked, 3.0)
+            released = (await get_workload(db, org_id)).hours[technician]
+            nobody = await pick_assignee(db, empty_org, "least_loaded")
+            return picked, reserved, released, nobody
+
+    assert support.run(run()) == (technician, 3.0, 0.0, None)
+
+
+TESTS = [
+    test_least_loaded_spreads_a_burst,
+    test_same_location_prefers_local_team,
+    test_team_round_robin_takes_turns,
+    test_index_follows_completion_and_manual_assignment,
+    test_invalid_requests_are_rejected,
+    test_unused_reservation_is_released,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("🧭 Auto-Assignment Tests (app/services/assignment.py)", TESTS)
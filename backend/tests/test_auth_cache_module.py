@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Authentication Cache Test Suite
+=============================================================================
+
+Tests the caches on the authentication path (app/api/deps.py,
+app/core/security.py):
+- a user's active status is read once and then served from the cache
+- deactivating a user through the API takes effect on the next request
+- unknown users are rejected and never cached
+- a verified access token is decoded once, and never cached past its exp
+- refresh tokens are not accepted (or cached) as access tokens
+
+Usage:
+    python tests/test_auth_cache_module.py
+    python -m pytest tests/test_auth_cache_module.py
+"""
+
+import time
+from datetime import timedelta
+from typing import Optional
+
+import service_support as support
+from fastapi import HTTPException
+
+from app.api.deps import _verify_user_status, invalidate_user_status, user_status_cache_stats
+from app.api.v1.users import delete_user
+from app.core import security
+from app.core.security import (
+    TokenPayload, clear_access_token_cache, create_access_token, create_refresh_token, decode_access_token,
+)
+from app.database import async_connection
+
+
+def _payload(user_id: str, org_id: str, role: str = "technician") -> TokenPayload:
+    return TokenPayload(sub=user_id, email=f"{user_id}@example.com", org_id=org_id, role=role, permissions=[])
+
+
+def _verify(payload: TokenPayload) -> Optional[int]:
+    """Status code _verify_user_status rejects with, or None if the user may proceed."""
+    async def verify():
+        try:
+            await _verify_user_status(payload)
+        except HTTPException as e:
+            return e.status_code
+        return None
+
+    return support.run(verify())
+
+
+def _counting_decodes(calls: list):
+    """Wrap jwt.decode so the test can count signature verifications."""
+    decode = security.jwt.decode
+
+    def counted(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    return decode, counted
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_status_is_cached_after_first_read():
+    org_id = support.create_org()
+    user = _payload(support.create_user(org_id), org_id)
+
+    before = user_status_cache_stats()
+    assert _verify(user) is None
+    # A change made behind the API's back is only seen once the entry is dropped
+    support.execute("UPDATE users SET is_active = FALSE WHERE id = ?", (user.sub,))
+    assert _verify(user) is None
+    after = user_status_cache_stats()
+
+    assert after["misses"] - before["misses"] == 1, after
+    assert after["hits"] - before["hits"] == 1, after
+
+    invalidate_user_status(user.sub)
+    assert _verify(user) == 403
+
+
+def test_deactivation_applies_on_next_request():
+    org_id = support.create_org()
+    admin = _payload(support.create_user(org_id, "admin"), org_id, "admin")
+    user = _payload(support.create_user(org_id), org_id)
+    assert _verify(user) is None
+
+    async def deactivate():
+        async with async_connection() as db:
+            await delete_user(user.sub, admin, db)
+
+    support.run(deactivate())
+
+    assert _verify(user) == 403
+
+
+def test_unknown_user_is_not_cached():
+    org_id = support.create_org()
+    user = _payload(support.new_id("user_"), org_id)
+
+    assert _verify(user) == 401
+    support.execute(
+        """
+        INSERT INTO users (id, email, password_hash, first_name, last_name, role_id, organization_id, is_active)
+        VALUES (?, ?, 'x', 'Late', 'User', ?, ?, TRUE)
+        """,
+        (user.sub, user.email, support.role_id("technician"), org_id)
+    )
+    assert _verify(user) is None
+
+
+def test_verified_token_is_decoded_once():
+    token = create_access_token("user_token_cache", "cache@example.com", "org_token_cache", "technician", [])
+    calls: list = []
+    decode, security.jwt.decode = _counting_decodes(calls)
+    try:
+        first = decode_access_token(token)
+        second = decode_access_token(token)
+        clear_access_token_cache()
+        third = decode_access_token(token)
+    finally:
+        security.jwt.decode = decode
+
+    assert first is not None and first.sub == "user_token_cache"
+    assert second is first
+    assert third is not first and third.sub == first.sub
+    assert len(calls) == 2
+
+
+def test_token_is_not_cached_past_its_expiry():
+    token = create_access_token(
+        "user_short_token", "short@example.com", "org_token_cache", "technician", [],
+        expires_delta=timedelta(seconds=2)
+    )
+    calls: list = []
+    decode, security.jwt.decode = _counting_decodes(calls)
+    try:
+        assert decode_access_token(token) is not None
+        time.sleep(2.1)
+        decode_access_token(token)
+    finally:
+        security.jwt.decode = decode
+
+    # The second call verified again (and the token itself has expired by now)
+    assert len(calls) == 2
+
+
+def test_refresh_token_is_not_an_access_token():
+    token, _ = create_refresh_token("user_refresh", "session_refresh")
+    calls: list = []
+    decode, security.jwt.decode = _counting_decodes(calls)
+    try:
+        assert decode_access_token(token) is None
+        assert decode_access_token(token) is None
+    finally:
+        security.jwt.decode = decode
+
+    assert len(calls) == 2
+
+
+TESTS = [
+    test_status_is_cached_after_first_read,
+    test_deactivation_applies_on_next_request,
+    test_unknown_user_is_not_cached,
+    test_verified_token_is_decoded_once,
+    test_token_is_not_cached_past_its_expiry,
+    test_refresh_token_is_not_an_access_token,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("🔑 Authentication Cache Tests (app/api/deps.py)", TESTS)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Bulk Equipment Import Test Suite
+=============================================================================
+
+Tests streamed equipment imports (app/api/v1/equipment.py,
+app/services/bulk_import.py):
+- JSON arrays split at arbitrary byte boundaries import every record
+- invalid rows are reported by row number while valid rows are imported
+- a rejected batch is retried row by row so only the offending row fails
+- a body that stops being valid JSON keeps the rows before it
+- CSV uploads resolve location codes and treat blank cells as missing
+- the error list is capped and flagged as truncated
+
+Usage:
+    python tests/test_bulk_import_module.py
+    python -m pytest tests/test_bulk_import_module.py
+"""
+
+import io
+import json
+from typing import AsyncIterator, List
+
+import service_support as support
+
+from app.api.v1.equipment import _import_equipment
+from app.config import settings
+from app.database import async_connection
+from app.services.bulk_import import iter_csv_records, iter_json_records
+
+
+def _create_location(org_id: str) -> str:
+    location_id = support.new_id("loc_")
+    support.execute(
+        "INSERT INTO locations (id, organization_id, name, code) VALUES (?, ?, 'Plant', ?)",
+        (location_id, org_id, f"LOC-{location_id}")
+    )
+    return location_id
+
+
+async def _chunks(body: bytes, size: int) -> AsyncIterator[bytes]:
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def _import(org_id: str, records) -> object:
+    async def run():
+        async with async_connection() as db:
+            return await _import_equipment(db, org_id, "user_bulk_import", records)
+
+    return support.run(run())
+
+
+def _import_json(org_id: str, body: str, chunk_size: int = 7):
+    return _import(org_id, iter_json_records(_chunks(body.encode("utf-8"), chunk_size)))
+
+
+def _equipment_names(org_id: str) -> List[str]:
+    return [row[0] for row in support.fetch_all(
+        "SELECT name FROM equipment WHERE organization_id = ? ORDER BY name", (org_id,)
+    )]
+
+
+def _errors(report) -> List[tuple]:
+    return [(error.row, error.field) for error in report.errors]
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_json_array_split_across_chunks():
+    org_id = support.create_org()
+    body = json.dumps([{"name": f"Pump {index}", "description": "Zürich ✓ plant"} for index in range(12)])
+
+    report = _import_json(org_id, body, chunk_size=5)
+
+    assert (report.total_rows, report.created, report.failed) == (12, 12, 0)
+    assert len(_equipment_names(org_id)) == 12
+
+
+def test_invalid_rows_are_reported_and_skipped():
+    org_id = support.create_org()
+    location_id = _create_location(org_id)
+    lines = [
+        {"name": "Lathe", "location_code": f"LOC-{location_id}"},
+        ["not", "an", "object"],  # one bad row, not three
+        {"code": "missing-name"},
+        {"name": "Drill", "location_code": "LOC-missing"},
+        {"name": "Press", "location_id": location_id},
+    ]
+
+    report = _import_json(org_id, "\n".join(json.dumps(line) for line in lines))
+
+    assert (report.total_rows, report.created, report.failed) == (5, 2, 3)
+    assert _errors(report) == [(2, None), (3, "name"), (4, "location_id")]
+    assert _equipment_names(org_id) == ["Lathe", "Press"]
+    assert support.fetch_value(
+        "SELECT COUNT(*) FROM equipment WHERE organization_id = ? AND location_id = ?", (org_id, location_id)
+    ) == 2
+
+
+def test_rejected_batch_is_retried_row_by_row():
+    org_id = support.create_org()
+    code = support.new_id("EQ-")
+    records = [{"name": f"Motor {index}", "code": code if index in (1, 3) else None} for index in range(5)]
+    batch_size, settings.BULK_IMPORT_BATCH_SIZE = settings.BULK_IMPORT_BATCH_SIZE, 2
+    try:
+        report = _import_json(org_id, json.dumps(records))
+    finally:
+        settings.BULK_IMPORT_BATCH_SIZE = batch_size
+
+    assert (report.created, report.failed) == (4, 1)
+    assert [error.row for error in report.errors] == [4]
+    assert "Motor 3" not in _equipment_names(org_id)
+
+
+def test_malformed_body_keeps_earlier_rows():
+    org_id = support.create_org()
+
+    report = _import_json(org_id, '[{"name": "Boiler"}, {"name": "Chiller"}, {"name": ')
+
+    assert report.created == 2
+    assert report.failed == 1 and report.errors[0].row == 3
+    assert _equipment_names(org_id) == ["Boiler", "Chiller"]
+
+
+def test_csv_upload():
+    org_id = support.create_org()
+    location_id = _create_location(org_id)
+    csv_text = (
+        "﻿name,location_code,serial_number,purchase_cost\n"
+        f"Conveyor,LOC-{location_id},SN-1,1200.50\n"
+        "Mixer,,,\n"
+        ",,SN-3,\n"
+    )
+
+    report = _import(org_id, iter_csv_records(io.BytesIO(csv_text.encode("utf-8"))))
+
+    assert (report.total_rows, report.created, report.failed) == (3, 2, 1)
+    assert _errors(report) == [(3, "name")]
+    rows = support.fetch_all(
+        "SELECT name, location_id, serial_number FROM equipment WHERE organization_id = ? ORDER BY name", (org_id,)
+    )
+    assert rows == [("Conveyor", location_id, "SN-1"), ("Mixer", None, None)]
+
+
+def test_error_list_is_capped():
+    org_id = support.create_org()
+    max_errors, settings.BULK_IMPORT_MAX_ERRORS = settings.BULK_IMPORT_MAX_ERRORS, 2
+    try:
+        report = _import_json(org_id, json.dumps([{"code": "no-name"}] * 5 + [{"name": "Valid"}]))
+    finally:
+        settings.BULK_IMPORT_MAX_ERRORS = max_errors
+
+    assert (report.created, report.failed) == (1, 5)
+    assert len(report.errors) == 2 and report.errors_truncated
+
+
+TESTS = [
+    test_json_array_split_across_chunks,
+    test_invalid_rows_are_reported_and_skipped,
+    test_rejected_batch_is_retried_row_by_row,
+    test_malformed_body_keeps_earlier_rows,
+    test_csv_upload,
+    test_error_list_is_capped,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("📥 Bulk Import Tests (app/api/v1/equipment.py)", TESTS)
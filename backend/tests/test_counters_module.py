@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Organization Counter Test Suite
+=============================================================================
+
+Tests incrementally maintained org counters (app/services/counters.py):
+- an organization's counters are reconciled on first read
+- track_counters() deltas for inserts and updates match a full reconcile
+- NULL stock levels count the same way in deltas and in reconciliation
+- concurrent writes to the same row never double-apply a delta
+- count_inserted_rows() adds one contribution per bulk-inserted row
+
+Usage:
+    python tests/test_counters_module.py
+    python -m pytest tests/test_counters_module.py
+"""
+
+import asyncio
+from typing import Dict
+
+import service_support as support
+from app.database import async_connection
+from app.services.counters import (
+    RECONCILED_MARKER, count_inserted_rows, get_counters, reconcile_counters, track_counters,
+)
+
+
+def _stored_counters(org_id: str) -> Dict[str, float]:
+    return {
+        counter: value
+        for counter, value in support.fetch_all(
+            "SELECT counter, value FROM org_counters WHERE organization_id = ?", (org_id,)
+        )
+        if counter != RECONCILED_MARKER and value
+    }
+
+
+def _reconciled_counters(org_id: str) -> Dict[str, float]:
+    async def reconcile():
+        async with async_connection() as db:
+            await reconcile_counters(db, org_id)
+
+    support.run(reconcile())
+    return _stored_counters(org_id)
+
+
+async def _tracked(entity: str, entity_id: str, org_id: str, sql: str, params=(), pause: float = 0) -> None:
+    async with async_connection() as db:
+        async with track_counters(db, entity, entity_id, org_id):
+            await asyncio.sleep(pause)
+            await db.execute(sql, params)
+        await db.commit()
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_first_read_reconciles():
+    org_id = support.create_org()
+    equipment_id = support.create_equipment(org_id)
+    support.create_work_order(org_id, equipment_id, "pending")
+
+    async def read():
+        async with async_connection() as db:
+            return await get_counters(db, org_id)
+
+    counters = support.run(read())
+
+    assert RECONCILED_MARKER in counters
+    assert counters["equipment_all"] == 1
+    assert counters["work_orders_status:pending"] == 1
+
+
+def test_tracked_writes_match_reconcile():
+    org_id = support.create_org()
+    equipment_id = support.create_equipment(org_id)
+    _reconciled_counters(org_id)
+    wo_id = support.new_id("wo_")
+
+    support.run(_tracked(
+        "work_orders", wo_id, org_id,
+        """
+        INSERT INTO work_orders (id, organization_id, equipment_id, work_order_number, title, type, status)
+        VALUES (?, ?, ?, ?, 'Tracked', 'corrective', 'pending')
+        """,
+        (wo_id, org_id, equipment_id, f"WO-{wo_id}")
+    ))
+    support.run(_tracked(
+        "work_orders", wo_id, org_id,
+        "UPDATE work_orders SET status = 'in_progress' WHERE id = ?", (wo_id,)
+    ))
+    support.run(_tracked(
+        "equipment", equipment_id, org_id,
+        "UPDATE equipment SET status = 'retired' WHERE id = ?", (equipment_id,)
+    ))
+
+    tracked = _stored_counters(org_id)
+    assert tracked["work_orders_status:in_progress"] == 1
+    assert "work_orders_status:pending" not in tracked
+    assert tracked == _reconciled_counters(org_id)
+
+
+def test_null_stock_levels_match_reconcile():
+    org_id = support.create_org()
+    part_ids = [
+        support.create_part(org_id, quantity_in_stock=5, minimum_stock_level=10),
+        support.create_part(org_id, quantity_in_stock=None, minimum_stock_level=10),
+        support.create_part(org_id, quantity_in_stock=5, minimum_stock_level=None),
+        support.create_part(org_id, quantity_in_stock=50, minimum_stock_level=10),
+    ]
+    reconciled = _reconciled_counters(org_id)
+    assert reconciled["parts_low_stock"] == 1, reconciled
+
+    # Change every part through track_counters, then compare with a rebuild
+    for part_id in part_ids:
+        support.run(_tracked(
+            "parts_inventory", part_id, org_id,
+            "UPDATE parts_inventory SET minimum_stock_level = minimum_stock_level + 1 WHERE id = ?", (part_id,)
+        ))
+    support.run(_tracked(
+        "parts_inventory", part_ids[3], org_id,
+        "UPDATE parts_inventory SET quantity_in_stock = NULL WHERE id = ?", (part_ids[3],)
+    ))
+
+    tracked = _stored_counters(org_id)
+    assert tracked == _reconciled_counters(org_id), tracked
+
+
+def test_concurrent_updates_apply_one_delta_each():
+    org_id = support.create_org()
+    equipment_id = support.create_equipment(org_id)
+    wo_id = support.create_work_order(org_id, equipment_id, "pending")
+    _reconciled_counters(org_id)
+
+    async def race():
+        # Both writers would snapshot "pending" if the snapshot ran outside the write lock
+        await asyncio.gather(
+            _tracked("work_orders", wo_id, org_id,
+                     "UPDATE work_orders SET status = 'in_progress' WHERE id = ?", (wo_id,), pause=0.05),
+            _tracked("work_orders", wo_id, org_id,
+                     "UPDATE work_orders SET status = 'completed' WHERE id = ?", (wo_id,), pause=0.05),
+        )
+
+    support.run(race())
+
+    tracked = _stored_counters(org_id)
+    assert tracked == _reconciled_counters(org_id), tracked
+    assert sum(value for counter, value in tracked.items() if counter.startswith("work_orders_status:")) == 1
+
+
+def test_count_inserted_rows():
+    org_id = support.create_org()
+    equipment_id = support.create_equipment(org_id)
+    _reconciled_counters(org_id)
+    wo_ids = [support.create_work_order(org_id, equipment_id, "pending") for _ in range(3)]
+
+    async def count():
+        async with async_connection() as db:
+            await count_inserted_rows(db, "work_orders", org_id, [("pending",)] * len(wo_ids))
+            await db.commit()
+
+    support.run(count())
+
+    tracked = _stored_counters(org_id)
+    assert tracked["work_orders_total"] == 3
+    assert tracked == _reconciled_counters(org_id)
+
+
+TESTS = [
+    test_first_read_reconciles,
+    test_tracked_writes_match_reconcile,
+    test_null_stock_levels_match_reconcile,
+    test_concurrent_updates_apply_one_delta_each,
+    test_count_inserted_rows,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("🧮 Org Counter Tests (app/services/counters.py)", TESTS)
@@ -0,0 +1,564 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Database Layer Test Suite
+=============================================================================
+
+Tests the connection layer (app/database.py):
+- blocking driver calls and retry backoff run off the event loop
+- pooled connections are reused and the pool never grows past max_size
+- a checkout waits for a released connection, or times out
+- a block that raises rolls back its uncommitted writes
+- a connection released with an open transaction is rolled back, or
+  closed if the rollback fails, before anyone reuses it
+- a failed connect gives its slot back; closing the pool closes connections
+- replica syncs requested by writes are coalesced per policy, and a session
+  that wrote is synced before it reads again (read-your-writes)
+- execute_many() and batch() apply all of their statements or none, without
+  ending the caller's transaction
+- statements are cached by normalized SQL, so every spelling of a shape
+  shares one prepared statement; update and filter helpers keep dynamic
+  SQL to one shape
+
+Usage:
+    python tests/test_database_module.py
+    python -m pytest tests/test_database_module.py
+"""
+
+import asyncio
+import threading
+import time
+
+import service_support as support
+from app.database import (
+    ConnectionPool, Database, PoolTimeoutError, StatementCache, SyncCoordinator, SyncPolicy, async_connection,
+    coalesce_assignments, normalize_sql, optional_filter, statement_cache_stats,
+)
+
+INSERT_NOTE_SQL = "INSERT INTO audit_logs (id, organization_id, action, resource_type) VALUES (?, ?, ?, 'test')"
+
+
+class _Replica(Database):
+    """Embedded-replica stand-in that counts syncs instead of pulling frames."""
+
+    def __init__(self, ok: bool = True):
+        super().__init__()
+        self.ok = ok
+        self.syncs = 0
+
+    @property
+    def supports_sync(self) -> bool:
+        return True
+
+    def _sync_now(self) -> bool:
+        self.syncs += 1
+        return self.ok
+
+
+def _coordinator(policy: str, debounce_ms: int = 0, ok: bool = True):
+    """Coordinator whose dedicated sync connection is a _Replica."""
+    coordinator = SyncCoordinator(policy=policy, debounce_ms=debounce_ms)
+    coordinator._db = _Replica(ok)
+    return coordinator, coordinator._db
+
+
+def _wait_until_synced(coordinator: SyncCoordinator) -> None:
+    for _ in range(200):
+        if not coordinator.stats()["pending"]:
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"sync never ran: {coordinator.stats()}")
+
+
+def _note_count(org_id: str) -> int:
+    return support.fetch_value("SELECT COUNT(*) FROM audit_logs WHERE organization_id = ?", (org_id,))
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def _ticks_while(operation) -> tuple:
+    """Run `operation(db)` while counting how often the event loop gets to run other tasks."""
+    async def run():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        async with async_connection() as db:
+            task = asyncio.ensure_future(ticker())
+            try:
+                result = await operation(db)
+            finally:
+                done.set()
+                await task
+        return result, ticks
+
+    return support.run(run())
+
+
+def test_slow_query_does_not_block_event_loop():
+    async def slow_query(db):
+        execute_once = db._db._execute_once
+
+        def slow(*args):
+            time.sleep(0.3)
+            return execute_once(*args)
+
+        db._db._execute_once = slow
+        try:
+            return await db.fetch_one("SELECT 42")
+        finally:
+            db._db._execute_once = execute_once
+
+    row, ticks = _ticks_while(slow_query)
+
+    assert row[0] == 42
+    assert ticks >= 10, ticks
+
+
+def test_retry_backoff_does_not_block_event_loop():
+    failures = []
+
+    async def flaky_query(db):
+        execute_once = db._db._execute_once
+
+        def flaky(*args):
+            if not failures:
+                failures.append(args[0])
+                raise ConnectionError("connection reset by peer")
+            return execute_once(*args)
+
+        db._db._execute_once = flaky
+        backoff, Database._backoff_delay = Database._backoff_delay, staticmethod(lambda attempt: 0.3)
+        try:
+            return await db.fetch_one("SELECT 7")
+        finally:
+            Database._backoff_delay = backoff
+            db._db._execute_once = execute_once
+
+    row, ticks = _ticks_while(flaky_query)
+
+    assert row[0] == 7 and len(failures) == 1
+    assert ticks >= 10, ticks
+
+
+def test_pool_reuses_connections():
+    pool = ConnectionPool(min_size=1, max_size=2, timeout=1)
+    pool.open()
+    try:
+        first = pool.acquire()
+        pool.release(first)
+        again = pool.acquire()
+        pool.release(again)
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    assert again is first
+    assert stats["size"] == 1, stats
+    assert stats["checkouts"] == 2 and stats["in_use"] == 0, stats
+
+
+def test_checkout_beyond_max_size_times_out():
+    pool = ConnectionPool(min_size=0, max_size=2, timeout=0.1)
+    try:
+        held = [pool.acquire(), pool.acquire()]
+        try:
+            pool.acquire()
+        except PoolTimeoutError:
+            pass
+        else:
+            raise AssertionError("pool handed out more than max_size connections")
+        stats = pool.stats()
+        for db in held:
+            pool.release(db)
+    finally:
+        pool.close()
+
+    assert stats["size"] == 2 and stats["in_use"] == 2, stats
+    assert stats["timeouts"] == 1, stats
+
+
+def test_waiter_gets_released_connection():
+    pool = ConnectionPool(min_size=0, max_size=1, timeout=2)
+    try:
+        held = pool.acquire()
+        threading.Timer(0.05, pool.release, (held,)).start()
+
+        started = time.monotonic()
+        waited_for = pool.acquire()
+        elapsed = time.monotonic() - started
+        pool.release(waited_for)
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    assert waited_for is held
+    assert 0.03 < elapsed < 1.5, elapsed
+    assert stats["waits"] == 1 and stats["timeouts"] == 0, stats
+
+
+def test_connection_block_rolls_back_on_error():
+    org_id = support.create_org()
+    pool = ConnectionPool(min_size=0, max_size=1, timeout=1)
+    try:
+        try:
+            with pool.connection() as db:
+                db.execute(
+                    "INSERT INTO audit_logs (id, organization_id, action, resource_type) VALUES (?, ?, 'noted', 'test')",
+                    (support.new_id("log_"), org_id)
+                )
+                raise RuntimeError("handler failed")
+        except RuntimeError:
+            pass
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    assert _note_count(org_id) == 0
+    assert stats["in_use"] == 0 and stats["idle"] == 1, stats
+
+
+def test_release_rolls_back_open_transaction():
+    org_id = support.create_org()
+    pool = ConnectionPool(min_size=0, max_size=1, timeout=1)
+    try:
+        leaked = pool.acquire()
+        leaked.execute(INSERT_NOTE_SQL, (support.new_id("log_"), org_id, "leaked"))
+        assert leaked.in_transaction
+        pool.release(leaked)
+
+        reused = pool.acquire()
+        reopened = reused.in_transaction
+        pool.release(reused)
+
+        # The rollback cannot take effect: the connection is dropped instead
+        stuck = pool.acquire()
+        stuck.execute(INSERT_NOTE_SQL, (support.new_id("log_"), org_id, "stuck"))
+        stuck.rollback = lambda: None
+        pool.release(stuck)
+        stats = pool.stats()
+        stuck_connection = stuck._connection
+    finally:
+        pool.close()
+
+    assert reused is leaked and not reopened
+    assert _note_count(org_id) == 0
+    assert stuck_connection is None
+    assert stats["size"] == 0 and stats["in_use"] == 0, stats
+
+
+def test_failed_connect_frees_slot():
+    pool = ConnectionPool(min_size=0, max_size=1, timeout=0.1)
+    connect = Database.connect
+
+    def refuse(self, force_reconnect=False):
+        raise ConnectionError("connection refused")
+
+    Database.connect = refuse
+    try:
+        try:
+            pool.acquire()
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError("connect error was swallowed")
+    finally:
+        Database.connect = connect
+
+    try:
+        db = pool.acquire()
+        pool.release(db)
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    assert stats["size"] == 1 and stats["timeouts"] == 0, stats
+
+
+def test_close_closes_idle_and_released_connections():
+    pool = ConnectionPool(min_size=2, max_size=2, timeout=0.1)
+    pool.open()
+    held = pool.acquire()
+    idle = pool._idle[0]
+
+    pool.close()
+    assert idle._connection is None
+    assert held._connection is not None
+
+    pool.release(held)
+    assert held._connection is None
+    assert pool.stats()["size"] == 0
+    try:
+        pool.acquire()
+    except PoolTimeoutError:
+        pass
+    else:
+        raise AssertionError("closed pool handed out a connection")
+
+
+def test_immediate_sync_runs_on_the_writer():
+    coordinator, dedicated = _coordinator(SyncPolicy.IMMEDIATE)
+    writer = _Replica()
+
+    coordinator.request_sync(writer, "session-a")
+    coordinator.request_sync(writer, "session-a")
+
+    assert writer.syncs == 2 and dedicated.syncs == 0
+    assert not coordinator.needs_sync("session-a")
+    assert coordinator.stats()["pending"] is False
+
+
+def test_debounced_syncs_are_coalesced():
+    coordinator, dedicated = _coordinator(SyncPolicy.DEBOUNCED, debounce_ms=100)
+    writer = _Replica()
+    try:
+        # The first write after a quiet period syncs right away...
+        coordinator.request_sync(writer, "session-a")
+        _wait_until_synced(coordinator)
+        # ...later writes inside the debounce window share one sync
+        for _ in range(5):
+            coordinator.request_sync(writer, "session-a")
+        assert dedicated.syncs == 1
+        _wait_until_synced(coordinator)
+        stats = coordinator.stats()
+    finally:
+        coordinator.close()
+
+    assert writer.syncs == 0  # never on the request's own connection
+    assert dedicated.syncs == 2
+    assert stats["requested"] == 6 and stats["performed"] == 2 and stats["coalesced"] == 4, stats
+
+
+def test_writing_session_is_synced_before_it_reads():
+    coordinator, dedicated = _coordinator(SyncPolicy.DEBOUNCED, debounce_ms=60000)
+    try:
+        coordinator.request_sync(_Replica(), "writer")
+
+        assert coordinator.needs_sync("writer")
+        assert not coordinator.needs_sync("reader")
+        coordinator.ensure_fresh("reader")
+        assert dedicated.syncs == 0
+
+        coordinator.ensure_fresh("writer")
+        assert dedicated.syncs == 1
+        assert not coordinator.needs_sync("writer")
+        assert coordinator.stats()["forced_for_read_your_writes"] == 1
+    finally:
+        coordinator.close()
+
+
+def test_failed_sync_stays_pending():
+    coordinator, dedicated = _coordinator(SyncPolicy.DEBOUNCED, debounce_ms=60000, ok=False)
+    try:
+        coordinator.request_sync(_Replica(), "writer")
+        assert coordinator.flush() is False
+
+        stats = coordinator.stats()
+        assert stats["failures"] == 1 and stats["pending"] is True, stats
+        assert coordinator.needs_sync("writer")
+
+        dedicated.ok = True
+    finally:
+        coordinator.close()
+
+    # close() flushes what is still pending
+    assert dedicated.syncs == 2
+    assert coordinator.stats()["pending"] is False
+
+
+def test_local_sqlite_never_requests_a_sync():
+    db = Database()
+    db.connect()
+    try:
+        assert not db.supports_sync
+        assert db._sync_now() is False
+    finally:
+        db.close()
+
+
+def test_execute_many_inserts_every_row():
+    org_id = support.create_org()
+    rows = [(support.new_id("log_"), org_id, f"note {index}") for index in range(25)]
+
+    async def insert():
+        async with async_connection() as db:
+            empty = await db.execute_many(INSERT_NOTE_SQL, [])
+            inserted = await db.execute_many(INSERT_NOTE_SQL, rows)
+            await db.commit()
+            return empty, inserted
+
+    assert support.run(insert()) == (0, 25)
+    assert _note_count(org_id) == 25
+
+
+def test_failed_execute_many_keeps_callers_earlier_writes():
+    org_id = support.create_org()
+    duplicate = support.new_id("log_")
+    rows = [(support.new_id("log_"), org_id, "batch"), (duplicate, org_id, "batch"), (duplicate, org_id, "batch")]
+
+    async def insert():
+        async with async_connection() as db:
+            await db.execute(INSERT_NOTE_SQL, (support.new_id("log_"), org_id, "before"))
+            try:
+                await db.execute_many(INSERT_NOTE_SQL, rows)
+            except Exception as e:  # sqlite3 and libsql raise different types
+                assert "UNIQUE" in str(e), e
+            else:
+                raise AssertionError("duplicate key was accepted")
+            await db.commit()
+
+    support.run(insert())
+
+    assert support.fetch_all(
+        "SELECT action FROM audit_logs WHERE organization_id = ?", (org_id,)
+    ) == [("before",)]
+
+
+def test_batch_returns_result_per_statement():
+    org_id = support.create_org()
+    log_ids = [support.new_id("log_") for _ in range(2)]
+
+    async def run():
+        async with async_connection() as db:
+            async with db.transaction():
+                return await db.batch([
+                    (INSERT_NOTE_SQL, (log_ids[0], org_id, "a")),
+                    (INSERT_NOTE_SQL, (log_ids[1], org_id, "b")),
+                    ("UPDATE audit_logs SET action = 'c' WHERE organization_id = ?", (org_id,)),
+                    ("SELECT id FROM audit_logs WHERE organization_id = ? ORDER BY id", (org_id,)),
+                ])
+
+    results = support.run(run())
+
+    assert [result.rows_affected for result in results[:3]] == [1, 1, 2]
+    assert results[0].last_insert_rowid is not None
+    assert results[3].rows == [(log_id,) for log_id in sorted(log_ids)]
+
+
+def test_failed_batch_applies_nothing():
+    org_id = support.create_org()
+    log_id = support.new_id("log_")
+
+    async def run():
+        async with async_connection() as db:
+            try:
+                await db.batch([
+                    (INSERT_NOTE_SQL, (log_id, org_id, "first")),
+                    ("UPDATE audit_logs SET action = 'second' WHERE id = ?", (log_id,)),
+                    (INSERT_NOTE_SQL, (log_id, org_id, "duplicate")),
+                ])
+            except Exception as e:  # sqlite3 and libsql raise different types
+                assert "UNIQUE" in str(e), e
+            else:
+                raise AssertionError("duplicate key was accepted")
+            await db.commit()
+
+    support.run(run())
+
+    assert _note_count(org_id) == 0
+
+
+def test_sql_is_normalized_outside_literals():
+    assert normalize_sql("\n    SELECT id,\n\t   name FROM users\n    WHERE id = ?\n") == \
+        "SELECT id, name FROM users WHERE id = ?"
+    assert normalize_sql("SELECT '  two  spaces ', 'it''s  here'   FROM t") == \
+        "SELECT '  two  spaces ', 'it''s  here' FROM t"
+
+
+def test_spellings_of_a_statement_share_one_entry():
+    tag = support.new_id("stmt_")
+
+    async def run():
+        async with async_connection() as db:
+            before = statement_cache_stats()
+            await db.fetch_one(f"SELECT '{tag}'")
+            await db.fetch_one(f"""
+                SELECT
+                    '{tag}'
+            """)
+            return before, statement_cache_stats()
+
+    before, after = support.run(run())
+
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+
+
+def test_statement_cache_evicts_least_recently_used():
+    cache = StatementCache(2)
+    cache.enabled = True
+    before = statement_cache_stats()
+
+    for query in ["SELECT 1", "SELECT 2", "SELECT 1", "SELECT 3", "SELECT  1", "SELECT 2"]:
+        cache.prepare(query)
+    after = statement_cache_stats()
+
+    # SELECT 2 was the least recently used when SELECT 3 arrived
+    assert after["misses"] - before["misses"] == 4
+    assert after["hits"] - before["hits"] == 2
+    assert after["evictions"] - before["evictions"] == 2
+
+    disabled = StatementCache(2)
+    disabled.prepare("SELECT 1")
+    assert statement_cache_stats()["unprepared"] - after["unprepared"] == 1
+
+
+def test_shape_helpers_keep_one_statement_per_shape():
+    org_id = support.create_org()
+    equipment_id = support.create_equipment(org_id)
+    support.execute("UPDATE equipment SET description = 'kept' WHERE id = ?", (equipment_id,))
+
+    set_sql, params = coalesce_assignments({"name": "Renamed", "description": None})
+    other_sql, _ = coalesce_assignments({"name": None, "description": "Changed"})
+    support.execute(f"UPDATE equipment SET {set_sql} WHERE id = ?", (*params, equipment_id))
+
+    assert set_sql == other_sql
+    assert support.fetch_all("SELECT name, description FROM equipment WHERE id = ?", (equipment_id,)) == [
+        ("Renamed", "kept")
+    ]
+
+    filter_sql, _ = optional_filter("status", None)
+    counts = []
+    for status in (None, "active", "retired"):
+        _, filter_params = optional_filter("status", status)
+        counts.append(support.fetch_value(
+            f"SELECT COUNT(*) FROM equipment WHERE organization_id = ? AND {filter_sql}", (org_id, *filter_params)
+        ))
+    assert counts == [1, 1, 0]
+
+
+TESTS = [
+    test_slow_query_does_not_block_event_loop,
+    test_retry_backoff_does_not_block_event_loop,
+    test_pool_reuses_connections,
+    test_checkout_beyond_max_size_times_out,
+    test_waiter_gets_released_connection,
+    test_connection_block_rolls_back_on_error,
+    test_release_rolls_back_open_transaction,
+    test_failed_connect_frees_slot,
+    test_close_closes_idle_and_released_connections,
+    test_immediate_sync_runs_on_the_writer,
+    test_debounced_syncs_are_coalesced,
+    test_writing_session_is_synced_before_it_reads,
+    test_failed_sync_stays_pending,
+    test_local_sqlite_never_requests_a_sync,
+    test_execute_many_inserts_every_row,
+    test_failed_execute_many_keeps_callers_earlier_writes,
+    test_batch_returns_result_per_statement,
+    test_failed_batch_applies_nothing,
+    test_sql_is_normalized_outside_literals,
+    test_spellings_of_a_statement_share_one_entry,
+    test_statement_cache_evicts_least_recently_used,
+    test_shape_helpers_keep_one_statement_per_shape,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("🗄️  Database Layer Tests (app/database.py)", TESTS)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Streaming Export Test Suite
+=============================================================================
+
+Tests keyset-chunked export streaming (app/services/export.py):
+- every matching row is streamed once, newest first, in chunk_size chunks
+- rows sharing a created_at are split across chunks without repeats
+- no pooled connection is held while a chunk is being consumed
+- CSV cells a spreadsheet would evaluate are neutralized; NDJSON is one
+  object per line
+
+Usage:
+    python tests/test_export_module.py
+    python -m pytest tests/test_export_module.py
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+import service_support as support
+from app.database import get_pool
+from app.services import export
+
+
+BASE = datetime(2024, 6, 3, 9, 0)
+
+SELECT_SQL = "SELECT a.id, a.action, a.created_at FROM audit_logs a"
+
+
+def _create_logs(org_id: str, count: int, same_time: bool = False) -> List[str]:
+    ids = []
+    for index in range(count):
+        log_id = support.new_id("log_")
+        created_at = BASE if same_time else BASE + timedelta(minutes=index)
+        support.execute(
+            "INSERT INTO audit_logs (id, organization_id, action, resource_type, created_at) VALUES (?, ?, ?, 'test', ?)",
+            (log_id, org_id, f"action {index}", created_at)
+        )
+        ids.append(log_id)
+    return ids
+
+
+async def _collect(org_id: str, chunk_size: int, between_chunks=None) -> List[List[Tuple]]:
+    chunks = []
+    async for rows in export.stream_rows(
+        SELECT_SQL, "a.organization_id = ?", (org_id,),
+        ("a.created_at", "a.id"), lambda r: (r[2], r[0]), chunk_size
+    ):
+        chunks.append(rows)
+        if between_chunks is not None:
+            between_chunks()
+    return chunks
+
+
+async def _collect_text(chunks: List[List[Tuple]], export_format: str) -> str:
+    async def source():
+        for rows in chunks:
+            yield rows
+
+    return "".join([text async for text in export.encode(export_format, ["id", "action"], source())])
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_streams_every_row_newest_first():
+    org_id = support.create_org()
+    ids = _create_logs(org_id, 7)
+
+    chunks = support.run(_collect(org_id, chunk_size=3))
+
+    assert [len(rows) for rows in chunks] == [3, 3, 1]
+    assert [row[0] for rows in chunks for row in rows] == list(reversed(ids))
+
+
+def test_ties_on_created_at_are_not_repeated():
+    org_id = support.create_org()
+    ids = _create_logs(org_id, 5, same_time=True)
+
+    chunks = support.run(_collect(org_id, chunk_size=2))
+
+    streamed = [row[0] for rows in chunks for row in rows]
+    assert sorted(streamed) == sorted(ids)
+    assert streamed == sorted(ids, reverse=True)
+
+
+def test_exact_multiple_ends_with_empty_query():
+    org_id = support.create_org()
+    _create_logs(org_id, 4)
+
+    chunks = support.run(_collect(org_id, chunk_size=2))
+
+    assert [len(rows) for rows in chunks] == [2, 2]
+
+
+def test_connection_released_between_chunks():
+    org_id = support.create_org()
+    _create_logs(org_id, 6)
+    in_use: List[int] = []
+
+    support.run(_collect(org_id, chunk_size=2, between_chunks=lambda: in_use.append(get_pool().stats()["in_use"])))
+
+    assert in_use == [0, 0, 0], in_use
+
+
+def test_csv_neutralizes_formulas():
+    text = support.run(_collect_text([[("1", "=SUM(A1:A9)"), ("2", "plain")]], export.CSV))
+
+    assert text.splitlines() == ["id,action", "1,'=SUM(A1:A9)", "2,plain"]
+
+
+def test_ndjson_one_object_per_line():
+    text = support.run(_collect_text([[("1", "a")], [("2", "b")]], export.NDJSON))
+
+    assert [json.loads(line) for line in text.splitlines()] == [
+        {"id": "1", "action": "a"},
+        {"id": "2", "action": "b"},
+    ]
+
+
+TESTS = [
+    test_streams_every_row_newest_first,
+    test_ties_on_created_at_are_not_repeated,
+    test_exact_multiple_ends_with_empty_query,
+    test_connection_released_between_chunks,
+    test_csv_neutralizes_formulas,
+    test_ndjson_one_object_per_line,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("📤 Export Streaming Tests (app/services/export.py)", TESTS)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Meter Ingestion Test Suite
+=============================================================================
+
+Tests group commit of meter readings (app/services/meter_ingest.py):
+- concurrent submits are written together in one flush and all acknowledged
+- readings are committed even when meter trigger evaluation fails
+- a schedule crossing its threshold through buffered readings gets a work order
+- an empty submit returns without flushing
+
+Usage:
+    python tests/test_meter_ingest_module.py
+    python -m pytest tests/test_meter_ingest_module.py
+"""
+
+import asyncio
+from datetime import datetime
+from typing import List
+
+import service_support as support
+from app.core import generate_id
+from app.services import meter_ingest
+from app.services.meter_ingest import MeterReadingBuffer, ReadingRow
+
+
+AT = datetime(2024, 6, 3, 9, 0)
+
+
+def _rows(equipment_id: str, user_id: str, *values: float, meter_type: str = "hours") -> List[ReadingRow]:
+    return [(generate_id(), equipment_id, meter_type, value, user_id, AT, None) for value in values]
+
+
+def _reading_count(equipment_id: str) -> int:
+    return support.fetch_value("SELECT COUNT(*) FROM meter_readings WHERE equipment_id = ?", (equipment_id,))
+
+
+async def _submit_all(buffer: MeterReadingBuffer, batches: List[List[ReadingRow]]) -> None:
+    await asyncio.gather(*(buffer.submit(rows) for rows in batches))
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_concurrent_submits_share_one_flush():
+    org_id = support.create_org()
+    user_id = support.create_user(org_id)
+    equipment_ids = [support.create_equipment(org_id) for _ in range(5)]
+    buffer = MeterReadingBuffer(flush_interval=0.05, max_rows=1000)
+
+    support.run(_submit_all(buffer, [_rows(eq, user_id, 10, 20) for eq in equipment_ids]))
+
+    assert [_reading_count(eq) for eq in equipment_ids] == [2] * 5
+    stats = buffer.stats()
+    assert stats["flushes"] == 1, stats
+    assert stats["rows_written"] == 10, stats
+    assert stats["pending_rows"] == 0, stats
+
+
+def test_full_buffer_flushes_early():
+    org_id = support.create_org()
+    user_id = support.create_user(org_id)
+    equipment_id = support.create_equipment(org_id)
+    # The interval is far longer than the test; only max_rows can trigger the flush
+    buffer = MeterReadingBuffer(flush_interval=60, max_rows=3)
+
+    support.run(asyncio.wait_for(buffer.submit(_rows(equipment_id, user_id, 1, 2, 3)), 5))
+
+    assert _reading_count(equipment_id) == 3
+
+
+def test_trigger_failure_keeps_readings():
+    org_id = support.create_org()
+    user_id = support.create_user(org_id)
+    equipment_id = support.create_equipment(org_id)
+    buffer = MeterReadingBuffer(flush_interval=0.01, max_rows=1000)
+
+    async def failing_evaluation(db, readings):
+        raise RuntimeError("trigger evaluation failed")
+
+    original = meter_ingest.evaluate_meter_readings
+    meter_ingest.evaluate_meter_readings = failing_evaluation
+    try:
+        support.run(buffer.submit(_rows(equipment_id, user_id, 10, 20, 30)))
+    finally:
+        meter_ingest.evaluate_meter_readings = original
+
+    assert _reading_count(equipment_id) == 3
+    stats = buffer.stats()
+    assert stats["failures"] == 0, stats
+    assert stats["rows_written"] == 3, stats
+
+
+def test_buffered_readings_trigger_work_orders():
+    org_id = support.create_org()
+    user_id = support.create_user(org_id)
+    equipment_id = support.create_equipment(org_id)
+    schedule_id = support.create_schedule(
+        org_id, equipment_id, None, "meter_based", None,
+        meter_threshold=100, frequency_unit="hours"
+    )
+
+    async def ingest():
+        # A buffer belongs to one event loop, like the server's
+        buffer = MeterReadingBuffer(flush_interval=0.01, max_rows=1000)
+        # Baseline first, then a reading past the threshold
+        await buffer.submit(_rows(equipment_id, user_id, 0))
+        await buffer.submit(_rows(equipment_id, user_id, 150))
+
+    support.run(ingest())
+
+    assert support.fetch_value(
+        "SELECT COUNT(*) FROM work_orders WHERE schedule_id = ?", (schedule_id,)
+    ) == 1
+
+
+def test_empty_submit_is_a_no_op():
+    buffer = MeterReadingBuffer(flush_interval=0.01, max_rows=10)
+
+    support.run(buffer.submit([]))
+
+    assert buffer.stats()["flushes"] == 0
+
+
+TESTS = [
+    test_concurrent_submits_share_one_flush,
+    test_full_buffer_flushes_early,
+    test_trigger_failure_keeps_readings,
+    test_buffered_readings_trigger_work_orders,
+    test_empty_submit_is_a_no_op,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("📟 Meter Ingestion Tests (app/services/meter_ingest.py)", TESTS)
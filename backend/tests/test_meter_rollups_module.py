@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Meter Rollups Test Suite
+=============================================================================
+
+Tests meter rollups, series downsampling and retention
+(app/services/meter_rollups.py):
+- readings fold into hourly and daily min/max/sum/count/last buckets,
+  across batches and regardless of arrival order
+- series use raw readings, hourly or daily rollups - the finest that fits
+- windows reaching past retention fall back to coarser rollups
+- long daily series are merged down to the point budget
+- compaction drops old raw readings and hourly rollups, keeping daily ones
+
+Usage:
+    python tests/test_meter_rollups_module.py
+    python -m pytest tests/test_meter_rollups_module.py
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, Tuple
+
+import service_support as support
+
+from app.config import settings
+from app.database import async_connection
+from app.services.meter_rollups import DAY, HOUR, RAW, compact_meter_data, fetch_series, update_rollups
+from app.services.meter_triggers import MeterReading
+
+
+# Eight in the morning two days ago: recent enough for raw retention, and
+# leaves the rest of the day for hourly buckets that do not cross midnight
+BASE = datetime.utcnow().replace(hour=8, minute=0, second=0, microsecond=0) - timedelta(days=2)
+
+
+def _record(equipment_id: str, readings: Iterable[Tuple[float, datetime]], meter_type: str = "hours") -> None:
+    """Insert readings and their rollups the way the write paths do."""
+    org_id = support.fetch_value("SELECT organization_id FROM equipment WHERE id = ?", (equipment_id,))
+    user_id = support.create_user(org_id)
+    readings = list(readings)
+
+    async def run():
+        async with async_connection() as db:
+            await db.execute_many(
+                """
+                INSERT INTO meter_readings (id, equipment_id, meter_type, reading_value, recorded_by, recorded_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [(support.new_id("mr_"), equipment_id, meter_type, value, user_id, at) for value, at in readings]
+            )
+            await update_rollups(db, [MeterReading(equipment_id, meter_type, value, at) for value, at in readings])
+            await db.commit()
+
+    support.run(run())
+
+
+def _rollups(equipment_id: str, resolution: str) -> List[tuple]:
+    return support.fetch_all(
+        """
+        SELECT min_value, max_value, sum_value, sample_count, last_value FROM meter_rollups
+        WHERE equipment_id = ? AND resolution = ? ORDER BY bucket
+        """,
+        (equipment_id, resolution)
+    )
+
+
+def _series(equipment_id: str, start: datetime, end: datetime, max_points: int):
+    async def run():
+        async with async_connection() as db:
+            return await fetch_series(db, equipment_id, "hours", start, end, max_points)
+
+    return support.run(run())
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_readings_fold_into_hourly_and_daily_buckets():
+    equipment_id = support.create_equipment(support.create_org())
+
+    _record(equipment_id, [(5.0, BASE + timedelta(minutes=5)), (8.0, BASE + timedelta(minutes=70))])
+    # A late reading for the first hour must not replace its newer last value
+    _record(equipment_id, [(3.0, BASE + timedelta(minutes=40)), (1.0, BASE + timedelta(minutes=2))])
+
+    assert _rollups(equipment_id, HOUR) == [(1.0, 5.0, 9.0, 3, 3.0), (8.0, 8.0, 8.0, 1, 8.0)]
+    assert _rollups(equipment_id, DAY) == [(1.0, 8.0, 17.0, 4, 8.0)]
+
+
+def test_series_uses_finest_resolution_that_fits():
+    equipment_id = support.create_equipment(support.create_org())
+    _record(equipment_id, [(float(index), BASE + timedelta(minutes=10 * index)) for index in range(30)])
+    end = BASE + timedelta(hours=6)
+
+    resolution, points = _series(equipment_id, BASE, end, 40)
+    assert resolution == RAW and len(points) == 30
+
+    resolution, points = _series(equipment_id, BASE, end, 10)
+    assert resolution == HOUR and len(points) == 5
+    assert (points[0].min, points[0].max, points[0].avg, points[0].last, points[0].count) == (0, 5, 2.5, 5, 6)
+
+    resolution, points = _series(equipment_id, BASE, end, 4)
+    assert resolution == DAY and len(points) == 1
+    assert (points[0].min, points[0].max, points[0].count) == (0, 29, 30)
+
+
+def test_windows_past_retention_use_rollups():
+    equipment_id = support.create_equipment(support.create_org())
+    old = BASE - timedelta(days=settings.METER_RAW_RETENTION_DAYS + 10)
+    older = BASE - timedelta(days=settings.METER_HOURLY_RETENTION_DAYS + 10)
+    _record(equipment_id, [(1.0, old), (2.0, old + timedelta(minutes=5)), (4.0, older)])
+
+    # Two raw readings would fit, but raw data that old may already be gone
+    resolution, points = _series(equipment_id, old, old + timedelta(hours=1), 100)
+    assert resolution == HOUR and [(point.avg, point.count) for point in points] == [(1.5, 2)]
+
+    resolution, points = _series(equipment_id, older, older + timedelta(hours=1), 100)
+    assert resolution == DAY and [(point.last, point.count) for point in points] == [(4.0, 1)]
+
+
+def test_long_daily_series_is_merged_to_budget():
+    equipment_id = support.create_equipment(support.create_org())
+    start = BASE - timedelta(days=20)
+    _record(equipment_id, [(float(day), start + timedelta(days=day)) for day in range(20)])
+
+    resolution, points = _series(equipment_id, start, start + timedelta(days=20), 5)
+
+    assert resolution == DAY
+    assert [(point.min, point.max, point.count) for point in points] == [
+        (0, 3, 4), (4, 7, 4), (8, 11, 4), (12, 15, 4), (16, 19, 4)
+    ]
+    assert points[0].avg == 1.5 and points[0].last == 3
+
+
+def test_compaction_applies_retention():
+    equipment_id = support.create_equipment(support.create_org())
+    now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    recent = now - timedelta(days=1)
+    past_raw = now - timedelta(days=settings.METER_RAW_RETENTION_DAYS + 5)
+    past_hourly = now - timedelta(days=settings.METER_HOURLY_RETENTION_DAYS + 5)
+    _record(equipment_id, [
+        (1.0, past_hourly), (2.0, past_raw), (3.0, past_raw + timedelta(minutes=1)),
+        (4.0, past_raw + timedelta(minutes=2)), (5.0, recent),
+    ])
+
+    # Small chunks so the deletes take several transactions
+    batch_size, settings.METER_COMPACTION_BATCH_SIZE = settings.METER_COMPACTION_BATCH_SIZE, 2
+    try:
+        support.run(compact_meter_data())
+    finally:
+        settings.METER_COMPACTION_BATCH_SIZE = batch_size
+
+    assert support.fetch_all(
+        "SELECT reading_value FROM meter_readings WHERE equipment_id = ?", (equipment_id,)
+    ) == [(5.0,)]
+    assert [row[4] for row in _rollups(equipment_id, HOUR)] == [4.0, 5.0]
+    assert [row[4] for row in _rollups(equipment_id, DAY)] == [1.0, 4.0, 5.0]
+
+
+TESTS = [
+    test_readings_fold_into_hourly_and_daily_buckets,
+    test_series_uses_finest_resolution_that_fits,
+    test_windows_past_retention_use_rollups,
+    test_long_daily_series_is_merged_to_budget,
+    test_compaction_applies_retention,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("📈 Meter Rollup Tests (app/services/meter_rollups.py)", TESTS)
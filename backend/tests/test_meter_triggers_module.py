@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Meter Trigger Test Suite
+=============================================================================
+
+Tests meter-based schedule triggering (app/services/meter_triggers.py):
+- the first reading sets a schedule's baseline without firing
+- several schedules crossing their thresholds in one call each get a work order
+- a schedule fires at most once per batch of readings
+- a meter reset restarts counting from the lower value
+- concurrent evaluation of the same readings never duplicates work orders
+
+Usage:
+    python tests/test_meter_triggers_module.py
+    python -m pytest tests/test_meter_triggers_module.py
+"""
+
+import asyncio
+from datetime import datetime
+from typing import List
+
+import service_support as support
+from app.database import async_connection
+from app.services.meter_triggers import MeterReading, evaluate_meter_readings
+
+
+AT = datetime(2024, 6, 3, 9, 0)
+
+
+async def _evaluate(readings: List[MeterReading]):
+    async with async_connection() as db:
+        created = await evaluate_meter_readings(db, readings)
+        await db.commit()
+    return created
+
+
+def _evaluate_values(equipment_id: str, meter_type: str, *values: float):
+    return support.run(_evaluate([MeterReading(equipment_id, meter_type, value, AT) for value in values]))
+
+
+def _work_order_schedules(org_id: str) -> List[str]:
+    return [row[0] for row in support.fetch_all(
+        "SELECT schedule_id FROM work_orders WHERE organization_id = ? ORDER BY schedule_id", (org_id,)
+    )]
+
+
+def _meter_schedule(org_id: str, equipment_id: str, threshold: float, meter_type: str = "hours") -> str:
+    return support.create_schedule(
+        org_id, equipment_id, None, "meter_based", None,
+        meter_threshold=threshold, frequency_unit=meter_type
+    )
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_first_reading_sets_baseline():
+    org_id = support.create_org()
+    equipment_id = support.create_equipment(org_id)
+    schedule_id = _meter_schedule(org_id, equipment_id, 100)
+
+    assert _evaluate_values(equipment_id, "hours", 5000) == {}
+    assert support.fetch_value(
+        "SELECT last_trigger_value FROM meter_trigger_state WHERE schedule_id = ?", (schedule_id,)
+    ) == 5000
+    assert _work_order_schedules(org_id) == []
+
+
+def test_several_schedules_trigger_at_once():
+    org_id = support.create_org()
+    first, second = support.create_equipment(org_id), support.create_equipment(org_id)
+    schedules = [
+        _meter_schedule(org_id, first, 100),
+        _meter_schedule(org_id, first, 250),
+        _meter_schedule(org_id, first, 50, meter_type=None),
+        _meter_schedule(org_id, second, 10),
+    ]
+    support.run(_evaluate([MeterReading(first, "hours", 0, AT), MeterReading(second, "hours", 0, AT)]))
+
+    created = support.run(_evaluate([MeterReading(first, "hours", 300, AT), MeterReading(second, "hours", 20, AT)]))
+
+    assert created == {org_id: 4}
+    assert _work_order_schedules(org_id) == sorted(schedules)
+    numbers = support.fetch_all("SELECT work_order_number FROM work_orders WHERE organization_id = ?", (org_id,))
+    assert len({row[0] for row in numbers}) == 4, "work order numbers must be unique"
+
+
+def test_fires_once_per_batch_and_advances_baseline():
+    org_id = support.create_org()
+    equipment_id = support.create_equipment(org_id)
+    schedule_id = _meter_schedule(org_id, equipment_id, 100)
+    _evaluate_values(equipment_id, "hours", 0)
+
+    assert _evaluate_values(equipment_id, "hours", 150, 420, 310) == {org_id: 1}
+    assert support.fetch_value(
+        "SELECT last_trigger_value FROM meter_trigger_state WHERE schedule_id = ?", (schedule_id,)
+    ) == 420
+    # Below the next threshold: nothing new
+    assert _evaluate_values(equipment_id, "hours", 480) == {}
+
+
+def test_other_meter_types_are_ignored():
+    org_id = support.create_org()
+    equipment_id = support.create_equipment(org_id)
+    _meter_schedule(org_id, equipment_id, 100, meter_type="km")
+    _evaluate_values(equipment_id, "km", 0)
+
+    assert _evaluate_values(equipment_id, "hours", 1000) == {}
+    assert _evaluate_values(equipment_id, "km", 100) == {org_id: 1}
+
+
+def test_meter_reset_restarts_counting():
+    org_id = support.create_org()
+    equipment_id = support.create_equipment(org_id)
+    schedule_id = _meter_schedule(org_id, equipment_id, 100)
+    _evaluate_values(equipment_id, "hours", 900)
+
+    assert _evaluate_values(equipment_id, "hours", 20) == {}
+    assert support.fetch_value(
+        "SELECT last_trigger_value FROM meter_trigger_state WHERE schedule_id = ?", (schedule_id,)
+    ) == 20
+    assert _evaluate_values(equipment_id, "hours", 120) == {org_id: 1}
+
+
+def test_concurrent_evaluation_does_not_duplicate():
+    org_id = support.create_org()
+    equipment_id = support.create_equipment(org_id)
+    schedules = [_meter_schedule(org_id, equipment_id, 100) for _ in range(3)]
+    _evaluate_values(equipment_id, "hours", 0)
+
+    async def concurrent():
+        readings = [MeterReading(equipment_id, "hours", 200, AT)]
+        return await asyncio.gather(*(_evaluate(readings) for _ in range(3)))
+
+    results = support.run(concurrent())
+
+    assert sum(result.get(org_id, 0) for result in results) == 3
+    assert _work_order_schedules(org_id) == sorted(schedules)
+
+
+# =============================================================================
+# Main Runner
+# =============================================================================
+
+TESTS = [
+    test_first_reading_sets_baseline,
+    test_several_schedules_trigger_at_once,
+    test_fires_once_per_batch_and_advances_baseline,
+    test_other_meter_types_are_ignored,
+    test_meter_reset_restarts_counting,
+    test_concurrent_evaluation_does_not_duplicate,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("📟 Meter Triggers (meter_triggers)", TESTS)
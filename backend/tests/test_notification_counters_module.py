@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Unread Notification Counter Test Suite
+=============================================================================
+
+Tests per-user unread counters (app/services/counters.py) through the
+notification endpoints (app/api/v1/notifications.py):
+- dispatched notifications are counted and served by /count
+- marking a notification read decrements once, however often it is marked
+- users cannot change the count through someone else's notification
+- deleting an unread notification decrements; deleting a read one does not
+- read-all clears the count
+- reconciliation repairs a drifted counter
+
+Usage:
+    python tests/test_notification_counters_module.py
+    python -m pytest tests/test_notification_counters_module.py
+"""
+
+from datetime import datetime
+from typing import List
+
+import service_support as support
+
+from app.api.v1.notifications import delete_notification, get_unread_count, mark_all_read, mark_notification_read
+from app.config import settings
+from app.core.security import TokenPayload
+from app.database import async_connection
+from app.services.counters import reconcile_unread_counters
+from app.services.outbox import dispatch_batch, emit_event
+
+
+def _user(org_id: str) -> TokenPayload:
+    user_id = support.create_user(org_id)
+    return TokenPayload(sub=user_id, email=f"{user_id}@example.com", org_id=org_id, role="technician", permissions=[])
+
+
+def _notify(user: TokenPayload, count: int) -> List[str]:
+    """Deliver `count` notifications to `user` through the outbox."""
+    async def run():
+        async with async_connection() as db:
+            for index in range(count):
+                await emit_event(
+                    db, user.org_id, "test_event", reference_type=None, reference_id=None,
+                    title=f"Notice {index}", message="Counted", users=[user.sub]
+                )
+            await db.commit()
+            await dispatch_batch(db, datetime.utcnow(), settings.NOTIFICATION_DISPATCH_BATCH_SIZE)
+
+    support.run(run())
+    return [row[0] for row in support.fetch_all(
+        "SELECT id FROM notifications WHERE user_id = ? ORDER BY title", (user.sub,)
+    )]
+
+
+def _call(endpoint, *args):
+    async def run():
+        async with async_connection() as db:
+            return await endpoint(*args, db)
+
+    return support.run(run())
+
+
+def _count(user: TokenPayload) -> int:
+    return _call(get_unread_count, user)["unread_count"]
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_dispatched_notifications_are_counted():
+    user = _user(support.create_org())
+    assert _count(user) == 0
+
+    _notify(user, 3)
+
+    assert _count(user) == 3
+
+
+def test_mark_read_decrements_once():
+    user = _user(support.create_org())
+    first, second = _notify(user, 2)
+
+    _call(mark_notification_read, first, user)
+    _call(mark_notification_read, first, user)
+
+    assert _count(user) == 1
+    _call(mark_notification_read, second, user)
+    assert _count(user) == 0
+
+
+def test_other_users_notifications_are_untouched():
+    org_id = support.create_org()
+    owner, other = _user(org_id), _user(org_id)
+    (notification_id,) = _notify(owner, 1)
+    _notify(other, 1)
+
+    _call(mark_notification_read, notification_id, other)
+    _call(delete_notification, notification_id, other)
+
+    assert (_count(owner), _count(other)) == (1, 1)
+    assert support.fetch_value("SELECT is_read FROM notifications WHERE id = ?", (notification_id,)) == 0
+
+
+def test_delete_decrements_only_unread():
+    user = _user(support.create_org())
+    read, unread, kept = _notify(user, 3)
+    _call(mark_notification_read, read, user)
+
+    _call(delete_notification, read, user)
+    assert _count(user) == 2
+    _call(delete_notification, unread, user)
+    assert _count(user) == 1
+    assert support.fetch_all("SELECT id FROM notifications WHERE user_id = ?", (user.sub,)) == [(kept,)]
+
+
+def test_read_all_clears_count():
+    user = _user(support.create_org())
+    _notify(user, 4)
+
+    _call(mark_all_read, user)
+
+    assert _count(user) == 0
+    assert support.fetch_value(
+        "SELECT COUNT(*) FROM notifications WHERE user_id = ? AND is_read = FALSE", (user.sub,)
+    ) == 0
+
+
+def test_reconcile_repairs_drift():
+    user = _user(support.create_org())
+    _notify(user, 2)
+    support.execute("UPDATE notification_counters SET unread = 7 WHERE user_id = ?", (user.sub,))
+    cleared = _user(support.create_org())
+    support.execute("INSERT INTO notification_counters (user_id, unread) VALUES (?, 5)", (cleared.sub,))
+
+    async def reconcile():
+        async with async_connection() as db:
+            await reconcile_unread_counters(db)
+
+    support.run(reconcile())
+
+    assert (_count(user), _count(cleared)) == (2, 0)
+
+
+TESTS = [
+    test_dispatched_notifications_are_counted,
+    test_mark_read_decrements_once,
+    test_other_users_notifications_are_untouched,
+    test_delete_decrements_only_unread,
+    test_read_all_clears_count,
+    test_reconcile_repairs_drift,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("🔔 Unread Counter Tests (app/services/counters.py)", TESTS)
@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Event Outbox Test Suite
+=============================================================================
+
+Tests notification fan-out through the event outbox
+(app/services/outbox.py):
+- an event with a dedup_key is recorded once however often it is emitted
+- recipients are expanded from users, teams and roles, minus the actor,
+  inactive users and users of other organizations
+- a dispatcher that dies before writing leaves its events to be claimed
+  again once the lease expires, and gives up after the maximum attempts
+- a dispatcher that outlives its lease writes nothing for events another
+  dispatcher has claimed, so recipients are notified and counted once
+- a redelivered event writes and counts nothing it already delivered
+- processed events are purged after the retention period
+
+Usage:
+    python tests/test_outbox_module.py
+    python -m pytest tests/test_outbox_module.py
+"""
+
+from datetime import datetime, timedelta
+from typing import List
+
+import service_support as support
+
+from app.config import settings
+from app.database import async_connection
+from app.services import outbox
+from app.services.outbox import dispatch_batch, dispatch_notifications, emit_event, emit_work_order_assigned
+
+
+LEASE = timedelta(seconds=settings.NOTIFICATION_DISPATCH_LEASE_SECONDS)
+
+
+def _emit(org_id: str, **event) -> None:
+    async def run():
+        async with async_connection() as db:
+            await emit_event(
+                db, org_id, "test_event", reference_type=None, reference_id=None,
+                title="Test", message="Test event", **event
+            )
+            await db.commit()
+
+    support.run(run())
+
+
+def _dispatch(now: datetime):
+    async def run():
+        async with async_connection() as db:
+            return await dispatch_batch(db, now, settings.NOTIFICATION_DISPATCH_BATCH_SIZE)
+
+    return support.run(run())
+
+
+def _notified(org_id: str) -> List[str]:
+    return [row[0] for row in support.fetch_all(
+        "SELECT user_id FROM notifications WHERE organization_id = ? ORDER BY user_id", (org_id,)
+    )]
+
+
+def _unread(user_id: str) -> int:
+    return support.fetch_value("SELECT unread FROM notification_counters WHERE user_id = ?", (user_id,)) or 0
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_dedup_key_records_event_once():
+    org_id = support.create_org()
+    technician = support.create_user(org_id)
+    wo_id = support.create_work_order(org_id, support.create_equipment(org_id), assigned_to=technician)
+
+    async def emit_assigned():
+        async with async_connection() as db:
+            await emit_work_order_assigned(db, org_id, wo_id, "user_actor")
+            await db.commit()
+
+    support.run(emit_assigned())
+    support.run(emit_assigned())
+    assert support.fetch_value("SELECT COUNT(*) FROM event_outbox WHERE reference_id = ?", (wo_id,)) == 1
+
+    # A later assignment is a new event
+    support.execute("UPDATE work_orders SET updated_at = ? WHERE id = ?", (datetime(2030, 1, 1), wo_id))
+    support.run(emit_assigned())
+    assert support.fetch_value("SELECT COUNT(*) FROM event_outbox WHERE reference_id = ?", (wo_id,)) == 2
+
+
+def test_recipients_are_expanded_and_filtered():
+    org_id = support.create_org()
+    other_org = support.create_org()
+    actor, direct, member, manager = (
+        support.create_user(org_id), support.create_user(org_id),
+        support.create_user(org_id), support.create_user(org_id, "manager"),
+    )
+    inactive = support.create_user(org_id, is_active=False)
+    outsider = support.create_user(other_org)
+    team_id = support.create_team(org_id, [member, actor, inactive])
+    _emit(org_id, users=[direct, outsider, inactive], teams=[team_id], roles=["manager"], exclude=[actor])
+
+    _dispatch(datetime.utcnow())
+
+    assert _notified(org_id) == sorted([direct, member, manager])
+    assert [_unread(user_id) for user_id in (direct, member, manager, outsider)] == [1, 1, 1, 0]
+
+
+def test_crashed_dispatch_is_retried_after_lease():
+    org_id = support.create_org()
+    user_id = support.create_user(org_id)
+    _emit(org_id, users=[user_id])
+    now = datetime.utcnow()
+
+    async def crash_before_write():
+        async with async_connection() as db:
+            batch = db.batch
+            calls = []
+
+            async def failing(statements):
+                calls.append(statements)
+                if len(calls) > 1:
+                    raise ConnectionError("worker died")
+                return await batch(statements)
+
+            db.batch = failing
+            try:
+                await dispatch_batch(db, now, settings.NOTIFICATION_DISPATCH_BATCH_SIZE)
+            except ConnectionError:
+                pass
+
+    support.run(crash_before_write())
+    _dispatch(now + timedelta(seconds=1))
+    assert _notified(org_id) == []  # still leased to the dead worker
+
+    _dispatch(now + LEASE + timedelta(seconds=1))
+    assert _notified(org_id) == [user_id]
+    assert _unread(user_id) == 1
+    assert support.fetch_value(
+        "SELECT attempts FROM event_outbox WHERE organization_id = ? AND processed_at IS NOT NULL", (org_id,)
+    ) == 2
+
+
+def test_event_is_dropped_after_max_attempts():
+    org_id = support.create_org()
+    user_id = support.create_user(org_id)
+    _emit(org_id, users=[user_id])
+    support.execute(
+        "UPDATE event_outbox SET attempts = ? WHERE organization_id = ?", (settings.NOTIFICATION_MAX_ATTEMPTS, org_id)
+    )
+
+    _dispatch(datetime.utcnow() + LEASE * 2)
+
+    assert _notified(org_id) == []
+
+
+def test_expired_claim_does_not_write_twice():
+    org_id = support.create_org()
+    user_id = support.create_user(org_id)
+    _emit(org_id, users=[user_id])
+    now = datetime.utcnow() + LEASE * 3
+    resolve = outbox._resolve_recipients
+    other_worker = []
+
+    async def slow_resolve(db, events):
+        if not other_worker:
+            # This worker stalls past its lease; another one claims and delivers meanwhile
+            other_worker.append(None)
+            async with async_connection() as other_db:
+                other_worker[0] = await dispatch_batch(
+                    other_db, now + LEASE + timedelta(seconds=1), settings.NOTIFICATION_DISPATCH_BATCH_SIZE
+                )
+        return await resolve(db, events)
+
+    outbox._resolve_recipients = slow_resolve
+    try:
+        _, written = _dispatch(now)
+    finally:
+        outbox._resolve_recipients = resolve
+
+    assert other_worker[0][1] >= 1
+    assert written == 0
+    assert _notified(org_id) == [user_id]
+    assert _unread(user_id) == 1
+
+
+def test_redelivered_event_is_not_counted_again():
+    org_id = support.create_org()
+    delivered, added = support.create_user(org_id), support.create_user(org_id)
+    team_id = support.create_team(org_id, [delivered])
+    _emit(org_id, teams=[team_id])
+    now = datetime.utcnow() + LEASE * 4
+    assert _dispatch(now) == (1, 1)
+
+    # Delivered, but processed_at was lost (e.g. a commit that did not reach
+    # the primary); the team has grown since
+    support.execute(
+        "UPDATE event_outbox SET processed_at = NULL, claim_token = NULL, claimed_until = NULL "
+        "WHERE organization_id = ?", (org_id,)
+    )
+    support.execute(
+        "INSERT INTO team_members (id, team_id, user_id) VALUES (?, ?, ?)", (support.new_id("tm_"), team_id, added)
+    )
+
+    assert _dispatch(now + timedelta(seconds=1)) == (1, 1)
+    assert _notified(org_id) == sorted([delivered, added])
+    assert (_unread(delivered), _unread(added)) == (1, 1)
+
+
+def test_processed_events_are_purged():
+    org_id = support.create_org()
+    _emit(org_id, users=[support.create_user(org_id)])
+    now = datetime.utcnow() + LEASE * 5
+    _dispatch(now)
+    assert support.fetch_value("SELECT COUNT(*) FROM event_outbox WHERE organization_id = ?", (org_id,)) == 1
+
+    support.run(dispatch_notifications(now + timedelta(days=settings.NOTIFICATION_OUTBOX_RETENTION_DAYS, seconds=1)))
+
+    assert support.fetch_value("SELECT COUNT(*) FROM event_outbox WHERE organization_id = ?", (org_id,)) == 0
+
+
+TESTS = [
+    test_dedup_key_records_event_once,
+    test_recipients_are_expanded_and_filtered,
+    test_crashed_dispatch_is_retried_after_lease,
+    test_event_is_dropped_after_max_attempts,
+    test_expired_claim_does_not_write_twice,
+    test_redelivered_event_is_not_counted_again,
+    test_processed_events_are_purged,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("📬 Event Outbox Tests (app/services/outbox.py)", TESTS)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Pagination Test Suite
+=============================================================================
+
+Tests keyset pagination (PaginationParams in app/api/deps.py) through the
+work order list (app/api/v1/workorders.py):
+- following next_cursor visits every row once, newest first
+- rows sharing a created_at are split across pages without repeats
+- rows created while paging do not shift later pages
+- malformed cursors are rejected with a 400
+- include_total runs, reuses or skips the COUNT(*) behind `total`
+
+Usage:
+    python tests/test_pagination_module.py
+    python -m pytest tests/test_pagination_module.py
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import service_support as support
+from fastapi import HTTPException
+
+from app.api.deps import PaginationParams, encode_cursor
+from app.api.v1.workorders import list_work_orders
+from app.core.security import TokenPayload
+from app.database import async_connection
+
+
+BASE = datetime(2024, 6, 3, 9, 0)
+
+
+def _user(org_id: str) -> TokenPayload:
+    return TokenPayload(sub="user_pagination", email="pagination@example.com", org_id=org_id,
+                        role="admin", permissions=[])
+
+
+def _create_work_orders(org_id: str, count: int, same_time: bool = False) -> List[str]:
+    equipment_id = support.create_equipment(org_id)
+    created_by = support.create_user(org_id)
+    return [
+        support.create_work_order(
+            org_id, equipment_id, created_at=BASE if same_time else BASE + timedelta(minutes=index),
+            created_by=created_by
+        )
+        for index in range(count)
+    ]
+
+
+async def _page(org_id: str, page_size: int, cursor: Optional[str] = None, include_total: str = "exact"):
+    async with async_connection() as db:
+        return await list_work_orders(
+            _user(org_id), db, PaginationParams(page_size=page_size, cursor=cursor, include_total=include_total),
+            status=None, type=None, priority=None, equipment_id=None, assigned_to=None, search=None
+        )
+
+
+def _follow(org_id: str, page_size: int, between_pages=None) -> List[List[str]]:
+    pages = []
+    cursor = None
+    while True:
+        response = support.run(_page(org_id, page_size, cursor))
+        pages.append([item.id for item in response.items])
+        assert response.has_more == (response.next_cursor is not None)
+        if response.next_cursor is None:
+            return pages
+        cursor = response.next_cursor
+        if between_pages is not None:
+            between_pages()
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_cursor_visits_every_row_newest_first():
+    org_id = support.create_org()
+    ids = _create_work_orders(org_id, 7)
+
+    pages = _follow(org_id, 3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [wo_id for page in pages for wo_id in page] == list(reversed(ids))
+
+
+def test_ties_on_created_at_are_not_repeated():
+    org_id = support.create_org()
+    ids = _create_work_orders(org_id, 5, same_time=True)
+
+    pages = _follow(org_id, 2)
+
+    assert [wo_id for page in pages for wo_id in page] == sorted(ids, reverse=True)
+
+
+def test_new_rows_do_not_shift_later_pages():
+    org_id = support.create_org()
+    ids = _create_work_orders(org_id, 6)
+    equipment_id = support.create_equipment(org_id)
+    created_by = support.create_user(org_id)
+
+    # An offset page would repeat a row for every insert above it
+    pages = _follow(org_id, 2, between_pages=lambda: support.create_work_order(
+        org_id, equipment_id, created_at=BASE + timedelta(days=1), created_by=created_by
+    ))
+
+    assert [wo_id for page in pages for wo_id in page] == list(reversed(ids))
+
+
+def test_malformed_cursor_is_rejected():
+    org_id = support.create_org()
+    _create_work_orders(org_id, 1)
+
+    for cursor in ["not a cursor", encode_cursor("2024-06-03 09:00:00"), encode_cursor(1, 2, 3)]:
+        try:
+            support.run(_page(org_id, 2, cursor))
+        except HTTPException as e:
+            assert e.status_code == 400
+        else:
+            raise AssertionError(f"cursor {cursor!r} was accepted")
+
+
+def test_include_total_modes():
+    org_id = support.create_org()
+    _create_work_orders(org_id, 5)
+    first = support.run(_page(org_id, 2))
+    assert first.total == 5
+
+    support.create_work_order(org_id, support.create_equipment(org_id), created_by=support.create_user(org_id))
+
+    # "estimate" serves the count cached by the exact page; "exact" counts again
+    assert support.run(_page(org_id, 2, first.next_cursor, "estimate")).total == 5
+    assert support.run(_page(org_id, 2, first.next_cursor, "exact")).total == 6
+    assert support.run(_page(org_id, 2, first.next_cursor, "none")).total is None
+
+
+def test_last_offset_page_needs_no_count():
+    org_id = support.create_org()
+    _create_work_orders(org_id, 3)
+
+    async def last_page():
+        async with async_connection() as db:
+            counts = []
+            fetch_one = db.fetch_one
+
+            async def counting(query, params=()):
+                counts.append(query)
+                return await fetch_one(query, params)
+
+            db.fetch_one = counting
+            response = await list_work_orders(
+                _user(org_id), db, PaginationParams(page=2, page_size=2),
+                status=None, type=None, priority=None, equipment_id=None, assigned_to=None, search=None
+            )
+            return response, counts
+
+    response, counts = support.run(last_page())
+
+    assert response.total == 3 and not response.has_more
+    assert counts == []
+
+
+TESTS = [
+    test_cursor_visits_every_row_newest_first,
+    test_ties_on_created_at_are_not_repeated,
+    test_new_rows_do_not_shift_later_pages,
+    test_malformed_cursor_is_rejected,
+    test_include_total_modes,
+    test_last_offset_page_needs_no_count,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("📄 Pagination Tests (app/api/deps.py)", TESTS)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Password Hashing Pool Test Suite
+=============================================================================
+
+Tests bounded password hashing (PasswordHasher in app/core/security.py):
+- hashes run on the pool and their results come back to the caller
+- requests beyond workers + queue are rejected with a 429 and Retry-After
+- a cancelled caller keeps its slot until its hash actually finishes
+- worker errors reach the caller and free the slot
+
+Usage:
+    python tests/test_password_hasher_module.py
+    python -m pytest tests/test_password_hasher_module.py
+"""
+
+import asyncio
+import threading
+
+import service_support as support
+from app.core.exceptions import TooManyRequestsError, to_http_exception
+from app.core.security import PasswordHasher
+
+
+def _blocking(release: threading.Event):
+    """Hash stand-in that holds its worker until `release` is set."""
+    def work() -> str:
+        release.wait(5)
+        return "hashed"
+    return work
+
+
+async def _wait_for_in_flight(hasher: PasswordHasher, count: int) -> None:
+    for _ in range(200):
+        if hasher.stats()["in_flight"] == count:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"in_flight never reached {count}: {hasher.stats()}")
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_runs_on_the_pool():
+    hasher = PasswordHasher(workers=2, queue_size=2)
+    try:
+        result = support.run(hasher.run(lambda value: value.upper(), "secret"))
+        stats = hasher.stats()
+    finally:
+        hasher.shutdown()
+
+    assert result == "SECRET"
+    assert stats["completed"] == 1, stats
+    assert stats["in_flight"] == 0, stats
+
+
+def test_saturated_pool_rejects_with_retry_after():
+    hasher = PasswordHasher(workers=1, queue_size=1)
+    release = threading.Event()
+
+    async def saturate():
+        running = [asyncio.create_task(hasher.run(_blocking(release))) for _ in range(2)]
+        await _wait_for_in_flight(hasher, 2)
+        try:
+            await hasher.run(_blocking(release))
+        except TooManyRequestsError as e:
+            return e
+        finally:
+            release.set()
+            await asyncio.gather(*running)
+
+    try:
+        error = support.run(saturate())
+        stats = hasher.stats()
+    finally:
+        hasher.shutdown()
+
+    assert isinstance(error, TooManyRequestsError)
+    http_error = to_http_exception(error)
+    assert http_error.status_code == 429
+    assert http_error.headers == {"Retry-After": "1"}
+    assert http_error.detail["details"]["retry_after"] == 1
+    assert stats["rejected"] == 1, stats
+    assert stats["in_flight"] == 0, stats
+
+
+def test_cancelled_caller_keeps_slot_until_hash_finishes():
+    hasher = PasswordHasher(workers=1, queue_size=0)
+    release = threading.Event()
+
+    async def cancel_while_hashing():
+        task = asyncio.create_task(hasher.run(_blocking(release)))
+        await _wait_for_in_flight(hasher, 1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        # The worker thread is still busy, so the pool is still full
+        assert hasher.stats()["in_flight"] == 1, hasher.stats()
+        try:
+            await hasher.run(lambda: "next")
+        except TooManyRequestsError:
+            pass
+        else:
+            raise AssertionError("pool admitted a request while its only worker was busy")
+
+        release.set()
+        await _wait_for_in_flight(hasher, 0)
+        return await hasher.run(lambda: "next")
+
+    try:
+        result = support.run(cancel_while_hashing())
+    finally:
+        hasher.shutdown()
+
+    assert result == "next"
+
+
+def test_worker_error_frees_slot():
+    hasher = PasswordHasher(workers=1, queue_size=0)
+
+    def failing() -> str:
+        raise ValueError("invalid salt")
+
+    async def run_twice():
+        try:
+            await hasher.run(failing)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("worker error was swallowed")
+        return await hasher.run(lambda: "ok")
+
+    try:
+        result = support.run(run_twice())
+        stats = hasher.stats()
+    finally:
+        hasher.shutdown()
+
+    assert result == "ok"
+    assert stats["in_flight"] == 0, stats
+
+
+TESTS = [
+    test_runs_on_the_pool,
+    test_saturated_pool_rejects_with_retry_after,
+    test_cancelled_caller_keeps_slot_until_hash_finishes,
+    test_worker_error_frees_slot,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("🔐 Password Hashing Pool Tests (app/core/security.py)", TESTS)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Preventive Maintenance Generator Test Suite
+=============================================================================
+
+Tests the background PM generator (app/services/pm_scheduler.py):
+- every due schedule in a batch gets exactly one work order
+- work order numbers are unique within a batch
+- concurrent and repeated runs never duplicate a due instance
+- next_due advances past `now`
+- manual generation goes through the same claim, so it never duplicates a
+  due instance either (app/api/v1/schedules.py)
+
+Usage:
+    python tests/test_pm_scheduler_module.py
+    python -m pytest tests/test_pm_scheduler_module.py
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import service_support as support
+from fastapi import HTTPException
+
+from app.api.v1 import schedules
+from app.api.v1.schedules import generate_work_order_from_schedule
+from app.core.security import TokenPayload
+from app.database import async_connection
+from app.services import pm_scheduler
+from app.services.pm_scheduler import generate_due_work_orders
+
+
+NOW = datetime(2024, 6, 3, 9, 0)
+
+
+def _work_orders(org_id: str):
+    return support.fetch_all(
+        "SELECT schedule_id, work_order_number, type, status FROM work_orders WHERE organization_id = ?",
+        (org_id,)
+    )
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_generates_every_due_schedule_in_one_batch():
+    org_id = support.create_org()
+    equipment_id = support.create_equipment(org_id)
+    due = [support.create_schedule(org_id, equipment_id, NOW - timedelta(hours=i + 1)) for i in range(5)]
+    later = support.create_schedule(org_id, equipment_id, NOW + timedelta(days=1))
+
+    support.run(generate_due_work_orders(NOW))
+
+    work_orders = _work_orders(org_id)
+    assert sorted(row[0] for row in work_orders) == sorted(due)
+    assert len({row[1] for row in work_orders}) == len(due), "work order numbers must be unique"
+    assert all(row[2] == "preventive" and row[3] == "pending" for row in work_orders)
+    assert later not in {row[0] for row in work_orders}
+
+
+def test_due_schedules_of_several_organizations():
+    orgs = [support.create_org() for _ in range(3)]
+    for org_id in orgs:
+        equipment_id = support.create_equipment(org_id)
+        for _ in range(2):
+            support.create_schedule(org_id, equipment_id, NOW - timedelta(minutes=5))
+
+    support.run(generate_due_work_orders(NOW))
+
+    for org_id in orgs:
+        assert len(_work_orders(org_id)) == 2
+
+
+def test_next_due_advances_past_now():
+    org_id = support.create_org()
+    equipment_id = support.create_equipment(org_id)
+    schedule_id = support.create_schedule(org_id, equipment_id, NOW - timedelta(days=3), "daily", 1)
+
+    support.run(generate_due_work_orders(NOW))
+
+    next_due = datetime.fromisoformat(str(support.fetch_value(
+        "SELECT next_due FROM maintenance_schedules WHERE id = ?", (schedule_id,)
+    )))
+    assert next_due > NOW
+    # Missed instances collapse into one work order
+    assert len(_work_orders(org_id)) == 1
+
+
+def test_concurrent_and_repeated_runs_do_not_duplicate():
+    org_id = support.create_org()
+    equipment_id = support.create_equipment(org_id)
+    schedules = [support.create_schedule(org_id, equipment_id, NOW - timedelta(hours=1)) for _ in range(4)]
+
+    async def concurrent_runs():
+        await asyncio.gather(*(generate_due_work_orders(NOW) for _ in range(3)))
+
+    support.run(concurrent_runs())
+    support.run(generate_due_work_orders(NOW))
+
+    assert sorted(row[0] for row in _work_orders(org_id)) == sorted(schedules)
+    assert support.fetch_value(
+        "SELECT COUNT(*) FROM pm_generations WHERE organization_id = ?", (org_id,)
+    ) == len(schedules)
+
+
+def test_meter_based_schedules_are_skipped():
+    org_id = support.create_org()
+    equipment_id = support.create_equipment(org_id)
+    support.create_schedule(org_id, equipment_id, NOW - timedelta(hours=1), "meter_based", 100)
+
+    support.run(generate_due_work_orders(NOW))
+
+    assert _work_orders(org_id) == []
+
+
+def test_manual_generation_claims_the_due_instance():
+    org_id = support.create_org()
+    user_id = support.create_user(org_id, "manager")
+    equipment_id = support.create_equipment(org_id)
+    due = datetime.utcnow() - timedelta(hours=1)
+    schedule_id = support.create_schedule(org_id, equipment_id, due)
+    user = TokenPayload(sub=user_id, email=f"{user_id}@example.com", org_id=org_id, role="manager", permissions=[])
+
+    async def generate():
+        async with async_connection() as db:
+            try:
+                return await generate_work_order_from_schedule(schedule_id, user, db)
+            except HTTPException as e:
+                return e.status_code
+
+    # All three read the same next_due before any of them writes; otherwise a
+    # later one may legitimately generate the instance after it
+    load_calendars = schedules.load_business_calendars
+    waiting = []
+    all_read = asyncio.Event()
+
+    async def after_all_read(db, org_ids):
+        waiting.append(None)
+        if len(waiting) == 3:
+            all_read.set()
+        await all_read.wait()
+        return await load_calendars(db, org_ids)
+
+    async def concurrent_requests():
+        return await asyncio.gather(generate(), generate(), generate_due_work_orders(datetime.utcnow()))
+
+    schedules.load_business_calendars = pm_scheduler.load_business_calendars = after_all_read
+    try:
+        results = support.run(concurrent_requests())
+    finally:
+        schedules.load_business_calendars = pm_scheduler.load_business_calendars = load_calendars
+    results.append(support.run(generate()))
+
+    work_orders = support.fetch_all(
+        "SELECT id, work_order_number, created_by FROM work_orders WHERE schedule_id = ?", (schedule_id,)
+    )
+    assert len(work_orders) == 2, work_orders  # the due instance, then the one after it
+    responses = [result for result in results if isinstance(result, dict)]
+    assert sorted(r["work_order_id"] for r in responses) == sorted(row[0] for row in work_orders if row[2] == user_id)
+    assert all(r["work_order_number"] in {row[1] for row in work_orders} for r in responses)
+    assert support.fetch_value(
+        "SELECT COUNT(*) FROM pm_generations WHERE schedule_id = ?", (schedule_id,)
+    ) == 2
+    next_due, last_performed = support.fetch_all(
+        "SELECT next_due, last_performed FROM maintenance_schedules WHERE id = ?", (schedule_id,)
+    )[0]
+    assert datetime.fromisoformat(str(next_due)) == due + timedelta(days=2)
+    assert last_performed is not None
+
+
+# =============================================================================
+# Main Runner
+# =============================================================================
+
+TESTS = [
+    test_generates_every_due_schedule_in_one_batch,
+    test_due_schedules_of_several_organizations,
+    test_next_due_advances_past_now,
+    test_concurrent_and_repeated_runs_do_not_duplicate,
+    test_meter_based_schedules_are_skipped,
+    test_manual_generation_claims_the_due_instance,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("🛠️  PM Generator (pm_scheduler)", TESTS)
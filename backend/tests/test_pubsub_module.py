@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Live Update Stream Test Suite
+=============================================================================
+
+Tests server-sent live updates (app/services/pubsub.py,
+app/api/v1/stream.py):
+- events reach the streams of their user, or of their organization when
+  the stream may see work orders
+- a client that falls behind gets one `resync` instead of a growing queue,
+  and unread counts are coalesced to the latest value
+- connection limits per user and per process are enforced
+- a stream starts with the retry delay and the unread count, sends
+  heartbeats while idle and unsubscribes when closed
+- the notification dispatcher pushes new notifications and unread counts
+  to recipients with an open stream
+
+Usage:
+    python tests/test_pubsub_module.py
+    python -m pytest tests/test_pubsub_module.py
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import service_support as support
+
+from app.api.v1.stream import stream_updates
+from app.config import settings
+from app.core.permissions import Permission
+from app.core.security import TokenPayload
+from app.database import async_connection
+from app.services.outbox import dispatch_batch, emit_event
+from app.services.pubsub import (
+    NOTIFICATION, RESYNC, UNREAD_COUNT, WORK_ORDER, Broker, StreamLimitError, get_broker,
+)
+
+
+def _events(subscription) -> List[tuple]:
+    return support.run(subscription.next_events(0.01))
+
+
+def _limited(subscribe) -> bool:
+    try:
+        subscribe()
+    except StreamLimitError:
+        return True
+    return False
+
+
+def _stream_user(org_id: str, permissions: List[str] = (), exp: Optional[datetime] = None) -> TokenPayload:
+    user_id = support.create_user(org_id)
+    return TokenPayload(
+        sub=user_id, email=f"{user_id}@example.com", org_id=org_id, role="technician",
+        permissions=list(permissions), exp=exp
+    )
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_events_reach_user_and_organization_streams():
+    broker = Broker()
+    alice = broker.subscribe("org_a", "user_alice")
+    bob = broker.subscribe("org_a", "user_bob", work_orders=False)
+    carol = broker.subscribe("org_b", "user_carol")
+
+    broker.publish_to_user("user_alice", NOTIFICATION, {"id": "n1"})
+    broker.publish_work_order("org_a", {"id": "wo1"})
+
+    assert _events(alice) == [(NOTIFICATION, {"id": "n1"}), (WORK_ORDER, {"id": "wo1"})]
+    assert _events(bob) == []
+    assert _events(carol) == []
+    assert broker.subscribed_users(["user_bob", "user_dave", "user_bob"]) == ["user_bob"]
+    assert broker.stats()["events_published"] == 2
+
+
+def test_slow_client_gets_resync_and_latest_count():
+    broker = Broker()
+    subscription = broker.subscribe("org_a", "user_slow")
+
+    for index in range(settings.STREAM_QUEUE_SIZE + 5):
+        broker.publish_to_user("user_slow", NOTIFICATION, {"id": index})
+        broker.set_unread("user_slow", index)
+
+    assert _events(subscription) == [(RESYNC, {}), (UNREAD_COUNT, {"unread_count": settings.STREAM_QUEUE_SIZE + 4})]
+
+    # Back to normal delivery after the resync
+    broker.publish_to_user("user_slow", NOTIFICATION, {"id": "next"})
+    assert _events(subscription) == [(NOTIFICATION, {"id": "next"})]
+
+
+def test_connection_limits():
+    broker = Broker()
+    per_user, settings.STREAM_MAX_CONNECTIONS_PER_USER = settings.STREAM_MAX_CONNECTIONS_PER_USER, 2
+    total, settings.STREAM_MAX_CONNECTIONS = settings.STREAM_MAX_CONNECTIONS, 3
+    try:
+        first = broker.subscribe("org_a", "user_tabs")
+        broker.subscribe("org_a", "user_tabs")
+        assert _limited(lambda: broker.subscribe("org_a", "user_tabs"))  # per user
+        broker.subscribe("org_a", "user_other")
+        assert _limited(lambda: broker.subscribe("org_b", "user_third"))  # per process
+
+        broker.unsubscribe(first)
+        broker.unsubscribe(first)
+        broker.subscribe("org_b", "user_third")
+    finally:
+        settings.STREAM_MAX_CONNECTIONS_PER_USER = per_user
+        settings.STREAM_MAX_CONNECTIONS = total
+
+    assert broker.stats() == {
+        "connections": 3, "users": 3, "organizations": 2, "events_published": 0, "rejected_connections": 2,
+    }
+
+
+def test_stream_sends_count_events_and_heartbeats():
+    org_id = support.create_org()
+    user = _stream_user(org_id, [Permission.WORKORDER_READ])
+    support.execute("INSERT INTO notification_counters (user_id, unread) VALUES (?, 4)", (user.sub,))
+    heartbeat, settings.STREAM_HEARTBEAT_SECONDS = settings.STREAM_HEARTBEAT_SECONDS, 0.05
+
+    async def run():
+        response = await stream_updates(user)
+        body = response.body_iterator
+        chunks = [await body.__anext__(), await body.__anext__()]
+        get_broker().publish_work_order(org_id, {"id": "wo_live", "status": "completed"})
+        chunks.append(await body.__anext__())
+        chunks.append(await body.__anext__())
+        connected = get_broker().subscribed_users([user.sub])
+        await body.aclose()
+        return chunks, connected
+
+    try:
+        chunks, connected = support.run(run())
+    finally:
+        settings.STREAM_HEARTBEAT_SECONDS = heartbeat
+
+    assert chunks == [
+        f"retry: {settings.STREAM_RETRY_MILLISECONDS}\n\n",
+        'event: unread_count\ndata: {"unread_count":4}\n\n',
+        'event: work_order\ndata: {"id":"wo_live","status":"completed"}\n\n',
+        ": ping\n\n",
+    ]
+    assert connected == [user.sub]
+    assert get_broker().subscribed_users([user.sub]) == []
+
+
+def test_stream_ends_when_token_expires():
+    org_id = support.create_org()
+    user = _stream_user(org_id, exp=datetime.now(timezone.utc) - timedelta(seconds=1))
+
+    async def run():
+        response = await stream_updates(user)
+        return [chunk async for chunk in response.body_iterator]
+
+    assert support.run(run()) == [f"retry: {settings.STREAM_RETRY_MILLISECONDS}\n\n"]
+    assert get_broker().subscribed_users([user.sub]) == []
+
+
+def test_dispatcher_pushes_to_open_streams():
+    org_id = support.create_org()
+    listening, offline = support.create_user(org_id), support.create_user(org_id)
+    subscription = get_broker().subscribe(org_id, listening)
+
+    async def run():
+        async with async_connection() as db:
+            await emit_event(
+                db, org_id, "test_event", reference_type="work_order", reference_id="wo_pushed",
+                title="Pushed", message="Live", users=[listening, offline]
+            )
+            await db.commit()
+            await dispatch_batch(db, datetime.utcnow(), settings.NOTIFICATION_DISPATCH_BATCH_SIZE)
+        return await subscription.next_events(0.01)
+
+    try:
+        events = support.run(run())
+    finally:
+        get_broker().unsubscribe(subscription)
+
+    assert [event for event, _ in events] == [NOTIFICATION, UNREAD_COUNT]
+    assert events[0][1]["reference_id"] == "wo_pushed" and events[0][1]["user_id"] == listening
+    assert events[1][1] == {"unread_count": 1}
+
+
+TESTS = [
+    test_events_reach_user_and_organization_streams,
+    test_slow_client_gets_resync_and_latest_count,
+    test_connection_limits,
+    test_stream_sends_count_events_and_heartbeats,
+    test_stream_ends_when_token_expires,
+    test_dispatcher_pushes_to_open_streams,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("📡 Live Update Stream Tests (app/services/pubsub.py)", TESTS)
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Query Plan Regression Checker
+=============================================================================
+
+Builds an in-memory SQLite database from migrations/ and runs
+EXPLAIN QUERY PLAN on every hot query registered below. A query fails the
+check when the planner:
+- falls back to a full table (or whole-index) scan on any of its tables
+- does not seek on the query's tenant key (organization_id / user_id)
+- sorts in a temporary B-tree instead of reading rows in index order
+
+Registered queries are built from the SQL constants and query builders the
+code itself runs, so a changed hot query is re-checked automatically. When
+you add a new hot query, expose its SQL (or builder) and register it here so
+a missing index shows up before it reaches production.
+
+Usage:
+    python tests/test_query_plans.py          # print plans, exit 1 on bad plans
+    python -m pytest tests/test_query_plans.py
+
+The backend's requirements must be installed (the SQL is imported from
+app/); no server or Turso connection is needed.
+"""
+
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+# Settings for importing app/ (a throwaway local database, never a server)
+import service_support  # noqa: E402,F401
+from app.api.deps import PaginationParams, encode_cursor  # noqa: E402
+from app.api.v1 import notifications, reports, schedules, workorders  # noqa: E402
+from app.api.v1.audit import audit_log_filters, audit_log_list_query  # noqa: E402
+from app.api.v1.equipment import equipment_filters, equipment_list_query  # noqa: E402
+from app.api.v1.parts import part_filters, part_list_query  # noqa: E402
+from app.api.v1.users import user_filters, user_list_query  # noqa: E402
+from app.services import assignment, export, meter_rollups, outbox, pm_scheduler, stats  # noqa: E402
+
+ORG = "org_test"
+USER = "user_test"
+NOW = "2024-01-01 00:00:00"
+PAGE_LIMIT = 21
+CHUNK_SIZE = 1000
+
+
+class HotQuery(NamedTuple):
+    name: str
+    sql: str
+    params: Tuple
+    # Plan must contain this seek, e.g. "(organization_id=?" for tenant-first indexes
+    seek: str = "(organization_id=?"
+    # Aggregates and small result sets may sort without an index
+    allow_sort: bool = False
+
+
+def work_order_page(name: str, cursor: Optional[str] = None, **filters: Any) -> HotQuery:
+    """A work order list page, built the way the list endpoint builds it."""
+    where_sql, params = workorders.work_order_filters(ORG, **filters)
+    keyset_sql, keyset_params = PaginationParams(cursor=cursor).keyset(("w.created_at", "w.id"))
+    return HotQuery(
+        name,
+        workorders.work_order_list_query(where_sql, keyset_sql),
+        (*params, *keyset_params, PAGE_LIMIT, 0),
+    )
+
+
+def list_page(
+    name: str,
+    list_query: Callable[[str, str], str],
+    where: Tuple[str, List[Any]],
+    sort_columns: Sequence[str],
+    cursor: Optional[str] = None,
+    descending: bool = True
+) -> HotQuery:
+    """A keyset list page of another endpoint, built from its filters and list query builder."""
+    where_sql, params = where
+    keyset_sql, keyset_params = PaginationParams(cursor=cursor).keyset(sort_columns, descending)
+    return HotQuery(name, list_query(where_sql, keyset_sql), (*params, *keyset_params, PAGE_LIMIT, 0))
+
+
+def export_chunk(name: str, select_sql: str, sort_columns: Sequence[str], where: Tuple[str, List[Any]]) -> HotQuery:
+    """A later export chunk (resuming after a key), built the way stream_rows builds it."""
+    where_sql, params = where
+    return HotQuery(
+        name,
+        export.chunk_query(select_sql, where_sql, sort_columns, resume=True),
+        (*params, NOW, "last_id", CHUNK_SIZE),
+    )
+
+
+# =============================================================================
+# Registered Hot Queries
+# =============================================================================
+# Built from the same constants and builders the code runs, so a change to a
+# hot query is checked without touching this file.
+
+_status_where, _status_params = workorders.work_order_filters(ORG, status="pending")
+_schedule_where, _schedule_params = schedules.schedule_filters(ORG, True)
+
+HOT_QUERIES: List[HotQuery] = [
+    # --- workorders.py ---
+    work_order_page("workorders.list"),
+    work_order_page("workorders.list_by_status", status="pending"),
+    work_order_page("workorders.list_by_assignee", assigned_to=USER),
+    work_order_page("workorders.list_next_page", cursor=encode_cursor(NOW, "wo_last")),
+    HotQuery(
+        "workorders.count_by_status",
+        workorders.work_order_count_query(_status_where),
+        tuple(_status_params),
+    ),
+
+    # --- equipment.py, users.py, parts.py, audit.py (keyset list pages) ---
+    list_page("equipment.list", equipment_list_query, equipment_filters(ORG), ("e.created_at", "e.id")),
+    list_page(
+        "equipment.list_by_status", equipment_list_query, equipment_filters(ORG, status="operational"),
+        ("e.created_at", "e.id"),
+    ),
+    list_page(
+        "equipment.list_next_page", equipment_list_query, equipment_filters(ORG), ("e.created_at", "e.id"),
+        cursor=encode_cursor(NOW, "eq_last"),
+    ),
+    list_page("users.list", user_list_query, user_filters(ORG), ("u.created_at", "u.id")),
+    list_page(
+        "users.list_next_page", user_list_query, user_filters(ORG, is_active=True), ("u.created_at", "u.id"),
+        cursor=encode_cursor(NOW, "user_last"),
+    ),
+    list_page("parts.list", part_list_query, part_filters(ORG), ("p.name", "p.id"), descending=False),
+    list_page(
+        "parts.list_next_page", part_list_query, part_filters(ORG, category="filters"), ("p.name", "p.id"),
+        cursor=encode_cursor("Gasket", "part_last"), descending=False,
+    ),
+    list_page("audit.list", audit_log_list_query, audit_log_filters(ORG), ("a.created_at", "a.id")),
+    list_page(
+        "audit.list_next_page", audit_log_list_query, audit_log_filters(ORG, action="update"),
+        ("a.created_at", "a.id"), cursor=encode_cursor(NOW, "audit_last"),
+    ),
+
+    # --- services/stats.py ---
+    HotQuery("stats.overdue_work_orders", stats.OVERDUE_WORK_ORDERS_SQL, (ORG, NOW)),
+    HotQuery("stats.upcoming_maintenance", stats.UPCOMING_MAINTENANCE_SQL, (ORG, NOW)),
+
+    # --- schedules.py ---
+    HotQuery("schedules.list", schedules.schedule_list_query(_schedule_where), tuple(_schedule_params)),
+    HotQuery("schedules.upcoming", schedules.UPCOMING_SCHEDULES_SQL, (ORG, NOW)),
+    HotQuery("schedules.overdue", schedules.OVERDUE_SCHEDULES_SQL, (ORG, NOW)),
+    HotQuery("schedules.forecast", schedules.FORECAST_SCHEDULES_SQL, (ORG, NOW)),
+
+    # --- services/meter_rollups.py (equipment ownership checked first) ---
+    HotQuery(
+        "meter_rollups.raw_series_count", meter_rollups.RAW_SERIES_COUNT_SQL,
+        ("eq_test", "hours", NOW, NOW, 501), seek="(equipment_id=?",
+    ),
+    HotQuery(
+        "meter_rollups.raw_series", meter_rollups.RAW_SERIES_SQL,
+        ("eq_test", "hours", NOW, NOW), seek="(equipment_id=?",
+    ),
+    HotQuery(
+        "meter_rollups.rollup_series", meter_rollups.ROLLUP_SERIES_SQL,
+        ("eq_test", "hours", "hour", NOW, NOW), seek="(equipment_id=?",
+    ),
+
+    # --- services/assignment.py (workload index rebuild) ---
+    HotQuery(
+        "assignment.open_work_by_assignee", assignment.OPEN_WORK_BY_ASSIGNEE_SQL,
+        (assignment.DEFAULT_HOURS, ORG),
+    ),
+
+    # --- services/pm_scheduler.py (cross-tenant background scan) ---
+    HotQuery("pm_scheduler.due_schedules", pm_scheduler.DUE_SCHEDULES_SQL, (NOW, 200), seek="(next_due<?"),
+
+    # --- services/outbox.py (cross-tenant notification dispatcher) ---
+    HotQuery("outbox.claimed_events", outbox.CLAIMED_EVENTS_SQL, ("token",), seek="(claim_token=?"),
+
+    # --- reports.py ---
+    HotQuery("reports.equipment_health_by_status", reports.EQUIPMENT_HEALTH_BY_STATUS_SQL, (ORG, "operational", 10)),
+    HotQuery("reports.equipment_health", reports.EQUIPMENT_HEALTH_SQL, (ORG, 10)),
+    HotQuery("reports.workorder_summary_total", reports.WORK_ORDERS_CREATED_SQL, (ORG, NOW)),
+    HotQuery("reports.workorder_summary", reports.WORK_ORDERS_CREATED_BY_STATUS_SQL, (ORG, NOW, "completed")),
+    HotQuery("reports.maintenance_costs", reports.MAINTENANCE_COST_SQL, (ORG, NOW)),
+    HotQuery("reports.parts_costs", reports.PARTS_COST_SQL, (ORG, NOW)),
+    export_chunk(
+        "reports.export_work_orders_chunk", reports.WORK_ORDER_EXPORT_SQL, reports.WORK_ORDER_EXPORT_SORT,
+        workorders.work_order_filters(ORG),
+    ),
+    export_chunk(
+        "reports.export_equipment_chunk", reports.EQUIPMENT_EXPORT_SQL, reports.EQUIPMENT_EXPORT_SORT,
+        equipment_filters(ORG),
+    ),
+    export_chunk(
+        "reports.export_audit_logs_chunk", reports.AUDIT_LOG_EXPORT_SQL, reports.AUDIT_LOG_EXPORT_SORT,
+        audit_log_filters(ORG, action="update"),
+    ),
+
+    # --- notifications.py ---
+    HotQuery("notifications.list", notifications.NOTIFICATIONS_SQL, (USER, 50), seek="(user_id=?"),
+    HotQuery("notifications.list_unread", notifications.UNREAD_NOTIFICATIONS_SQL, (USER, 50), seek="(user_id=?"),
+    HotQuery("notifications.unread_count", notifications.UNREAD_COUNT_SQL, (USER,), seek="(user_id=?"),
+]
+
+
+# =============================================================================
+# Plan Checking
+# =============================================================================
+
+# "SCAN work_orders" / "SCAN w" / "SCAN TABLE work_orders" (older SQLite);
+# covering-index scans read the whole index and count as full scans too
+_FULL_SCAN = re.compile(r"^SCAN (TABLE )?(?P<table>\w+)")
+_TEMP_SORT = "USE TEMP B-TREE FOR ORDER BY"
+
+
+def create_database() -> sqlite3.Connection:
+    """In-memory database with every migration applied in order."""
+    conn = sqlite3.connect(":memory:")
+    for migration in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        conn.executescript(migration.read_text())
+    return conn
+
+
+def explain(conn: sqlite3.Connection, query: HotQuery) -> List[str]:
+    """EXPLAIN QUERY PLAN detail lines for a query."""
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {query.sql}", query.params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def problems(query: HotQuery, plan: List[str]) -> List[str]:
+    """Everything wrong with a query's plan (empty when the plan is fine)."""
+    found = [f"full scan: {line}" for line in plan if _FULL_SCAN.match(line)]
+    if not any(query.seek in line for line in plan):
+        found.append(f"no seek on {query.seek.strip('(=?')}")
+    if not query.allow_sort and _TEMP_SORT in plan:
+        found.append("sorts in a temp B-tree")
+    return found
+
+
+def check_all() -> Dict[str, List[str]]:
+    """Map of query name -> plan problems."""
+    conn = create_database()
+    try:
+        return {query.name: problems(query, explain(conn, query)) for query in HOT_QUERIES}
+    finally:
+        conn.close()
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_hot_queries_use_indexes():
+    failures = {name: found for name, found in check_all().items() if found}
+    assert not failures, f"Hot queries with bad plans: {failures}"
+
+
+def test_query_names_are_unique():
+    names = [query.name for query in HOT_QUERIES]
+    assert len(names) == len(set(names))
+
+
+# =============================================================================
+# Main Runner
+# =============================================================================
+
+def main():
+    conn = create_database()
+    failed = 0
+
+    print(f"\n  Checking {len(HOT_QUERIES)} hot queries against {MIGRATIONS_DIR}\n")
+    for query in HOT_QUERIES:
+        plan = explain(conn, query)
+        found = problems(query, plan)
+        failed += bool(found)
+        print(f"  {'❌' if found else '✅'} {query.name}")
+        for line in plan:
+            print(f"         {line}")
+        for problem in found:
+            print(f"       !! {problem}")
+
+    conn.close()
+
+    if failed:
+        print(f"\n  ❌ {failed}/{len(HOT_QUERIES)} hot queries have bad plans\n")
+        sys.exit(1)
+    print(f"\n  🎉 All {len(HOT_QUERIES)} hot queries use tenant-first indexes\n")
+
+
+if __name__ == "__main__":
+    main()
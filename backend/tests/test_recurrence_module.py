@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Schedule Recurrence Test Suite
+=============================================================================
+
+Tests calendar-correct due dates (app/services/recurrence.py):
+- month and year steps clamp to the end of shorter months without drifting
+- the first occurrence at or after a moment is found arithmetically
+- next_due_after() skips missed instances and business-calendar collisions
+- business calendars roll non-working days forward
+- partial schedule updates validate custom units against the stored
+  frequency type (app/api/v1/schedules.py)
+
+Usage:
+    python tests/test_recurrence_module.py
+    python -m pytest tests/test_recurrence_module.py
+"""
+
+import json
+from datetime import date, datetime
+
+import service_support as support
+from fastapi import HTTPException
+
+from app.api.v1.schedules import ScheduleUpdateRequest, update_schedule
+from app.core.security import TokenPayload
+from app.database import async_connection
+from app.services.recurrence import (
+    ALWAYS_OPEN, DAYS, HOURS, MONTHS, WEEKS, YEARS, BusinessCalendar, Recurrence,
+    add_months, expand_occurrences, next_due_after, normalize_unit,
+)
+
+
+JAN_31 = datetime(2024, 1, 31, 8, 0)
+
+# Monday to Friday, with Wednesday 2024-06-05 off
+WEEKDAYS = BusinessCalendar(working_days=range(5), holidays=[date(2024, 6, 5)])
+
+
+async def _update(schedule_id: str, org_id: str, **fields):
+    user = TokenPayload(sub="user_recurrence", email="recurrence@example.com", org_id=org_id,
+                        role="manager", permissions=[])
+    async with async_connection() as db:
+        try:
+            return await update_schedule(schedule_id, ScheduleUpdateRequest(**fields), user, db)
+        except HTTPException as e:
+            return e.status_code
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_month_steps_clamp_to_month_end():
+    assert add_months(JAN_31, 1) == datetime(2024, 2, 29, 8, 0)
+    assert add_months(datetime(2023, 1, 31), 1) == datetime(2023, 2, 28)
+    assert add_months(datetime(2024, 11, 30), 3) == datetime(2025, 2, 28)
+    assert add_months(datetime(2024, 2, 29), -12) == datetime(2023, 2, 28)
+
+
+def test_occurrences_are_anchored_and_do_not_drift():
+    monthly = Recurrence(MONTHS, 1)
+
+    # Each step is taken from the anchor, so February does not pull later months back
+    assert [monthly.nth(JAN_31, n).date() for n in range(4)] == [
+        date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30)
+    ]
+    assert Recurrence(YEARS, 1).nth(datetime(2024, 2, 29), 1) == datetime(2025, 2, 28)
+    assert Recurrence(WEEKS, 2).nth(JAN_31, 3) == datetime(2024, 3, 13, 8, 0)
+
+
+def test_index_at_or_after():
+    monthly = Recurrence(MONTHS, 1)
+    assert monthly.index_at_or_after(JAN_31, datetime(2023, 1, 1)) == 0
+    assert monthly.index_at_or_after(JAN_31, JAN_31) == 0
+    assert monthly.index_at_or_after(JAN_31, datetime(2024, 2, 29, 8, 0)) == 1
+    assert monthly.index_at_or_after(JAN_31, datetime(2024, 2, 29, 8, 1)) == 2
+    assert monthly.index_at_or_after(JAN_31, datetime(2034, 1, 31, 8, 0)) == 120
+
+    every_6_hours = Recurrence(HOURS, 6)
+    assert every_6_hours.index_at_or_after(JAN_31, datetime(2024, 2, 1, 8, 0)) == 4
+    assert every_6_hours.index_at_or_after(JAN_31, datetime(2024, 2, 1, 8, 1)) == 5
+
+
+def test_next_due_after_skips_missed_instances():
+    daily = Recurrence(DAYS, 1)
+    due = datetime(2024, 6, 1, 9, 0)
+
+    assert next_due_after(daily, due, datetime(2024, 6, 1, 10, 0)) == datetime(2024, 6, 2, 9, 0)
+    # A week without a generator yields the next instance, not seven catch-up ones
+    assert next_due_after(daily, due, datetime(2024, 6, 8, 10, 0)) == datetime(2024, 6, 9, 9, 0)
+    # Generating early still moves to the following instance
+    assert next_due_after(daily, due, datetime(2024, 5, 30)) == datetime(2024, 6, 2, 9, 0)
+
+
+def test_next_due_after_collapses_calendar_collisions():
+    daily = Recurrence(DAYS, 1)
+    saturday = datetime(2024, 6, 8, 9, 0)
+
+    assert next_due_after(daily, saturday, saturday) == datetime(2024, 6, 9, 9, 0)
+    # Saturday's instance is due Monday, so Sunday and Monday (also due Monday) are skipped
+    assert next_due_after(daily, saturday, saturday, WEEKDAYS) == datetime(2024, 6, 11, 9, 0)
+
+
+def test_business_calendar_roll_forward():
+    assert WEEKDAYS.roll_forward(datetime(2024, 6, 4, 7, 30)) == datetime(2024, 6, 4, 7, 30)
+    assert WEEKDAYS.roll_forward(datetime(2024, 6, 5, 7, 30)) == datetime(2024, 6, 6, 7, 30)
+    assert WEEKDAYS.roll_forward(datetime(2024, 6, 8, 7, 30)) == datetime(2024, 6, 10, 7, 30)
+    assert ALWAYS_OPEN.roll_forward(datetime(2024, 6, 8)) == datetime(2024, 6, 8)
+
+    stored = BusinessCalendar.from_settings(json.dumps({"business_calendar": WEEKDAYS.as_dict()}))
+    assert stored.as_dict() == WEEKDAYS.as_dict()
+    assert BusinessCalendar.from_settings('{"business_calendar": {"holidays": ["June 5"]}}') is ALWAYS_OPEN
+
+
+def test_expand_occurrences_within_window():
+    weekly = Recurrence(WEEKS, 1)
+    occurrences = list(expand_occurrences(
+        weekly, datetime(2024, 1, 3, 9, 0), datetime(2024, 6, 1), datetime(2024, 6, 30), WEEKDAYS
+    ))
+
+    # Wednesdays in June 2024; the June 5 holiday moves to Thursday
+    assert [value.date() for value in occurrences] == [
+        date(2024, 6, 6), date(2024, 6, 12), date(2024, 6, 19), date(2024, 6, 26)
+    ]
+
+
+def test_normalize_unit_and_schedule_rules():
+    assert normalize_unit(" Month ") == MONTHS
+    assert normalize_unit("days") == DAYS
+    assert normalize_unit("fortnight") is None
+    assert normalize_unit(None) is None
+
+    assert Recurrence.for_schedule("monthly", 3) == Recurrence(MONTHS, 3)
+    assert Recurrence.for_schedule("custom", 2, "Week") == Recurrence(WEEKS, 2)
+    assert Recurrence.for_schedule("custom", 2, "fortnight") == Recurrence(DAYS, 30)
+    assert Recurrence.for_schedule("daily", 0) == Recurrence(DAYS, 1)
+
+
+def test_update_validates_unit_against_stored_frequency_type():
+    org_id = support.create_org()
+    equipment_id = support.create_equipment(org_id)
+    custom_id = support.create_schedule(org_id, equipment_id, JAN_31, "custom", 2, frequency_unit="weeks")
+    daily_id = support.create_schedule(org_id, equipment_id, JAN_31, "daily", 1)
+
+    # Unit alone on a stored custom schedule is validated and normalized
+    assert support.run(_update(custom_id, org_id, frequency_unit="fortnight")) == 400
+    assert support.run(_update(custom_id, org_id, frequency_unit="Month")).frequency_unit == MONTHS
+
+    # Switching to custom without a unit keeps a stored unit only if it is valid
+    assert support.run(_update(daily_id, org_id, frequency_type="custom")) == 400
+    assert support.run(_update(daily_id, org_id, frequency_type="custom", frequency_unit="day")).frequency_unit == DAYS
+
+    # Leaving custom lets any unit through unchanged
+    assert support.run(_update(custom_id, org_id, frequency_type="weekly", frequency_unit="n/a")).frequency_type == "weekly"
+    assert support.run(_update("sched_missing", org_id, frequency_unit="days")) == 404
+
+
+TESTS = [
+    test_month_steps_clamp_to_month_end,
+    test_occurrences_are_anchored_and_do_not_drift,
+    test_index_at_or_after,
+    test_next_due_after_skips_missed_instances,
+    test_next_due_after_collapses_calendar_collisions,
+    test_business_calendar_roll_forward,
+    test_expand_occurrences_within_window,
+    test_normalize_unit_and_schedule_rules,
+    test_update_validates_unit_against_stored_frequency_type,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("📅 Schedule Recurrence Tests (app/services/recurrence.py)", TESTS)
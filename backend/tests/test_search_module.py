@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Full-Text Search Test Suite
+=============================================================================
+
+Tests the FTS5 search index (app/services/search.py):
+- the index is built at startup from existing rows
+- indexed rows are found by word prefixes, only within their organization
+- reindexing after an update drops the old text; deleted rows leave the index
+- soft-deleted equipment, parts and users drop out of unified search but
+  stay findable by list filters that ask for them
+- user input cannot inject FTS5 syntax
+- results are ranked per type and limited per type
+- list endpoints filter through the index (app/api/v1/workorders.py)
+- /search groups hits by type and checks out no request connection
+  besides the one it searches on (app/api/v1/search.py)
+
+Usage:
+    python tests/test_search_module.py
+    python -m pytest tests/test_search_module.py
+"""
+
+import inspect
+from typing import List, Sequence
+
+import service_support as support
+
+from app.api.deps import PaginationParams, get_unpooled_user
+from app.api.v1.search import search_all
+from app.api.v1.equipment import delete_equipment
+from app.api.v1.parts import delete_part
+from app.api.v1.users import delete_user, list_users
+from app.api.v1.workorders import list_work_orders
+from app.core.security import TokenPayload
+from app.database import async_connection, get_pool
+from app.services.search import (
+    EQUIPMENT, PART, USER, WORK_ORDER, build_match_query, ensure_search_index, index_document, search,
+)
+
+
+def _ready() -> None:
+    assert support.run(ensure_search_index()), "FTS5 index unavailable"
+
+
+def _search(org_id: str, text: str, entity_types: Sequence[str] = (WORK_ORDER,), limit: int = 10) -> List[str]:
+    async def run():
+        async with async_connection() as db:
+            return await search(db, org_id, text, entity_types, limit)
+
+    return [row[1] for row in support.run(run())]
+
+
+def _reindex(entity_type: str, entity_id: str) -> None:
+    async def run():
+        async with async_connection() as db:
+            await index_document(db, entity_type, entity_id)
+            await db.commit()
+
+    support.run(run())
+
+
+def _work_order(org_id: str, title: str, **columns) -> str:
+    wo_id = support.create_work_order(
+        org_id, support.create_equipment(org_id), title=title, created_by=support.create_user(org_id), **columns
+    )
+    _reindex(WORK_ORDER, wo_id)
+    return wo_id
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_startup_builds_index_from_existing_rows():
+    org_id = support.create_org()
+    wo_id = support.create_work_order(org_id, support.create_equipment(org_id), title="Preexisting gearbox")
+    support.execute("DELETE FROM search_index")
+
+    _ready()
+
+    assert _search(org_id, "gearbox") == [wo_id]
+
+
+def test_prefix_search_within_organization():
+    _ready()
+    org_id = support.create_org()
+    other_org = support.create_org()
+    wo_id = _work_order(org_id, "Pump Motor overheating")
+    _work_order(other_org, "Pump Motor overheating")
+
+    assert _search(org_id, "pum mot") == [wo_id]
+    assert _search(org_id, "pump valve") == []
+
+
+def test_reindex_follows_updates_and_deletes():
+    _ready()
+    org_id = support.create_org()
+    wo_id = _work_order(org_id, "Replace conveyor belt")
+
+    support.execute("UPDATE work_orders SET title = 'Align conveyor rollers' WHERE id = ?", (wo_id,))
+    _reindex(WORK_ORDER, wo_id)
+    assert _search(org_id, "belt") == []
+    assert _search(org_id, "rollers") == [wo_id]
+
+    support.execute("DELETE FROM work_orders WHERE id = ?", (wo_id,))
+    _reindex(WORK_ORDER, wo_id)
+    assert _search(org_id, "conveyor") == []
+
+
+def test_soft_deleted_rows_leave_unified_search():
+    _ready()
+    org_id = support.create_org()
+    admin_id = support.create_user(org_id, "admin")
+    admin = TokenPayload(sub=admin_id, email=f"{admin_id}@example.com", org_id=org_id, role="admin", permissions=[])
+    equipment_id = support.create_equipment(org_id)
+    part_id = support.create_part(org_id, name="Turbine gasket")
+    user_id = support.create_user(org_id)
+    support.execute("UPDATE equipment SET name = 'Turbine housing' WHERE id = ?", (equipment_id,))
+    support.execute("UPDATE users SET last_name = 'Turbine' WHERE id = ?", (user_id,))
+    for entity_type, entity_id in ((EQUIPMENT, equipment_id), (PART, part_id), (USER, user_id)):
+        _reindex(entity_type, entity_id)
+    types = (EQUIPMENT, PART, USER)
+    assert sorted(_search(org_id, "turbine", types)) == sorted([equipment_id, part_id, user_id])
+
+    async def delete_all():
+        async with async_connection() as db:
+            await delete_equipment(equipment_id, admin, db)
+            await delete_part(part_id, admin, db)
+            await delete_user(user_id, admin, db)
+
+    support.run(delete_all())
+
+    assert _search(org_id, "turbine", types) == []
+
+    async def list_inactive():
+        async with async_connection() as db:
+            return await list_users(admin, db, PaginationParams(), role=None, is_active=False, search="turbine")
+
+    assert [item.id for item in support.run(list_inactive()).items] == [user_id]
+
+
+def test_user_input_cannot_inject_fts_syntax():
+    _ready()
+    org_id = support.create_org()
+    wo_id = _work_order(org_id, "Hydraulic press NEAR leak")
+
+    assert build_match_query('press" OR * NEAR(') == '"press"* "OR"* "NEAR"*'
+    assert build_match_query("  ---  ") is None
+    assert _search(org_id, 'hydraulic" OR "x') == []
+    assert _search(org_id, "hydraulic near") == [wo_id]
+
+
+def test_results_are_limited_per_type():
+    _ready()
+    org_id = support.create_org()
+    work_orders = [_work_order(org_id, f"Compressor check {index}") for index in range(3)]
+    equipment_id = support.create_equipment(org_id)
+    support.execute("UPDATE equipment SET name = 'Compressor unit' WHERE id = ?", (equipment_id,))
+    _reindex(EQUIPMENT, equipment_id)
+
+    found = _search(org_id, "compressor", (WORK_ORDER, EQUIPMENT, PART), limit=2)
+
+    assert len(found) == 3
+    assert equipment_id in found
+    assert len(set(found) & set(work_orders)) == 2
+
+
+def test_list_endpoint_filters_through_index():
+    _ready()
+    org_id = support.create_org()
+    wo_id = _work_order(org_id, "Lubricate spindle bearings")
+    _work_order(org_id, "Inspect forklift tyres")
+    user = TokenPayload(sub="user_search", email="search@example.com", org_id=org_id, role="admin", permissions=[])
+
+    async def list_matching(text: str):
+        async with async_connection() as db:
+            return await list_work_orders(
+                user, db, PaginationParams(),
+                status=None, type=None, priority=None, equipment_id=None, assigned_to=None, search=text
+            )
+
+    response = support.run(list_matching("spind bear"))
+
+    assert [item.id for item in response.items] == [wo_id]
+    assert response.total == 1
+
+
+def test_search_endpoint_uses_one_connection():
+    _ready()
+    org_id = support.create_org()
+    wo_id = _work_order(org_id, "Calibrate torque wrench")
+    user = TokenPayload(
+        sub="user_search", email="search@example.com", org_id=org_id, role="admin", permissions=["*"]
+    )
+    in_use = get_pool().stats()["in_use"]
+
+    response = support.run(search_all(user, q="torque", types="work_order,equipment", limit=5))
+
+    assert [hit.id for hit in response.results["work_order"]] == [wo_id]
+    assert response.results["equipment"] == [] and not response.timed_out
+    assert get_pool().stats()["in_use"] == in_use
+    # Authenticated without a request-scoped connection
+    (dependency,) = inspect.signature(search_all).parameters["current_user"].annotation.__metadata__
+    assert dependency.dependency is get_unpooled_user
+
+
+TESTS = [
+    test_startup_builds_index_from_existing_rows,
+    test_prefix_search_within_organization,
+    test_reindex_follows_updates_and_deletes,
+    test_soft_deleted_rows_leave_unified_search,
+    test_user_input_cannot_inject_fts_syntax,
+    test_results_are_limited_per_type,
+    test_list_endpoint_filters_through_index,
+    test_search_endpoint_uses_one_connection,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("🔎 Full-Text Search Tests (app/services/search.py)", TESTS)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+"""
+=============================================================================
+GearGuard Backend - Dashboard Statistics Test Suite
+=============================================================================
+
+Tests organization statistics (app/services/stats.py) behind the dashboard
+(app/api/v1/reports.py):
+- every dashboard figure matches the organization's rows
+- equipment without a health score is left out of the average, both when
+  counters are rebuilt and when write paths maintain them
+- stats are cached until a write path invalidates them
+- with no spare pooled connection the queries share the request's one
+
+Usage:
+    python tests/test_stats_module.py
+    python -m pytest tests/test_stats_module.py
+"""
+
+from datetime import datetime, timedelta
+
+import service_support as support
+
+from app.api.v1.equipment import EquipmentCreateRequest, create_equipment, delete_equipment
+from app.api.v1.reports import get_dashboard_stats
+from app.api.v1.workorders import StatusUpdateRequest, update_work_order_status
+from app.core.security import TokenPayload
+from app.database import PoolTimeoutError, async_connection
+from app.services import stats
+from app.services.stats import invalidate_org_stats
+
+
+def _admin(org_id: str) -> TokenPayload:
+    user_id = support.create_user(org_id, "admin")
+    return TokenPayload(sub=user_id, email=f"{user_id}@example.com", org_id=org_id, role="admin", permissions=[])
+
+
+def _dashboard(user: TokenPayload):
+    async def run():
+        async with async_connection() as db:
+            return await get_dashboard_stats(user, db)
+
+    return support.run(run())
+
+
+def _seed_org() -> str:
+    org_id = support.create_org()
+    now = datetime.utcnow()
+    equipment = []
+    for status, health in [("operational", 90), ("operational", 70), ("maintenance", 50),
+                           ("breakdown", 30), ("retired", 0)]:
+        equipment_id = support.create_equipment(org_id, status=status)
+        support.execute("UPDATE equipment SET health_score = ? WHERE id = ?", (health, equipment_id))
+        equipment.append(equipment_id)
+
+    created_by = support.create_user(org_id, "admin")
+    for equipment_id, status, due_in_days in [(equipment[0], "pending", -1), (equipment[0], "in_progress", -2),
+                                              (equipment[1], "pending", 1), (equipment[1], "completed", -3)]:
+        support.create_work_order(
+            org_id, equipment_id, status, due_date=now + timedelta(days=due_in_days), created_by=created_by
+        )
+
+    support.create_schedule(org_id, equipment[0], next_due=now + timedelta(days=2))
+    support.create_schedule(org_id, equipment[1], next_due=now + timedelta(days=30))
+    support.create_schedule(org_id, equipment[2], next_due=now + timedelta(days=1), is_active=False)
+
+    support.create_part(org_id, quantity_in_stock=1, minimum_stock_level=5)
+    support.create_part(org_id, quantity_in_stock=0, minimum_stock_level=5, is_active=False)
+    support.create_part(org_id, quantity_in_stock=9, minimum_stock_level=5)
+    support.create_part(org_id, quantity_in_stock=None, minimum_stock_level=5)
+    return org_id
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+def test_dashboard_matches_rows():
+    org_id = _seed_org()
+
+    dashboard = _dashboard(_admin(org_id))
+
+    assert (
+        dashboard.total_equipment, dashboard.operational_equipment,
+        dashboard.equipment_in_maintenance, dashboard.equipment_breakdown,
+    ) == (4, 2, 1, 1)
+    assert dashboard.avg_equipment_health == 60.0
+    assert (
+        dashboard.total_work_orders, dashboard.pending_work_orders,
+        dashboard.in_progress_work_orders, dashboard.completed_work_orders,
+    ) == (4, 2, 1, 1)
+    assert dashboard.overdue_work_orders == 2
+    assert dashboard.upcoming_maintenance == 1
+    assert dashboard.low_stock_parts == 1
+
+
+def test_unscored_equipment_is_left_out_of_average():
+    org_id = support.create_org()
+    admin = _admin(org_id)
+    scored, unscored = support.create_equipment(org_id), support.create_equipment(org_id)
+    support.execute("UPDATE equipment SET health_score = 80 WHERE id = ?", (scored,))
+    support.execute("UPDATE equipment SET health_score = NULL WHERE id = ?", (unscored,))
+
+    rebuilt = _dashboard(admin)
+
+    async def retire_scored_and_add_new():
+        async with async_connection() as db:
+            await delete_equipment(scored, admin, db)
+            await create_equipment(EquipmentCreateRequest(name="Fresh pump"), admin, db)
+
+    support.run(retire_scored_and_add_new())
+    maintained = _dashboard(admin)
+
+    assert (rebuilt.total_equipment, rebuilt.avg_equipment_health) == (2, 80.0)
+    assert (maintained.total_equipment, maintained.avg_equipment_health) == (2, 100.0)
+
+
+def test_stats_are_cached_until_invalidated():
+    org_id = _seed_org()
+    admin = _admin(org_id)
+    assert _dashboard(admin).total_work_orders == 4
+
+    # A write behind the API's back is not seen while the cache holds
+    pending_id = support.fetch_value(
+        "SELECT id FROM work_orders WHERE organization_id = ? AND status = 'pending' AND due_date > ?",
+        (org_id, datetime.utcnow())
+    )
+    support.execute("UPDATE work_orders SET due_date = ? WHERE id = ?", (datetime(2000, 1, 1), pending_id))
+    assert _dashboard(admin).overdue_work_orders == 2
+
+    async def complete():
+        async with async_connection() as db:
+            await update_work_order_status(pending_id, StatusUpdateRequest(status="completed"), admin, db)
+
+    support.run(complete())
+    dashboard = _dashboard(admin)
+
+    assert (dashboard.pending_work_orders, dashboard.completed_work_orders) == (1, 2)
+    assert dashboard.overdue_work_orders == 2
+
+
+def test_exhausted_pool_falls_back_to_request_connection():
+    org_id = _seed_org()
+    admin = _admin(org_id)
+    pooled = _dashboard(admin)
+    invalidate_org_stats(org_id)
+
+    acquire = stats.acquire_async
+
+    async def no_spare_connection(timeout=None):
+        raise PoolTimeoutError("pool exhausted")
+
+    stats.acquire_async = no_spare_connection
+    try:
+        shared = _dashboard(admin)
+    finally:
+        stats.acquire_async = acquire
+
+    assert shared.dict() == pooled.dict()
+
+
+TESTS = [
+    test_dashboard_matches_rows,
+    test_unscored_equipment_is_left_out_of_average,
+    test_stats_are_cached_until_invalidated,
+    test_exhausted_pool_falls_back_to_request_connection,
+]
+
+
+if __name__ == "__main__":
+    support.run_module("📊 Dashboard Statistics Tests (app/services/stats.py)", TESTS)